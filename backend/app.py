@@ -5,6 +5,7 @@ import logging
 import uuid
 import threading
 import shutil
+import math
 from datetime import datetime
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -19,6 +20,62 @@ from api_auth_middleware import init_api_auth
 # 导入服务器监控器
 from server_monitor import ServerMonitor
 
+# 导入抢购工作线程池和共享的OVH请求预算
+from purchase_workers import PurchaseWorkerPool
+from rate_budget import RateBudget
+
+# 导入抢购队列存储
+from queue_store import QueueRepository
+
+# 导入抢购流程耗时追踪
+from purchase_trace import PurchaseTrace, TraceAggregator
+
+# 导入服务器目录可用性补全
+from catalog_enrichment import AvailabilityEnricher
+
+# 导入型号解析缓存（增量刷新）
+from plan_parse_cache import PlanParseCache
+
+# 导入调试数据采集（默认关闭）
+from debug_capture import DebugCaptureSink
+
+# 导入服务器硬件信息提取
+from hardware_extraction import parse_plan, describe_datacenter
+
+# 导入多子公司目录缓存
+from catalog_cache import CatalogCache, extract_monthly_price
+
+# 导入服务器列表后台刷新任务管理
+from catalog_refresh import CatalogRefreshManager
+
+# 导入预序列化响应缓存
+from response_cache import ResponseCache
+
+# 导入服务器列表列式索引
+from server_index import ServerIndex, SORT_FIELDS
+
+# 导入目录变更记录
+from catalog_changes import CatalogChangeFeed
+
+# 导入Telegram通知异步发送
+from notification_dispatcher import NotificationDispatcher
+
+# 导入补货统计和补货时段预测
+from restock_analytics import RestockAnalytics, EVENT_RESTOCK
+from restock_windows import RestockWindowPredictor
+
+# 导入多进程监控工作进程
+from monitor_workers import MonitorWorkerPool, parse_config_availability
+
+# 导入配置字符串标准化（预编译正则 + 结果缓存）
+from config_normalizer import standardize_config
+
+# 导入配置指纹索引
+from config_index import ConfigFingerprintIndex
+
+# 导入可用性变化事件（配置狙击按事件触发）
+from availability_feed import AvailabilityFeed, PlanTriggerQueue, UNAVAILABLE_STATES
+
 # Data storage directories
 DATA_DIR = "data"
 CACHE_DIR = "cache"
@@ -73,12 +130,66 @@ config = {
     "tgChatId": "",
     "iam": "go-ovh-ie",
     "zone": "IE",
+    "purchaseConcurrency": 3,
+    "monitorConcurrency": 4,
+    "monitorRequestsPerMinute": 60,
+    "ovhRequestsPerMinute": 600,
+    "debugCapture": {"enabled": False, "plans": [], "sampleRate": 0.0, "maxBytes": 50 * 1024 * 1024},
+    "catalogSubsidiaries": {},  # 额外缓存的子公司及刷新间隔（秒），如 {"FR": 7200, "CA": 14400}
+    "predictiveScheduling": True,  # 临近历史补货集中时段时提高监控、抢购队列和配置狙击的检查频率
+    "monitorWorkers": 0,  # 监控工作进程数，0表示在Web进程内用线程检查
+    "configSniperInterval": 60,  # 配置狙击完整检查的间隔（秒），期间由可用性变化事件触发
+    "fastPathMaxAge": 10,  # 可用性确认在多少秒内的订单直接开始下单，不再重复检查可用性（0表示关闭）
 }
 
+# 抢购并发数和OVH请求预算的默认值
+DEFAULT_PURCHASE_CONCURRENCY = 3
+DEFAULT_MONITOR_CONCURRENCY = 4
+DEFAULT_MONITOR_REQUESTS_PER_MINUTE = 60
+DEFAULT_OVH_REQUESTS_PER_MINUTE = 600
+
+# 快速通道：可用性确认的有效时间（秒）
+DEFAULT_FAST_PATH_MAX_AGE = 10
+
+# 数值设置的类型和最小值（保存设置时校验，不合法时不修改配置）
+NUMERIC_SETTINGS = {
+    "purchaseConcurrency": (int, 1),
+    "monitorConcurrency": (int, 1),
+    "monitorRequestsPerMinute": (int, 1),
+    "ovhRequestsPerMinute": (int, 1),
+    "monitorWorkers": (int, 0),
+    "configSniperInterval": (int, 1),
+    "fastPathMaxAge": (float, 0),
+}
+
+def coerce_numeric_setting(key, value):
+    """
+    把数值设置转换为对应类型
+
+    Returns:
+        int/float: 转换后的值
+
+    Raises:
+        ValueError: 不是数字、整数设置不是整数或小于最小值
+    """
+    kind, minimum = NUMERIC_SETTINGS[key]
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} 应为数字")
+    if not math.isfinite(number) or (kind is int and not number.is_integer()):
+        raise ValueError(f"{key} 应为{'整数' if kind is int else '数字'}")
+    if number < minimum:
+        raise ValueError(f"{key} 不能小于 {minimum}")
+    return kind(number)
+
 logs = []
-queue = []
+queue = QueueRepository()  # 抢购队列（按ID索引、按状态分桶）
 purchase_history = []
 server_plans = []
+server_plans_version = 0  # 每次替换 server_plans 时加一（没有目录缓存时作为响应缓存的版本）
 stats = {
     "activeQueues": 0,
     "totalServers": 0,
@@ -87,12 +198,44 @@ stats = {
     "purchaseFailed": 0
 }
 
-# 服务器列表缓存
-server_list_cache = {
-    "data": [],
-    "timestamp": None,
-    "cache_duration": 2 * 60 * 60  # 缓存2小时
-}
+# 服务器列表缓存（按子公司缓存，config["zone"] 为主子公司，缓存2小时）
+catalog_cache = CatalogCache(default_interval=2 * 60 * 60)
+CATALOG_CACHE_FILE = os.path.join(DATA_DIR, "catalog_cache.json")
+
+# 目录变更记录（首次使用时创建并从文件加载）
+catalog_changes = None
+CATALOG_CHANGES_FILE = os.path.join(DATA_DIR, "catalog_changes.json")
+RESTOCK_EVENTS_FILE = os.path.join(DATA_DIR, "restock_events.json")
+MONITOR_WORKERS_DB = os.path.join(DATA_DIR, "monitor_workers.sqlite3")
+
+# 最近一次从API刷新服务器列表的统计（耗时、可用性查询结果）
+last_catalog_refresh = None
+
+# 型号解析缓存（首次刷新时从磁盘加载）
+plan_parse_cache = None
+PLAN_PARSE_CACHE_FILE = os.path.join(CACHE_DIR, "plan_parse_cache.json")
+
+# /api/servers 的预序列化响应（每个目录版本只序列化、压缩一次）
+servers_response_cache = ResponseCache()
+# 带过滤/排序/分页参数的查询结果（按查询参数缓存）
+servers_query_cache = ResponseCache(max_entries=64)
+
+# 服务器列表列式索引（按子公司缓存，目录版本变化时重建）
+server_indexes = {}
+
+# 服务器列表后台刷新任务（首次使用时创建）
+catalog_refresher = None
+notification_dispatcher = None  # Telegram通知异步发送（首次使用时创建）
+restock_analytics = None  # 补货统计（首次使用时从磁盘加载）
+restock_events_saved_at = 0.0
+restock_predictor = None  # 补货时段预测（首次使用时创建）
+RESTOCK_EVENTS_SAVE_INTERVAL = 60  # 补货事件最多每分钟保存一次
+# 没有任何缓存数据时，请求最多等待首次刷新的秒数
+COLD_LOAD_WAIT_SECONDS = 120
+
+# 调试数据采集（首次使用时创建）
+debug_capture = None
+DEBUG_CAPTURE_DIR = os.path.join(CACHE_DIR, "debug")
 
 # 自动刷新缓存的后台线程标志
 auto_refresh_running = False
@@ -100,12 +243,32 @@ auto_refresh_running = False
 # 初始化监控器（需要在函数定义后才能传入函数引用）
 monitor = None
 
-# 全局删除任务ID集合（用于立即停止后台线程处理）
-deleted_task_ids = set()
+# 抢购工作线程池（在 start_queue_processor 中创建）
+purchase_workers = None
+
+# 共享的OVH API请求预算（抢购、监控、狙击共用）
+ovh_rate_budget = RateBudget(DEFAULT_OVH_REQUESTS_PER_MINUTE)
+
+# 抢购流程各步骤耗时汇总（按数据中心）
+purchase_latency = TraceAggregator()
+
+# 有新任务加入队列时唤醒队列处理线程
+queue_wakeup = threading.Event()
+
+# 保存数据文件的锁（多个抢购工作线程会同时保存）
+save_lock = threading.RLock()
+
+# 补货统计和补货时段预测的创建锁（首次调用来自并发的监控线程）
+restock_lock = threading.RLock()
 
 # 配置绑定狙击任务
 config_sniper_tasks = []
 config_sniper_running = False
+# 配置狙击的唤醒事件：监控或目录刷新发现任务相关型号有货时按型号触发，
+# 目录出现新增型号/可选配置时请求一次完整检查（立即检查待匹配任务）
+config_sniper_events = PlanTriggerQueue()
+availability_feed = None  # 可用性变化事件（首次使用时创建）
+config_fingerprint_index = None  # 配置指纹索引（首次使用时创建）
 
 # VPS 监控相关
 vps_subscriptions = []
@@ -115,7 +278,7 @@ vps_check_interval = 60  # VPS检查间隔（秒）
 
 # Load data from files if they exist
 def load_data():
-    global config, logs, queue, purchase_history, server_plans, stats, config_sniper_tasks, vps_subscriptions, vps_check_interval
+    global config, logs, purchase_history, server_plans, server_plans_version, stats, config_sniper_tasks, vps_subscriptions, vps_check_interval
     
     if os.path.exists(CONFIG_FILE):
         try:
@@ -140,7 +303,7 @@ def load_data():
             with open(QUEUE_FILE, 'r', encoding='utf-8') as f:
                 content = f.read().strip()
                 if content:  # 确保文件不是空的
-                    queue = json.loads(content)
+                    queue.load(json.loads(content))
                 else:
                     print(f"警告: {QUEUE_FILE}文件为空，使用空列表")
         except json.JSONDecodeError:
@@ -152,20 +315,31 @@ def load_data():
                 content = f.read().strip()
                 if content:  # 确保文件不是空的
                     purchase_history = json.loads(content)
+                    purchase_latency.load_history(purchase_history)
                 else:
                     print(f"警告: {HISTORY_FILE}文件为空，使用空列表")
         except json.JSONDecodeError:
             print(f"警告: {HISTORY_FILE}文件格式不正确，使用空列表")
     
+    # 加载各子公司的目录缓存
+    if os.path.exists(CATALOG_CACHE_FILE):
+        try:
+            with open(CATALOG_CACHE_FILE, 'r', encoding='utf-8') as f:
+                catalog_cache.load_dict(json.load(f))
+            print(f"已加载目录缓存: {', '.join(catalog_cache.zones()) or '无'}")
+        except (json.JSONDecodeError, AttributeError):
+            print(f"警告: {CATALOG_CACHE_FILE}文件格式不正确，忽略")
+    
     if os.path.exists(SERVERS_FILE):
         try:
             with open(SERVERS_FILE, 'r', encoding='utf-8') as f:
                 content = f.read().strip()
                 if content:  # 确保文件不是空的
                     server_plans = json.loads(content)
-                    # 将文件数据同步到缓存
-                    server_list_cache["data"] = server_plans
-                    server_list_cache["timestamp"] = time.time()
+                    server_plans_version += 1
+                    # 将文件数据同步到缓存（目录缓存中没有主子公司数据时）
+                    if catalog_cache.get(config["zone"]) is None:
+                        catalog_cache.store(config["zone"], server_plans)
                     print(f"已从文件加载 {len(server_plans)} 台服务器，并同步到缓存")
                 else:
                     print(f"警告: {SERVERS_FILE}文件为空，使用空列表")
@@ -187,8 +361,11 @@ def load_data():
                                 sub.get('datacenters', []),
                                 sub.get('notifyAvailable', True),
                                 sub.get('notifyUnavailable', False),
-                                sub.get('serverName')  # 恢复服务器名称
+                                sub.get('serverName'),  # 恢复服务器名称
+                                sub.get('priority')
                             )
+                            # 恢复上次状态（紧凑格式或旧版字典格式）和历史记录
+                            monitor.restore_subscription_state(sub['planCode'], sub.get('lastStatus'), sub.get('history'), sub.get('lastStatusAt'))
                     # 恢复已知服务器列表
                     if 'known_servers' in subscriptions_data:
                         monitor.known_servers = set(subscriptions_data['known_servers'])
@@ -232,6 +409,12 @@ def load_data():
         except json.JSONDecodeError:
             print(f"警告: {VPS_SUBSCRIPTIONS_FILE}文件格式不正确")
     
+    # 应用OVH请求预算配置
+    ovh_rate_budget.set_rate(config.get("ovhRequestsPerMinute", DEFAULT_OVH_REQUESTS_PER_MINUTE))
+    if debug_capture:
+        debug_capture.configure(config.get("debugCapture"))
+    apply_catalog_schedules()
+    
     # Update stats
     update_stats()
     
@@ -239,12 +422,16 @@ def load_data():
 
 # Save data to files
 def save_data():
+    with save_lock:
+        _save_data()
+
+def _save_data():
     try:
         with open(CONFIG_FILE, 'w') as f:
             json.dump(config, f)
         flush_logs()  # 使用批量刷新函数
         with open(QUEUE_FILE, 'w') as f:
-            json.dump(queue, f)
+            json.dump(queue.snapshot(), f)
         with open(HISTORY_FILE, 'w') as f:
             json.dump(purchase_history, f)
         with open(SERVERS_FILE, 'w') as f:
@@ -256,7 +443,7 @@ def save_data():
         # 尝试单独保存每个文件
         try_save_file(CONFIG_FILE, config)
         try_save_file(LOGS_FILE, logs)
-        try_save_file(QUEUE_FILE, queue)
+        try_save_file(QUEUE_FILE, queue.snapshot())
         try_save_file(HISTORY_FILE, purchase_history)
         try_save_file(SERVERS_FILE, server_plans)
 
@@ -346,7 +533,7 @@ def flush_logs():
 def update_stats():
     global stats
     # 活跃队列 = 所有未完成的队列项（running + pending），不包括已完成或失败的
-    active_count = sum(1 for item in queue if item["status"] in ["running", "pending", "paused"])
+    active_count = queue.count_by_status("running", "pending", "paused")
     available_count = 0
     
     # Count available servers
@@ -368,17 +555,21 @@ def update_stats():
     }
 
 # Initialize OVH client
-def get_ovh_client():
+def get_ovh_client(timeout=None):
     if not config["appKey"] or not config["appSecret"] or not config["consumerKey"]:
         add_log("ERROR", "Missing OVH API credentials")
         return None
     
     try:
+        client_kwargs = {}
+        if timeout is not None:
+            client_kwargs["timeout"] = timeout
         client = ovh.Client(
             endpoint=config["endpoint"],
             application_key=config["appKey"],
             application_secret=config["appSecret"],
-            consumer_key=config["consumerKey"]
+            consumer_key=config["consumerKey"],
+            **client_kwargs
         )
         return client
     except Exception as e:
@@ -413,34 +604,12 @@ def check_server_availability_with_configs(plan_code):
             return {}
         
         add_log("INFO", f"[配置监控] OVH API 返回 {len(availabilities)} 个配置组合", "monitor")
+        get_availability_feed().publish(plan_code, availabilities, "monitor")
         
-        # 构建配置级别的可用性数据
-        result = {}
-        for item in availabilities:
-            memory = item.get("memory", "N/A")
-            storage = item.get("storage", "N/A")
-            fqn = item.get("fqn", "")
-            
-            # 使用 fqn 作为唯一key
-            config_key = fqn
-            
-            # 收集该配置在各个数据中心的可用性
-            datacenters = {}
-            for dc in item.get("datacenters", []):
-                dc_name = dc.get("datacenter")
-                availability = dc.get("availability", "unknown")
-                
-                if dc_name:
-                    datacenters[dc_name] = availability
-            
-            result[config_key] = {
-                "memory": memory,
-                "storage": storage,
-                "datacenters": datacenters,
-                "fqn": fqn
-            }
-            
-            add_log("INFO", f"[配置监控] 配置: {memory} + {storage}, 数据中心数: {len(datacenters)}", "monitor")
+        # 构建配置级别的可用性数据（使用 fqn 作为唯一key，与监控工作进程共用）
+        result = parse_config_availability(availabilities)
+        for config_data in result.values():
+            add_log("INFO", f"[配置监控] 配置: {config_data['memory']} + {config_data['storage']}, 数据中心数: {len(config_data['datacenters'])}", "monitor")
         
         add_log("INFO", f"[配置监控] 成功获取 {len(result)} 个配置组合的可用性", "monitor")
         return result
@@ -617,32 +786,41 @@ def purchase_server(queue_item):
     
     cart_id = None # Initialize cart_id to None
     item_id = None # Initialize item_id to None
+    trace = PurchaseTrace(queue_item["planCode"], queue_item["datacenter"])
     
     try:
-        # Check availability first
+        # Check availability first（快速通道：刚确认过可用性的首次尝试跳过重复检查）
         add_log("INFO", f"开始为 {queue_item['planCode']} 在 {queue_item['datacenter']} 的购买流程，选项: {queue_item.get('options')}", "purchase")
-        availabilities = client.get('/dedicated/server/datacenter/availabilities', planCode=queue_item["planCode"])
+        verified_age = availability_verified_age(queue_item)
+        if verified_age is not None:
+            add_log("INFO", f"快速通道: {queue_item['planCode']} 在 {queue_item['datacenter']} 的可用性已在 {verified_age:.1f} 秒前确认，跳过重复检查", "purchase")
+        else:
+            trace.begin("availability")
+            availabilities = client.get('/dedicated/server/datacenter/availabilities', planCode=queue_item["planCode"])
         
-        found_available = False
-        for item in availabilities:
-            datacenters = item.get("datacenters", [])
+            found_available = False
+            for item in availabilities:
+                datacenters = item.get("datacenters", [])
             
-            for dc_info in datacenters:
-                if dc_info.get("datacenter") == queue_item["datacenter"] and dc_info.get("availability") not in ["unavailable", "unknown"]:
-                    found_available = True
-                    break
+                for dc_info in datacenters:
+                    if dc_info.get("datacenter") == queue_item["datacenter"] and dc_info.get("availability") not in ["unavailable", "unknown"]:
+                        found_available = True
+                        break
             
-            if found_available:
-                break
+                if found_available:
+                    break
         
-        if not found_available:
-            add_log("INFO", f"服务器 {queue_item['planCode']} 在数据中心 {queue_item['datacenter']} 当前无货", "purchase")
-            # Even if not available, we might want to record this attempt in history if it's the first one
-            # For now, returning False will prevent history update here, purchase_server is called in a loop by queue processor
-            return False
+            if not found_available:
+                add_log("INFO", f"服务器 {queue_item['planCode']} 在数据中心 {queue_item['datacenter']} 当前无货", "purchase")
+                # Even if not available, we might want to record this attempt in history if it's the first one
+                # For now, returning False will prevent history update here, purchase_server is called in a loop by queue processor
+                trace.finish("unavailable")
+                purchase_latency.record(trace)
+                return False
         
         # Create cart
         add_log("INFO", f"为区域 {config['zone']} 创建购物车", "purchase")
+        trace.begin("cart_create")
         cart_result = client.post('/order/cart', ovhSubsidiary=config["zone"])
         cart_id = cart_result["cartId"]
         add_log("INFO", f"购物车创建成功，ID: {cart_id}", "purchase")
@@ -655,12 +833,14 @@ def purchase_server(queue_item):
             "duration": "P1M",  # 1 month
             "quantity": 1
         }
+        trace.begin("item_add")
         item_result = client.post(f'/order/cart/{cart_id}/eco', **item_payload)
         item_id = item_result["itemId"] # This is the itemId for the base server
         add_log("INFO", f"基础商品添加成功，项目 ID: {item_id}", "purchase")
         
         # Configure item (datacenter, OS, region)
         add_log("INFO", f"为项目 {item_id} 设置必需配置", "purchase")
+        trace.begin("configure")
         dc_lower = queue_item["datacenter"].lower()
         region = None
         EU_DATACENTERS = ['gra', 'rbx', 'sbg', 'eri', 'lim', 'waw', 'par', 'fra', 'lon']
@@ -717,8 +897,10 @@ def purchase_server(queue_item):
                 add_log("INFO", f"过滤后的硬件选项计划代码: {filtered_hardware_options}", "purchase")
                 try:
                     add_log("INFO", f"获取购物车 {cart_id} 中与基础商品 {queue_item['planCode']} 兼容的 Eco 硬件选项...", "purchase")
+                    trace.begin("option_lookup")
                     available_eco_options = client.get(f'/order/cart/{cart_id}/eco/options', planCode=queue_item['planCode'])
                     add_log("INFO", f"找到 {len(available_eco_options)} 个可用的 Eco 硬件选项。", "purchase")
+                    trace.begin("option_add")
                     added_options_count = 0
                     for wanted_option_plan_code in filtered_hardware_options:
                         option_added_successfully = False
@@ -759,6 +941,7 @@ def purchase_server(queue_item):
             add_log("INFO", "用户未提供任何硬件选项。", "purchase")
 
         add_log("INFO", f"绑定购物车 {cart_id}", "purchase")
+        trace.begin("assign")
         client.post(f'/order/cart/{cart_id}/assign')
         add_log("INFO", "购物车绑定成功", "purchase")
         
@@ -767,7 +950,11 @@ def purchase_server(queue_item):
             "autoPayWithPreferredPaymentMethod": False, 
             "waiveRetractationPeriod": True
         }
+        trace.begin("checkout")
         checkout_result = client.post(f'/order/cart/{cart_id}/checkout', **checkout_payload)
+        trace.finish("success")
+        purchase_latency.record(trace)
+        trace_data = trace.to_dict()
         
         order_id_val = checkout_result.get("orderId", "")
         order_url_val = checkout_result.get("url", "")
@@ -784,6 +971,7 @@ def purchase_server(queue_item):
             existing_history_entry["purchaseTime"] = current_time_iso
             existing_history_entry["attemptCount"] = queue_item["retryCount"]
             existing_history_entry["options"] = queue_item.get("options", [])
+            existing_history_entry["trace"] = trace_data
             add_log("INFO", f"更新抢购历史(成功) 任务ID: {queue_item['id']}", "purchase")
         else:
             history_entry = {
@@ -797,7 +985,8 @@ def purchase_server(queue_item):
                 "orderUrl": order_url_val,
                 "errorMessage": None,
                 "purchaseTime": current_time_iso,
-                "attemptCount": queue_item["retryCount"]
+                "attemptCount": queue_item["retryCount"],
+                "trace": trace_data
             }
             purchase_history.append(history_entry)
             add_log("INFO", f"创建抢购历史(成功) 任务ID: {queue_item['id']}", "purchase")
@@ -823,7 +1012,7 @@ def purchase_server(queue_item):
             
             success_message += f"\n抢购任务ID: {queue_item['id']}"
             
-            send_telegram_msg(success_message)
+            send_telegram_msg(success_message, urgent=True)
             add_log("INFO", f"已为订单 {order_id_val} 发送 Telegram 成功通知。", "purchase")
         else:
             add_log("INFO", "未配置 Telegram Token 或 Chat ID，跳过成功通知发送。", "purchase")
@@ -832,6 +1021,9 @@ def purchase_server(queue_item):
     
     except ovh.exceptions.APIError as api_e:
         error_msg = str(api_e)
+        trace.finish("failed")
+        purchase_latency.record(trace)
+        trace_data = trace.to_dict()
         add_log("ERROR", f"购买 {queue_item['planCode']} 时发生 OVH API 错误: {error_msg}", "purchase")
         if cart_id: add_log("ERROR", f"错误发生时的购物车ID: {cart_id}", "purchase")
         if item_id: add_log("ERROR", f"错误发生时的基础商品ID: {item_id}", "purchase")
@@ -848,6 +1040,7 @@ def purchase_server(queue_item):
             existing_history_entry["purchaseTime"] = current_time_iso
             existing_history_entry["attemptCount"] = queue_item["retryCount"]
             existing_history_entry["options"] = queue_item.get("options", [])
+            existing_history_entry["trace"] = trace_data
             add_log("INFO", f"更新抢购历史(API失败) 任务ID: {queue_item['id']}", "purchase")
         else:
             history_entry = {
@@ -861,7 +1054,8 @@ def purchase_server(queue_item):
                 "orderUrl": None,
                 "errorMessage": error_msg,
                 "purchaseTime": current_time_iso,
-                "attemptCount": queue_item["retryCount"]
+                "attemptCount": queue_item["retryCount"],
+                "trace": trace_data
             }
             purchase_history.append(history_entry)
             add_log("INFO", f"创建抢购历史(API失败) 任务ID: {queue_item['id']}", "purchase")
@@ -872,6 +1066,9 @@ def purchase_server(queue_item):
 
     except Exception as e:
         error_msg = str(e)
+        trace.finish("failed")
+        purchase_latency.record(trace)
+        trace_data = trace.to_dict()
         add_log("ERROR", f"购买 {queue_item['planCode']} 时发生未知错误: {error_msg}", "purchase")
         add_log("ERROR", f"完整错误堆栈: {traceback.format_exc()}", "purchase")
         if cart_id: add_log("ERROR", f"错误发生时的购物车ID: {cart_id}", "purchase")
@@ -889,6 +1086,7 @@ def purchase_server(queue_item):
             existing_history_entry["purchaseTime"] = current_time_iso
             existing_history_entry["attemptCount"] = queue_item["retryCount"]
             existing_history_entry["options"] = queue_item.get("options", [])
+            existing_history_entry["trace"] = trace_data
             add_log("INFO", f"更新抢购历史(通用失败) 任务ID: {queue_item['id']}", "purchase")
         else:
             history_entry = {
@@ -902,7 +1100,8 @@ def purchase_server(queue_item):
                 "orderUrl": None,
                 "errorMessage": error_msg,
                 "purchaseTime": current_time_iso,
-                "attemptCount": queue_item["retryCount"]
+                "attemptCount": queue_item["retryCount"],
+                "trace": trace_data
             }
             purchase_history.append(history_entry)
             add_log("INFO", f"创建抢购历史(通用失败) 任务ID: {queue_item['id']}", "purchase")
@@ -911,112 +1110,210 @@ def purchase_server(queue_item):
         update_stats()
         return False
 
+# 执行单个队列项的购买（在抢购工作线程中运行）
+def run_queue_item(item):
+    # 执行前最后检查：任务是否被标记删除
+    if queue.is_deleted(item["id"]):
+        add_log("INFO", f"任务 {item['id']} 在执行前被标记删除", "queue")
+        return
+    
+    last_check_time = item.get("lastCheckTime", 0)
+    if last_check_time == 0:
+        add_log("INFO", f"首次尝试任务 {item['id']}: {item['planCode']} 在 {item['datacenter']}", "queue")
+    else:
+        add_log("INFO", f"重试检查任务 {item['id']} (尝试次数: {item['retryCount'] + 1}): {item['planCode']} 在 {item['datacenter']}", "queue")
+    
+    # 更新检查时间和重试计数
+    item["lastCheckTime"] = time.time()
+    item["retryCount"] += 1
+    item["updatedAt"] = datetime.now().isoformat()
+    
+    # 尝试购买
+    try:
+        if purchase_server(item):
+            queue.set_status(item["id"], "completed")
+            item["updatedAt"] = datetime.now().isoformat()
+            log_message_verb = "首次尝试购买成功" if item["retryCount"] == 1 else f"重试购买成功 (尝试次数: {item['retryCount']})"
+            add_log("INFO", f"{log_message_verb}: {item['planCode']} 在 {item['datacenter']} (ID: {item['id']})", "queue")
+        else:
+            log_message_verb = "首次尝试购买失败或服务器暂无货" if item["retryCount"] == 1 else f"重试购买失败或服务器仍无货 (尝试次数: {item['retryCount']})"
+            add_log("INFO", f"{log_message_verb}: {item['planCode']} 在 {item['datacenter']} (ID: {item['id']})。将根据重试间隔再次尝试。", "queue")
+    finally:
+        # 按重试间隔重新排期（任务已完成、被暂停或被删除时不会再排期）
+        queue.reschedule(item["id"])
+    
+    save_data() # 保存队列状态
+    update_stats() # 更新统计信息
+
 # Process queue items
 def process_queue():
-    global deleted_task_ids
     while True:
-        # 在循环开始时检查队列是否为空
-        if not queue:
-            time.sleep(1)
-            continue
-            
-        items_to_process = list(queue) # Create a copy to iterate over
-        for item in items_to_process:
-            # 优先检查：任务是否在删除集合中（前端删除时立即生效）
-            if item["id"] in deleted_task_ids:
-                add_log("INFO", f"任务 {item['id']} 已被标记为删除，跳过处理", "queue")
-                continue
-            
-            # 次要检查：在处理前检查项目是否仍在原始队列中（通过ID检查）
-            item_still_exists = any(q_item["id"] == item["id"] for q_item in queue)
-            if not item_still_exists:
-                add_log("INFO", f"任务 {item['id']} 已从队列中移除，跳过处理", "queue")
-                # 添加到删除集合，避免重复处理
-                deleted_task_ids.add(item["id"])
-                continue
-            
-            if item["status"] == "running":
-                current_time = time.time()
-                last_check_time = item.get("lastCheckTime", 0)
-                
-                # 如果是首次尝试 (lastCheckTime为0) 或者到达重试间隔
-                if last_check_time == 0 or (current_time - last_check_time >= item["retryInterval"]):
-                    # 最后检查：任务是否被标记删除
-                    if item["id"] in deleted_task_ids:
-                        add_log("INFO", f"任务 {item['id']} 在执行前被标记删除", "queue")
-                        continue
-                    
-                    # 再次检查任务是否还在队列中（可能在等待期间被删除）
-                    if not any(q_item["id"] == item["id"] for q_item in queue):
-                        add_log("INFO", f"任务 {item['id']} 在处理前被移除", "queue")
-                        deleted_task_ids.add(item["id"])
-                        continue
-                    
-                    if last_check_time == 0:
-                        add_log("INFO", f"首次尝试任务 {item['id']}: {item['planCode']} 在 {item['datacenter']}", "queue")
-                    else:
-                        add_log("INFO", f"重试检查任务 {item['id']} (尝试次数: {item['retryCount'] + 1}): {item['planCode']} 在 {item['datacenter']}", "queue")
-                    
-                    # 更新检查时间和重试计数
-                    item["lastCheckTime"] = current_time
-                    item["retryCount"] += 1
-                    item["updatedAt"] = datetime.now().isoformat()
-                    
-                    # 尝试购买
-                    if purchase_server(item):
-                        item["status"] = "completed"
-                        item["updatedAt"] = datetime.now().isoformat()
-                        log_message_verb = "首次尝试购买成功" if item["retryCount"] == 1 else f"重试购买成功 (尝试次数: {item['retryCount']})"
-                        add_log("INFO", f"{log_message_verb}: {item['planCode']} 在 {item['datacenter']} (ID: {item['id']})", "queue")
-                    else:
-                        log_message_verb = "首次尝试购买失败或服务器暂无货" if item["retryCount"] == 1 else f"重试购买失败或服务器仍无货 (尝试次数: {item['retryCount']})"
-                        add_log("INFO", f"{log_message_verb}: {item['planCode']} 在 {item['datacenter']} (ID: {item['id']})。将根据重试间隔再次尝试。", "queue")
-                    
-                    save_data() # 保存队列状态
-                    update_stats() # 更新统计信息
+        queue.cleanup_tombstones()
         
-        time.sleep(1) # 每秒检查一次队列
+        # 只取出已到期的运行中任务（首次尝试或到达重试间隔），按等待时间先后排序
+        due_items = queue.pop_due()
+        
+        # 公平调度：等待最久的任务优先分派；线程池已满或同型号正在购买的任务保持原到期时间留到下一轮
+        for item in due_items:
+            if not (purchase_workers.has_capacity() and purchase_workers.submit(item)):
+                queue.reschedule(item["id"])
+        
+        # 每秒检查一次队列（有新任务加入时立即检查）
+        queue_wakeup.wait(1)
+        queue_wakeup.clear()
+
+# 快速通道：可用性确认的有效时间（秒），0表示关闭
+def fast_path_max_age():
+    try:
+        return max(0.0, float(config.get("fastPathMaxAge", DEFAULT_FAST_PATH_MAX_AGE)))
+    except (TypeError, ValueError):
+        return float(DEFAULT_FAST_PATH_MAX_AGE)
+
+# 首次尝试且可用性确认未超过有效时间时返回确认距今的秒数，否则返回None（需要重新检查可用性）
+def availability_verified_age(item):
+    verified_at = item.get("availabilityVerifiedAt")
+    if not verified_at or item.get("retryCount", 0) > 1:
+        return None
+    age = time.time() - verified_at
+    return age if age <= fast_path_max_age() else None
+
+def dispatch_verified_order(queue_item, verified_at=None):
+    """抢购快速通道：订单加入队列（用于显示和历史记录）后直接交给抢购工作线程，
+    不等待队列处理线程下一秒的检查；可用性确认时间未超过有效时间时首次尝试不再重复检查可用性
+    
+    Args:
+        queue_item: 完整的队列项（状态为 running）
+        verified_at: 可用性确认的时间戳，None表示未确认
+    
+    Returns:
+        bool: 是否已直接分派（线程池已满、同型号正在购买或预算不足时留在队列中立即调度）
+    """
+    if verified_at:
+        queue_item["availabilityVerifiedAt"] = verified_at
+    queue_item["fastPath"] = True
+    queue.add(queue_item)
+    
+    item = queue.take(queue_item["id"])
+    if item is not None and purchase_workers is not None and purchase_workers.submit(item):
+        add_log("INFO", f"快速通道: {item['planCode']} ({item['datacenter']}) 已直接分派给抢购工作线程", "queue")
+        return True
+    if item is not None:
+        queue.reschedule(item["id"], due_at=0)
+    queue_wakeup.set()
+    return False
 
 # Start queue processing thread
 def start_queue_processor():
+    global purchase_workers
+    queue.interval_func = queue_retry_interval
+    purchase_workers = PurchaseWorkerPool(
+        run_item_func=run_queue_item,
+        add_log_func=add_log,
+        max_workers=config.get("purchaseConcurrency", DEFAULT_PURCHASE_CONCURRENCY),
+        rate_budget=ovh_rate_budget
+    )
     thread = threading.Thread(target=process_queue)
     thread.daemon = True
     thread.start()
 
+# 设置各子公司的目录刷新计划（主子公司始终定时刷新）
+def apply_catalog_schedules():
+    schedules = {config["zone"]: catalog_cache.default_interval}
+    for zone, interval in (config.get("catalogSubsidiaries") or {}).items():
+        schedules[zone] = interval
+    catalog_cache.set_schedules(schedules)
+
+# 保存各子公司的目录缓存
+def save_catalog_cache():
+    try_save_file(CATALOG_CACHE_FILE, catalog_cache.to_dict())
+
+# 从API刷新指定子公司的服务器列表并更新缓存，返回服务器列表（失败时返回空列表）
+def refresh_catalog(zone, full_parse=False, progress=None):
+    global server_plans, server_plans_version
+    zone = CatalogCache.normalize_zone(zone or config["zone"])
+    is_primary_zone = zone == CatalogCache.normalize_zone(config["zone"])
+    api_servers = load_server_list(full_parse=full_parse, zone=zone, progress=progress)
+    if not api_servers:
+        return []
+    
+    previous_servers = catalog_cache.get(zone) or (server_plans if is_primary_zone else [])
+    catalog_cache.store(zone, api_servers)
+    save_catalog_cache()
+    
+    # 主子公司的数据同时作为全局服务器列表
+    if is_primary_zone:
+        server_plans = api_servers
+        server_plans_version += 1
+        save_data()
+        update_stats()
+    
+    # 与上一版本对比，发布变更
+    if get_catalog_changes().publish(zone, previous_servers, api_servers):
+        try_save_file(CATALOG_CHANGES_FILE, get_catalog_changes().to_list())
+    return api_servers
+
+# 获取目录变更记录（首次使用时创建，并注册监控和配置狙击的变更处理）
+def get_catalog_changes():
+    global catalog_changes
+    if catalog_changes is None:
+        catalog_changes = CatalogChangeFeed(add_log_func=add_log)
+        if os.path.exists(CATALOG_CHANGES_FILE):
+            try:
+                with open(CATALOG_CHANGES_FILE, 'r', encoding='utf-8') as f:
+                    catalog_changes.load_list(json.load(f))
+            except (json.JSONDecodeError, OSError) as e:
+                add_log("WARNING", f"加载目录变更记录失败: {str(e)}")
+        catalog_changes.subscribe(on_catalog_changes)
+    return catalog_changes
+
+# 目录变更处理：新增型号和价格变化提醒交给监控，新增型号/可选配置时唤醒配置狙击
+def on_catalog_changes(event):
+    if monitor:
+        monitor.handle_catalog_changes(event)
+    
+    if event["zone"] == CatalogCache.normalize_zone(config["zone"]) and (event["added"] or event["newOptions"]):
+        if any(task.get("enabled") and task.get("match_status") == "pending_match" for task in config_sniper_tasks):
+            add_log("INFO", f"目录出现新增型号或可选配置，立即检查待匹配任务", "config_sniper")
+            config_sniper_events.request_full_pass()
+
 # 自动刷新缓存的后台线程
 def auto_refresh_cache_loop():
-    """自动刷新服务器列表缓存（每2小时）"""
-    global auto_refresh_running, server_list_cache, server_plans
+    """按各子公司的刷新间隔自动刷新服务器列表缓存"""
+    global auto_refresh_running
     
     auto_refresh_running = True
-    add_log("INFO", "服务器列表自动刷新已启动（每2小时更新一次）", "auto_refresh")
+    add_log("INFO", f"服务器列表自动刷新已启动（子公司: {', '.join(catalog_cache.scheduled_zones())}）", "auto_refresh")
     
+    api_warned = False
     while auto_refresh_running:
         try:
-            # 每2小时刷新一次
-            time.sleep(2 * 60 * 60)  # 2小时
+            # 每分钟检查一次是否有子公司到了刷新时间
+            time.sleep(60)
             
-            # 检查是否配置了API
-            if not get_ovh_client():
-                add_log("WARNING", "未配置API，跳过自动刷新", "auto_refresh")
+            due_zones = catalog_cache.due_zones()
+            if not due_zones:
                 continue
             
-            add_log("INFO", "开始自动刷新服务器列表...", "auto_refresh")
-            
-            # 从API加载服务器列表
-            api_servers = load_server_list()
+            # 检查是否配置了API（只提示一次）
+            if not get_ovh_client():
+                if not api_warned:
+                    add_log("WARNING", "未配置API，跳过自动刷新", "auto_refresh")
+                    api_warned = True
+                continue
+            api_warned = False
             
-            if api_servers and len(api_servers) > 0:
-                # 更新缓存和全局变量
-                server_plans = api_servers
-                server_list_cache["data"] = api_servers
-                server_list_cache["timestamp"] = time.time()
-                save_data()
-                update_stats()
+            for zone in due_zones:
+                add_log("INFO", f"开始自动刷新服务器列表 ({zone})...", "auto_refresh")
                 
-                add_log("INFO", f"自动刷新完成：已更新 {len(server_plans)} 台服务器", "auto_refresh")
-            else:
-                add_log("WARNING", "自动刷新失败：API返回空数据", "auto_refresh")
+                # 从API加载服务器列表（与请求触发的刷新共用任务锁，同一子公司不会重复刷新）
+                api_servers = get_catalog_refresher().run(zone)
+                
+                if api_servers is None:
+                    continue
+                if api_servers:
+                    add_log("INFO", f"自动刷新完成 ({zone})：已更新 {len(api_servers)} 台服务器", "auto_refresh")
+                else:
+                    add_log("WARNING", f"自动刷新失败 ({zone})：API返回空数据", "auto_refresh")
                 
         except Exception as e:
             add_log("ERROR", f"自动刷新缓存时出错: {str(e)}", "auto_refresh")
@@ -1037,28 +1334,82 @@ def start_auto_refresh_cache():
     thread.start()
     add_log("INFO", "自动刷新缓存线程已启动", "auto_refresh")
 
+# 获取服务器列表后台刷新任务管理（首次使用时创建）
+def get_catalog_refresher():
+    global catalog_refresher
+    if catalog_refresher is None:
+        catalog_refresher = CatalogRefreshManager(refresh_catalog, add_log_func=add_log)
+    return catalog_refresher
+
+# 获取调试数据采集（首次使用时创建）
+def get_debug_capture():
+    global debug_capture
+    if debug_capture is None:
+        debug_capture = DebugCaptureSink(DEBUG_CAPTURE_DIR, add_log_func=add_log, settings=config.get("debugCapture"))
+    return debug_capture
+
+# 获取型号解析缓存（首次使用时从磁盘加载）
+def get_plan_parse_cache():
+    global plan_parse_cache
+    if plan_parse_cache is None:
+        plan_parse_cache = PlanParseCache(PLAN_PARSE_CACHE_FILE, add_log_func=add_log)
+    return plan_parse_cache
+
 # Load server list from OVH API
-def load_server_list():
-    global config
+# full_parse=True 时忽略解析缓存，完整解析所有型号；zone 为子公司代码，默认 config["zone"]
+# progress(stage, processed, total) 用于报告刷新进度
+def load_server_list(full_parse=False, zone=None, progress=None):
+    global config, last_catalog_refresh
     client = get_ovh_client()
     if not client:
         return []
     
+    zone = CatalogCache.normalize_zone(zone or config["zone"])
+    report_progress = progress or (lambda stage, processed=0, total=0: None)
+    refresh_started = time.monotonic()
     try:
+        report_progress("catalog")
+        # Get server models（只请求一次目录，原始响应同时保存到缓存目录）
+        catalog = client.get(f'/order/catalog/public/eco?ovhSubsidiary={zone}')
+        currency = (catalog.get("locale") or {}).get("currencyCode")
+        get_config_fingerprint_index().update(zone, catalog)
+        
         # 保存完整的API原始响应
         try:
-            # 尝试获取并保存原始目录响应
-            catalog = client.get(f'/order/catalog/public/eco?ovhSubsidiary={config["zone"]}')
             with open(os.path.join(CACHE_DIR, "ovh_catalog_raw.json"), "w") as f:
                 json.dump(catalog, f, indent=2)
             add_log("INFO", "已保存完整的API原始响应")
         except Exception as e:
             add_log("WARNING", f"保存API原始响应时出错: {str(e)}")
         
-        # Get server models
-        catalog = client.get(f'/order/catalog/public/eco?ovhSubsidiary={config["zone"]}')
         plans = []
         
+        # 并发获取所有型号的可用性（按目录顺序组装结果），失败的型号回退到上次缓存的数据中心列表
+        catalog_plan_codes = [plan.get("planCode") for plan in catalog.get("plans", []) if plan.get("planCode")]
+        previous_datacenters = {
+            server.get("planCode"): server.get("datacenters", [])
+            for server in (catalog_cache.get(zone) or (server_plans if zone == CatalogCache.normalize_zone(config["zone"]) else []))
+        }
+        report_progress("availability", 0, len(catalog_plan_codes))
+        enricher = AvailabilityEnricher(
+            client_factory=get_ovh_client,
+            add_log_func=add_log,
+            rate_budget=ovh_rate_budget
+        )
+        availability_map, enrichment_report = enricher.fetch(catalog_plan_codes, fallback=previous_datacenters)
+        get_availability_feed().publish_many(availability_map, "catalog")
+        add_log("INFO", f"可用性查询完成 ({enrichment_report['mode']}): {enrichment_report['fetched']}/{enrichment_report['plans']} 个型号，"
+                       f"回退缓存 {enrichment_report['fallback']} 个，耗时 {enrichment_report['durationSeconds']} 秒")
+        
+        # 增量刷新：原始数据哈希未变化的型号直接复用上次的解析结果
+        parse_cache = get_plan_parse_cache()
+        if full_parse:
+            parse_cache.clear()
+        parse_report = {"incremental": not full_parse, "reused": 0, "parsed": 0}
+        
+        # 调试数据由后台线程异步写入（默认关闭）
+        capture = get_debug_capture()
+        
         # 创建一个计数器，记录硬件信息提取成功的服务器数量
         hardware_info_counter = {
             "total": 0,
@@ -1074,877 +1425,57 @@ def load_server_list():
                 continue
             
             hardware_info_counter["total"] += 1
+            report_progress("parse", hardware_info_counter["total"], len(catalog_plan_codes))
             
-            # Get availability
-            availabilities = client.get('/dedicated/server/datacenter/availabilities', planCode=plan_code)
+            # Get availability（已预先并发获取）
+            availabilities = availability_map.get(plan_code)
             datacenters = []
             
-            for item in availabilities:
-                for dc in item.get("datacenters", []):
+            if availabilities is None:
+                # 查询失败或超时，沿用上次缓存的结果
+                for dc in previous_datacenters.get(plan_code, []):
                     datacenters.append({
                         "datacenter": dc.get("datacenter"),
                         "availability": dc.get("availability", "unknown")
                     })
-            
-            # 添加数据中心的名称和区域信息
-            for dc in datacenters:
-                dc_code = dc.get("datacenter", "").lower()[:3]  # 取前三个字符作为数据中心代码
-                
-                # 根据代码设置名称和区域
-                if dc_code == "gra":
-                    dc["dcName"] = "格拉夫尼茨"
-                    dc["region"] = "法国"
-                elif dc_code == "sbg":
-                    dc["dcName"] = "斯特拉斯堡"
-                    dc["region"] = "法国"
-                elif dc_code == "rbx":
-                    dc["dcName"] = "鲁贝"
-                    dc["region"] = "法国"
-                elif dc_code == "bhs":
-                    dc["dcName"] = "博阿尔诺"
-                    dc["region"] = "加拿大"
-                elif dc_code == "hil":
-                    dc["dcName"] = "希尔斯伯勒"
-                    dc["region"] = "美国"
-                elif dc_code == "vin":
-                    dc["dcName"] = "维也纳"
-                    dc["region"] = "美国"
-                elif dc_code == "lim":
-                    dc["dcName"] = "利马索尔"
-                    dc["region"] = "塞浦路斯"
-                elif dc_code == "sgp":
-                    dc["dcName"] = "新加坡"
-                    dc["region"] = "新加坡"
-                elif dc_code == "syd":
-                    dc["dcName"] = "悉尼"
-                    dc["region"] = "澳大利亚"
-                elif dc_code == "waw":
-                    dc["dcName"] = "华沙"
-                    dc["region"] = "波兰"
-                elif dc_code == "fra":
-                    dc["dcName"] = "法兰克福"
-                    dc["region"] = "德国"
-                elif dc_code == "lon":
-                    dc["dcName"] = "伦敦"
-                    dc["region"] = "英国"
-                elif dc_code == "eri":
-                    dc["dcName"] = "厄斯沃尔"
-                    dc["region"] = "英国"
-                else:
-                    dc["dcName"] = dc.get("datacenter", "未知")
-                    dc["region"] = "未知"
-            
-            # Extract server details
-            default_options = []
-            available_options = []
-            
-            # 创建初始服务器信息对象 - 确保在解析特定字段前就已创建
-            server_info = {
-                "planCode": plan_code,
-                "name": plan.get("invoiceName", ""),
-                "description": plan.get("description", ""),
-                "cpu": "N/A",
-                "memory": "N/A",
-                "storage": "N/A",
-                "bandwidth": "N/A",
-                "vrackBandwidth": "N/A",
-                "datacenters": datacenters,
-                "defaultOptions": default_options,
-                "availableOptions": available_options
-            }
-            
-            # 保存服务器详细数据，以便于调试
-            try:
-                # 创建一个目录来存储服务器数据
-                server_data_dir = os.path.join(CACHE_DIR, "servers", plan_code)
-                os.makedirs(server_data_dir, exist_ok=True)
-                
-                # 保存详细的plan数据
-                with open(os.path.join(server_data_dir, "plan_data.json"), "w") as f:
-                    json.dump(plan, f, indent=2)
-                
-                # 保存addonFamilies数据，如果存在
-                if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
-                    with open(os.path.join(server_data_dir, "addonFamilies.json"), "w") as f:
-                        json.dump(plan.get("addonFamilies"), f, indent=2)
-                
-                add_log("INFO", f"已保存服务器{plan_code}的详细数据用于调试")
-            except Exception as e:
-                add_log("WARNING", f"保存服务器详细数据时出错: {str(e)}")
-            
-            # 处理特殊系列处理逻辑
-            special_server_processed = False
-            try:
-                # 检查是否为SYSLE系列服务器
-                if "sysle" in plan_code.lower():
-                    add_log("INFO", f"检测到SYSLE系列服务器: {plan_code}")
-                    
-                    # 尝试从plan_code提取信息
-                    # 通常SYSLE的格式为"25sysle021"，可能包含CPU型号或配置信息
-                    # 根据不同型号添加更具体的CPU信息
-                    if "011" in plan_code:
-                        server_info["cpu"] = "SYSLE 011系列 (入门级服务器CPU)"
-                    elif "021" in plan_code:
-                        server_info["cpu"] = "SYSLE 021系列 (中端服务器CPU)"
-                    elif "031" in plan_code:
-                        server_info["cpu"] = "SYSLE 031系列 (高端服务器CPU)"
-                    else:
-                        server_info["cpu"] = "SYSLE系列CPU"
-                    
-                    # 获取服务器显示名称和描述，可能包含CPU信息
-                    display_name = plan.get("displayName", "")
-                    invoice_name = plan.get("invoiceName", "")
-                    description = plan.get("description", "")
-                    
-                    # 检查名称中是否包含具体CPU型号信息
-                    found_cpu = False
-                    for name in [display_name, invoice_name, description]:
-                        if not name:
-                            continue
-                            
-                        # 查找CPU型号关键词
-                        cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"]
-                        for keyword in cpu_keywords:
-                            if keyword.lower() in name.lower():
-                                # 提取包含CPU型号的部分
-                                start_pos = name.lower().find(keyword.lower())
-                                end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
-                                cpu_info = name[start_pos:end_pos].split(",")[0].strip()
-                                server_info["cpu"] = cpu_info
-                                add_log("INFO", f"从关键词中提取SYSLE CPU型号: {cpu_info} 给 {plan_code}")
-                                found_cpu = True
-                                break
-                        
-                        if found_cpu:
-                            break
-                    
-                    # 尝试寻找更具体的信息
-                    # 保存原始数据以便分析
-                    try:
-                        debug_file = os.path.join(CACHE_DIR, f"sysle_server_{plan_code}.json")
-                        with open(debug_file, "w") as f:
-                            json.dump(plan, f, indent=2)
-                        add_log("INFO", f"已保存SYSLE服务器{plan_code}的原始数据到cache目录")
-                    except Exception as e:
-                        add_log("WARNING", f"保存SYSLE服务器数据时出错: {str(e)}")
-                    
-                    special_server_processed = True
-                
-                # 检查是否为SK系列服务器
-                elif "sk" in plan_code.lower():
-                    add_log("INFO", f"检测到SK系列服务器: {plan_code}")
-                    
-                    # 获取服务器显示名称和描述，可能包含CPU信息
-                    display_name = plan.get("displayName", "")
-                    invoice_name = plan.get("invoiceName", "")
-                    description = plan.get("description", "")
-                    
-                    # 检查名称中是否包含具体CPU型号信息
-                    found_cpu = False
-                    for name in [display_name, invoice_name, description]:
-                        if not name:
-                            continue
-                            
-                        # 查找典型的CPU信息格式，例如"KS-A | Intel i7-6700k"
-                        if "|" in name:
-                            parts = name.split("|")
-                            if len(parts) > 1:
-                                cpu_part = parts[1].strip()
-                                if "intel" in cpu_part.lower() or "amd" in cpu_part.lower() or "xeon" in cpu_part.lower() or "i7" in cpu_part.lower():
-                                    server_info["cpu"] = cpu_part
-                                    add_log("INFO", f"从名称中提取CPU型号: {cpu_part} 给 {plan_code}")
-                                    found_cpu = True
-                        
-                        # 直接查找CPU型号关键词
-                        cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"]
-                        for keyword in cpu_keywords:
-                            if keyword.lower() in name.lower():
-                                # 提取包含CPU型号的部分
-                                start_pos = name.lower().find(keyword.lower())
-                                end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
-                                cpu_info = name[start_pos:end_pos].split(",")[0].strip()
-                                server_info["cpu"] = cpu_info
-                                add_log("INFO", f"从关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
-                                found_cpu = True
-                                break
-                        
-                        if found_cpu:
-                            break
-                    
-                    # 如果没有找到详细的CPU型号，使用默认值
-                    if not found_cpu:
-                        server_info["cpu"] = "SK系列专用CPU"
-                    
-                    # 尝试寻找更具体的信息
-                    # 保存原始数据以便分析
-                    try:
-                        debug_file = os.path.join(CACHE_DIR, f"sk_server_{plan_code}.json")
-                        with open(debug_file, "w") as f:
-                            json.dump(plan, f, indent=2)
-                        add_log("INFO", f"已保存SK服务器{plan_code}的原始数据到cache目录")
-                    except Exception as e:
-                        add_log("WARNING", f"保存SK服务器数据时出错: {str(e)}")
-                    
-                    special_server_processed = True
-                
-                # 添加更多特殊系列处理...
-                
-                # 确保所有服务器都有CPU信息
-                if server_info["cpu"] == "N/A":
-                    add_log("INFO", f"服务器 {plan_code} 无法从API提取CPU信息，尝试从名称提取")
-                    
-                    # 尝试从名称中提取CPU信息
-                    display_name = plan.get("displayName", "")
-                    invoice_name = plan.get("invoiceName", "")
-                    description = plan.get("description", "")
-                    
-                    found_cpu = False
-                    for name in [display_name, invoice_name, description]:
-                        if not name:
-                            continue
-                            
-                        # 检查是否有CPU型号信息
-                        cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen", "processor", "cpu"]
-                        for keyword in cpu_keywords:
-                            if keyword.lower() in name.lower():
-                                # 提取包含CPU型号的部分
-                                start_pos = name.lower().find(keyword.lower())
-                                end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
-                                cpu_info = name[start_pos:end_pos].split(",")[0].strip()
-                                server_info["cpu"] = cpu_info
-                                add_log("INFO", f"从名称关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
-                                found_cpu = True
-                                break
-                        
-                        if found_cpu:
-                            break
-                    
-                    # 如果仍然没有找到CPU信息，使用默认值
-                    if not found_cpu:
-                        if "sysle" in plan_code.lower():
-                            server_info["cpu"] = "SYSLE系列专用CPU"
-                        elif "rise" in plan_code.lower():
-                            server_info["cpu"] = "RISE系列专用CPU"
-                        elif "game" in plan_code.lower():
-                            server_info["cpu"] = "GAME系列专用CPU"
-                        else:
-                            server_info["cpu"] = "专用服务器CPU"
-            except Exception as e:
-                add_log("WARNING", f"处理特殊系列服务器时出错: {str(e)}")
-                add_log("WARNING", f"错误详情: {traceback.format_exc()}")
-                
-                # 出错时也确保有默认CPU信息
-                if server_info["cpu"] == "N/A":
-                    server_info["cpu"] = "专用服务器CPU"
-            
-            # 如果是特殊处理的服务器，记录日志
-            if special_server_processed:
-                add_log("INFO", f"已对服务器 {plan_code} 应用特殊处理逻辑")
-            
-            # 获取服务器名称和描述，确保它们不为空
-            if not server_info["name"] and plan.get("displayName"):
-                server_info["name"] = plan.get("displayName")
-            
-            if not server_info["description"] and plan.get("displayName"):
-                server_info["description"] = plan.get("displayName")
-            
-            # 尝试从服务器名称标签中提取CPU信息
-            # 例如"KS-A | Intel i7-6700k"格式
-            if server_info["cpu"] == "N/A" or "系列" in server_info["cpu"]:
-                try:
-                    display_name = plan.get("displayName", "")
-                    invoice_name = plan.get("invoiceName", "")
-                    
-                    for name in [display_name, invoice_name]:
-                        if not name or "|" not in name:
-                            continue
-                            
-                        parts = name.split("|")
-                        if len(parts) > 1:
-                            cpu_part = parts[1].strip()
-                            if "intel" in cpu_part.lower() or "amd" in cpu_part.lower() or "xeon" in cpu_part.lower() or "i7" in cpu_part.lower():
-                                server_info["cpu"] = cpu_part
-                                add_log("INFO", f"从服务器名称标签中提取CPU: {cpu_part} 给 {plan_code}")
-                                break
-                except Exception as e:
-                    add_log("WARNING", f"从名称提取CPU时出错: {str(e)}")
-            
-            # 获取推荐配置和可选配置 - 使用多种方法处理不同格式
-            try:
-                # 方法 1: 检查plan.default.options
-                if plan.get("default") and isinstance(plan.get("default"), dict) and plan.get("default").get("options"):
-                    for default_opt in plan.get("default").get("options"):
-                        if isinstance(default_opt, dict):
-                            option_code = default_opt.get("planCode")
-                            option_name = default_opt.get("description", option_code)
-                            
-                            if option_code:
-                                default_options.append({
-                                    "label": option_name,
-                                    "value": option_code
-                                })
-                
-                # 方法 2: 检查plan.addons
-                if plan.get("addons") and isinstance(plan.get("addons"), list):
-                    for addon in plan.get("addons"):
-                        if not isinstance(addon, dict):
-                            continue
-                            
-                        addon_plan_code = addon.get("planCode")
-                        if not addon_plan_code:
-                            continue
-                        
-                        # 跳过已经在默认选项中的配置
-                        if any(opt["value"] == addon_plan_code for opt in default_options):
-                            continue
-                        
-                        # 添加到可选配置列表
-                        available_options.append({
-                            "label": addon.get("description", addon_plan_code),
-                            "value": addon_plan_code
+            else:
+                for item in availabilities:
+                    for dc in item.get("datacenters", []):
+                        datacenters.append({
+                            "datacenter": dc.get("datacenter"),
+                            "availability": dc.get("availability", "unknown")
                         })
-                
-                # 方法 3: 检查plan.product.options
-                if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("options"):
-                    product_options = plan.get("product").get("options")
-                    if isinstance(product_options, list):
-                        for product_opt in product_options:
-                            if not isinstance(product_opt, dict):
-                                continue
-                                
-                            option_code = product_opt.get("planCode")
-                            option_name = product_opt.get("description", option_code)
-                            
-                            if option_code and not any(opt["value"] == option_code for opt in available_options) and not any(opt["value"] == option_code for opt in default_options):
-                                available_options.append({
-                                    "label": option_name,
-                                    "value": option_code
-                                })
-                
-                # 方法 4: 尝试从plan.addonFamilies中提取硬件信息
-                printed_example = False
-                try:
-                    if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
-                        # 尝试保存完整的addonFamilies数据用于更深入分析
-                        try:
-                            debug_file = os.path.join(CACHE_DIR, f"addonFamilies_{plan_code}.json")
-                            with open(debug_file, "w") as f:
-                                json.dump(plan.get("addonFamilies"), f, indent=2)
-                            add_log("INFO", f"已保存服务器 {plan_code} 的addonFamilies数据到cache目录")
-                        except Exception as e:
-                            add_log("WARNING", f"保存addonFamilies数据时出错: {str(e)}")
-                        
-                        # 打印一个完整的addonFamilies示例用于调试
-                        if len(plan.get("addonFamilies")) > 0 and not printed_example:
-                            try:
-                                add_log("INFO", f"addonFamilies示例: {json.dumps(plan.get('addonFamilies')[0], indent=2)}")
-                                printed_example = True
-                            except Exception as e:
-                                add_log("WARNING", f"无法序列化addonFamilies示例: {str(e)}")
-                        
-                        # 尝试保存所有带宽相关的选项用于调试
-                        try:
-                            bandwidth_options = []
-                            for family in plan.get("addonFamilies"):
-                                family_name = family.get("name", "").lower()
-                                if ("bandwidth" in family_name or "traffic" in family_name or "network" in family_name):
-                                    bandwidth_options.append({
-                                        "family": family.get("name"),
-                                        "default": family.get("default"),
-                                        "addons": family.get("addons")
-                                    })
-                            
-                            if bandwidth_options:
-                                debug_file = os.path.join(CACHE_DIR, f"bandwidth_options_{plan_code}.json")
-                                with open(debug_file, "w") as f:
-                                    json.dump(bandwidth_options, f, indent=2)
-                                add_log("INFO", f"已保存{plan_code}的带宽选项到cache目录")
-                        except Exception as e:
-                            add_log("WARNING", f"保存带宽选项时出错: {str(e)}")
-                        
-                        # 重置可选配置列表
-                        temp_available_options = []
-                        
-                        # 提取addonFamilies信息
-                        for family in plan.get("addonFamilies"):
-                            if not isinstance(family, dict):
-                                add_log("WARNING", f"addonFamily不是字典类型: {family}")
-                                continue
-                                
-                            family_name = family.get("name", "").lower()  # 注意: 在API响应中是'name'而不是'family'
-                            default_addon = family.get("default")  # 获取默认选项
-                            
-                            # 提取可选配置
-                            if family.get("addons") and isinstance(family.get("addons"), list):
-                                for addon_code in family.get("addons"):
-                                    # 在API响应中，addons是字符串数组而不是对象数组
-                                    if not isinstance(addon_code, str):
-                                        continue
-                            
-                                    # 标记是否为默认选项
-                                    is_default = (addon_code == default_addon)
-                                    
-                                    # 从addon_code解析描述信息
-                                    addon_desc = addon_code
-                                    
-                                    # 过滤掉许可证相关选项
-                                    if (
-                                        # Windows许可证
-                                        "windows-server" in addon_code.lower() or
-                                        # SQL Server许可证
-                                        "sql-server" in addon_code.lower() or
-                                        # cPanel许可证
-                                        "cpanel-license" in addon_code.lower() or
-                                        # Plesk许可证
-                                        "plesk-" in addon_code.lower() or
-                                        # 其他常见许可证
-                                        "-license-" in addon_code.lower() or
-                                        # 操作系统选项
-                                        addon_code.lower().startswith("os-") or
-                                        # 控制面板
-                                        "control-panel" in addon_code.lower() or
-                                        "panel" in addon_code.lower()
-                                    ):
-                                        # 跳过许可证类选项
-                                        continue
-                            
-                                    if addon_code:
-                                        temp_available_options.append({
-                                            "label": addon_desc,
-                                            "value": addon_code,
-                                            "family": family_name,
-                                            "isDefault": is_default
-                                        })
-                                        
-                                        # 如果是默认选项，添加到默认选项列表
-                                        if is_default:
-                                            default_options.append({
-                                                "label": addon_desc,
-                                                "value": addon_code
-                                            })
-                            
-                            # 根据family名称设置对应的硬件信息
-                            if family_name and family.get("addons") and isinstance(family.get("addons"), list):
-                                # 获取默认选项的值
-                                default_value = family.get("default")
-                                
-                                # CPU信息
-                                if ("cpu" in family_name or "processor" in family_name) and server_info["cpu"] == "N/A":
-                                    if default_value:
-                                        server_info["cpu"] = default_value
-                                        add_log("INFO", f"从addonFamilies默认选项提取CPU: {default_value} 给 {plan_code}")
-                                        
-                                        # 尝试从CPU选项中提取更详细信息
-                                        try:
-                                            # 记录CPU选项的完整列表，方便调试
-                                            if family.get("addons") and isinstance(family.get("addons"), list):
-                                                cpu_options = []
-                                                for cpu_addon in family.get("addons"):
-                                                    if isinstance(cpu_addon, str):
-                                                        cpu_options.append(cpu_addon)
-                                                
-                                                if cpu_options:
-                                                    add_log("INFO", f"服务器 {plan_code} 的CPU选项: {', '.join(cpu_options)}")
-                                                    
-                                                    # 保存到文件以便更详细分析
-                                                    try:
-                                                        debug_file = os.path.join(CACHE_DIR, f"cpu_options_{plan_code}.json")
-                                                        with open(debug_file, "w") as f:
-                                                            json.dump({"options": cpu_options, "default": default_value}, f, indent=2)
-                                                    except Exception as e:
-                                                        add_log("WARNING", f"保存CPU选项时出错: {str(e)}")
-                                        except Exception as e:
-                                            add_log("WARNING", f"解析CPU选项时出错: {str(e)}")
-                                
-                                # 内存信息
-                                elif ("memory" in family_name or "ram" in family_name) and server_info["memory"] == "N/A":
-                                    if default_value:
-                                        # 尝试提取内存大小
-                                        ram_size = ""
-                                        ram_match = re.search(r'ram-(\d+)g', default_value, re.IGNORECASE)
-                                        if ram_match:
-                                            ram_size = f"{ram_match.group(1)} GB"
-                                            server_info["memory"] = ram_size
-                                            add_log("INFO", f"从addonFamilies默认选项提取内存: {ram_size} 给 {plan_code}")
-                                        else:
-                                            server_info["memory"] = default_value
-                                            add_log("INFO", f"从addonFamilies默认选项提取内存(原始值): {default_value} 给 {plan_code}")
-                                
-                                # 存储信息
-                                elif ("storage" in family_name or "disk" in family_name or "drive" in family_name or "ssd" in family_name or "hdd" in family_name) and server_info["storage"] == "N/A":
-                                    if default_value:
-                                        # 尝试匹配混合RAID格式
-                                        hybrid_storage_match = re.search(r'hybridsoftraid-(\d+)x(\d+)(sa|ssd|hdd)-(\d+)x(\d+)(nvme|ssd|hdd)', default_value, re.IGNORECASE)
-                                        if hybrid_storage_match:
-                                            count1 = hybrid_storage_match.group(1)
-                                            size1 = hybrid_storage_match.group(2)
-                                            type1 = hybrid_storage_match.group(3).upper()
-                                            count2 = hybrid_storage_match.group(4)
-                                            size2 = hybrid_storage_match.group(5)
-                                            type2 = hybrid_storage_match.group(6).upper()
-                                            server_info["storage"] = f"混合RAID {count1}x {size1}GB {type1} + {count2}x {size2}GB {type2}"
-                                            add_log("INFO", f"从addonFamilies默认选项提取混合存储: {server_info['storage']} 给 {plan_code}")
-                                        else:
-                                            # 尝试从存储代码中提取信息
-                                            storage_match = re.search(r'(raid|softraid)-(\d+)x(\d+)(ssd|hdd|nvme|sa)', default_value, re.IGNORECASE)
-                                            if storage_match:
-                                                raid_type = storage_match.group(1).upper()
-                                                count = storage_match.group(2)
-                                                size = storage_match.group(3)
-                                                type_str = storage_match.group(4).upper()
-                                                server_info["storage"] = f"{raid_type} {count}x {size}GB {type_str}"
-                                                add_log("INFO", f"从addonFamilies默认选项提取存储: {server_info['storage']} 给 {plan_code}")
-                                            else:
-                                                server_info["storage"] = default_value
-                                                add_log("INFO", f"从addonFamilies默认选项提取存储(原始值): {default_value} 给 {plan_code}")
-                                
-                                # 带宽信息
-                                elif ("bandwidth" in family_name or "traffic" in family_name or "network" in family_name) and server_info["bandwidth"] == "N/A":
-                                    if default_value:
-                                        add_log("DEBUG", f"处理带宽选项: {default_value}")
-                                        
-                                        # 格式1: traffic-5tb-100-24sk-apac (带宽限制和流量限制)
-                                        traffic_bw_match = re.search(r'traffic-(\d+)(tb|gb|mb)-(\d+)', default_value, re.IGNORECASE)
-                                        if traffic_bw_match:
-                                            size = traffic_bw_match.group(1)
-                                            unit = traffic_bw_match.group(2).upper()
-                                            bw_value = traffic_bw_match.group(3)
-                                            server_info["bandwidth"] = f"{bw_value} Mbps / {size} {unit}流量"
-                                            add_log("INFO", f"从addonFamilies默认选项提取带宽和流量: {server_info['bandwidth']} 给 {plan_code}")
-                                        
-                                        # 格式2: traffic-5tb (仅流量限制)
-                                        elif re.search(r'traffic-(\d+)(tb|gb|mb)$', default_value, re.IGNORECASE):
-                                            simple_traffic_match = re.search(r'traffic-(\d+)(tb|gb|mb)', default_value, re.IGNORECASE)
-                                            size = simple_traffic_match.group(1)
-                                            unit = simple_traffic_match.group(2).upper()
-                                            server_info["bandwidth"] = f"{size} {unit}流量"
-                                            add_log("INFO", f"从addonFamilies默认选项提取流量: {server_info['bandwidth']} 给 {plan_code}")
-                                        
-                                        # 格式3: bandwidth-100 (仅带宽限制)
-                                        elif re.search(r'bandwidth-(\d+)', default_value, re.IGNORECASE):
-                                            bandwidth_match = re.search(r'bandwidth-(\d+)', default_value, re.IGNORECASE)
-                                            bw_value = int(bandwidth_match.group(1))
-                                            if bw_value >= 1000:
-                                                server_info["bandwidth"] = f"{bw_value/1000:.1f} Gbps".replace(".0 ", " ")
-                                            else:
-                                                server_info["bandwidth"] = f"{bw_value} Mbps"
-                                            add_log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
-                                        
-                                        # 格式4: traffic-unlimited (无限流量)
-                                        elif "traffic-unlimited" in default_value.lower() or "unlimited" in default_value.lower():
-                                            # 检查是否有带宽限制
-                                            bw_match = re.search(r'(\d+)', default_value)
-                                            if bw_match:
-                                                bw_value = int(bw_match.group(1))
-                                                server_info["bandwidth"] = f"{bw_value} Mbps / 无限流量"
-                                            else:
-                                                server_info["bandwidth"] = "无限流量"
-                                            add_log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
-                                        
-                                        # 格式5: bandwidth-guarantee (保证带宽)
-                                        elif "guarantee" in default_value.lower() or "guaranteed" in default_value.lower():
-                                            bw_guarantee_match = re.search(r'(\d+)', default_value)
-                                            if bw_guarantee_match:
-                                                bw_value = int(bw_guarantee_match.group(1))
-                                                server_info["bandwidth"] = f"{bw_value} Mbps (保证带宽)"
-                                                add_log("INFO", f"从addonFamilies默认选项提取保证带宽: {server_info['bandwidth']} 给 {plan_code}")
-                                            else:
-                                                server_info["bandwidth"] = "保证带宽"
-                                                add_log("INFO", f"从addonFamilies默认选项提取保证带宽(无具体值) 给 {plan_code}")
-                                        
-                                        # 格式6: vrack-bandwidth (内部网络带宽)
-                                        elif "vrack" in default_value.lower():
-                                            vrack_bw_match = re.search(r'vrack-bandwidth-(\d+)', default_value, re.IGNORECASE)
-                                            if vrack_bw_match:
-                                                bw_value = int(vrack_bw_match.group(1))
-                                                if bw_value >= 1000:
-                                                    server_info["vrackBandwidth"] = f"{bw_value/1000:.1f} Gbps".replace(".0 ", " ")
-                                                else:
-                                                    server_info["vrackBandwidth"] = f"{bw_value} Mbps"
-                                                add_log("INFO", f"从addonFamilies默认选项提取内部网络带宽: {server_info['vrackBandwidth']} 给 {plan_code}")
-                                        
-                                        # 无法识别的格式，使用原始值
-                                        else:
-                                            server_info["bandwidth"] = default_value
-                                            add_log("INFO", f"从addonFamilies默认选项提取带宽(原始值): {default_value} 给 {plan_code}")
-                        
-                        # 将处理好的可选配置添加到服务器信息中
-                        if temp_available_options:
-                            available_options = temp_available_options
-                
-                except Exception as e:
-                    add_log("ERROR", f"解析addonFamilies时出错: {str(e)}")
-                    add_log("ERROR", f"错误详情: {traceback.format_exc()}")
-                
-                # 方法 5: 检查plan.pricings中的配置项
-                if plan.get("pricings") and isinstance(plan.get("pricings"), dict):
-                    for pricing_key, pricing_value in plan.get("pricings").items():
-                        if isinstance(pricing_value, dict) and pricing_value.get("options"):
-                            for option_code, option_details in pricing_value.get("options").items():
-                                # 跳过已经在其他列表中的项目
-                                if any(opt["value"] == option_code for opt in default_options) or any(opt["value"] == option_code for opt in available_options):
-                                    continue
-                                
-                                option_label = option_code
-                                if isinstance(option_details, dict) and option_details.get("description"):
-                                    option_label = option_details.get("description")
-                                
-                                available_options.append({
-                                    "label": option_label,
-                                    "value": option_code
-                                })
-                
-                # 记录找到的选项数量
-                add_log("INFO", f"找到 {len(default_options)} 个默认选项和 {len(available_options)} 个可选配置用于 {plan_code}")
-                
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} 选项时出错: {str(e)}")
             
-            # 解析方法 1: 尝试从properties中提取硬件详情
-            try:
-                if plan.get("details") and plan.get("details").get("properties"):
-                    for prop in plan.get("details").get("properties"):
-                        # 添加类型检查，确保prop是字典类型
-                        if not isinstance(prop, dict):
-                            add_log("WARNING", f"属性项不是字典类型: {prop}")
-                            continue
-                            
-                        prop_name = prop.get("name", "").lower()
-                        value = prop.get("value", "N/A")
-                        
-                        if value and value != "N/A":
-                            if any(cpu_term in prop_name for cpu_term in ["cpu", "processor"]):
-                                server_info["cpu"] = value
-                                add_log("INFO", f"从properties提取CPU: {value} 给 {plan_code}")
-                            elif any(mem_term in prop_name for mem_term in ["memory", "ram"]):
-                                server_info["memory"] = value
-                                add_log("INFO", f"从properties提取内存: {value} 给 {plan_code}")
-                            elif any(storage_term in prop_name for storage_term in ["storage", "disk", "hdd", "ssd"]):
-                                server_info["storage"] = value
-                                add_log("INFO", f"从properties提取存储: {value} 给 {plan_code}")
-                            elif "bandwidth" in prop_name:
-                                if any(private_term in prop_name for private_term in ["vrack", "private", "internal"]):
-                                    server_info["vrackBandwidth"] = value
-                                    add_log("INFO", f"从properties提取vRack带宽: {value} 给 {plan_code}")
-                                else:
-                                    server_info["bandwidth"] = value
-                                    add_log("INFO", f"从properties提取带宽: {value} 给 {plan_code}")
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} 属性时出错: {str(e)}")
-            
-            # 解析方法 2: 尝试从名称中提取信息
-            try:
-                server_name = server_info["name"]
-                server_desc = server_info["description"] if server_info["description"] else ""
-                
-                # 保存原始数据用于调试
-                try:
-                    debug_file = os.path.join(CACHE_DIR, f"server_details_{plan_code}.json")
-                    with open(debug_file, "w") as f:
-                        json.dump({
-                            "name": server_name,
-                            "description": server_desc,
-                            "planCode": plan_code
-                        }, f, indent=2)
-                except Exception as e:
-                    add_log("WARNING", f"保存服务器详情时出错: {str(e)}")
-                
-                # 检查是否为KS/RISE系列服务器，它们通常使用 "KS-XX | CPU信息" 格式
-                if "|" in server_name:
-                    parts = server_name.split("|")
-                    if len(parts) > 1 and server_info["cpu"] == "N/A":
-                        cpu_part = parts[1].strip()
-                        server_info["cpu"] = cpu_part
-                        add_log("INFO", f"从服务器名称提取CPU: {cpu_part} 给 {plan_code}")
-                        
-                        # 尝试从CPU部分提取更多信息
-                        if "core" in cpu_part.lower():
-                            # 例如: "4 Core, 8 Thread, xxxx"
-                            core_parts = cpu_part.split(",")
-                            if len(core_parts) > 1:
-                                server_info["cpu"] = core_parts[0].strip()
-                
-                # 提取CPU型号信息
-                if server_info["cpu"] == "N/A":
-                    # 尝试匹配常见的CPU关键词
-                    cpu_keywords = ["i7-", "i9-", "ryzen", "xeon", "epyc", "cpu", "intel", "amd", "processor"]
-                    full_text = f"{server_name} {server_desc}".lower()
-                    
-                    for keyword in cpu_keywords:
-                        if keyword in full_text.lower():
-                            # 找到关键词的位置
-                            pos = full_text.lower().find(keyword)
-                            if pos >= 0:
-                                # 提取关键词周围的文本
-                                start = max(0, pos - 5)
-                                end = min(len(full_text), pos + 25)
-                                cpu_text = full_text[start:end]
-                                
-                                # 尝试清理提取的文本
-                                cpu_text = re.sub(r'[^\w\s\-,.]', ' ', cpu_text)
-                                cpu_text = ' '.join(cpu_text.split())
-                                
-                                if cpu_text:
-                                    server_info["cpu"] = cpu_text
-                                    add_log("INFO", f"从文本中提取CPU关键字: {cpu_text} 给 {plan_code}")
-                                    break
-                
-                # 从服务器名称中提取内存信息
-                if server_info["memory"] == "N/A":
-                    # 寻找内存关键词
-                    mem_match = None
-                    mem_patterns = [
-                        r'(\d+)\s*GB\s*RAM', 
-                        r'RAM\s*(\d+)\s*GB',
-                        r'(\d+)\s*G\s*RAM',
-                        r'RAM\s*(\d+)\s*G',
-                        r'(\d+)\s*GB'
-                    ]
-                    
-                    full_text = f"{server_name} {server_desc}"
-                    for pattern in mem_patterns:
-                        match = re.search(pattern, full_text, re.IGNORECASE)
-                        if match:
-                            mem_match = match
-                            break
-                    
-                    if mem_match:
-                        memory_size = mem_match.group(1)
-                        server_info["memory"] = f"{memory_size} GB"
-                        add_log("INFO", f"从文本中提取内存: {server_info['memory']} 给 {plan_code}")
-                
-                # 从服务器名称中提取存储信息
-                if server_info["storage"] == "N/A":
-                    # 寻找存储关键词
-                    storage_patterns = [
-                        r'(\d+)\s*[xX]\s*(\d+)\s*GB\s*(SSD|HDD|NVMe)',
-                        r'(\d+)\s*(SSD|HDD|NVMe)\s*(\d+)\s*GB',
-                        r'(\d+)\s*TB\s*(SSD|HDD|NVMe)',
-                        r'(\d+)\s*(SSD|HDD|NVMe)'
-                    ]
-                    
-                    full_text = f"{server_name} {server_desc}"
-                    for pattern in storage_patterns:
-                        match = re.search(pattern, full_text, re.IGNORECASE)
-                        if match:
-                            if match.lastindex == 3:  # 匹配了第一种模式
-                                count = match.group(1)
-                                size = match.group(2)
-                                disk_type = match.group(3).upper()
-                                server_info["storage"] = f"{count}x {size}GB {disk_type}"
-                            elif match.lastindex == 2:  # 匹配了最后一种模式
-                                size = match.group(1)
-                                disk_type = match.group(2).upper()
-                                server_info["storage"] = f"{size} {disk_type}"
-                            
-                            add_log("INFO", f"从文本中提取存储: {server_info['storage']} 给 {plan_code}")
-                            break
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} 服务器名称时出错: {str(e)}")
-                add_log("WARNING", f"错误详情: {traceback.format_exc()}")
-            
-            # 解析方法 3: 尝试从产品配置中提取信息
-            try:
-                if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("configurations"):
-                    configs = plan.get("product").get("configurations")
-                    if not isinstance(configs, list):
-                        add_log("WARNING", f"产品配置不是列表类型: {configs}")
-                        configs = []
-                        
-                    for config in configs:
-                        # 添加类型检查，确保config是字典类型
-                        if not isinstance(config, dict):
-                            add_log("WARNING", f"产品配置项不是字典类型: {config}")
-                            continue
-                            
-                        config_name = config.get("name", "").lower()
-                        value = config.get("value")
-                        
-                        if value:
-                            if any(cpu_term in config_name for cpu_term in ["cpu", "processor"]):
-                                server_info["cpu"] = value
-                                add_log("INFO", f"从产品配置提取CPU: {value} 给 {plan_code}")
-                            elif any(mem_term in config_name for mem_term in ["memory", "ram"]):
-                                server_info["memory"] = value
-                                add_log("INFO", f"从产品配置提取内存: {value} 给 {plan_code}")
-                            elif any(storage_term in config_name for storage_term in ["storage", "disk", "hdd", "ssd"]):
-                                server_info["storage"] = value
-                                add_log("INFO", f"从产品配置提取存储: {value} 给 {plan_code}")
-                            elif "bandwidth" in config_name:
-                                server_info["bandwidth"] = value
-                                add_log("INFO", f"从产品配置提取带宽: {value} 给 {plan_code}")
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} 产品配置时出错: {str(e)}")
-                add_log("WARNING", f"错误详情: {traceback.format_exc()}")
-            
-            # 解析方法 4: 尝试从description解析信息
-            try:
-                description = plan.get("description", "")
-                if description:
-                    parts = description.split(",")
-                    for part in parts:
-                        part = part.strip().lower()
-                        
-                        # 检查每个部分是否包含硬件信息
-                        if server_info["cpu"] == "N/A" and any(cpu_term in part for cpu_term in ["cpu", "core", "i7", "i9", "xeon", "epyc", "ryzen"]):
-                            server_info["cpu"] = part
-                            add_log("INFO", f"从描述提取CPU: {part} 给 {plan_code}")
-                            
-                        if server_info["memory"] == "N/A" and any(mem_term in part for mem_term in ["ram", "gb", "memory"]):
-                            server_info["memory"] = part
-                            add_log("INFO", f"从描述提取内存: {part} 给 {plan_code}")
-                            
-                        if server_info["storage"] == "N/A" and any(storage_term in part for storage_term in ["hdd", "ssd", "nvme", "storage", "disk"]):
-                            server_info["storage"] = part
-                            add_log("INFO", f"从描述提取存储: {part} 给 {plan_code}")
-                            
-                        if server_info["bandwidth"] == "N/A" and "bandwidth" in part:
-                            server_info["bandwidth"] = part
-                            add_log("INFO", f"从描述提取带宽: {part} 给 {plan_code}")
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} 描述时出错: {str(e)}")
-            
-            # 解析方法 5: 从pricing获取信息
-            try:
-                if plan.get("pricing") and isinstance(plan.get("pricing"), dict) and plan.get("pricing").get("configurations"):
-                    pricing_configs = plan.get("pricing").get("configurations")
-                    if not isinstance(pricing_configs, list):
-                        add_log("WARNING", f"价格配置不是列表类型: {pricing_configs}")
-                        pricing_configs = []
-                        
-                    for price_config in pricing_configs:
-                        # 添加类型检查，确保price_config是字典类型
-                        if not isinstance(price_config, dict):
-                            add_log("WARNING", f"价格配置项不是字典类型: {price_config}")
-                            continue
-                            
-                        config_name = price_config.get("name", "").lower()
-                        value = price_config.get("value")
-                        
-                        if value:
-                            if "processor" in config_name and server_info["cpu"] == "N/A":
-                                server_info["cpu"] = value
-                                add_log("INFO", f"从pricing配置提取CPU: {value} 给 {plan_code}")
-                            elif "memory" in config_name and server_info["memory"] == "N/A":
-                                server_info["memory"] = value
-                                add_log("INFO", f"从pricing配置提取内存: {value} 给 {plan_code}")
-                            elif "storage" in config_name and server_info["storage"] == "N/A":
-                                server_info["storage"] = value
-                                add_log("INFO", f"从pricing配置提取存储: {value} 给 {plan_code}")
-            except Exception as e:
-                add_log("WARNING", f"解析 {plan_code} pricing配置时出错: {str(e)}")
-                add_log("WARNING", f"错误详情: {traceback.format_exc()}")
+            # 添加数据中心的名称和区域信息（缓存的映射表）
+            for dc in datacenters:
+                dc["dcName"], dc["region"] = describe_datacenter(dc.get("datacenter", "未知"))
             
-            # 清理提取的数据以确保格式一致
-            # 对于CPU，添加一些基本信息如果只有核心数
-            if server_info["cpu"] != "N/A" and server_info["cpu"].isdigit():
-                server_info["cpu"] = f"{server_info['cpu']} 核心"
+            # 原始数据（含 addonFamilies 和 pricings）未变化时复用上次的解析结果，只更新可用性
+            plan_hash = parse_cache.digest(plan)
+            plan_price = extract_monthly_price(plan, currency)
+            cached_server_info = parse_cache.get(f"{zone}:{plan_code}", plan_hash)
+            if cached_server_info is not None:
+                cached_server_info["datacenters"] = datacenters
+                cached_server_info["price"] = plan_price
+                plans.append(cached_server_info)
+                parse_report["reused"] += 1
+                continue
+            parse_report["parsed"] += 1
             
-            # 更新服务器信息中的配置选项
-            server_info["defaultOptions"] = default_options
-            server_info["availableOptions"] = available_options
+            # Extract server details（预编译规则表解析硬件信息和可选配置）
+            server_info = parse_plan(plan, datacenters, log=add_log, capture=capture)
             
-            # 更新硬件信息计数器
+            server_info["price"] = plan_price
+            parse_cache.put(f"{zone}:{plan_code}", plan_hash, server_info)
+            plans.append(server_info)
+        
+        # 保存解析缓存（删除该子公司目录中已不存在的型号）
+        parse_cache.prune([f"{zone}:{code}" for code in catalog_plan_codes], prefix=f"{zone}:")
+        parse_cache.save()
+        add_log("INFO", f"型号解析: 复用 {parse_report['reused']} 个，重新解析 {parse_report['parsed']} 个")
+        
+        # 更新硬件信息计数器（包含复用的解析结果）
+        for server_info in plans:
             if server_info["cpu"] != "N/A":
                 hardware_info_counter["cpu_success"] += 1
             if server_info["memory"] != "N/A":
@@ -1953,8 +1484,6 @@ def load_server_list():
                 hardware_info_counter["storage_success"] += 1
             if server_info["bandwidth"] != "N/A":
                 hardware_info_counter["bandwidth_success"] += 1
-            
-            plans.append(server_info)
         
         # 记录硬件信息提取的成功率
         total = hardware_info_counter["total"]
@@ -1967,6 +1496,16 @@ def load_server_list():
             add_log("INFO", f"服务器硬件信息提取成功率: CPU={cpu_rate:.1f}%, 内存={memory_rate:.1f}%, "
                            f"存储={storage_rate:.1f}%, 带宽={bandwidth_rate:.1f}%")
         
+        last_catalog_refresh = {
+            "zone": zone,
+            "finishedAt": datetime.now().isoformat(),
+            "durationSeconds": round(time.monotonic() - refresh_started, 2),
+            "serverCount": len(plans),
+            "availability": enrichment_report,
+            "parse": parse_report
+        }
+        add_log("INFO", f"服务器列表刷新完成，共 {len(plans)} 个型号，总耗时 {last_catalog_refresh['durationSeconds']} 秒")
+        
         return plans
     except Exception as e:
         add_log("ERROR", f"Failed to load server list: {str(e)}")
@@ -2010,8 +1549,26 @@ def save_raw_api_response(client, zone):
     except Exception as e:
         add_log("WARNING", f"保存API原始响应时出错: {str(e)}")
 
+# 获取Telegram通知异步发送（首次使用时创建）
+def get_notification_dispatcher():
+    global notification_dispatcher
+    if notification_dispatcher is None:
+        notification_dispatcher = NotificationDispatcher(add_log_func=add_log)
+    return notification_dispatcher
+
 #移植过来的 send_telegram_msg 函数，适配 app.py 的 config
-def send_telegram_msg(message: str):
+def send_telegram_msg(message: str, urgent=False, wait=False):
+    """
+    发送Telegram消息：默认放入异步发送队列后立即返回（短时间内的多条消息合并为一条汇总）
+
+    Args:
+        message: 消息内容
+        urgent: 是否立即发送（不等待合并窗口）
+        wait: 是否同步发送并等待结果（测试通知使用）
+
+    Returns:
+        bool: wait=True 时为是否发送成功，否则为是否已加入发送队列
+    """
     # 使用 app.py 的全局 config 字典
     tg_token = config.get("tgToken")
     tg_chat_id = config.get("tgChatId")
@@ -2024,43 +1581,116 @@ def send_telegram_msg(message: str):
         add_log("WARNING", "Telegram消息未发送: Chat ID未在config中设置")
         return False
     
-    add_log("INFO", f"准备发送Telegram消息，ChatID: {tg_chat_id}, TokenLength: {len(tg_token)}")
-    
-    url = f"https://api.telegram.org/bot{tg_token}/sendMessage"
-    payload = {
-        "chat_id": tg_chat_id,
-        "text": message
-    }
-    headers = {"Content-Type": "application/json"}
-
     try:
-        add_log("INFO", f"发送HTTP请求到Telegram API: {url[:45]}...")
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        add_log("INFO", f"Telegram API响应: 状态码={response.status_code}")
+        if wait:
+            add_log("INFO", f"同步发送Telegram消息，ChatID: {tg_chat_id}, TokenLength: {len(tg_token)}")
+            result = get_notification_dispatcher().send_now(tg_token, tg_chat_id, message)
+            add_log("INFO" if result else "ERROR", "成功发送消息到Telegram" if result else "发送消息到Telegram失败")
+            return result
         
-        if response.status_code == 200:
-            try:
-                response_data = response.json()
-                add_log("INFO", f"Telegram响应数据: {response_data}")
-                add_log("INFO", "成功发送消息到Telegram")
-                return True
-            except Exception as json_error: # Changed from json.JSONDecodeError to generic Exception for wider catch, or could add 'import json'
-                add_log("ERROR", f"解析Telegram响应JSON时出错: {str(json_error)}")
-                return False # Explicitly return False here
-        else:
-            add_log("ERROR", f"发送消息到Telegram失败: 状态码={response.status_code}, 响应={response.text}")
+        if not get_notification_dispatcher().enqueue(tg_token, tg_chat_id, message, urgent=urgent):
+            add_log("WARNING", "Telegram发送队列已满，消息已丢弃")
             return False
-    except requests.exceptions.Timeout:
-        add_log("ERROR", "发送Telegram消息超时")
-        return False
-    except requests.exceptions.RequestException as e:
-        add_log("ERROR", f"发送Telegram消息时发生网络错误: {str(e)}")
-        return False
+        return True
     except Exception as e:
         add_log("ERROR", f"发送Telegram消息时发生未预期错误: {str(e)}")
         add_log("ERROR", f"错误详情: {traceback.format_exc()}")
         return False
 
+# 获取补货统计（首次使用时从保存的事件重建）
+def get_restock_analytics():
+    global restock_analytics
+    if restock_analytics is None:
+        with restock_lock:
+            if restock_analytics is None:
+                analytics = RestockAnalytics(add_log_func=add_log)
+                if os.path.exists(RESTOCK_EVENTS_FILE):
+                    try:
+                        with open(RESTOCK_EVENTS_FILE, 'r', encoding='utf-8') as f:
+                            analytics.load_list(json.load(f))
+                    except (json.JSONDecodeError, OSError) as e:
+                        add_log("WARNING", f"加载补货事件失败: {str(e)}")
+                restock_analytics = analytics
+    return restock_analytics
+
+# 记录可用性变化到补货统计（服务器监控和VPS监控共用）
+def record_restock_transition(plan_code, datacenter, config_display, old_status, status, unavailable_states=("unavailable",)):
+    global restock_events_saved_at
+    was_available = None if old_status is None else old_status not in unavailable_states
+    event_type = get_restock_analytics().record(plan_code, datacenter, config_display, was_available, status not in unavailable_states)
+    if event_type == EVENT_RESTOCK:
+        get_restock_predictor().observe_restock(plan_code)
+    # 多进程监控只传回状态变化，由此通知配置狙击（单进程监控已在查询时发布了原始可用性，不会重复通知）
+    if not was_available and status not in unavailable_states and status not in UNAVAILABLE_STATES:
+        get_availability_feed().mark_available(plan_code, datacenter, "monitor")
+    
+    with restock_lock:
+        save_due = time.time() - restock_events_saved_at >= RESTOCK_EVENTS_SAVE_INTERVAL
+        if save_due:
+            restock_events_saved_at = time.time()
+    if save_due:
+        try_save_file(RESTOCK_EVENTS_FILE, get_restock_analytics().to_list())
+
+# 获取补货时段预测（首次使用时创建）
+def get_restock_predictor():
+    global restock_predictor
+    if restock_predictor is None:
+        with restock_lock:
+            if restock_predictor is None:
+                restock_predictor = RestockWindowPredictor(get_restock_analytics(), add_log_func=add_log,
+                                                           enabled=bool(config.get("predictiveScheduling", True)))
+    return restock_predictor
+
+# 型号当前的补货时段加速倍数（不在补货集中时段时为1）
+def restock_window_boost(plan_code):
+    return get_restock_predictor().boost(plan_code)
+
+# 抢购队列任务的实际重试间隔：临近补货集中时段时缩短（不低于 MIN_PREDICTIVE_RETRY_INTERVAL，请求仍受共享预算限制）
+MIN_PREDICTIVE_RETRY_INTERVAL = 5
+def queue_retry_interval(item):
+    interval = item.get("retryInterval", 30)
+    boost = restock_window_boost(item.get("planCode"))
+    if boost <= 1:
+        return interval
+    return min(interval, max(MIN_PREDICTIVE_RETRY_INTERVAL, interval / boost))
+
+# 多进程监控时工作进程合计最多占用的OVH请求预算比例（其余留给 Web 进程的抢购、狙击等请求）
+MAX_MONITOR_WORKER_BUDGET_SHARE = 0.5
+
+# 多进程监控：按配置的工作进程数启用、调整或关闭
+def apply_monitor_workers():
+    num_workers = int(config.get("monitorWorkers") or 0)
+    total_rpm = config.get("ovhRequestsPerMinute", DEFAULT_OVH_REQUESTS_PER_MINUTE)
+    api_config = {
+        "endpoint": config["endpoint"],
+        "application_key": config["appKey"],
+        "application_secret": config["appSecret"],
+        "consumer_key": config["consumerKey"]
+    }
+    pool = monitor.worker_pool
+    if num_workers <= 0:
+        ovh_rate_budget.set_rate(total_rpm)
+        if pool is not None:
+            monitor.set_worker_pool(None)
+            add_log("INFO", "监控已切换为单进程模式", "monitor")
+        return
+    # 工作进程直接请求OVH，不经过 ovh_rate_budget：从总预算中划出工作进程的份额，Web 进程使用剩余部分
+    worker_rpm = max(1, min(config.get("monitorRequestsPerMinute", DEFAULT_MONITOR_REQUESTS_PER_MINUTE),
+                            int(total_rpm * MAX_MONITOR_WORKER_BUDGET_SHARE)))
+    ovh_rate_budget.set_rate(max(1, total_rpm - worker_rpm))
+    if pool is None:
+        pool = MonitorWorkerPool(MONITOR_WORKERS_DB, api_config, add_log_func=add_log, num_workers=num_workers)
+        pool.set_request_budget(worker_rpm)
+        monitor.set_worker_pool(pool)
+        add_log("INFO", f"监控已切换为多进程模式（{num_workers} 个工作进程，每分钟最多 {worker_rpm} 次请求）", "monitor")
+        return
+    pool.set_request_budget(worker_rpm)
+    pool.update_api_config(api_config)
+    if monitor.running:
+        pool.set_workers(num_workers)
+    else:
+        pool.num_workers = num_workers
+
 # 初始化服务器监控器
 def init_monitor():
     """初始化监控器"""
@@ -2068,7 +1698,12 @@ def init_monitor():
     monitor = ServerMonitor(
         check_availability_func=check_server_availability_with_configs,  # 使用配置级别的监控
         send_notification_func=send_telegram_msg,
-        add_log_func=add_log
+        add_log_func=add_log,
+        rate_budget=ovh_rate_budget,
+        max_workers=config.get("monitorConcurrency", DEFAULT_MONITOR_CONCURRENCY),
+        requests_per_minute=config.get("monitorRequestsPerMinute", DEFAULT_MONITOR_REQUESTS_PER_MINUTE),
+        transition_func=record_restock_transition,
+        boost_func=restock_window_boost
     )
     return monitor
 
@@ -2077,7 +1712,7 @@ def save_subscriptions():
     """保存订阅数据到文件"""
     try:
         subscriptions_data = {
-            "subscriptions": monitor.subscriptions,
+            "subscriptions": monitor.export_subscriptions(),
             "known_servers": list(monitor.known_servers),
             "check_interval": monitor.check_interval
         }
@@ -2101,8 +1736,8 @@ def save_settings():
     prev_tg_token = config.get("tgToken")
     prev_tg_chat_id = config.get("tgChatId")
 
-    # Update config
-    config = {
+    # Update config（先校验数值设置，不合法时直接返回，不修改当前配置）
+    new_config = {
         "appKey": data.get("appKey", ""),
         "appSecret": data.get("appSecret", ""),
         "consumerKey": data.get("consumerKey", ""),
@@ -2110,8 +1745,39 @@ def save_settings():
         "tgToken": data.get("tgToken", ""),
         "tgChatId": data.get("tgChatId", ""),
         "iam": data.get("iam", "go-ovh-ie"),
-        "zone": data.get("zone", "IE")
+        "zone": data.get("zone", "IE"),
+        "purchaseConcurrency": data.get("purchaseConcurrency", config.get("purchaseConcurrency", DEFAULT_PURCHASE_CONCURRENCY)),
+        "monitorConcurrency": data.get("monitorConcurrency", config.get("monitorConcurrency", DEFAULT_MONITOR_CONCURRENCY)),
+        "monitorRequestsPerMinute": data.get("monitorRequestsPerMinute", config.get("monitorRequestsPerMinute", DEFAULT_MONITOR_REQUESTS_PER_MINUTE)),
+        "ovhRequestsPerMinute": data.get("ovhRequestsPerMinute", config.get("ovhRequestsPerMinute", DEFAULT_OVH_REQUESTS_PER_MINUTE)),
+        "debugCapture": data.get("debugCapture", config.get("debugCapture")),
+        "catalogSubsidiaries": data.get("catalogSubsidiaries", config.get("catalogSubsidiaries", {})),
+        "predictiveScheduling": data.get("predictiveScheduling", config.get("predictiveScheduling", True)),
+        "monitorWorkers": data.get("monitorWorkers", config.get("monitorWorkers", 0)),
+        "configSniperInterval": data.get("configSniperInterval", config.get("configSniperInterval", CONFIG_SNIPER_POLL_INTERVAL)),
+        "fastPathMaxAge": data.get("fastPathMaxAge", config.get("fastPathMaxAge", DEFAULT_FAST_PATH_MAX_AGE))
     }
+    try:
+        for key in NUMERIC_SETTINGS:
+            new_config[key] = coerce_numeric_setting(key, new_config[key])
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"设置无效: {str(e)}"}), 400
+    config = new_config
+    
+    # 应用抢购并发数和请求预算设置
+    ovh_rate_budget.set_rate(config["ovhRequestsPerMinute"])
+    if purchase_workers:
+        purchase_workers.set_max_workers(config["purchaseConcurrency"])
+    if monitor:
+        monitor.set_max_workers(config["monitorConcurrency"])
+        monitor.set_requests_per_minute(config["monitorRequestsPerMinute"])
+    if debug_capture:
+        debug_capture.configure(config["debugCapture"])
+    if restock_predictor:
+        restock_predictor.enabled = bool(config["predictiveScheduling"])
+    if monitor:
+        apply_monitor_workers()
+    apply_catalog_schedules()
     
     # Auto-generate IAM if not set
     if not config["iam"]:
@@ -2129,7 +1795,7 @@ def save_settings():
         if (current_tg_token != prev_tg_token) or (current_tg_chat_id != prev_tg_chat_id) or not prev_tg_token or not prev_tg_chat_id :
             add_log("INFO", f"Telegram Token或Chat ID已更新/设置。尝试发送Telegram测试消息到 Chat ID: {current_tg_chat_id}")
             test_message_content = "OVH Phantom Sniper: Telegram 通知已成功配置 (来自 app.py 测试)"
-            test_result = send_telegram_msg(test_message_content) # Call the移植过来的 function
+            test_result = send_telegram_msg(test_message_content, wait=True) # Call the移植过来的 function
             if test_result:
                 add_log("INFO", "Telegram 测试消息发送成功。")
             else:
@@ -2177,7 +1843,7 @@ def clear_logs():
 
 @app.route('/api/queue', methods=['GET'])
 def get_queue():
-    return jsonify(queue)
+    return jsonify(queue.snapshot())
 
 @app.route('/api/queue', methods=['POST'])
 def add_queue_item():
@@ -2196,7 +1862,7 @@ def add_queue_item():
         "lastCheckTime": 0 # 初始化为0, process_queue的首次检查会处理
     }
     
-    queue.append(queue_item)
+    queue.add(queue_item)
     save_data()
     update_stats()
     
@@ -2205,15 +1871,10 @@ def add_queue_item():
 
 @app.route('/api/queue/<id>', methods=['DELETE'])
 def remove_queue_item(id):
-    global queue, deleted_task_ids
-    item = next((item for item in queue if item["id"] == id), None)
+    # 从队列中移除并标记为删除（后台线程会检查墓碑记录，立即停止处理）
+    item = queue.remove(id)
     if item:
-        # 立即标记为删除（后台线程会检查这个集合）
-        deleted_task_ids.add(id)
         add_log("INFO", f"标记任务 {id} 为删除，后台线程将立即停止处理", "system")
-        
-        # 从队列中移除
-        queue = [item for item in queue if item["id"] != id]
         save_data()
         update_stats()
         add_log("INFO", f"Removed {item['planCode']} from queue (ID: {id})", "system")
@@ -2222,18 +1883,10 @@ def remove_queue_item(id):
 
 @app.route('/api/queue/clear', methods=['DELETE'])
 def clear_all_queue():
-    global queue, deleted_task_ids
-    count = len(queue)
-    
-    # 立即标记所有任务为删除（后台线程会检查这个集合）
-    for item in queue:
-        deleted_task_ids.add(item["id"])
-    
+    # 强制清空队列，所有任务标记为删除（后台线程会检查墓碑记录，立即停止处理）
+    count = queue.clear()
     add_log("INFO", f"标记 {count} 个任务为删除，后台线程将立即停止处理")
     
-    # 强制清空队列
-    queue.clear()  # 使用clear()方法确保列表被清空
-    
     # 立即保存到文件
     save_data()
     
@@ -2252,10 +1905,9 @@ def clear_all_queue():
 @app.route('/api/queue/<id>/status', methods=['PUT'])
 def update_queue_status(id):
     data = request.json
-    item = next((item for item in queue if item["id"] == id), None)
+    item = queue.set_status(id, data.get("status", "pending"))
     
     if item:
-        item["status"] = data.get("status", "pending")
         item["updatedAt"] = datetime.now().isoformat()
         save_data()
         update_stats()
@@ -2268,6 +1920,12 @@ def update_queue_status(id):
 def get_purchase_history():
     return jsonify(purchase_history)
 
+@app.route('/api/purchase-history/latency', methods=['GET'])
+def get_purchase_latency():
+    """抢购流程各步骤耗时统计（p50/p95，按数据中心）"""
+    datacenter = request.args.get('datacenter')
+    return jsonify(purchase_latency.stats(datacenter))
+
 @app.route('/api/purchase-history', methods=['DELETE'])
 def clear_purchase_history():
     global purchase_history
@@ -2281,7 +1939,7 @@ def clear_purchase_history():
 @app.route('/api/monitor/subscriptions', methods=['GET'])
 def get_subscriptions():
     """获取订阅列表"""
-    return jsonify(monitor.subscriptions)
+    return jsonify(monitor.list_subscriptions())
 
 @app.route('/api/monitor/subscriptions', methods=['POST'])
 def add_subscription():
@@ -2291,6 +1949,7 @@ def add_subscription():
     datacenters = data.get("datacenters", [])
     notify_available = data.get("notifyAvailable", True)
     notify_unavailable = data.get("notifyUnavailable", False)
+    priority = data.get("priority")  # high/normal/low，影响自适应检查间隔
     
     if not plan_code:
         return jsonify({"status": "error", "message": "缺少planCode参数"}), 400
@@ -2307,7 +1966,7 @@ def add_subscription():
     except Exception as e:
         add_log("WARNING", f"获取服务器名称失败: {str(e)}", "monitor")
     
-    monitor.add_subscription(plan_code, datacenters, notify_available, notify_unavailable, server_name)
+    monitor.add_subscription(plan_code, datacenters, notify_available, notify_unavailable, server_name, priority)
     save_subscriptions()
     
     # 如果监控未运行，自动启动
@@ -2383,6 +2042,7 @@ def stop_monitor():
 def get_monitor_status():
     """获取监控状态"""
     status = monitor.get_status()
+    status["notifications"] = get_notification_dispatcher().get_status()
     return jsonify(status)
 
 @app.route('/api/monitor/interval', methods=['PUT'])
@@ -2412,7 +2072,7 @@ def test_notification():
             "✅ Telegram通知配置正常！"
         )
         
-        result = send_telegram_msg(test_message)
+        result = send_telegram_msg(test_message, wait=True)
         
         if result:
             add_log("INFO", "Telegram测试通知发送成功", "monitor")
@@ -2426,64 +2086,151 @@ def test_notification():
 
 @app.route('/api/servers', methods=['GET'])
 def get_servers():
-    global server_plans, server_list_cache
+    global server_plans
     show_api_servers = request.args.get('showApiServers', 'false').lower() == 'true'
     force_refresh = request.args.get('forceRefresh', 'false').lower() == 'true'
+    full_parse = request.args.get('fullParse', 'false').lower() == 'true'
+    
+    # 过滤、排序和分页参数（参数错误时直接返回）
+    try:
+        query = parse_server_query(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"查询参数无效: {str(e)}"}), 400
+    
+    # 子公司（默认为配置的区域），各子公司的目录分别缓存，切换时不需要重新获取
+    zone = CatalogCache.normalize_zone(request.args.get('zone') or config["zone"])
+    is_primary_zone = zone == CatalogCache.normalize_zone(config["zone"])
+    cached_servers = catalog_cache.get(zone)
+    servers = cached_servers if cached_servers is not None else (server_plans if is_primary_zone else [])
     
     # 检查缓存是否有效
-    cache_valid = False
-    if server_list_cache["timestamp"] is not None:
-        cache_age = time.time() - server_list_cache["timestamp"]
-        cache_valid = cache_age < server_list_cache["cache_duration"]
+    cache_valid = catalog_cache.is_valid(zone)
+    refresh_job = None
     
-    # 如果缓存有效且不是强制刷新，使用缓存
     if cache_valid and not force_refresh:
-        add_log("INFO", f"使用缓存的服务器列表 (缓存时间: {int((time.time() - server_list_cache['timestamp']) / 60)} 分钟前)")
-        server_plans = server_list_cache["data"]
+        # 缓存有效且不是强制刷新，使用缓存
+        add_log("INFO", f"使用缓存的服务器列表 ({zone}，缓存时间: {int((time.time() - catalog_cache.timestamp(zone)) / 60)} 分钟前)")
     elif show_api_servers and get_ovh_client():
-        # 缓存失效或强制刷新，从API重新加载
-        add_log("INFO", "正在从OVH API重新加载服务器列表...")
-        api_servers = load_server_list()
-        if api_servers and len(api_servers) > 0:  # 确保返回有效数据
-            server_plans = api_servers
-            # 更新缓存
-            server_list_cache["data"] = api_servers
-            server_list_cache["timestamp"] = time.time()
-            save_data()
-            update_stats()
-            add_log("INFO", f"从OVH API加载了 {len(server_plans)} 台服务器，已更新缓存")
-            
-            # 记录硬件信息统计
-            cpu_count = sum(1 for s in server_plans if s["cpu"] != "N/A")
-            memory_count = sum(1 for s in server_plans if s["memory"] != "N/A")
-            storage_count = sum(1 for s in server_plans if s["storage"] != "N/A")
-            bandwidth_count = sum(1 for s in server_plans if s["bandwidth"] != "N/A")
-            
-            add_log("INFO", f"服务器硬件信息统计: CPU={cpu_count}/{len(server_plans)}, 内存={memory_count}/{len(server_plans)}, "
-                   f"存储={storage_count}/{len(server_plans)}, 带宽={bandwidth_count}/{len(server_plans)}")
-        else:
-            # API返回空数据，尝试使用旧的缓存或全局变量
-            add_log("WARNING", f"从OVH API加载服务器列表失败或返回空数据")
-            if server_list_cache["data"] and len(server_list_cache["data"]) > 0:
-                # 内存缓存有数据，使用缓存
-                server_plans = server_list_cache["data"]
-                add_log("INFO", f"使用内存缓存数据（共 {len(server_plans)} 台服务器）")
-            elif len(server_plans) > 0:
-                # 全局变量有数据（可能是从文件加载的），使用全局变量
-                add_log("INFO", f"使用全局服务器数据（共 {len(server_plans)} 台服务器）")
-            else:
-                # 完全没有数据，返回空数组
-                server_plans = []
+        # 缓存失效或强制刷新：先返回旧数据，在后台刷新（同一子公司只会有一个刷新任务）
+        refresh_job, created = get_catalog_refresher().start(zone, full_parse=full_parse)
+        if created and refresh_job["state"] == "queued":
+            add_log("INFO", f"正在进行增量刷新，已排队完整解析任务 {refresh_job['id']} ({zone})")
+        elif created:
+            add_log("INFO", f"已启动后台刷新服务器列表 ({zone})，任务 {refresh_job['id']}")
+        
+        if not servers:
+            # 没有任何可返回的数据时（包括强制刷新），等待首次刷新完成
+            refresh_job = get_catalog_refresher().wait(refresh_job["id"], timeout=COLD_LOAD_WAIT_SECONDS)
+            cached_servers = catalog_cache.get(zone)
+            servers = cached_servers if cached_servers is not None else (server_plans if is_primary_zone else [])
+            cache_valid = catalog_cache.is_valid(zone)
+            if not servers:
                 add_log("ERROR", "API返回空数据且没有缓存可用，返回空列表！")
-    elif not cache_valid and server_list_cache["data"]:
+        elif servers:
+            add_log("INFO", f"后台刷新中，先返回缓存数据（共 {len(servers)} 台服务器）")
+    elif not cache_valid and cached_servers:
         # 缓存过期但未认证，使用过期缓存
         add_log("INFO", "缓存已过期但未配置API，使用过期缓存数据")
-        server_plans = server_list_cache["data"]
     
+    cache_timestamp = catalog_cache.timestamp(zone)
+    if refresh_job is None:
+        refresh_job = get_catalog_refresher().get_running(zone)
+    
+    # 响应内容只随目录版本、缓存状态和刷新任务变化，序列化和压缩结果按此缓存
+    # （缓存时长通过 Age 响应头返回，不放入响应体，使同一版本的响应体保持不变）
+    refresh_state = {"id": refresh_job["id"], "state": refresh_job["state"]} if refresh_job else None
+    data_version = catalog_cache.version if cached_servers is not None else ("fallback", server_plans_version if is_primary_zone else None, len(servers))
+    cache_key = (
+        zone,
+        data_version,
+        cache_valid,
+        refresh_state["id"] if refresh_state else None,
+        refresh_state["state"] if refresh_state else None
+    )
+    
+    headers = {}
+    if cache_timestamp:
+        headers["Age"] = str(max(0, int(time.time() - cache_timestamp)))
+    
+    if not query:
+        entry = servers_response_cache.get(
+            cache_key,
+            lambda: build_servers_payload(servers, zone, cache_valid, cache_timestamp, refresh_state)
+        )
+        return servers_response_cache.respond(entry, request, headers)
+    
+    # 服务器端过滤/排序/分页：在列式索引上计算，只序列化当前页
+    query_started = time.perf_counter()
+    index = get_server_index(zone, data_version, servers)
+    rows, total = index.query(**query)
+    
+    def build_query_payload():
+        payload = build_servers_payload([servers[row] for row in rows], zone, cache_valid, cache_timestamp, refresh_state)
+        payload["query"] = {"total": total, "offset": query["offset"], "limit": query["limit"]}
+        return payload
+    
+    entry = servers_query_cache.get(cache_key + (repr(sorted(query.items())),), build_query_payload)
+    headers["X-Query-Time-Ms"] = f"{(time.perf_counter() - query_started) * 1000:.3f}"
+    return servers_query_cache.respond(entry, request, headers)
+
+# 解析 /api/servers 的过滤、排序和分页参数，没有任何参数时返回None
+def parse_server_query(args):
+    """
+    支持的参数:
+        minMemory/maxMemory (GB), minStorage/maxStorage (TB), minBandwidth/maxBandwidth (Mbps),
+        minPrice/maxPrice, disk=nvme,ssd,hdd, datacenters=gra,rbx（任意一个有货）,
+        search, sort=price/-memory/..., offset, limit
+    """
+    range_params = {"memory": "Memory", "storage": "Storage", "bandwidth": "Bandwidth", "price": "Price"}
+    ranges = {}
+    for field, suffix in range_params.items():
+        low, high = args.get(f"min{suffix}"), args.get(f"max{suffix}")
+        if low is None and high is None:
+            continue
+        ranges[field] = (float(low) if low not in (None, "") else None, float(high) if high not in (None, "") else None)
+    
+    disks = [d.strip().lower() for d in args.get("disk", "").split(",") if d.strip()]
+    datacenters = [d.strip().lower() for d in args.get("datacenters", "").split(",") if d.strip()]
+    search = args.get("search", "").strip()
+    sort = args.get("sort", "").strip() or None
+    if sort and sort.lstrip("-+") not in SORT_FIELDS:
+        raise ValueError(f"不支持的排序字段: {sort}")
+    offset = int(args.get("offset", 0) or 0)
+    limit = args.get("limit")
+    limit = int(limit) if limit not in (None, "") else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset/limit 不能为负数")
+    
+    if not (ranges or disks or datacenters or search or sort or offset or limit is not None):
+        return None
+    return {
+        "ranges": ranges,
+        "disks": disks,
+        "datacenters": datacenters,
+        "search": search,
+        "sort": sort,
+        "offset": offset,
+        "limit": limit
+    }
+
+# 获取子公司服务器列表的列式索引（目录版本变化时重建）
+def get_server_index(zone, data_version, servers):
+    cached = server_indexes.get(zone)
+    if cached and cached[0] == data_version:
+        return cached[1]
+    started = time.perf_counter()
+    index = ServerIndex(servers)
+    server_indexes[zone] = (data_version, index)
+    add_log("INFO", f"已建立服务器列式索引 ({zone})：{index.size} 个型号，"
+                   f"{len(index.datacenter_bits)} 个数据中心，耗时 {(time.perf_counter() - started) * 1000:.1f} ms")
+    return index
+
+# 生成 /api/servers 的响应数据
+def build_servers_payload(servers, zone, cache_valid, cache_timestamp, refresh_state):
     # 确保返回的服务器对象具有所有必要字段
     validated_servers = []
     
-    for server in server_plans:
+    for server in servers:
         # 确保每个字段都有合理的默认值
         validated_server = {
             "planCode": server.get("planCode", "未知"),
@@ -2496,7 +2243,8 @@ def get_servers():
             "vrackBandwidth": server.get("vrackBandwidth", "N/A"),
             "defaultOptions": server.get("defaultOptions", []),
             "availableOptions": server.get("availableOptions", []),
-            "datacenters": server.get("datacenters", [])
+            "datacenters": server.get("datacenters", []),
+            "price": server.get("price")
         }
         
         # 确保数组类型的字段是有效的数组
@@ -2513,22 +2261,32 @@ def get_servers():
     
     # 计算下一次自动刷新的时间
     next_refresh_time = None
-    if server_list_cache["timestamp"]:
-        next_refresh_time = server_list_cache["timestamp"] + server_list_cache["cache_duration"]
+    if cache_timestamp:
+        next_refresh_time = cache_timestamp + catalog_cache.interval(zone)
     
     # 返回服务器列表和缓存信息
-    response_data = {
+    return {
         "servers": validated_servers,
         "cacheInfo": {
+            "zone": zone,
             "cached": cache_valid,
-            "timestamp": server_list_cache["timestamp"],
-            "cacheAge": int(time.time() - server_list_cache["timestamp"]) if server_list_cache["timestamp"] else None,
-            "cacheDuration": server_list_cache["cache_duration"],
+            "timestamp": cache_timestamp,
+            "cacheDuration": catalog_cache.interval(zone),
             "nextAutoRefresh": next_refresh_time,
-            "autoRefreshEnabled": True
+            "autoRefreshEnabled": True,
+            "stale": not cache_valid,
+            "refreshing": bool(refresh_state and refresh_state["state"] in ("running", "queued")),
+            "refreshJob": refresh_state
         }
     }
-    return jsonify(response_data)
+
+@app.route('/api/servers/refresh/<job_id>', methods=['GET'])
+def get_server_refresh_job(job_id):
+    """查询服务器列表后台刷新任务的进度"""
+    job = get_catalog_refresher().get_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "刷新任务不存在或已过期"}), 404
+    return jsonify(job)
 
 @app.route('/api/availability/<plan_code>', methods=['GET'])
 def get_availability(plan_code):
@@ -2545,19 +2303,32 @@ def get_availability(plan_code):
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     update_stats()
-    return jsonify(stats)
+    response_data = dict(stats)
+    # 抢购工作线程状态（进行中的购买和线程利用率）
+    if purchase_workers:
+        response_data["purchaseWorkers"] = purchase_workers.get_status()
+    response_data["rateBudget"] = ovh_rate_budget.get_status()
+    return jsonify(response_data)
 
 @app.route('/api/cache/info', methods=['GET'])
 def get_cache_info():
     """获取缓存信息"""
+    zone = config["zone"]
+    cached_servers = catalog_cache.get(zone) or []
+    cache_timestamp = catalog_cache.timestamp(zone)
     cache_info = {
         "backend": {
-            "hasCachedData": len(server_list_cache["data"]) > 0,
-            "timestamp": server_list_cache["timestamp"],
-            "cacheAge": int(time.time() - server_list_cache["timestamp"]) if server_list_cache["timestamp"] else None,
-            "cacheDuration": server_list_cache["cache_duration"],
-            "serverCount": len(server_list_cache["data"]),
-            "cacheValid": False
+            "hasCachedData": len(cached_servers) > 0,
+            "timestamp": cache_timestamp,
+            "cacheAge": int(time.time() - cache_timestamp) if cache_timestamp else None,
+            "cacheDuration": catalog_cache.interval(zone),
+            "serverCount": len(cached_servers),
+            "cacheValid": catalog_cache.is_valid(zone),
+            "catalogs": catalog_cache.get_status(),
+            "refreshJobs": get_catalog_refresher().get_status(),
+            "serializedResponses": servers_response_cache.get_status(),
+            "lastRefresh": last_catalog_refresh,
+            "debugCapture": debug_capture.get_status() if debug_capture else None
         },
         "storage": {
             "dataDir": DATA_DIR,
@@ -2573,26 +2344,49 @@ def get_cache_info():
         }
     }
     
-    # 检查缓存是否有效
-    if server_list_cache["timestamp"]:
-        cache_age = time.time() - server_list_cache["timestamp"]
-        cache_info["backend"]["cacheValid"] = cache_age < server_list_cache["cache_duration"]
-    
     return jsonify(cache_info)
 
+@app.route('/api/catalog/price-deltas', methods=['GET'])
+def get_catalog_price_deltas():
+    """同一型号在各子公司的月付价格差异"""
+    plan_code = request.args.get('planCode')
+    return jsonify(catalog_cache.price_deltas(plan_code))
+
+@app.route('/api/catalog/changes', methods=['GET'])
+def get_catalog_change_feed():
+    """目录变更记录，since 为上次获取到的变更序号或 ISO 时间"""
+    since = request.args.get('since')
+    zone = request.args.get('zone')
+    feed = get_catalog_changes()
+    try:
+        events = feed.since(since, CatalogCache.normalize_zone(zone) if zone else None)
+    except ValueError:
+        return jsonify({"status": "error", "message": "since 参数应为变更序号或 ISO 时间"}), 400
+    return jsonify({"events": events, "latestSeq": feed.last_seq})
+
+@app.route('/api/monitor/analytics', methods=['GET'])
+def get_restock_analytics_summary():
+    """补货统计：按 (型号, 数据中心, 配置) 的补货频率、有货持续时间分布、常见补货时段、距上次补货的时间"""
+    analytics = get_restock_analytics()
+    items = analytics.query(plan_code=request.args.get('planCode'), datacenter=request.args.get('datacenter'))
+    return jsonify({"items": items, "predictions": get_restock_predictor().get_status(), **analytics.get_status()})
+
 @app.route('/api/cache/clear', methods=['POST'])
 def clear_cache():
     """清除后端缓存"""
-    global server_list_cache, server_plans
+    global server_plans, server_plans_version
     
     cache_type = request.json.get('type', 'all') if request.json else 'all'
     cleared = []
     
     if cache_type in ['all', 'memory']:
-        # 清除内存缓存
-        server_list_cache["data"] = []
-        server_list_cache["timestamp"] = None
+        # 清除内存缓存（所有子公司）
+        catalog_cache.clear()
+        servers_response_cache.clear()
+        servers_query_cache.clear()
+        server_indexes.clear()
         server_plans = []
+        server_plans_version += 1
         cleared.append('memory')
         add_log("INFO", "已清除内存缓存")
     
@@ -2603,8 +2397,15 @@ def clear_cache():
                 os.remove(SERVERS_FILE)
                 cleared.append('servers_file')
             
+            if os.path.exists(CATALOG_CACHE_FILE):
+                os.remove(CATALOG_CACHE_FILE)
+                cleared.append('catalog_cache_file')
+            
+            # 清除型号解析缓存
+            get_plan_parse_cache().clear()
+            
             # 清除API调试缓存
-            cache_files = ['ovh_catalog_raw.json']
+            cache_files = ['ovh_catalog_raw.json', 'plan_parse_cache.json']
             for cache_file in cache_files:
                 cache_path = os.path.join(CACHE_DIR, cache_file)
                 if os.path.exists(cache_path):
@@ -2617,6 +2418,15 @@ def clear_cache():
                 shutil.rmtree(servers_cache_dir)
                 cleared.append('servers_cache_dir')
             
+            # 清除调试采集数据（等待后台线程写完当前数据）
+            if debug_capture:
+                debug_capture.flush()
+            if os.path.exists(DEBUG_CAPTURE_DIR):
+                shutil.rmtree(DEBUG_CAPTURE_DIR)
+                if debug_capture:
+                    debug_capture.reset_index()
+                cleared.append('debug_capture_dir')
+            
             add_log("INFO", f"已清除缓存文件: {', '.join(cleared)}")
         except Exception as e:
             add_log("ERROR", f"清除缓存文件时出错: {str(e)}")
@@ -2662,51 +2472,61 @@ def ensure_files_exist():
 
 # ==================== 配置绑定狙击系统 ====================
 
-def standardize_config(config_str):
-    """标准化配置字符串，提取核心参数用于匹配"""
-    if not config_str:
-        return ""
-    
-    normalized = config_str.lower().strip()
-    
-    # 第一步：移除所有型号后缀
-    model_patterns = [
-        r'-\d+skl[a-e]\d{2}(-v\d+)?',  # -24sklea01, -24sklea01-v1
-        r'-\d+sk\d+',                   # -24sk502
-        r'-\d+rise\d*',                 # -24rise, -24rise012
-        r'-\d+sys\w*',                  # -24sys, -24sysgame01
-        r'-\d+risegame\d*',             # -24risegame01
-        r'-\d+risestor',                # -24risestor
-        r'-\d+skgame\d*',               # -24skgame01
-        r'-\d+ska\d*',                  # -24ska01
-        r'-\d+skstor\d*',               # -24skstor01
-        r'-\d+sysstor',                 # -24sysstor
-        r'game\d*',                     # game01, game02
-        r'stor\d*',                     # stor
-        r'-ks\d+',                      # -ks40
-        r'-rise',                       # -rise
-        r'-\d+sysle\d+',                # -25sysle012
-        r'-\d+skb\d+',                  # -25skb01
-        r'-\d+skc\d+',                  # -25skc01
-        r'-\d+sk\d+b',                  # -24sk60b
-        r'-v\d+',                       # -v1
-        r'-[a-z]{3}$',                  # -gra, -sgp (机房后缀)
-    ]
-    
-    for pattern in model_patterns:
-        normalized = re.sub(pattern, '', normalized)
-    
-    # 第二步：移除规格细节，只保留核心参数
-    # 对于内存：移除频率 (ecc-2133, noecc-2400 等)
-    normalized = re.sub(r'-(no)?ecc-\d+', '', normalized)
+# 获取配置指纹索引（首次使用时创建）
+def get_config_fingerprint_index():
+    global config_fingerprint_index
+    if config_fingerprint_index is None:
+        config_fingerprint_index = ConfigFingerprintIndex(add_log_func=add_log)
+        config_fingerprint_index.subscribe(on_config_fingerprint_index_rebuilt)
+    return config_fingerprint_index
+
+# 目录内容变化（索引重建）时重新计算配置狙击任务的下单配置
+def on_config_fingerprint_index_rebuilt(zone):
+    if zone != CatalogCache.normalize_zone(config["zone"]):
+        return
+    refreshed = 0
+    for task in list(config_sniper_tasks):
+        if task.get('match_status') != 'completed' and task.get('matched_api2'):
+            compute_order_options(task, zone=zone)
+            refreshed += 1
+    if refreshed:
+        add_log("INFO", f"目录已变化，已重新计算 {refreshed} 个配置狙击任务的下单配置", "config_sniper")
+        save_config_sniper_tasks()
+
+def compute_order_options(task, plan_codes=None, zone=None):
+    """预先计算任务的已匹配型号下单使用的配置码（task['order_options']: {planCode: [memory, storage]}），
+    出现库存时直接使用，不再查询目录
     
-    # 对于存储：移除后缀修饰符
-    normalized = re.sub(r'-(sas|sa|ssd|nvme)$', '', normalized)
+    Args:
+        task: 配置狙击任务
+        plan_codes: 需要计算的型号，None表示所有已匹配型号
+        zone: 已确认可用的索引子公司，None时确保索引可用
     
-    # 移除其他规格细节数字 (如频率)
-    normalized = re.sub(r'-\d{4,5}$', '', normalized)  # -4800, -5600
+    Returns:
+        dict: 任务的下单配置
+    """
+    order_options = task.setdefault('order_options', {})
+    zone = zone or ensure_config_fingerprint_index()
+    if not zone:
+        add_log("WARNING", f"计算 {task['api1_planCode']} 的下单配置失败: 目录不可用", "config_sniper")
+        return order_options
+    bound_config = task['bound_config']
+    bound_fingerprint = (standardize_config(bound_config['memory']), standardize_config(bound_config['storage']))
+    index = get_config_fingerprint_index()
+    for plan_code in (task.get('matched_api2') or []) if plan_codes is None else plan_codes:
+        order_options[plan_code] = index.order_options(zone, plan_code, bound_fingerprint)
+    return order_options
+
+# 获取目录并确保配置狙击使用的子公司的配置指纹索引可用
+def ensure_config_fingerprint_index():
+    def fetch_catalog(zone):
+        client = get_ovh_client()
+        if not client:
+            raise RuntimeError("OVH客户端未配置")
+        return client.get(f'/order/catalog/public/eco?ovhSubsidiary={zone}')
     
-    return normalized
+    zone = CatalogCache.normalize_zone(config["zone"])
+    return zone if get_config_fingerprint_index().ensure(zone, fetch_catalog) else None
 
 def find_matching_api2_plans(config_fingerprint, target_plancode_base=None, exclude_known=False):
     """在 API2 catalog 中查找匹配的 planCode
@@ -2720,76 +2540,16 @@ def find_matching_api2_plans(config_fingerprint, target_plancode_base=None, excl
         list: 匹配的 planCode 列表
         
     逻辑：
-        配置匹配模式：查找所有相同配置的型号
+        配置匹配模式：在配置指纹索引中查找所有相同配置的型号
     """
-    client = get_ovh_client()
-    if not client:
+    zone = ensure_config_fingerprint_index()
+    if not zone:
         return []
     
-    try:
-        catalog = client.get(f'/order/catalog/public/eco?ovhSubsidiary={config["zone"]}')
-        matched_plancodes = []
-        
-        # 配置匹配模式：查找所有相同配置的型号
-        add_log("INFO", f"🔍 配置匹配模式：查找所有相同配置的型号", "config_sniper")
-        for plan in catalog.get("plans", []):
-            plan_code = plan.get("planCode")
-            addon_families = plan.get("addonFamilies", [])
-            
-            # 提取所有可能的配置组合（包括 default 和 addons）
-            memory_options = []
-            storage_options = []
-            
-            for family in addon_families:
-                family_name = family.get("name", "").lower()
-                addons = family.get("addons", [])
-                
-                if family_name == "memory":
-                    # 找到匹配的 memory 配置
-                    target_memory_std = standardize_config(config_fingerprint[0])
-                    for addon in addons:
-                        if standardize_config(addon) == target_memory_std:
-                            memory_options.append(addon)
-                elif family_name == "storage":
-                    # 找到匹配的 storage 配置
-                    target_storage_std = standardize_config(config_fingerprint[1])
-                    for addon in addons:
-                        if standardize_config(addon) == target_storage_std:
-                            storage_options.append(addon)
-            
-            # 遍历所有内存和存储的组合
-            if memory_options and storage_options:
-                for memory_config in memory_options:
-                    for storage_config in storage_options:
-                        # 标准化并比较（配置匹配）
-                        plan_fingerprint = (
-                            standardize_config(memory_config),
-                            standardize_config(storage_config)
-                        )
-                        
-                        # 记录所有扫描到的 API2 配置（用于调试）
-                        add_log("DEBUG", f"API2 扫描: {plan_code}, memory={standardize_config(memory_config)}, storage={standardize_config(storage_config)}", "config_sniper")
-                        
-                        # 特别记录 64GB 内存的配置（用于调试）
-                        if "64g" in standardize_config(memory_config):
-                            add_log("INFO", f"🔍 发现 64GB 配置: {plan_code} | {memory_config} → {standardize_config(memory_config)} | {storage_config} → {standardize_config(storage_config)}", "config_sniper")
-                        
-                        if plan_fingerprint == config_fingerprint:
-                            # 避免重复添加同一个 planCode
-                            if plan_code not in matched_plancodes:
-                                matched_plancodes.append(plan_code)
-                                add_log("INFO", f"✓ API2 配置匹配: {plan_code}", "config_sniper")
-                            break  # 找到一个匹配就跳出内层循环
-                    else:
-                        continue
-                    break  # 找到匹配后跳出外层循环
-        
-        add_log("INFO", f"配置匹配完成，找到 {len(matched_plancodes)} 个 API2 planCode", "config_sniper")
-        return matched_plancodes
-        
-    except Exception as e:
-        add_log("ERROR", f"查找匹配 API2 planCode 时出错: {str(e)}")
-        return []
+    matched_plancodes = get_config_fingerprint_index().find_plans(zone, config_fingerprint)
+    add_log("DEBUG", f"配置匹配完成 ({target_plancode_base}): {config_fingerprint[0]} + {config_fingerprint[1]} → "
+                     f"{len(matched_plancodes)} 个 API2 planCode", "config_sniper")
+    return matched_plancodes
 
 def format_memory_display(memory_code):
     """格式化内存显示"""
@@ -2844,11 +2604,11 @@ def match_config(user_memory, user_storage, ovh_memory, ovh_storage):
 
 # 配置绑定狙击监控线程
 def config_sniper_monitor_loop():
-    """配置绑定狙击监控主循环（60秒轮询）"""
+    """配置绑定狙击监控主循环（可用性变化事件触发，定期完整检查）"""
     global config_sniper_running
     config_sniper_running = True
     
-    add_log("INFO", "配置绑定狙击监控已启动（60秒轮询）", "config_sniper")
+    add_log("INFO", f"配置绑定狙击监控已启动（事件触发，每 {int(config_sniper_poll_interval())} 秒完整检查）", "config_sniper")
     
     while config_sniper_running:
         try:
@@ -2865,43 +2625,145 @@ def config_sniper_monitor_loop():
             elif len(tasks_snapshot) != len(config_sniper_tasks):
                 add_log("WARNING", f"监控循环异常：副本 {len(tasks_snapshot)} 个，原列表 {len(config_sniper_tasks)} 个", "config_sniper")
             
-            for task in tasks_snapshot:
-                # 检查任务是否还在原列表中（可能已被删除，通过ID验证）
-                task_still_exists = any(t["id"] == task["id"] for t in config_sniper_tasks)
-                if not task_still_exists:
-                    continue
-                
-                if not task.get('enabled'):
-                    continue
-                
-                # 待匹配任务：先尝试匹配 API2
-                if task['match_status'] == 'pending_match':
-                    handle_pending_match_task(task)
-                
-                # 已匹配任务：检查可用性并下单
-                elif task['match_status'] == 'matched':
-                    handle_matched_task(task)
-                
-                # 已完成任务：跳过
-                elif task['match_status'] == 'completed':
-                    continue
-                
-                # 更新最后检查时间
-                task['last_check'] = datetime.now().isoformat()
+            # 所有任务共用本轮的目录和可用性快照
+            evaluate_config_sniper_tasks(tasks_snapshot)
             
             # 只有列表不为空时才保存（避免误保存空列表覆盖文件）
             if len(config_sniper_tasks) > 0:
                 save_config_sniper_tasks()
             else:
                 add_log("WARNING", "监控循环跳过保存：任务列表为空", "config_sniper")
-            time.sleep(60)  # 60秒轮询
+            
+            # 完整检查之间等待可用性变化事件，只评估监控了触发型号的任务
+            # （完整检查间隔默认60秒，目录变更时提前开始，临近补货集中时段时缩短）
+            next_full_pass = time.monotonic() + config_sniper_poll_interval()
+            while config_sniper_running:
+                full_pass, plan_codes = config_sniper_events.wait(max(0, next_full_pass - time.monotonic()))
+                if plan_codes:
+                    add_log("INFO", f"⚡ 可用性变化触发配置狙击: {', '.join(plan_codes)}", "config_sniper")
+                    evaluate_config_sniper_tasks(list(config_sniper_tasks), plan_codes=plan_codes)
+                    if len(config_sniper_tasks) > 0:
+                        save_config_sniper_tasks()
+                if full_pass or time.monotonic() >= next_full_pass:
+                    break
             
         except Exception as e:
             add_log("ERROR", f"配置狙击监控循环错误: {str(e)}", "config_sniper")
             time.sleep(60)
 
-def handle_pending_match_task(task):
-    """处理待匹配任务 - 增量匹配新增的 planCode，排除已知型号"""
+# 配置狙击完整检查的间隔：任务涉及的型号临近补货集中时段时按最大加速倍数缩短
+CONFIG_SNIPER_POLL_INTERVAL = 60
+MIN_CONFIG_SNIPER_POLL_INTERVAL = 15
+def config_sniper_poll_interval():
+    interval = max(MIN_CONFIG_SNIPER_POLL_INTERVAL, int(config.get("configSniperInterval") or CONFIG_SNIPER_POLL_INTERVAL))
+    boost = 1.0
+    for task in list(config_sniper_tasks):
+        if not task.get('enabled') or task.get('match_status') == 'completed':
+            continue
+        for plan_code in [task.get('api1_planCode')] + list(task.get('matched_api2') or []):
+            boost = max(boost, restock_window_boost(plan_code))
+    return max(MIN_CONFIG_SNIPER_POLL_INTERVAL, interval / boost)
+
+# 获取可用性变化事件（首次使用时创建，并注册配置狙击的处理）
+def get_availability_feed():
+    global availability_feed
+    if availability_feed is None:
+        availability_feed = AvailabilityFeed(add_log_func=add_log)
+        availability_feed.subscribe(on_availability_event)
+    return availability_feed
+
+# 可用性变化处理：有已匹配任务监控该型号时立即唤醒配置狙击
+def on_availability_event(plan_code, added, source):
+    if any(task.get('enabled') and task.get('match_status') == 'matched' and plan_code in (task.get('matched_api2') or [])
+           for task in list(config_sniper_tasks)):
+        add_log("DEBUG", f"{plan_code} 出现新的有货配置（来源: {source}）: "
+                         f"{', '.join(dc for _, dc in added)}", "config_sniper")
+        config_sniper_events.trigger(plan_code)
+
+# 配置狙击每轮需要查询的型号数量达到该值时，用一次批量请求获取全部可用性
+CONFIG_SNIPER_BULK_THRESHOLD = 10
+
+def evaluate_config_sniper_tasks(tasks, require_enabled=True, plan_codes=None):
+    """批量评估配置狙击任务：每轮只获取一次目录（配置指纹索引），
+    所有任务需要的型号去重后并发查询一次可用性，再用同一份快照评估每个任务
+    
+    Args:
+        tasks: 任务列表副本
+        require_enabled: 是否跳过已停用的任务（手动检查时不跳过）
+        plan_codes: 可用性变化触发的型号，只评估监控了这些型号的已匹配任务；None表示完整检查
+    """
+    # 检查任务是否还在原列表中（可能已被删除，通过ID验证）
+    def still_exists(task):
+        return any(t["id"] == task["id"] for t in config_sniper_tasks)
+    
+    active = [task for task in tasks
+              if (task.get('enabled') or not require_enabled) and task['match_status'] in ('pending_match', 'matched') and still_exists(task)]
+    if plan_codes is not None:
+        triggered = set(plan_codes)
+        active = [task for task in active if task['match_status'] == 'matched' and triggered & set(task['matched_api2'])]
+    if not active:
+        return
+    
+    # 待匹配任务：在配置指纹索引中查找新增的 planCode（本轮只获取一次目录）
+    new_plancodes_by_task = {}
+    for task in active:
+        if task['match_status'] == 'pending_match':
+            new_plancodes_by_task[task['id']] = find_new_plancodes(task)
+    
+    # 所有任务需要查询可用性的型号（去重）
+    needed = []
+    for task in active:
+        plancodes = new_plancodes_by_task[task['id']] if task['match_status'] == 'pending_match' else task['matched_api2']
+        needed.extend(pc for pc in plancodes if pc not in needed and (plan_codes is None or pc in plan_codes))
+    availability_map = fetch_config_sniper_availabilities(needed)
+    
+    for task in active:
+        if not still_exists(task):
+            continue
+        
+        # 待匹配任务：记录新增型号，检查其可用性并下单
+        if task['match_status'] == 'pending_match':
+            handle_pending_match_task(task, new_plancodes_by_task[task['id']], availability_map)
+        
+        # 已匹配任务：检查可用性并下单
+        elif task['match_status'] == 'matched':
+            handle_matched_task(task, availability_map, plan_codes)
+        
+        # 更新最后检查时间
+        task['last_check'] = datetime.now().isoformat()
+
+def fetch_config_sniper_availabilities(plan_codes):
+    """获取型号的可用性：监控或目录刷新刚发布的数据直接使用，
+    其余型号并发查询（共用一个OVH客户端，受共享请求预算限制）
+    
+    Returns:
+        dict: {planCode: 可用性列表}，查询失败的型号为 None
+    """
+    feed = get_availability_feed()
+    availability_map = {}
+    for plan_code in plan_codes:
+        snapshot = feed.get(plan_code)
+        if snapshot is not None:
+            availability_map[plan_code] = snapshot[1]
+    missing = [plan_code for plan_code in plan_codes if plan_code not in availability_map]
+    if not missing:
+        return availability_map
+    
+    enricher = AvailabilityEnricher(
+        client_factory=get_ovh_client,
+        add_log_func=add_log,
+        rate_budget=ovh_rate_budget
+    )
+    fetched, report = enricher.fetch(missing, bulk=len(missing) >= CONFIG_SNIPER_BULK_THRESHOLD)
+    availability_map.update(fetched)
+    # 保存查询结果（下单快速通道据此判断可用性确认时间），不再触发配置狙击
+    feed.publish_many(fetched, "config_sniper", notify=False)
+    add_log("DEBUG", f"配置狙击可用性查询 ({report['mode']}): {report['fetched']}/{report['plans']} 个型号，"
+                     f"使用最新发布的数据 {len(plan_codes) - len(missing)} 个，耗时 {report['durationSeconds']} 秒", "config_sniper")
+    return availability_map
+
+def find_new_plancodes(task):
+    """查找待匹配任务新增的 planCode（排除已知型号）"""
     config = task['bound_config']
     memory_std = standardize_config(config['memory'])
     storage_std = standardize_config(config['storage'])
@@ -2916,11 +2778,17 @@ def handle_pending_match_task(task):
     all_known = set(known_plancodes + existing_matched)
     
     # 找出新增的 planCode（排除所有已知型号）
-    new_plancodes = [pc for pc in current_matched if pc not in all_known]
+    return [pc for pc in current_matched if pc not in all_known]
+
+def handle_pending_match_task(task, new_plancodes, availability_map):
+    """处理待匹配任务 - 增量匹配新增的 planCode，排除已知型号"""
+    config = task['bound_config']
+    existing_matched = task.get('matched_api2', [])
     
     if new_plancodes:
         # 发现新增的 planCode！
         task['matched_api2'] = existing_matched + new_plancodes  # 累加
+        compute_order_options(task, new_plancodes)
         
         add_log("INFO", 
             f"✅ 发现新增 planCode！{task['api1_planCode']} 新增 {len(new_plancodes)} 个：{', '.join(new_plancodes)}", 
@@ -2938,15 +2806,17 @@ def handle_pending_match_task(task):
         save_config_sniper_tasks()
         
         # 立即检查新增 planCode 的可用性并加入队列（所有机房）
-        client = get_ovh_client()
         has_queued = False
-        if client:
-            for new_plancode in new_plancodes:
-                try:
-                    if check_and_queue_plancode(new_plancode, task, config, client):
-                        has_queued = True
-                except Exception as e:
-                    add_log("WARNING", f"检查新增 {new_plancode} 可用性失败: {str(e)}", "config_sniper")
+        for new_plancode in new_plancodes:
+            availabilities = availability_map.get(new_plancode)
+            if availabilities is None:
+                add_log("WARNING", f"检查新增 {new_plancode} 可用性失败: 查询失败或超时", "config_sniper")
+                continue
+            try:
+                if check_and_queue_plancode(new_plancode, task, config, availabilities):
+                    has_queued = True
+            except Exception as e:
+                add_log("WARNING", f"检查新增 {new_plancode} 可用性失败: {str(e)}", "config_sniper")
         
         # 立即标记任务为已完成（一次性下单，不再继续监控）
         if has_queued:
@@ -2963,21 +2833,20 @@ def handle_pending_match_task(task):
     else:
         add_log("DEBUG", f"待匹配任务 {task['api1_planCode']} 暂无新增", "config_sniper")
 
-def check_and_queue_plancode(api2_plancode, task, bound_config, client):
+def check_and_queue_plancode(api2_plancode, task, bound_config, availabilities):
     """检查单个 planCode 的可用性并加入队列
     使用新的配置匹配逻辑：内存提取前两段，存储前缀匹配
     
+    Args:
+        availabilities: 本轮查询到的该 planCode 的可用性列表
+    
     Returns:
         bool: 是否有新订单加入队列
     """
     queued_count = 0
+    hardware_options = None
     
     try:
-        availabilities = client.get(
-            '/dedicated/server/datacenter/availabilities',
-            planCode=api2_plancode
-        )
-        
         # 遍历所有配置组合，使用新的匹配逻辑
         for item in availabilities:
             item_memory = item.get("memory")
@@ -3016,9 +2885,8 @@ def check_and_queue_plancode(api2_plancode, task, bound_config, client):
                 )
                 
                 # 检查是否已在队列中（同一个 planCode + datacenter 组合）
-                existing_queue_item = next((q for q in queue 
-                    if q['planCode'] == api2_plancode 
-                    and q['datacenter'] == datacenter
+                existing_queue_item = next((q for q in queue.find_by_plan(api2_plancode)
+                    if q['datacenter'] == datacenter
                     and q.get('configSniperTaskId') == task['id']), None)
                 
                 if existing_queue_item:
@@ -3028,48 +2896,20 @@ def check_and_queue_plancode(api2_plancode, task, bound_config, client):
                 # 添加到购买队列（用 API2 planCode 下单，带上用户选择的配置）
                 current_time = datetime.now().isoformat()
                 
-                # 从 bound_config 中获取用户选择的原始配置（非标准化版本）
-                # bound_config 存储的是 API1 的配置代码，需要转换为 API2 的配置代码
-                # 我们需要从 API2 中找到对应的 memory 和 storage 选项
-                hardware_options = []
-                try:
-                    # 获取该 planCode 的配置选项
-                    catalog = client.get(f'/order/catalog/public/eco?ovhSubsidiary={config["zone"]}')
-                    for plan in catalog.get("plans", []):
-                        if plan.get("planCode") == api2_plancode:
-                            addon_families = plan.get("addonFamilies", [])
-                            
-                            # 提取 memory 和 storage 的 addons
-                            for family in addon_families:
-                                family_name = family.get("name", "").lower()
-                                addons = family.get("addons", [])
-                                
-                                if family_name == "memory":
-                                    # 找到匹配的 memory 配置
-                                    target_memory_std = standardize_config(bound_config['memory'])
-                                    for addon in addons:
-                                        if standardize_config(addon) == target_memory_std:
-                                            hardware_options.append(addon)
-                                            add_log("DEBUG", f"添加 memory 选项: {addon}", "config_sniper")
-                                            break
-                                
-                                elif family_name == "storage":
-                                    # 找到匹配的 storage 配置
-                                    target_storage_std = standardize_config(bound_config['storage'])
-                                    for addon in addons:
-                                        if standardize_config(addon) == target_storage_std:
-                                            hardware_options.append(addon)
-                                            add_log("DEBUG", f"添加 storage 选项: {addon}", "config_sniper")
-                                            break
-                            break
-                except Exception as e:
-                    add_log("WARNING", f"获取 {api2_plancode} 的配置选项失败: {str(e)}", "config_sniper")
+                # bound_config 存储的是 API1 的配置代码，下单使用匹配时预先计算的 API2 memory 和 storage 选项
+                # （旧任务没有预先计算的选项时补算一次）
+                if hardware_options is None:
+                    order_options = task.get('order_options') or {}
+                    if api2_plancode not in order_options:
+                        order_options = compute_order_options(task, [api2_plancode])
+                    hardware_options = order_options.get(api2_plancode, [])
+                    add_log("DEBUG", f"{api2_plancode} 下单配置: {', '.join(hardware_options) or '默认'}", "config_sniper")
                 
                 queue_item = {
                     "id": str(uuid.uuid4()),
                     "planCode": api2_plancode,
                     "datacenter": datacenter,
-                    "options": hardware_options,  # 用户选择的 memory + storage
+                    "options": list(hardware_options),  # 用户选择的 memory + storage
                     "status": "running",
                     "retryCount": 0,
                     "maxRetries": 3,
@@ -3080,9 +2920,9 @@ def check_and_queue_plancode(api2_plancode, task, bound_config, client):
                     "configSniperTaskId": task['id']
                 }
                 
-                queue.append(queue_item)
-                save_data()
-                update_stats()
+                # 刚确认过可用性：直接交给抢购工作线程
+                dispatch_verified_order(queue_item, get_availability_feed().is_available(
+                    api2_plancode, datacenter, max_age=fast_path_max_age()))
                 queued_count += 1
                 
                 add_log("INFO", 
@@ -3100,28 +2940,37 @@ def check_and_queue_plancode(api2_plancode, task, bound_config, client):
                     f"库存状态: {availability}\n"
                     f"✅ 已加入购买队列"
                 )
-    except Exception as e:
-        raise e
+    finally:
+        # 所有机房加入队列后再统一保存
+        if queued_count:
+            save_data()
+            update_stats()
     
     return queued_count > 0
 
-def handle_matched_task(task):
-    """处理已匹配任务 - 只监控已知型号的可用性（一次性狙击）"""
+def handle_matched_task(task, availability_map, plan_codes=None):
+    """处理已匹配任务 - 只监控已知型号的可用性（一次性狙击）
+    
+    Args:
+        plan_codes: 可用性变化触发的型号，只检查其中的已知型号；None表示检查所有已知型号
+    """
     bound_config = task['bound_config']
     matched_api2_plancodes = task['matched_api2']  # API2 planCode 列表（已知型号）
-    
-    client = get_ovh_client()
-    if not client:
-        return
+    if plan_codes is not None:
+        matched_api2_plancodes = [pc for pc in matched_api2_plancodes if pc in plan_codes]
     
     # 遍历所有已知型号，检查可用性并加入队列（一次性）
     has_queued = False
     for api2_plancode in matched_api2_plancodes:
+        availabilities = availability_map.get(api2_plancode)
+        if availabilities is None:
+            add_log("WARNING", f"查询 {api2_plancode} 可用性失败: 查询失败或超时", "config_sniper")
+            continue
         try:
-            if check_and_queue_plancode(api2_plancode, task, bound_config, client):
+            if check_and_queue_plancode(api2_plancode, task, bound_config, availabilities):
                 has_queued = True
         except Exception as e:
-            add_log("WARNING", f"查询 {api2_plancode} 可用性失败: {str(e)}", "config_sniper")
+            add_log("WARNING", f"检查 {api2_plancode} 可用性失败: {str(e)}", "config_sniper")
     
     # 如果有订单加入队列，标记任务为已完成
     if has_queued:
@@ -3171,9 +3020,10 @@ def get_config_options(planCode):
                 "error": f"型号 {planCode} 不存在或API1中无数据"
             })
         
-        # 提取配置选项
+        # 提取配置选项（多个配置匹配到同一个 API2 planCode 时只查询一次机房）
         configs = []
         seen_configs = set()
+        api2_datacenters = {}
         
         for item in availabilities:
             memory = item.get("memory")
@@ -3197,25 +3047,27 @@ def get_config_options(planCode):
             # 为每个匹配的 planCode 查询可用机房
             plancodes_with_datacenters = []
             for api2_plancode in matched_plancodes:
-                try:
-                    api2_availabilities = client.get(
-                        '/dedicated/server/datacenter/availabilities',
-                        planCode=api2_plancode
-                    )
-                    datacenters = []
-                    for api2_item in api2_availabilities:
-                        for dc in api2_item.get("datacenters", []):
-                            datacenter = dc.get("datacenter")
-                            if datacenter:
-                                datacenters.append(datacenter)
-                    
-                    if datacenters:  # 只返回有机房的 planCode
-                        plancodes_with_datacenters.append({
-                            "planCode": api2_plancode,
-                            "datacenters": list(set(datacenters))  # 去重
-                        })
-                except:
-                    pass  # 查询失败就跳过
+                if api2_plancode not in api2_datacenters:
+                    try:
+                        api2_availabilities = client.get(
+                            '/dedicated/server/datacenter/availabilities',
+                            planCode=api2_plancode
+                        )
+                        datacenters = []
+                        for api2_item in api2_availabilities:
+                            for dc in api2_item.get("datacenters", []):
+                                datacenter = dc.get("datacenter")
+                                if datacenter:
+                                    datacenters.append(datacenter)
+                        api2_datacenters[api2_plancode] = list(set(datacenters))  # 去重
+                    except:
+                        api2_datacenters[api2_plancode] = []  # 查询失败就跳过
+                
+                if api2_datacenters[api2_plancode]:  # 只返回有机房的 planCode
+                    plancodes_with_datacenters.append({
+                        "planCode": api2_plancode,
+                        "datacenters": api2_datacenters[api2_plancode]
+                    })
             
             configs.append({
                 "memory": {
@@ -3247,7 +3099,9 @@ def get_config_sniper_tasks():
     return jsonify({
         "success": True,
         "tasks": config_sniper_tasks,
-        "total": len(config_sniper_tasks)
+        "total": len(config_sniper_tasks),
+        "fingerprintIndex": get_config_fingerprint_index().get_status(),
+        "events": dict(config_sniper_events.get_status(), **get_availability_feed().get_status())
     })
 
 @app.route('/api/config-sniper/tasks', methods=['POST'])
@@ -3303,6 +3157,9 @@ def create_config_sniper_task():
             else:
                 message = "⏳ 未找到匹配，已创建待匹配任务"
         
+        # 预先计算已匹配型号的下单配置（出现库存时直接加入队列）
+        compute_order_options(task)
+        
         config_sniper_tasks.append(task)
         add_log("DEBUG", f"任务已添加到列表: 当前数量={len(config_sniper_tasks)}, 列表ID={id(config_sniper_tasks)}", "config_sniper")
         save_config_sniper_tasks()
@@ -3365,7 +3222,7 @@ def quick_order():
         if not plancode or not datacenter:
             return jsonify({"success": False, "error": "缺少 planCode 或 datacenter"})
         
-        # 直接创建队列项，不检查可用性
+        # 直接创建队列项，不检查可用性（监控刚确认该机房有货时首次尝试也不再检查）
         current_time = datetime.now().isoformat()
         queue_item = {
             "id": str(uuid.uuid4()),
@@ -3382,11 +3239,13 @@ def quick_order():
             "quickOrder": True  # 标记为快速下单
         }
         
-        queue.append(queue_item)
+        verified_at = get_availability_feed().is_available(plancode, datacenter, max_age=fast_path_max_age())
+        dispatch_verified_order(queue_item, verified_at)
         save_data()
         update_stats()
         
-        add_log("INFO", f"快速下单: {plancode} ({datacenter}) 已加入队列", "config_sniper")
+        add_log("INFO", f"快速下单: {plancode} ({datacenter}) 已加入队列"
+                        f"{'（可用性已确认，直接下单）' if verified_at else ''}", "config_sniper")
         
         return jsonify({
             "success": True,
@@ -3406,14 +3265,10 @@ def check_config_sniper_task(task_id):
         return jsonify({"success": False, "error": "任务不存在"})
     
     try:
-        if task['match_status'] == 'pending_match':
-            handle_pending_match_task(task)
-        elif task['match_status'] == 'matched':
-            handle_matched_task(task)
-        elif task['match_status'] == 'completed':
+        if task['match_status'] == 'completed':
             return jsonify({"success": True, "message": "任务已完成，无需检查"})
         
-        task['last_check'] = datetime.now().isoformat()
+        evaluate_config_sniper_tasks([task], require_enabled=False)
         save_config_sniper_tasks()
         
         return jsonify({
@@ -4817,9 +4672,9 @@ def send_vps_summary_notification(plan_code, datacenters_list, change_type):
         result = send_telegram_msg(message)
         
         if result:
-            add_log("INFO", f"✅ VPS汇总通知发送成功: {plan_code} ({len(datacenters_list)}个机房)", "vps_monitor")
+            add_log("INFO", f"✅ VPS汇总通知已加入发送队列: {plan_code} ({len(datacenters_list)}个机房)", "vps_monitor")
         else:
-            add_log("WARNING", f"⚠️ VPS汇总通知发送失败: {plan_code}", "vps_monitor")
+            add_log("WARNING", f"⚠️ VPS汇总通知未能加入发送队列: {plan_code}", "vps_monitor")
         
         return result
         
@@ -4897,9 +4752,9 @@ def send_vps_notification(plan_code, datacenter_info, change_type):
         result = send_telegram_msg(message)
         
         if result:
-            add_log("INFO", f"✅ VPS通知发送成功: {plan_code}@{dc_name}", "vps_monitor")
+            add_log("INFO", f"✅ VPS通知已加入发送队列: {plan_code}@{dc_name}", "vps_monitor")
         else:
-            add_log("WARNING", f"⚠️ VPS通知发送失败: {plan_code}@{dc_name}", "vps_monitor")
+            add_log("WARNING", f"⚠️ VPS通知未能加入发送队列: {plan_code}@{dc_name}", "vps_monitor")
         
         return result
         
@@ -4959,6 +4814,11 @@ def vps_monitor_loop():
                         old_status = last_status.get(dc_code)
                         is_first_check = old_status is None
                         
+                        # 记录到补货统计
+                        if old_status != current_status:
+                            record_restock_transition(plan_code, dc_code, None, old_status, current_status,
+                                                      unavailable_states=("out-of-stock", "out-of-stock-preorder-allowed"))
+                        
                         # 首次检查：收集所有数据中心状态
                         if is_first_check:
                             initial_available.append({
@@ -5270,6 +5130,9 @@ if __name__ == '__main__':
     # Load data first (会加载订阅数据)
     load_data()
     
+    # 多进程监控（配置了工作进程数时）
+    apply_monitor_workers()
+    
     # 确保使用新的默认值60秒（如果配置文件中没有保存check_interval）
     if monitor.check_interval == 300:
         print("检测到旧的检查间隔300秒，更新为60秒")
@@ -0,0 +1,185 @@
+"""
+可用性变化事件模块
+监控检查、目录刷新的批量可用性查询把每个型号最新的可用性原始列表发布到 AvailabilityFeed，
+出现新的有货 (配置, 机房) 时通知订阅方；配置狙击订阅后把相关型号放入 PlanTriggerQueue，
+监控线程被立即唤醒，只评估监控这些型号的任务，并直接使用刚发布的可用性数据（不再重复请求）
+"""
+
+import threading
+import time
+
+
+# 不视为有货的状态（与配置狙击下单判断一致）
+UNAVAILABLE_STATES = ("unavailable", "unknown")
+
+# 发布的可用性数据在多长时间内视为最新（秒），超过后使用方重新查询
+MAX_SNAPSHOT_AGE = 5.0
+
+
+def available_slots(availabilities):
+    """可用性原始列表中有货的 (fqn, 机房)"""
+    slots = set()
+    for item in availabilities or []:
+        fqn = item.get("fqn") or f"{item.get('memory')}.{item.get('storage')}"
+        for dc in item.get("datacenters", []):
+            if dc.get("datacenter") and dc.get("availability") not in UNAVAILABLE_STATES:
+                slots.add((fqn, dc["datacenter"]))
+    return slots
+
+
+class AvailabilityFeed:
+    """各型号最新的可用性原始列表，出现新的有货配置时通知订阅方"""
+
+    def __init__(self, add_log_func, max_age=MAX_SNAPSHOT_AGE):
+        """
+        初始化可用性事件
+
+        Args:
+            add_log_func: 添加日志的函数
+            max_age: 发布的可用性数据视为最新的时间（秒）
+        """
+        self.add_log = add_log_func
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshots = {}  # planCode -> (发布时间戳, 可用性原始列表, 有货的 (fqn, 机房))
+        self._subscribers = []
+        self.published = 0
+        self.events = 0
+
+    def subscribe(self, callback):
+        """订阅新的有货事件 callback(planCode, 新增有货的 [(fqn, 机房)], 来源)"""
+        self._subscribers.append(callback)
+
+    def publish(self, plan_code, availabilities, source, notify=True):
+        """
+        发布型号最新的可用性原始列表
+
+        Args:
+            plan_code: 型号
+            availabilities: /dedicated/server/datacenter/availabilities 的返回
+            source: 来源（monitor、catalog 等）
+            notify: 是否通知订阅方（订阅方自己查询的数据只保存不通知）
+
+        Returns:
+            list: 新增有货的 [(fqn, 机房)]
+        """
+        if not plan_code or availabilities is None:
+            return []
+        slots = available_slots(availabilities)
+        with self._lock:
+            previous = self._snapshots.get(plan_code)
+            self._snapshots[plan_code] = (time.time(), availabilities, slots)
+            self.published += 1
+        added = sorted(slots - previous[2]) if previous else sorted(slots)
+        if added and notify:
+            self._notify(plan_code, added, source)
+        return added
+
+    def publish_many(self, availability_map, source, notify=True):
+        """发布多个型号的可用性（查询失败的型号值为 None，跳过）"""
+        for plan_code, availabilities in availability_map.items():
+            self.publish(plan_code, availabilities, source, notify)
+
+    def mark_available(self, plan_code, datacenter, source):
+        """
+        只知道型号在某机房变为有货（没有原始列表，如多进程监控的状态变化）
+
+        最新发布的数据已经包含该机房有货时不重复通知
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(plan_code)
+        if snapshot and time.time() - snapshot[0] < self.max_age and any(dc == datacenter for _, dc in snapshot[2]):
+            return
+        self._notify(plan_code, [(None, datacenter)], source)
+
+    def _notify(self, plan_code, added, source):
+        with self._lock:
+            self.events += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(plan_code, added, source)
+            except Exception as e:
+                self.add_log("WARNING", f"处理 {plan_code} 可用性变化出错: {str(e)}")
+
+    def get(self, plan_code, max_age=None):
+        """
+        型号最新的可用性原始列表
+
+        Returns:
+            tuple: (发布时间戳, 可用性原始列表)，没有数据或已超过 max_age 时返回None
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            snapshot = self._snapshots.get(plan_code)
+        if snapshot is None or time.time() - snapshot[0] >= max_age:
+            return None
+        return snapshot[0], snapshot[1]
+
+    def is_available(self, plan_code, datacenter, max_age=None):
+        """
+        最新发布的数据中型号在该机房是否有货
+
+        Returns:
+            float: 有货时返回发布时间戳，否则返回None
+        """
+        snapshot = self.get(plan_code, max_age)
+        if snapshot is None or not any(dc == datacenter for _, dc in available_slots(snapshot[1])):
+            return None
+        return snapshot[0]
+
+    def get_status(self):
+        with self._lock:
+            return {"plans": len(self._snapshots), "published": self.published, "events": self.events}
+
+
+class PlanTriggerQueue:
+    """唤醒配置狙击的事件队列：按型号触发（只评估相关任务）或请求一次完整检查"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._plans = {}  # planCode -> 首次触发时间
+        self._full_pass = False
+        self.triggered = 0
+        self.handled = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+
+    def trigger(self, plan_code):
+        """型号出现新的有货配置"""
+        with self._cond:
+            self._plans.setdefault(plan_code, time.monotonic())
+            self.triggered += 1
+            self._cond.notify_all()
+
+    def request_full_pass(self):
+        """请求立即完整检查所有任务（如目录出现新增型号）"""
+        with self._cond:
+            self._full_pass = True
+            self._cond.notify_all()
+
+    def wait(self, timeout):
+        """
+        等待事件，超时返回空结果
+
+        Returns:
+            tuple: (是否请求完整检查, 触发的型号列表)
+        """
+        with self._cond:
+            if not self._full_pass and not self._plans:
+                self._cond.wait(timeout)
+            full_pass, plans = self._full_pass, self._plans
+            self._full_pass, self._plans = False, {}
+        now = time.monotonic()
+        for triggered_at in plans.values():
+            self.last_latency = now - triggered_at
+            self.total_latency += self.last_latency
+            self.handled += 1
+        return full_pass, list(plans)
+
+    def get_status(self):
+        return {
+            "triggered": self.triggered,
+            "handled": self.handled,
+            "lastLatencyMs": round(self.last_latency * 1000, 2) if self.last_latency is not None else None,
+            "avgLatencyMs": round(self.total_latency / self.handled * 1000, 2) if self.handled else None
+        }
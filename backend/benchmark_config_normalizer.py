@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置字符串标准化基准测试脚本
+从保存的目录原始响应 (cache/ovh_catalog_raw.json) 和服务器列表 (data/servers.json) 收集配置码，
+对比 config_normalizer.standardize_config 与原实现（逐条 re.sub）的结果，并分别计时
+
+用法: python benchmark_config_normalizer.py [--catalog 路径] [--reference 路径] [--rounds 次数]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from config_normalizer import standardize_config
+
+# 设置UTF-8编码输出
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# 目录文件不存在时也会测试的配置码
+SAMPLE_CONFIGS = (
+    "ram-64g-ecc-2400", "ram-32g-noecc-2133-24sk50", "ram-128g-ecc-4800-24sklea01-v1",
+    "ram-64g-ecc-2933-24rise012", "ram-32g-ecc-3200-24sysgame01", "ram-16g-noecc-24skgame01",
+    "ram-64g-ecc-24risestor", "ram-32g-24ska01-gra", "ram-64g-ecc-25sysle012", "ram-32g-ecc-25skb01",
+    "softraid-2x480ssd", "softraid-2x4000sa-24sk60b", "hybridsoftraid-2x4000sa-1x500nvme-24rise",
+    "softraid-2x960nvme-25skc01", "softraid-3x2000sa-24sysstor", "softraid-2x450nvme-24skstor01-sgp",
+    "raid-4x8000sas-v2", "ram-16g-ks40", "softraid-2x2000sa-rise", "",
+)
+
+# 原实现的正则（顺序与 config_normalizer 相同）
+REFERENCE_MODEL_PATTERNS = (
+    r'-\d+skl[a-e]\d{2}(-v\d+)?', r'-\d+sk\d+', r'-\d+rise\d*', r'-\d+sys\w*', r'-\d+risegame\d*',
+    r'-\d+risestor', r'-\d+skgame\d*', r'-\d+ska\d*', r'-\d+skstor\d*', r'-\d+sysstor', r'game\d*',
+    r'stor\d*', r'-ks\d+', r'-rise', r'-\d+sysle\d+', r'-\d+skb\d+', r'-\d+skc\d+', r'-\d+sk\d+b',
+    r'-v\d+', r'-[a-z]{3}$',
+)
+
+
+def reference_standardize_config(config_str):
+    """原实现：每次调用逐条执行 re.sub"""
+    if not config_str:
+        return ""
+    normalized = config_str.lower().strip()
+    for pattern in REFERENCE_MODEL_PATTERNS:
+        normalized = re.sub(pattern, '', normalized)
+    normalized = re.sub(r'-(no)?ecc-\d+', '', normalized)
+    normalized = re.sub(r'-(sas|sa|ssd|nvme)$', '', normalized)
+    normalized = re.sub(r'-\d{4,5}$', '', normalized)
+    return normalized
+
+
+def collect_catalog_configs(catalog_file):
+    """收集目录中的附加选项、默认选项和价格选项的配置码"""
+    with open(catalog_file, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    configs = []
+    for plan in catalog.get("plans", []):
+        for family in plan.get("addonFamilies") or []:
+            if isinstance(family, dict):
+                configs.extend(addon for addon in family.get("addons") or [] if isinstance(addon, str))
+        for section in ("default", "product"):
+            for option in (plan.get(section) or {}).get("options") or []:
+                if isinstance(option, dict) and isinstance(option.get("planCode"), str):
+                    configs.append(option["planCode"])
+        for pricing in (plan.get("pricings") or {}).values():
+            if isinstance(pricing, dict) and isinstance(pricing.get("options"), dict):
+                configs.extend(pricing["options"].keys())
+    return configs
+
+
+def collect_server_configs(reference_file):
+    """收集服务器列表中的内存、存储和可选配置"""
+    with open(reference_file, "r", encoding="utf-8") as f:
+        servers = json.load(f)
+    configs = []
+    for server in servers:
+        for field in ("memory", "storage"):
+            if isinstance(server.get(field), str):
+                configs.append(server[field])
+        for option in server.get("availableOptions") or []:
+            value = option.get("value") if isinstance(option, dict) else option
+            if isinstance(value, str):
+                configs.append(value)
+    return configs
+
+
+def time_calls(func, configs, rounds):
+    """多轮计时取最短时间，返回每次调用的微秒数"""
+    best = None
+    for _ in range(max(1, rounds)):
+        start = time.perf_counter()
+        for config_str in configs:
+            func(config_str)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / max(1, len(configs))
+
+
+def run_benchmark(catalog_file, reference_file, rounds):
+    print("=" * 50)
+    print("配置字符串标准化基准测试")
+    print("=" * 50)
+
+    configs = list(SAMPLE_CONFIGS)
+    if os.path.exists(catalog_file):
+        catalog_configs = collect_catalog_configs(catalog_file)
+        configs.extend(catalog_configs)
+        print(f"[OK] 从目录收集 {len(catalog_configs)} 个配置码: {catalog_file}")
+    else:
+        print(f"[INFO] 未找到目录原始响应 {catalog_file}，只使用内置样例")
+    if reference_file and os.path.exists(reference_file):
+        server_configs = collect_server_configs(reference_file)
+        configs.extend(server_configs)
+        print(f"[OK] 从服务器列表收集 {len(server_configs)} 个配置: {reference_file}")
+
+    unique = len(set(configs))
+    print(f"共 {len(configs)} 次调用，{unique} 个不同的配置码")
+
+    # 一致性检查
+    mismatched = [(config_str, reference_standardize_config(config_str), standardize_config(config_str))
+                  for config_str in set(configs)
+                  if reference_standardize_config(config_str) != standardize_config(config_str)]
+    print(f"\n一致性检查: 对比 {unique} 个配置码，{len(mismatched)} 个不一致")
+    for config_str, expected, actual in mismatched[:20]:
+        print(f"  [DIFF] {config_str!r}: 原实现={expected!r} 新实现={actual!r}")
+
+    # 计时（配置狙击匹配时同一批配置码会被反复标准化，按收集到的调用序列计时）
+    standardize_config.cache_clear()
+    reference_us = time_calls(reference_standardize_config, configs, rounds)
+    uncached_us = time_calls(standardize_config.__wrapped__, configs, rounds)
+    cached_us = time_calls(standardize_config, configs, rounds)
+    info = standardize_config.cache_info()
+
+    print(f"\n每次调用耗时 (us，{rounds} 轮取最小值):")
+    print(f"  原实现（逐条 re.sub）: {reference_us:.3f}")
+    print(f"  预编译（不使用缓存）: {uncached_us:.3f}  ({reference_us / max(uncached_us, 1e-9):.1f}x)")
+    print(f"  预编译 + 缓存: {cached_us:.3f}  ({reference_us / max(cached_us, 1e-9):.1f}x)")
+    print(f"  缓存命中 {info.hits} 次，未命中 {info.misses} 次，缓存 {info.currsize}/{info.maxsize} 个")
+
+    print("\n" + "=" * 50)
+    if mismatched:
+        print("[FAILED] 标准化结果与原实现不一致")
+        return 1
+    print("[SUCCESS] 标准化结果与原实现一致")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="配置字符串标准化基准测试")
+    parser.add_argument("--catalog", default=os.path.join("cache", "ovh_catalog_raw.json"), help="目录原始响应文件")
+    parser.add_argument("--reference", default=os.path.join("data", "servers.json"), help="服务器列表文件")
+    parser.add_argument("--rounds", type=int, default=5, help="计时轮数")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.catalog, args.reference, args.rounds))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+硬件信息提取基准测试脚本
+读取保存的目录原始响应 (cache/ovh_catalog_raw.json)，逐个型号分别计时新实现和原实现的解析，
+对同一份目录对比两者的解析结果和日志（baseline），也可与上次刷新保存的结果 (data/servers.json) 对比（reference）
+
+用法: python benchmark_hardware_extraction.py [--catalog 路径] [--reference 路径] [--rounds 次数]
+                                             [--compare baseline|reference|both]
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+from hardware_extraction import parse_plan
+from hardware_extraction_baseline import parse_plan_baseline
+
+# 设置UTF-8编码输出
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# 只比较解析得到的字段（可用性每次刷新都会变化）
+COMPARED_FIELDS = ("name", "description", "cpu", "memory", "storage", "bandwidth",
+                   "vrackBandwidth", "defaultOptions", "availableOptions")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def time_parser(parser, plans, rounds):
+    """逐个型号计时（多轮取最短时间，减少抖动），返回 ({planCode: ms}, {planCode: 解析结果})"""
+    timings = {}
+    results = {}
+    for _ in range(max(1, rounds)):
+        for plan in plans:
+            plan_code = plan["planCode"]
+            start = time.perf_counter()
+            server_info = parser(plan, [])
+            elapsed = (time.perf_counter() - start) * 1000
+            timings[plan_code] = min(elapsed, timings.get(plan_code, elapsed))
+            results[plan_code] = server_info
+    return timings, results
+
+
+def compare_with_baseline(plans):
+    """对每个型号分别运行新实现和原实现，对比解析结果和日志，返回不一致的 [(planCode, 差异)]"""
+    mismatched = []
+    for plan in plans:
+        baseline_logs, new_logs = [], []
+        expected = parse_plan_baseline(copy.deepcopy(plan), [], log=lambda *entry: baseline_logs.append(entry))
+        actual = parse_plan(copy.deepcopy(plan), [], log=lambda *entry: new_logs.append(entry))
+        diff = [field for field in sorted(set(expected) | set(actual)) if expected.get(field) != actual.get(field)]
+        if baseline_logs != new_logs:
+            diff.append("日志")
+        if diff:
+            mismatched.append((plan["planCode"], diff))
+    return mismatched
+
+
+def compare_with_reference(results, reference_file):
+    """与保存的解析结果对比，返回 (对比的型号数, 不一致的 [(planCode, 差异字段)])"""
+    with open(reference_file, "r", encoding="utf-8") as f:
+        reference = {server.get("planCode"): server for server in json.load(f)}
+
+    compared = 0
+    mismatched = []
+    for plan_code, server_info in results.items():
+        expected = reference.get(plan_code)
+        if expected is None:
+            continue
+        compared += 1
+        diff = [field for field in COMPARED_FIELDS if expected.get(field) != server_info.get(field)]
+        if diff:
+            mismatched.append((plan_code, diff))
+    return compared, mismatched
+
+
+def run_benchmark(catalog_file, reference_file, rounds, compare="baseline"):
+    print("=" * 50)
+    print("硬件信息提取基准测试")
+    print("=" * 50)
+
+    if not os.path.exists(catalog_file):
+        print(f"[ERROR] 未找到目录原始响应: {catalog_file}")
+        print("  请先在后端刷新一次服务器列表（会保存到 cache/ovh_catalog_raw.json）")
+        return 1
+
+    with open(catalog_file, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    plans = [plan for plan in catalog.get("plans", []) if plan.get("planCode")]
+    print(f"[OK] 已加载 {len(plans)} 个型号: {catalog_file}")
+
+    timings, results = time_parser(parse_plan, plans, rounds)
+    baseline_timings, _ = time_parser(parse_plan_baseline, plans, rounds)
+
+    values = sorted(timings.values())
+    baseline_total = sum(baseline_timings.values())
+    print(f"\n每个型号的解析耗时 (ms，{rounds} 轮取最小值):")
+    print(f"  合计: {sum(values):.2f}  平均: {sum(values) / max(1, len(values)):.3f}  "
+          f"p50: {percentile(values, 50):.3f}  p95: {percentile(values, 95):.3f}  最大: {values[-1] if values else 0:.3f}")
+    print(f"  原实现合计: {baseline_total:.2f}  ({baseline_total / max(sum(values), 1e-9):.1f}x)")
+
+    slowest = sorted(timings.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    print("\n最慢的型号:")
+    for plan_code, elapsed in slowest:
+        print(f"  {plan_code:<30} {elapsed:.3f} ms")
+
+    failed = False
+
+    # 与原实现对比（同一份目录）
+    if compare in ("baseline", "both"):
+        mismatched = compare_with_baseline(plans)
+        print(f"\n与原实现对比: 对比 {len(plans)} 个型号，{len(mismatched)} 个不一致")
+        for plan_code, diff in mismatched[:20]:
+            print(f"  [DIFF] {plan_code}: {', '.join(diff)}")
+        failed = failed or bool(mismatched)
+
+    # 与上次刷新保存的结果对比
+    if compare in ("reference", "both"):
+        if not reference_file or not os.path.exists(reference_file):
+            print(f"\n[INFO] 未找到对比结果文件 {reference_file}，跳过与保存结果的对比")
+        else:
+            compared, mismatched = compare_with_reference(results, reference_file)
+            print(f"\n与保存的结果对比: 对比 {compared} 个型号，{len(mismatched)} 个不一致")
+            for plan_code, diff in mismatched[:20]:
+                print(f"  [DIFF] {plan_code}: {', '.join(diff)}")
+            failed = failed or bool(mismatched)
+
+    print("\n" + "=" * 50)
+    if failed:
+        print("[FAILED] 解析结果不一致")
+        return 1
+    print("[SUCCESS] 解析结果一致")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="硬件信息提取基准测试")
+    parser.add_argument("--catalog", default=os.path.join("cache", "ovh_catalog_raw.json"), help="目录原始响应文件")
+    parser.add_argument("--reference", default=os.path.join("data", "servers.json"), help="用于对比的解析结果文件")
+    parser.add_argument("--rounds", type=int, default=3, help="计时轮数")
+    parser.add_argument("--compare", choices=("baseline", "reference", "both"), default="baseline",
+                        help="一致性检查：与原实现对比 (baseline)、与保存的结果对比 (reference) 或两者")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.catalog, args.reference, args.rounds, args.compare))
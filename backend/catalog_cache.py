@@ -0,0 +1,287 @@
+"""
+多子公司服务器目录缓存模块
+按 ovhSubsidiary 同时缓存多个目录：各子公司相同的型号解析结果只保存一份（可用性和价格单独保存），
+记录同一型号在不同子公司的价格差异，每个子公司按各自的刷新间隔更新
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+# 默认缓存时长/刷新间隔（秒）
+DEFAULT_REFRESH_INTERVAL = 2 * 60 * 60
+
+# 每个子公司单独保存的字段（其余字段在各子公司间共享）
+ZONE_FIELDS = ("datacenters", "price")
+
+
+def extract_monthly_price(plan, currency=None):
+    """
+    从目录原始型号数据中提取默认的月付价格
+
+    Args:
+        plan: 目录中的原始型号数据
+        currency: 目录的货币代码（catalog.locale.currencyCode）
+
+    Returns:
+        dict: {"value": 价格, "currency": 货币}，无法确定时返回None
+    """
+    pricings = plan.get("pricings")
+    if not isinstance(pricings, list):
+        return None
+    for pricing in pricings:
+        if not isinstance(pricing, dict):
+            continue
+        capacities = pricing.get("capacities") or []
+        if pricing.get("interval") == 1 and pricing.get("mode", "default") == "default" and "renew" in capacities:
+            price = pricing.get("price")
+            if isinstance(price, (int, float)):
+                # 目录价格以 1e-8 为单位
+                return {"value": round(price / 100000000, 2), "currency": currency}
+    return None
+
+
+def _spec_key(server):
+    shared = {k: v for k, v in server.items() if k not in ZONE_FIELDS}
+    raw = json.dumps(shared, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest(), shared
+
+
+class CatalogCache:
+    """按子公司缓存服务器列表"""
+
+    def __init__(self, default_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        初始化目录缓存
+
+        Args:
+            default_interval: 默认的缓存时长/刷新间隔（秒）
+        """
+        self._lock = threading.RLock()
+        self.default_interval = default_interval
+        self._specs = {}  # spec key -> 共享的型号解析结果
+        self._zones = {}  # zone -> {"plans": [(spec key, zone fields)], "timestamp", "data"}
+        self._schedules = {}  # zone -> 刷新间隔（秒）
+        self.version = 0
+
+    @staticmethod
+    def normalize_zone(zone):
+        return (zone or "").strip().upper()
+
+    # ---------- 刷新计划 ----------
+
+    def set_schedules(self, schedules):
+        """
+        设置需要定时刷新的子公司及其刷新间隔
+
+        Args:
+            schedules: {zone: 刷新间隔（秒）}
+        """
+        with self._lock:
+            self._schedules = {
+                self.normalize_zone(zone): max(60, int(interval or self.default_interval))
+                for zone, interval in schedules.items() if zone
+            }
+
+    def interval(self, zone):
+        return self._schedules.get(self.normalize_zone(zone), self.default_interval)
+
+    def scheduled_zones(self):
+        with self._lock:
+            return list(self._schedules)
+
+    def due_zones(self, now=None):
+        """获取已到刷新时间的子公司（从未加载的也视为到期）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = []
+            for zone, interval in self._schedules.items():
+                entry = self._zones.get(zone)
+                if entry is None or entry["timestamp"] is None or now - entry["timestamp"] >= interval:
+                    due.append(zone)
+            return due
+
+    # ---------- 读写 ----------
+
+    def store(self, zone, servers, timestamp=None):
+        """
+        保存子公司的服务器列表（相同的型号解析结果在子公司间共享）
+
+        Args:
+            zone: 子公司代码
+            servers: 服务器列表
+            timestamp: 数据时间，默认当前时间
+        """
+        zone = self.normalize_zone(zone)
+        plans = []
+        with self._lock:
+            for server in servers:
+                key, shared = _spec_key(server)
+                if key not in self._specs:
+                    self._specs[key] = shared
+                plans.append((key, {k: server[k] for k in ZONE_FIELDS if k in server}))
+            self._zones[zone] = {
+                "plans": plans,
+                "timestamp": time.time() if timestamp is None else timestamp,
+                "data": None
+            }
+            self._collect_specs()
+            self.version += 1
+
+    def _collect_specs(self):
+        """删除不再被任何子公司引用的解析结果"""
+        used = {key for entry in self._zones.values() for key, _ in entry["plans"]}
+        for key in [key for key in self._specs if key not in used]:
+            del self._specs[key]
+
+    def get(self, zone):
+        """
+        获取子公司的服务器列表
+
+        Returns:
+            list: 服务器列表，未缓存时返回None
+        """
+        zone = self.normalize_zone(zone)
+        with self._lock:
+            entry = self._zones.get(zone)
+            if entry is None:
+                return None
+            if entry["data"] is None:
+                # 浅复制共享的解析结果，再加上子公司自己的可用性和价格
+                entry["data"] = [dict(self._specs[key], **zone_fields) for key, zone_fields in entry["plans"]]
+            return entry["data"]
+
+    def update_availability(self, zone, plan_code, datacenters):
+        """只更新某个型号的可用性（不改变共享的解析结果）"""
+        zone = self.normalize_zone(zone)
+        with self._lock:
+            entry = self._zones.get(zone)
+            if entry is None:
+                return False
+            for key, zone_fields in entry["plans"]:
+                if self._specs[key].get("planCode") == plan_code:
+                    zone_fields["datacenters"] = datacenters
+                    entry["data"] = None
+                    self.version += 1
+                    return True
+            return False
+
+    def timestamp(self, zone):
+        entry = self._zones.get(self.normalize_zone(zone))
+        return entry["timestamp"] if entry else None
+
+    def is_valid(self, zone, now=None):
+        ts = self.timestamp(zone)
+        if ts is None:
+            return False
+        now = time.time() if now is None else now
+        return now - ts < self.interval(zone)
+
+    def zones(self):
+        with self._lock:
+            return list(self._zones)
+
+    def clear(self, zone=None):
+        with self._lock:
+            if zone is None:
+                self._zones = {}
+            else:
+                self._zones.pop(self.normalize_zone(zone), None)
+            self._collect_specs()
+            self.version += 1
+
+    # ---------- 价格差异 ----------
+
+    def price_deltas(self, plan_code=None):
+        """
+        对比同一型号在各子公司的月付价格
+
+        Args:
+            plan_code: 只返回指定型号，None表示全部
+
+        Returns:
+            dict: {planCode: {"prices": {zone: {...}}, "deltas": {zone: 与同币种最低价的差额}}}
+        """
+        with self._lock:
+            prices = {}
+            for zone, entry in self._zones.items():
+                for key, zone_fields in entry["plans"]:
+                    code = self._specs[key].get("planCode")
+                    if plan_code and code != plan_code:
+                        continue
+                    price = zone_fields.get("price")
+                    if price:
+                        prices.setdefault(code, {})[zone] = price
+
+        result = {}
+        for code, by_zone in prices.items():
+            if len(by_zone) < 2:
+                continue
+            cheapest = {}
+            for price in by_zone.values():
+                currency = price.get("currency")
+                cheapest[currency] = min(cheapest.get(currency, price["value"]), price["value"])
+            result[code] = {
+                "prices": by_zone,
+                "deltas": {
+                    zone: round(price["value"] - cheapest[price.get("currency")], 2)
+                    for zone, price in by_zone.items()
+                }
+            }
+        return result
+
+    # ---------- 持久化 ----------
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "specs": dict(self._specs),
+                "zones": {
+                    zone: {"timestamp": entry["timestamp"], "plans": [[key, fields] for key, fields in entry["plans"]]}
+                    for zone, entry in self._zones.items()
+                }
+            }
+
+    def load_dict(self, data):
+        """从持久化数据恢复（忽略损坏的条目）"""
+        specs = data.get("specs") or {}
+        with self._lock:
+            self._specs = dict(specs)
+            self._zones = {}
+            for zone, entry in (data.get("zones") or {}).items():
+                plans = [(key, fields) for key, fields in entry.get("plans", []) if key in self._specs]
+                self._zones[self.normalize_zone(zone)] = {
+                    "plans": plans,
+                    "timestamp": entry.get("timestamp"),
+                    "data": None
+                }
+            self._collect_specs()
+            self.version += 1
+
+    def get_status(self, now=None):
+        """获取各子公司的缓存状态"""
+        now = time.time() if now is None else now
+        with self._lock:
+            zones = {}
+            total_plans = 0
+            for zone in sorted(set(self._zones) | set(self._schedules)):
+                entry = self._zones.get(zone)
+                timestamp = entry["timestamp"] if entry else None
+                count = len(entry["plans"]) if entry else 0
+                total_plans += count
+                zones[zone] = {
+                    "serverCount": count,
+                    "timestamp": timestamp,
+                    "cacheAge": int(now - timestamp) if timestamp else None,
+                    "refreshInterval": self.interval(zone),
+                    "scheduled": zone in self._schedules,
+                    "nextRefresh": timestamp + self.interval(zone) if timestamp else None
+                }
+            return {
+                "zones": zones,
+                "uniquePlans": len(self._specs),
+                "totalPlans": total_plans,
+                "deduplicated": total_plans - len(self._specs)
+            }
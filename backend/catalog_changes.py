@@ -0,0 +1,176 @@
+"""
+目录变更记录模块
+每次刷新目录时与上一版本对比，生成结构化的变更（新增/下架型号、配置变化、价格变化、新增可选配置），
+发布给监控、配置狙击任务和 /api/catalog/changes 接口，消费方只处理变化部分而不必重新扫描整个目录
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+# 比较的配置字段
+SPEC_FIELDS = ("name", "description", "cpu", "memory", "storage", "bandwidth", "vrackBandwidth", "defaultOptions")
+
+# 保留的变更记录数量
+MAX_EVENTS = 200
+
+
+def _option_values(server):
+    return {opt.get("value") for opt in server.get("availableOptions") or [] if isinstance(opt, dict) and opt.get("value")}
+
+
+def _price_value(server):
+    price = server.get("price")
+    return price.get("value") if isinstance(price, dict) else None
+
+
+def diff_catalogs(previous, current):
+    """
+    对比两个版本的服务器列表
+
+    Args:
+        previous: 上一版本的服务器列表
+        current: 当前版本的服务器列表
+
+    Returns:
+        dict: {"added", "removed", "specChanged", "priceChanged", "newOptions"}
+    """
+    old_by_code = {s.get("planCode"): s for s in previous if s.get("planCode")}
+    new_by_code = {s.get("planCode"): s for s in current if s.get("planCode")}
+
+    added = [new_by_code[code] for code in new_by_code if code not in old_by_code]
+    removed = [code for code in old_by_code if code not in new_by_code]
+    spec_changed = []
+    price_changed = []
+    new_options = []
+
+    for code, server in new_by_code.items():
+        old = old_by_code.get(code)
+        if old is None:
+            continue
+
+        fields = {
+            field: {"old": old.get(field), "new": server.get(field)}
+            for field in SPEC_FIELDS if old.get(field) != server.get(field)
+        }
+        if fields:
+            spec_changed.append({"planCode": code, "fields": fields})
+
+        old_price, new_price = _price_value(old), _price_value(server)
+        if old_price is not None and new_price is not None and old_price != new_price:
+            price_changed.append({
+                "planCode": code,
+                "old": old.get("price"),
+                "new": server.get("price"),
+                "delta": round(new_price - old_price, 2)
+            })
+
+        options = sorted(_option_values(server) - _option_values(old))
+        if options:
+            new_options.append({"planCode": code, "options": options})
+
+    return {
+        "added": added,
+        "removed": removed,
+        "specChanged": spec_changed,
+        "priceChanged": price_changed,
+        "newOptions": new_options
+    }
+
+
+class CatalogChangeFeed:
+    """目录变更记录（按序号递增）"""
+
+    def __init__(self, add_log_func, max_events=MAX_EVENTS):
+        """
+        初始化变更记录
+
+        Args:
+            add_log_func: 添加日志的函数
+            max_events: 保留的变更记录数量
+        """
+        self.add_log = add_log_func
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max_events)
+        self._subscribers = []
+        self.last_seq = 0
+
+    def subscribe(self, callback):
+        """注册变更回调 callback(event)"""
+        self._subscribers.append(callback)
+
+    def publish(self, zone, previous, current):
+        """
+        对比并发布变更（没有上一版本或没有变化时不发布）
+
+        Returns:
+            dict: 变更记录，没有变化时返回None
+        """
+        if not previous:
+            return None
+        changes = diff_catalogs(previous, current)
+        if not any(changes.values()):
+            return None
+
+        with self._lock:
+            self.last_seq += 1
+            event = {
+                "seq": self.last_seq,
+                "zone": zone,
+                "timestamp": time.time(),
+                "time": datetime.now().isoformat(),
+                "summary": {key: len(value) for key, value in changes.items()},
+                **changes
+            }
+            self._events.append(event)
+
+        self.add_log("INFO", f"目录变更 #{event['seq']} ({zone}): 新增 {len(changes['added'])}，下架 {len(changes['removed'])}，"
+                             f"配置变化 {len(changes['specChanged'])}，价格变化 {len(changes['priceChanged'])}，"
+                             f"新增可选配置 {len(changes['newOptions'])}")
+
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                self.add_log("ERROR", f"处理目录变更回调时出错: {str(e)}")
+        return event
+
+    def since(self, since=None, zone=None):
+        """
+        获取之后的变更
+
+        Args:
+            since: 变更序号（整数）或 ISO 时间，None表示全部
+            zone: 只返回指定子公司
+
+        Returns:
+            list: 变更记录
+        """
+        with self._lock:
+            events = list(self._events)
+        if zone:
+            events = [e for e in events if e["zone"] == zone]
+        if since is None or since == "":
+            return events
+
+        try:
+            seq = int(since)
+            return [e for e in events if e["seq"] > seq]
+        except (TypeError, ValueError):
+            pass
+        timestamp = datetime.fromisoformat(str(since)).timestamp()
+        return [e for e in events if e["timestamp"] > timestamp]
+
+    def to_list(self):
+        with self._lock:
+            return list(self._events)
+
+    def load_list(self, events):
+        with self._lock:
+            self._events.clear()
+            for event in events or []:
+                if isinstance(event, dict) and isinstance(event.get("seq"), int):
+                    self._events.append(event)
+            self.last_seq = max([e["seq"] for e in self._events] or [0])
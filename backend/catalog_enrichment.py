@@ -0,0 +1,154 @@
+"""
+服务器目录可用性补全模块
+刷新服务器列表时一次性获取所有型号的数据中心可用性：优先使用一次批量请求，
+失败时改用有界线程池并发逐个查询，单个型号超时或出错时回退到上次缓存的结果；
+等待共享请求预算超时时不再逐个查询，全部型号直接回退到上次缓存的结果
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+# 并发查询的线程数
+DEFAULT_MAX_WORKERS = 8
+
+# 单个型号查询的超时时间（秒）
+PLAN_TIMEOUT = 15
+
+AVAILABILITY_PATH = '/dedicated/server/datacenter/availabilities'
+
+
+class AvailabilityEnricher:
+    """为目录中的型号批量获取数据中心可用性"""
+
+    def __init__(self, client_factory, add_log_func, max_workers=DEFAULT_MAX_WORKERS,
+                 plan_timeout=PLAN_TIMEOUT, rate_budget=None):
+        """
+        初始化
+
+        Args:
+            client_factory: 创建OVH客户端的函数，参数为请求超时时间（秒）
+            add_log_func: 添加日志的函数
+            max_workers: 逐个查询时的最大并发数
+            plan_timeout: 单个型号查询的超时时间（秒）
+            rate_budget: 共享的OVH请求预算（RateBudget），None表示不限制
+        """
+        self.client_factory = client_factory
+        self.add_log = add_log_func
+        self.max_workers = max(1, int(max_workers))
+        self.plan_timeout = plan_timeout
+        self.rate_budget = rate_budget
+
+    def fetch(self, plan_codes, fallback=None, bulk=True):
+        """
+        获取所有型号的可用性
+
+        Args:
+            plan_codes: 型号列表（按目录顺序）
+            fallback: {planCode: datacenters} 上次缓存的结果，查询失败时使用
+            bulk: 是否优先使用一次批量请求（只查询少量型号时直接并发逐个查询）
+
+        Returns:
+            tuple: ({planCode: 可用性原始列表}, 统计信息)
+                   回退到缓存的型号对应值为 None，调用方使用 fallback 中的数据
+        """
+        fallback = fallback or {}
+        started = time.monotonic()
+        report = {
+            "mode": "bulk",
+            "plans": len(plan_codes),
+            "fetched": 0,
+            "fallback": 0,
+            "failed": 0,
+            "timedOut": 0,
+            "durationSeconds": 0.0
+        }
+
+        if bulk and not self._acquire_budget():
+            # 共享预算已耗尽，逐个查询只会发出更多请求（与购买争抢预算），全部回退到缓存
+            self.add_log("WARNING", "等待OVH请求预算超时，跳过本次可用性查询，使用上次缓存的结果")
+            report["mode"] = "skipped"
+            report["timedOut"] = len(plan_codes)
+            report["fallback"] = sum(1 for plan_code in plan_codes if plan_code in fallback)
+            results = {plan_code: None for plan_code in plan_codes}
+        else:
+            results = self._fetch_bulk(plan_codes) if bulk else None
+            if results is not None:
+                report["fetched"] = len(plan_codes)
+            else:
+                report["mode"] = "parallel"
+                results = self._fetch_parallel(plan_codes, fallback, report)
+
+        report["durationSeconds"] = round(time.monotonic() - started, 2)
+        return results, report
+
+    def _acquire_budget(self):
+        if self.rate_budget is None:
+            return True
+        return self.rate_budget.acquire(1, timeout=self.plan_timeout)
+
+    def _fetch_bulk(self, plan_codes):
+        """一次请求获取全部型号的可用性（调用方已取得预算），失败时返回None"""
+        try:
+            # 批量请求返回的数据量较大，超时时间放宽
+            client = self.client_factory(self.plan_timeout * 4)
+            availabilities = client.get(AVAILABILITY_PATH)
+        except Exception as e:
+            self.add_log("WARNING", f"批量获取可用性失败，改为并发逐个查询: {str(e)}")
+            return None
+
+        if not isinstance(availabilities, list):
+            return None
+
+        wanted = set(plan_codes)
+        grouped = {plan_code: [] for plan_code in plan_codes}
+        for item in availabilities:
+            plan_code = item.get("planCode")
+            if plan_code in wanted:
+                grouped[plan_code].append(item)
+        return grouped
+
+    def _fetch_one(self, client, plan_code):
+        if not self._acquire_budget():
+            raise TimeoutError("等待OVH请求预算超时")
+        return client.get(AVAILABILITY_PATH, planCode=plan_code)
+
+    def _fetch_parallel(self, plan_codes, fallback, report):
+        """有界线程池逐个查询，超时或失败的型号回退到缓存"""
+        results = {}
+        client = self.client_factory(self.plan_timeout)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="catalog")
+        try:
+            futures = {executor.submit(self._fetch_one, client, plan_code): plan_code for plan_code in plan_codes}
+            # 整体截止时间：按批次数计算，避免个别请求卡住整个刷新
+            batches = (len(plan_codes) + self.max_workers - 1) // self.max_workers
+            deadline = time.monotonic() + self.plan_timeout * max(1, batches) + self.plan_timeout
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    plan_code = futures[future]
+                    try:
+                        results[plan_code] = future.result()
+                        report["fetched"] += 1
+                    except Exception as e:
+                        is_timeout = isinstance(e, TimeoutError) or "timed out" in str(e).lower()
+                        report["timedOut" if is_timeout else "failed"] += 1
+                        self.add_log("WARNING", f"获取 {plan_code} 可用性失败: {str(e)}")
+                        results[plan_code] = None
+
+            for future in pending:
+                future.cancel()
+                results[futures[future]] = None
+                report["timedOut"] += 1
+            if pending:
+                self.add_log("WARNING", f"{len(pending)} 个型号的可用性查询超时，使用上次缓存的结果")
+        finally:
+            executor.shutdown(wait=False)
+
+        report["fallback"] = sum(1 for plan_code in plan_codes
+                                 if results.get(plan_code) is None and plan_code in fallback)
+        return results
@@ -0,0 +1,191 @@
+"""
+服务器列表后台刷新模块
+缓存过期时先返回旧数据，同一子公司同时只运行一个刷新任务（stale-while-revalidate），
+刷新进度通过任务ID查询，不再让HTTP请求阻塞等待整个目录加载完成；
+正在运行的是增量刷新而请求需要完整解析时，排队一个完整解析任务，在当前任务结束后开始
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+
+# 保留的已结束任务数量
+MAX_FINISHED_JOBS = 50
+
+
+class CatalogRefreshManager:
+    """管理服务器列表的后台刷新任务"""
+
+    def __init__(self, refresh_func, add_log_func):
+        """
+        初始化刷新任务管理器
+
+        Args:
+            refresh_func: 刷新函数 refresh_func(zone, full_parse=..., progress=...)，返回服务器列表
+            add_log_func: 添加日志的函数
+        """
+        self.refresh_func = refresh_func
+        self.add_log = add_log_func
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job id -> 任务信息
+        self._running = {}  # zone -> 正在运行的 job id
+        self._queued = {}  # zone -> 排队等待当前任务结束的完整解析 job id
+        self._events = {}  # job id -> 结束事件
+
+    def _create_job(self, zone, full_parse, source, queued_after=None):
+        """创建任务（调用方需持有锁），queued_after 为排在其后的正在运行的任务ID"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "zone": zone,
+            "fullParse": full_parse,
+            "source": source,
+            "state": "queued" if queued_after else "running",
+            "queuedAfter": queued_after,
+            "stage": "pending",
+            "processed": 0,
+            "total": 0,
+            "startedAt": datetime.now().isoformat(),
+            "finishedAt": None,
+            "durationSeconds": None,
+            "serverCount": None,
+            "error": None
+        }
+        self._jobs[job_id] = job
+        if queued_after:
+            self._queued[zone] = job_id
+        else:
+            self._running[zone] = job_id
+        self._events[job_id] = threading.Event()
+        return job
+
+    def _acquire(self, zone, full_parse, source, queue_full_parse=False):
+        """
+        已有任务在运行时返回该任务，否则创建新任务
+
+        queue_full_parse 为 True 且正在运行的不是完整解析时，返回排队的完整解析任务（没有则新建）
+
+        Returns:
+            tuple: (任务, 是否新建)
+        """
+        with self._lock:
+            job_id = self._running.get(zone)
+            if not job_id:
+                return self._create_job(zone, full_parse, source), True
+            job = self._jobs[job_id]
+            if not (queue_full_parse and full_parse and not job["fullParse"]):
+                return job, False
+            queued_id = self._queued.get(zone)
+            if queued_id:
+                return self._jobs[queued_id], False
+            return self._create_job(zone, True, source, queued_after=job_id), True
+
+    def start(self, zone, full_parse=False, source="request"):
+        """
+        在后台线程中刷新（同一子公司已在刷新时直接返回正在运行的任务）
+
+        请求完整解析而正在运行的是增量刷新时，返回排队的完整解析任务（state 为 queued），
+        当前任务结束后自动开始
+
+        Returns:
+            tuple: (任务信息副本, 是否新建了任务)
+        """
+        job, created = self._acquire(zone, full_parse, source, queue_full_parse=True)
+        if created and job["state"] == "running":
+            self._start_thread(job)
+        return dict(job), created
+
+    def _start_thread(self, job):
+        thread = threading.Thread(target=self._execute, args=(job,), name=f"catalog-refresh-{job['zone']}", daemon=True)
+        thread.start()
+
+    def run(self, zone, full_parse=False, source="auto_refresh"):
+        """
+        在当前线程中刷新（同一子公司已在刷新时跳过）
+
+        Returns:
+            list: 服务器列表；跳过时返回None
+        """
+        job, created = self._acquire(zone, full_parse, source)
+        if not created:
+            self.add_log("INFO", f"子公司 {zone} 正在刷新中（任务 {job['id']}），跳过本次刷新", "auto_refresh")
+            return None
+        return self._execute(job)
+
+    def _execute(self, job):
+        started = time.monotonic()
+
+        def report_progress(stage, processed=0, total=0):
+            job["stage"] = stage
+            job["processed"] = processed
+            job["total"] = total
+
+        servers = []
+        try:
+            servers = self.refresh_func(job["zone"], full_parse=job["fullParse"], progress=report_progress) or []
+            if servers:
+                job["state"] = "completed"
+                job["serverCount"] = len(servers)
+            else:
+                job["state"] = "failed"
+                job["error"] = "API返回空数据"
+        except Exception as e:
+            job["state"] = "failed"
+            job["error"] = str(e)
+            self.add_log("ERROR", f"刷新服务器列表任务 {job['id']} 出错: {str(e)}")
+        finally:
+            job["stage"] = "done"
+            job["finishedAt"] = datetime.now().isoformat()
+            job["durationSeconds"] = round(time.monotonic() - started, 2)
+            next_job = None
+            with self._lock:
+                if self._running.get(job["zone"]) == job["id"]:
+                    del self._running[job["zone"]]
+                    # 开始排队的完整解析任务
+                    queued_id = self._queued.pop(job["zone"], None)
+                    if queued_id:
+                        next_job = self._jobs[queued_id]
+                        next_job["state"] = "running"
+                        next_job["startedAt"] = datetime.now().isoformat()
+                        self._running[job["zone"]] = queued_id
+                event = self._events.pop(job["id"], None)
+                self._trim()
+            if event:
+                event.set()
+            if next_job:
+                self.add_log("INFO", f"开始排队的完整解析任务 {next_job['id']} ({next_job['zone']})")
+                self._start_thread(next_job)
+        return servers
+
+    def _trim(self):
+        """只保留最近的已结束任务（调用方需持有锁）"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["state"] not in ("running", "queued")]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def wait(self, job_id, timeout=None):
+        """等待任务结束，返回任务信息（超时返回当前状态）"""
+        event = self._events.get(job_id)
+        if event:
+            event.wait(timeout)
+        return self.get_job(job_id)
+
+    def get_job(self, job_id):
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def get_running(self, zone):
+        """获取子公司正在运行的刷新任务"""
+        job_id = self._running.get(zone)
+        return self.get_job(job_id) if job_id else None
+
+    def get_status(self):
+        with self._lock:
+            return {
+                "running": [dict(self._jobs[job_id]) for job_id in self._running.values()],
+                "queued": [dict(self._jobs[job_id]) for job_id in self._queued.values()],
+                "recent": [dict(job) for job in list(self._jobs.values())[-10:]]
+            }
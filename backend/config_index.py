@@ -0,0 +1,217 @@
+"""
+配置指纹索引模块
+按子公司把目录（/order/catalog/public/eco）中每个型号的内存/存储附加选项标准化后建立索引：
+(内存, 存储) 指纹 -> 提供该配置的型号列表，以及 (型号, 指纹) -> 下单使用的原始配置码，
+配置狙击匹配型号、生成下单选项时直接查表，不再每次重新请求目录并扫描所有型号的 addonFamilies；
+目录内容（型号及其 addonFamilies）的哈希作为版本，未变化时不重建索引
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from config_normalizer import standardize_config
+
+
+# 索引的最长使用时间（秒），超过后下次查询时重新获取目录（与配置狙击的轮询间隔一致）
+MAX_AGE = 60
+
+# 建立索引的附加选项类别
+INDEXED_FAMILIES = ("memory", "storage")
+
+
+def catalog_version(catalog):
+    """计算目录中型号及其附加选项的哈希（键排序，保证相同内容得到相同结果）"""
+    plans = [(plan.get("planCode"), plan.get("addonFamilies") or [])
+             for plan in catalog.get("plans", []) if isinstance(plan, dict)]
+    raw = json.dumps(plans, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def build_index(catalog):
+    """
+    建立配置指纹索引
+
+    Args:
+        catalog: /order/catalog/public/eco 的响应
+
+    Returns:
+        tuple: (指纹 -> 型号列表, 型号 -> [(类别, {标准化配置: 第一个原始配置码})])
+    """
+    plans_by_fingerprint = {}
+    plan_families = {}
+    for plan in catalog.get("plans", []):
+        plan_code = plan.get("planCode") if isinstance(plan, dict) else None
+        if not plan_code:
+            continue
+
+        families = []
+        standardized = {name: [] for name in INDEXED_FAMILIES}
+        for family in plan.get("addonFamilies") or []:
+            family_name = (family.get("name") or "").lower()
+            if family_name not in standardized:
+                continue
+            first_addon = {}
+            for addon in family.get("addons") or []:
+                addon_std = standardize_config(addon)
+                first_addon.setdefault(addon_std, addon)
+                if addon_std not in standardized[family_name]:
+                    standardized[family_name].append(addon_std)
+            families.append((family_name, first_addon))
+        plan_families[plan_code] = families
+
+        # 内存和存储的所有组合
+        for memory_std in standardized["memory"]:
+            for storage_std in standardized["storage"]:
+                matched = plans_by_fingerprint.setdefault((memory_std, storage_std), [])
+                if plan_code not in matched:
+                    matched.append(plan_code)
+    return plans_by_fingerprint, plan_families
+
+
+class ConfigFingerprintIndex:
+    """按子公司缓存的配置指纹索引"""
+
+    def __init__(self, add_log_func, max_age=MAX_AGE):
+        """
+        初始化配置指纹索引
+
+        Args:
+            add_log_func: 添加日志的函数
+            max_age: 索引的最长使用时间（秒）
+        """
+        self.add_log = add_log_func
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._zones = {}  # 子公司 -> {"version", "updatedAt", "plans", "families"}
+        self._subscribers = []
+        self.builds = 0
+        self.reused = 0
+        self.lookups = 0
+
+    def subscribe(self, callback):
+        """订阅索引重建（目录内容变化）callback(子公司)"""
+        self._subscribers.append(callback)
+
+    def update(self, zone, catalog):
+        """
+        用新获取的目录更新索引（版本未变化时只刷新时间）
+
+        Args:
+            zone: 子公司代码
+            catalog: /order/catalog/public/eco 的响应
+
+        Returns:
+            bool: 是否重建了索引
+        """
+        version = catalog_version(catalog)
+        now = time.time()
+        with self._lock:
+            entry = self._zones.get(zone)
+            if entry is not None and entry["version"] == version:
+                entry["updatedAt"] = now
+                self.reused += 1
+                return False
+
+        plans_by_fingerprint, plan_families = build_index(catalog)
+        with self._lock:
+            self._zones[zone] = {
+                "version": version,
+                "updatedAt": now,
+                "plans": plans_by_fingerprint,
+                "families": plan_families
+            }
+            self.builds += 1
+        self.add_log("INFO", f"配置指纹索引已更新 ({zone}): {len(plan_families)} 个型号，"
+                             f"{len(plans_by_fingerprint)} 种配置", "config_sniper")
+        for callback in list(self._subscribers):
+            try:
+                callback(zone)
+            except Exception as e:
+                self.add_log("WARNING", f"处理配置指纹索引更新出错: {str(e)}", "config_sniper")
+        return True
+
+    def ensure(self, zone, fetch_catalog):
+        """
+        索引不存在或超过最长使用时间时重新获取目录并更新
+
+        Args:
+            zone: 子公司代码
+            fetch_catalog: 获取目录的函数 fetch_catalog(zone)
+
+        Returns:
+            bool: 索引是否可用
+        """
+        with self._lock:
+            entry = self._zones.get(zone)
+            fresh = entry is not None and time.time() - entry["updatedAt"] < self.max_age
+        if fresh:
+            return True
+        try:
+            self.update(zone, fetch_catalog(zone))
+            return True
+        except Exception as e:
+            self.add_log("ERROR", f"获取目录建立配置指纹索引失败: {str(e)}", "config_sniper")
+            with self._lock:
+                return zone in self._zones
+
+    def invalidate(self, zone=None):
+        """使索引失效（下次查询时重新获取目录）"""
+        with self._lock:
+            for key in ([zone] if zone else list(self._zones)):
+                if key in self._zones:
+                    self._zones[key]["updatedAt"] = 0
+
+    def find_plans(self, zone, fingerprint):
+        """
+        查找提供该配置的型号
+
+        Args:
+            zone: 子公司代码
+            fingerprint: 标准化后的 (内存, 存储)
+
+        Returns:
+            list: 型号列表（目录顺序）
+        """
+        with self._lock:
+            self.lookups += 1
+            entry = self._zones.get(zone)
+            return list(entry["plans"].get(tuple(fingerprint), [])) if entry else []
+
+    def order_options(self, zone, plan_code, fingerprint):
+        """
+        型号上与该配置对应的原始配置码（每个内存/存储类别取第一个匹配的配置码）
+
+        Args:
+            zone: 子公司代码
+            plan_code: 型号
+            fingerprint: 标准化后的 (内存, 存储)
+
+        Returns:
+            list: 下单使用的配置码
+        """
+        memory_std, storage_std = fingerprint
+        targets = {"memory": memory_std, "storage": storage_std}
+        with self._lock:
+            self.lookups += 1
+            entry = self._zones.get(zone)
+            families = entry["families"].get(plan_code, []) if entry else []
+        return [first_addon[targets[name]] for name, first_addon in families if targets[name] in first_addon]
+
+    def get_status(self):
+        with self._lock:
+            return {
+                "zones": {
+                    zone: {
+                        "version": entry["version"][:12],
+                        "updatedAt": entry["updatedAt"],
+                        "plans": len(entry["families"]),
+                        "fingerprints": len(entry["plans"])
+                    }
+                    for zone, entry in self._zones.items()
+                },
+                "builds": self.builds,
+                "reused": self.reused,
+                "lookups": self.lookups
+            }
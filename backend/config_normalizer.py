@@ -0,0 +1,65 @@
+"""
+配置字符串标准化模块
+配置狙击匹配时对内存/存储配置码反复调用 standardize_config（每个内存×存储组合最多5次），
+而配置码来自很小的附加选项词汇表：正则在模块加载时预编译，结果按原始配置码缓存（LRU），
+每个正则先用必需的字面子串做快速判断，不包含时跳过，结果与逐条 re.sub 的原实现一致
+"""
+
+import re
+from functools import lru_cache
+
+
+# 缓存的配置码数量（附加选项词汇表通常只有几百个）
+CACHE_SIZE = 4096
+
+# 第一步：型号后缀（按顺序依次移除）
+# (必需的字面子串, 正则)：当前字符串不包含该子串时正则不可能匹配，直接跳过
+MODEL_SUFFIX_PATTERNS = tuple((literal, re.compile(pattern)) for literal, pattern in (
+    ("skl", r'-\d+skl[a-e]\d{2}(-v\d+)?'),  # -24sklea01, -24sklea01-v1
+    ("sk", r'-\d+sk\d+'),                    # -24sk502
+    ("rise", r'-\d+rise\d*'),                # -24rise, -24rise012
+    ("sys", r'-\d+sys\w*'),                  # -24sys, -24sysgame01
+    ("risegame", r'-\d+risegame\d*'),        # -24risegame01
+    ("risestor", r'-\d+risestor'),           # -24risestor
+    ("skgame", r'-\d+skgame\d*'),            # -24skgame01
+    ("ska", r'-\d+ska\d*'),                  # -24ska01
+    ("skstor", r'-\d+skstor\d*'),            # -24skstor01
+    ("sysstor", r'-\d+sysstor'),             # -24sysstor
+    ("game", r'game\d*'),                    # game01, game02
+    ("stor", r'stor\d*'),                    # stor
+    ("-ks", r'-ks\d+'),                      # -ks40
+    ("-rise", r'-rise'),                     # -rise
+    ("sysle", r'-\d+sysle\d+'),              # -25sysle012
+    ("skb", r'-\d+skb\d+'),                  # -25skb01
+    ("skc", r'-\d+skc\d+'),                  # -25skc01
+    ("sk", r'-\d+sk\d+b'),                   # -24sk60b
+    ("-v", r'-v\d+'),                        # -v1
+    ("-", r'-[a-z]{3}$'),                    # -gra, -sgp (机房后缀)
+))
+
+# 第二步：规格细节
+RE_MEMORY_FREQUENCY = re.compile(r'-(no)?ecc-\d+')      # 内存频率 (ecc-2133, noecc-2400 等)
+RE_STORAGE_SUFFIX = re.compile(r'-(sas|sa|ssd|nvme)$')  # 存储后缀修饰符
+RE_TRAILING_NUMBER = re.compile(r'-\d{4,5}$')           # 其他规格细节数字 (-4800, -5600)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def standardize_config(config_str):
+    """标准化配置字符串，提取核心参数用于匹配"""
+    if not config_str:
+        return ""
+
+    normalized = config_str.lower().strip()
+
+    # 第一步：移除所有型号后缀
+    for literal, pattern in MODEL_SUFFIX_PATTERNS:
+        if literal in normalized:
+            normalized = pattern.sub('', normalized)
+
+    # 第二步：移除规格细节，只保留核心参数
+    if "ecc-" in normalized:
+        normalized = RE_MEMORY_FREQUENCY.sub('', normalized)
+    normalized = RE_STORAGE_SUFFIX.sub('', normalized)
+    normalized = RE_TRAILING_NUMBER.sub('', normalized)
+
+    return normalized
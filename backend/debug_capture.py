@@ -0,0 +1,242 @@
+"""
+调试数据采集模块
+刷新服务器列表时的原始数据（plan、addonFamilies、带宽/CPU选项等）不再在解析循环中同步写入，
+而是交给后台线程压缩保存：默认关闭，可按型号或按比例采样开启，
+相同内容按哈希去重只保存一份（内容变化后不再被引用的旧文件立即删除），总大小超过配额时淘汰最早的数据
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "plans": [],  # 只采集指定型号，为空表示不按型号过滤
+    "sampleRate": 0.0,  # 按比例采样（0-1），0表示不采样
+    "maxBytes": 50 * 1024 * 1024  # 总大小配额
+}
+
+# 待写入队列的容量，超出时丢弃（不阻塞解析）
+MAX_PENDING = 1000
+
+
+class DebugCaptureSink:
+    """异步、压缩、去重、有配额的调试数据采集"""
+
+    def __init__(self, base_dir, add_log_func, settings=None):
+        """
+        初始化调试数据采集
+
+        Args:
+            base_dir: 保存目录
+            add_log_func: 添加日志的函数
+            settings: 采集设置，参见 DEFAULT_SETTINGS
+        """
+        self.base_dir = base_dir
+        self.blob_dir = os.path.join(base_dir, "blobs")
+        self.index_file = os.path.join(base_dir, "index.json")
+        self.add_log = add_log_func
+        self.settings = dict(DEFAULT_SETTINGS)
+
+        self._queue = queue.Queue(maxsize=MAX_PENDING)
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()  # 保护索引（后台写入与重置、查询状态之间）
+        self._index = None  # "planCode/name" -> {"hash", "size", "capturedAt"}，首次写入时加载
+        self._thread = None
+
+        # 统计
+        self.captured = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.evicted = 0
+
+        self.configure(settings)
+
+    def configure(self, settings):
+        """更新采集设置"""
+        settings = settings or {}
+        with self._lock:
+            self.settings = {key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+            self._plans = set(self.settings.get("plans") or [])
+            try:
+                self._sample_rate = max(0.0, min(1.0, float(self.settings.get("sampleRate") or 0)))
+            except (TypeError, ValueError):
+                self._sample_rate = 0.0
+
+    def should_capture(self, plan_code):
+        """判断是否采集该型号（按型号哈希采样，同一型号每次刷新的结果一致）"""
+        if not self.settings.get("enabled"):
+            return False
+        if self._plans:
+            return plan_code in self._plans
+        if self._sample_rate > 0:
+            bucket = int(hashlib.md5(plan_code.encode("utf-8")).hexdigest()[:8], 16) % 10000
+            return bucket < self._sample_rate * 10000
+        return True
+
+    def capture(self, plan_code, name, payload):
+        """
+        提交调试数据（立即返回，由后台线程写入）
+
+        Args:
+            plan_code: 型号
+            name: 数据名称（如 plan_data、addonFamilies）
+            payload: 可序列化为JSON的数据
+        """
+        if not self.should_capture(plan_code):
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((plan_code, name, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="debug-capture", daemon=True)
+                self._thread.start()
+
+    def reset_index(self):
+        """保存目录被删除后重置索引"""
+        with self._index_lock:
+            self._index = None
+
+    def flush(self, timeout=10):
+        """等待队列中的数据写入完成"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+    # ---------- 后台写入 ----------
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except Exception as e:
+                self.add_log("WARNING", f"加载调试数据索引失败: {str(e)}")
+        self._sweep_orphans()
+
+    def _sweep_orphans(self):
+        """删除索引中没有引用的数据文件（如之前的版本在内容变化后留下的旧文件）"""
+        referenced = {entry["hash"] for entry in self._index.values()}
+        for filename in os.listdir(self.blob_dir):
+            if filename.endswith(".json.gz") and filename[:-len(".json.gz")] not in referenced:
+                try:
+                    os.remove(os.path.join(self.blob_dir, filename))
+                except OSError:
+                    pass
+
+    def _remove_blob(self, digest):
+        try:
+            os.remove(os.path.join(self.blob_dir, f"{digest}.json.gz"))
+        except OSError:
+            pass
+
+    def _save_index(self):
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_file, self.index_file)
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                with self._index_lock:
+                    os.makedirs(self.blob_dir, exist_ok=True)
+                    self._load_index()
+                    changed = self._write(*item)
+                    # 批量处理队列中剩余的数据后再保存索引
+                    while True:
+                        try:
+                            next_item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        try:
+                            changed = self._write(*next_item) or changed
+                        finally:
+                            self._queue.task_done()
+                    if changed:
+                        self._enforce_quota()
+                        self._save_index()
+            except Exception as e:
+                self.add_log("WARNING", f"写入调试数据时出错: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, plan_code, name, payload):
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha1(raw).hexdigest()
+        key = f"{plan_code}/{name}"
+
+        entry = self._index.get(key)
+        if entry and entry.get("hash") == digest:
+            self.deduplicated += 1
+            return False
+
+        blob_path = os.path.join(self.blob_dir, f"{digest}.json.gz")
+        if os.path.exists(blob_path):
+            size = os.path.getsize(blob_path)
+            self.deduplicated += 1
+        else:
+            with gzip.open(blob_path, "wb", compresslevel=6) as f:
+                f.write(raw)
+            size = os.path.getsize(blob_path)
+            self.captured += 1
+
+        self._index[key] = {"hash": digest, "size": size, "capturedAt": time.time()}
+        # 旧内容没有其他条目引用时删除，否则不计入配额也不会被淘汰
+        if entry and not any(v["hash"] == entry["hash"] for v in self._index.values()):
+            self._remove_blob(entry["hash"])
+        return True
+
+    def _enforce_quota(self):
+        """总大小超过配额时，按采集时间从早到晚淘汰"""
+        max_bytes = self.settings.get("maxBytes") or DEFAULT_SETTINGS["maxBytes"]
+        blob_sizes = {}
+        last_used = {}
+        for entry in self._index.values():
+            blob_sizes[entry["hash"]] = entry["size"]
+            last_used[entry["hash"]] = max(last_used.get(entry["hash"], 0), entry["capturedAt"])
+
+        total = sum(blob_sizes.values())
+        if total <= max_bytes:
+            return
+
+        for digest in sorted(last_used, key=last_used.get):
+            if total <= max_bytes:
+                break
+            self._remove_blob(digest)
+            total -= blob_sizes[digest]
+            self.evicted += 1
+            for key in [k for k, v in self._index.items() if v["hash"] == digest]:
+                del self._index[key]
+
+    def get_status(self):
+        with self._index_lock:
+            index = self._index or {}
+            entries = len(index)
+            total_bytes = sum({v["hash"]: v["size"] for v in index.values()}.values())
+        return {
+            "settings": dict(self.settings),
+            "pending": self._queue.qsize(),
+            "entries": entries,
+            "totalBytes": total_bytes,
+            "captured": self.captured,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "evicted": self.evicted
+        }
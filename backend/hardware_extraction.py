@@ -0,0 +1,777 @@
+"""
+服务器硬件信息提取模块
+将目录型号的硬件解析（CPU、内存、存储、带宽、可选配置）从 load_server_list 中独立出来：
+所有正则和关键词规则集中在规则表中并在导入时预编译，每个型号的名称/描述只做一次小写转换，
+数据中心名称和区域使用缓存的映射表查询
+"""
+
+import json
+import re
+import traceback
+from functools import lru_cache
+
+
+# ---------- 数据中心元数据 ----------
+
+# 数据中心代码（前三个字符）-> (名称, 区域)
+DATACENTER_INFO = {
+    "gra": ("格拉夫尼茨", "法国"),
+    "sbg": ("斯特拉斯堡", "法国"),
+    "rbx": ("鲁贝", "法国"),
+    "bhs": ("博阿尔诺", "加拿大"),
+    "hil": ("希尔斯伯勒", "美国"),
+    "vin": ("维也纳", "美国"),
+    "lim": ("利马索尔", "塞浦路斯"),
+    "sgp": ("新加坡", "新加坡"),
+    "syd": ("悉尼", "澳大利亚"),
+    "waw": ("华沙", "波兰"),
+    "fra": ("法兰克福", "德国"),
+    "lon": ("伦敦", "英国"),
+    "eri": ("厄斯沃尔", "英国"),
+}
+
+
+@lru_cache(maxsize=256)
+def describe_datacenter(datacenter):
+    """
+    获取数据中心的名称和区域
+
+    Args:
+        datacenter: 数据中心代码（如 gra1、bhs）
+
+    Returns:
+        tuple: (名称, 区域)，未知数据中心返回 (原代码, "未知")，没有代码时名称也为 "未知"
+    """
+    dc_code = (datacenter or "").lower()[:3]
+    return DATACENTER_INFO.get(dc_code, (datacenter if datacenter is not None else "未知", "未知"))
+
+
+# ---------- 规则表（导入时预编译） ----------
+
+# 名称中的CPU型号关键词（按优先级排列）
+CPU_MODEL_KEYWORDS = ("i7-", "i9-", "i5-", "xeon", "epyc", "ryzen")
+CPU_FALLBACK_KEYWORDS = CPU_MODEL_KEYWORDS + ("processor", "cpu")
+CPU_TEXT_KEYWORDS = ("i7-", "i9-", "ryzen", "xeon", "epyc", "cpu", "intel", "amd", "processor")
+CPU_TAG_TERMS = ("intel", "amd", "xeon", "i7")
+
+# 不作为硬件选项显示的许可证/系统/面板类 addon
+LICENSE_ADDON_TERMS = ("windows-server", "sql-server", "cpanel-license", "plesk-", "-license-", "control-panel", "panel")
+
+# 属性/产品配置名称 -> 硬件字段
+CPU_TERMS = ("cpu", "processor")
+MEMORY_TERMS = ("memory", "ram")
+STORAGE_TERMS = ("storage", "disk", "hdd", "ssd")
+PRIVATE_BANDWIDTH_TERMS = ("vrack", "private", "internal")
+
+# addonFamilies 的 family 名称分类
+FAMILY_CPU_TERMS = ("cpu", "processor")
+FAMILY_MEMORY_TERMS = ("memory", "ram")
+FAMILY_STORAGE_TERMS = ("storage", "disk", "drive", "ssd", "hdd")
+FAMILY_BANDWIDTH_TERMS = ("bandwidth", "traffic", "network")
+
+# 描述片段的关键词
+DESC_CPU_TERMS = ("cpu", "core", "i7", "i9", "xeon", "epyc", "ryzen")
+DESC_MEMORY_TERMS = ("ram", "gb", "memory")
+DESC_STORAGE_TERMS = ("hdd", "ssd", "nvme", "storage", "disk")
+
+# addon 代码
+RE_RAM_ADDON = re.compile(r'ram-(\d+)g', re.IGNORECASE)
+RE_HYBRID_STORAGE = re.compile(r'hybridsoftraid-(\d+)x(\d+)(sa|ssd|hdd)-(\d+)x(\d+)(nvme|ssd|hdd)', re.IGNORECASE)
+RE_RAID_STORAGE = re.compile(r'(raid|softraid)-(\d+)x(\d+)(ssd|hdd|nvme|sa)', re.IGNORECASE)
+RE_TRAFFIC_BANDWIDTH = re.compile(r'traffic-(\d+)(tb|gb|mb)-(\d+)', re.IGNORECASE)
+RE_TRAFFIC_ONLY = re.compile(r'traffic-(\d+)(tb|gb|mb)$', re.IGNORECASE)
+RE_TRAFFIC = re.compile(r'traffic-(\d+)(tb|gb|mb)', re.IGNORECASE)
+RE_BANDWIDTH = re.compile(r'bandwidth-(\d+)', re.IGNORECASE)
+RE_VRACK_BANDWIDTH = re.compile(r'vrack-bandwidth-(\d+)', re.IGNORECASE)
+RE_NUMBER = re.compile(r'(\d+)')
+
+# 名称/描述文本
+RE_CPU_TEXT_CLEAN = re.compile(r'[^\w\s\-,.]')
+MEMORY_TEXT_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+)\s*GB\s*RAM',
+    r'RAM\s*(\d+)\s*GB',
+    r'(\d+)\s*G\s*RAM',
+    r'RAM\s*(\d+)\s*G',
+    r'(\d+)\s*GB'
+))
+STORAGE_TEXT_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+)\s*[xX]\s*(\d+)\s*GB\s*(SSD|HDD|NVMe)',
+    r'(\d+)\s*(SSD|HDD|NVMe)\s*(\d+)\s*GB',
+    r'(\d+)\s*TB\s*(SSD|HDD|NVMe)',
+    r'(\d+)\s*(SSD|HDD|NVMe)'
+))
+
+
+# ---------- 文本预处理 ----------
+
+class PlanText:
+    """单个型号的文本字段，小写结果只计算一次"""
+
+    __slots__ = ("_lower",)
+
+    def __init__(self):
+        self._lower = {}
+
+    def lower(self, text):
+        result = self._lower.get(text)
+        if result is None:
+            result = self._lower[text] = text.lower()
+        return result
+
+    def find_keyword(self, text, keywords):
+        """按优先级查找第一个出现的关键词，返回 (关键词, 位置)"""
+        lowered = self.lower(text)
+        for keyword in keywords:
+            pos = lowered.find(keyword)
+            if pos >= 0:
+                return keyword, pos
+        return None, -1
+
+
+def _contains_any(text, terms):
+    for term in terms:
+        if term in text:
+            return True
+    return False
+
+
+def _format_speed(bw_value):
+    if bw_value >= 1000:
+        return f"{bw_value/1000:.1f} Gbps".replace(".0 ", " ")
+    return f"{bw_value} Mbps"
+
+
+def _noop_log(level, message, source="system"):
+    pass
+
+
+# ---------- 解析入口 ----------
+
+def parse_plan(plan, datacenters, log=None, capture=None):
+    """
+    解析单个目录型号的硬件信息和可选配置
+
+    Args:
+        plan: 目录中的原始型号数据
+        datacenters: 已补全名称和区域的数据中心列表
+        log: 日志函数（签名同 add_log），None表示不记录
+        capture: 调试数据采集（DebugCaptureSink），None表示不采集
+
+    Returns:
+        dict: 服务器信息
+    """
+    log = log or _noop_log
+    plan_code = plan.get("planCode")
+    text = PlanText()
+
+    server_info = {
+        "planCode": plan_code,
+        "name": plan.get("invoiceName", ""),
+        "description": plan.get("description", ""),
+        "cpu": "N/A",
+        "memory": "N/A",
+        "storage": "N/A",
+        "bandwidth": "N/A",
+        "vrackBandwidth": "N/A",
+        "datacenters": datacenters,
+        "defaultOptions": [],
+        "availableOptions": []
+    }
+
+    # 保存服务器详细数据，以便于调试（异步采集，相同内容只保存一份）
+    if capture is not None:
+        capture.capture(plan_code, "plan_data", plan)
+        if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
+            capture.capture(plan_code, "addonFamilies", plan.get("addonFamilies"))
+
+    _apply_special_series(plan, plan_code, server_info, text, log)
+
+    # 获取服务器名称和描述，确保它们不为空
+    if not server_info["name"] and plan.get("displayName"):
+        server_info["name"] = plan.get("displayName")
+    if not server_info["description"] and plan.get("displayName"):
+        server_info["description"] = plan.get("displayName")
+
+    _apply_name_tag_cpu(plan, plan_code, server_info, text, log)
+
+    options = {"default": [], "available": []}
+    _extract_options(plan, plan_code, server_info, options, text, log, capture)
+
+    _apply_properties(plan, plan_code, server_info, log)
+    _apply_name_text(plan_code, server_info, text, log, capture)
+    _apply_product_configurations(plan, plan_code, server_info, log)
+    _apply_description(plan, plan_code, server_info, log)
+    _apply_pricing_configurations(plan, plan_code, server_info, log)
+
+    # 对于CPU，添加一些基本信息如果只有核心数
+    if server_info["cpu"] != "N/A" and server_info["cpu"].isdigit():
+        server_info["cpu"] = f"{server_info['cpu']} 核心"
+
+    server_info["defaultOptions"] = options["default"]
+    server_info["availableOptions"] = options["available"]
+    return server_info
+
+
+# ---------- 各解析步骤 ----------
+
+def _cpu_from_keywords(names, keywords, text):
+    """在名称列表中查找CPU型号关键词，提取关键词开始的最多30个字符"""
+    for name in names:
+        if not name:
+            continue
+        keyword, pos = text.find_keyword(name, keywords)
+        if keyword is not None:
+            return name[pos:pos + 30].split(",")[0].strip()
+    return None
+
+
+def _apply_special_series(plan, plan_code, server_info, text, log):
+    """SYSLE/SK 等特殊系列，以及无法提取CPU时的默认值"""
+    special_server_processed = False
+    try:
+        plan_code_lower = text.lower(plan_code)
+        names = [plan.get("displayName", ""), plan.get("invoiceName", ""), plan.get("description", "")]
+
+        if "sysle" in plan_code_lower:
+            log("INFO", f"检测到SYSLE系列服务器: {plan_code}")
+            if "011" in plan_code:
+                server_info["cpu"] = "SYSLE 011系列 (入门级服务器CPU)"
+            elif "021" in plan_code:
+                server_info["cpu"] = "SYSLE 021系列 (中端服务器CPU)"
+            elif "031" in plan_code:
+                server_info["cpu"] = "SYSLE 031系列 (高端服务器CPU)"
+            else:
+                server_info["cpu"] = "SYSLE系列CPU"
+
+            cpu_info = _cpu_from_keywords(names, CPU_MODEL_KEYWORDS, text)
+            if cpu_info is not None:
+                server_info["cpu"] = cpu_info
+                log("INFO", f"从关键词中提取SYSLE CPU型号: {cpu_info} 给 {plan_code}")
+
+            special_server_processed = True
+
+        elif "sk" in plan_code_lower:
+            log("INFO", f"检测到SK系列服务器: {plan_code}")
+
+            found_cpu = False
+            for name in names:
+                if not name:
+                    continue
+
+                # 查找典型的CPU信息格式，例如"KS-A | Intel i7-6700k"
+                if "|" in name:
+                    parts = name.split("|")
+                    if len(parts) > 1:
+                        cpu_part = parts[1].strip()
+                        if _contains_any(text.lower(cpu_part), CPU_TAG_TERMS):
+                            server_info["cpu"] = cpu_part
+                            log("INFO", f"从名称中提取CPU型号: {cpu_part} 给 {plan_code}")
+                            found_cpu = True
+
+                # 直接查找CPU型号关键词
+                cpu_info = _cpu_from_keywords([name], CPU_MODEL_KEYWORDS, text)
+                if cpu_info is not None:
+                    server_info["cpu"] = cpu_info
+                    log("INFO", f"从关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
+                    found_cpu = True
+
+                if found_cpu:
+                    break
+
+            if not found_cpu:
+                server_info["cpu"] = "SK系列专用CPU"
+
+            special_server_processed = True
+
+        # 确保所有服务器都有CPU信息
+        if server_info["cpu"] == "N/A":
+            log("INFO", f"服务器 {plan_code} 无法从API提取CPU信息，尝试从名称提取")
+
+            cpu_info = _cpu_from_keywords(names, CPU_FALLBACK_KEYWORDS, text)
+            if cpu_info is not None:
+                server_info["cpu"] = cpu_info
+                log("INFO", f"从名称关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
+            elif "sysle" in plan_code_lower:
+                server_info["cpu"] = "SYSLE系列专用CPU"
+            elif "rise" in plan_code_lower:
+                server_info["cpu"] = "RISE系列专用CPU"
+            elif "game" in plan_code_lower:
+                server_info["cpu"] = "GAME系列专用CPU"
+            else:
+                server_info["cpu"] = "专用服务器CPU"
+    except Exception as e:
+        log("WARNING", f"处理特殊系列服务器时出错: {str(e)}")
+        log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+        # 出错时也确保有默认CPU信息
+        if server_info["cpu"] == "N/A":
+            server_info["cpu"] = "专用服务器CPU"
+
+    if special_server_processed:
+        log("INFO", f"已对服务器 {plan_code} 应用特殊处理逻辑")
+
+
+def _apply_name_tag_cpu(plan, plan_code, server_info, text, log):
+    """从"KS-A | Intel i7-6700k"格式的名称标签中提取CPU"""
+    if not (server_info["cpu"] == "N/A" or "系列" in server_info["cpu"]):
+        return
+    try:
+        for name in [plan.get("displayName", ""), plan.get("invoiceName", "")]:
+            if not name or "|" not in name:
+                continue
+
+            parts = name.split("|")
+            if len(parts) > 1:
+                cpu_part = parts[1].strip()
+                if _contains_any(text.lower(cpu_part), CPU_TAG_TERMS):
+                    server_info["cpu"] = cpu_part
+                    log("INFO", f"从服务器名称标签中提取CPU: {cpu_part} 给 {plan_code}")
+                    break
+    except Exception as e:
+        log("WARNING", f"从名称提取CPU时出错: {str(e)}")
+
+
+def _extract_options(plan, plan_code, server_info, options, text, log, capture):
+    """获取推荐配置和可选配置（plan.default、addons、product.options、addonFamilies、pricings）"""
+    default_options = options["default"]
+    try:
+        # 方法 1: 检查plan.default.options
+        if plan.get("default") and isinstance(plan.get("default"), dict) and plan.get("default").get("options"):
+            for default_opt in plan.get("default").get("options"):
+                if isinstance(default_opt, dict):
+                    option_code = default_opt.get("planCode")
+                    option_name = default_opt.get("description", option_code)
+                    if option_code:
+                        default_options.append({"label": option_name, "value": option_code})
+
+        # 方法 2: 检查plan.addons
+        if plan.get("addons") and isinstance(plan.get("addons"), list):
+            for addon in plan.get("addons"):
+                if not isinstance(addon, dict):
+                    continue
+                addon_plan_code = addon.get("planCode")
+                if not addon_plan_code:
+                    continue
+                # 跳过已经在默认选项中的配置
+                if any(opt["value"] == addon_plan_code for opt in default_options):
+                    continue
+                options["available"].append({
+                    "label": addon.get("description", addon_plan_code),
+                    "value": addon_plan_code
+                })
+
+        # 方法 3: 检查plan.product.options
+        if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("options"):
+            product_options = plan.get("product").get("options")
+            if isinstance(product_options, list):
+                for product_opt in product_options:
+                    if not isinstance(product_opt, dict):
+                        continue
+                    option_code = product_opt.get("planCode")
+                    option_name = product_opt.get("description", option_code)
+                    if (option_code and not any(opt["value"] == option_code for opt in options["available"])
+                            and not any(opt["value"] == option_code for opt in default_options)):
+                        options["available"].append({"label": option_name, "value": option_code})
+
+        # 方法 4: 尝试从plan.addonFamilies中提取硬件信息
+        try:
+            if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
+                _apply_addon_families(plan, plan_code, server_info, options, text, log, capture)
+        except Exception as e:
+            log("ERROR", f"解析addonFamilies时出错: {str(e)}")
+            log("ERROR", f"错误详情: {traceback.format_exc()}")
+
+        # 方法 5: 检查plan.pricings中的配置项
+        if plan.get("pricings") and isinstance(plan.get("pricings"), dict):
+            for pricing_key, pricing_value in plan.get("pricings").items():
+                if isinstance(pricing_value, dict) and pricing_value.get("options"):
+                    for option_code, option_details in pricing_value.get("options").items():
+                        # 跳过已经在其他列表中的项目
+                        if (any(opt["value"] == option_code for opt in default_options)
+                                or any(opt["value"] == option_code for opt in options["available"])):
+                            continue
+                        option_label = option_code
+                        if isinstance(option_details, dict) and option_details.get("description"):
+                            option_label = option_details.get("description")
+                        options["available"].append({"label": option_label, "value": option_code})
+
+        log("INFO", f"找到 {len(default_options)} 个默认选项和 {len(options['available'])} 个可选配置用于 {plan_code}")
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} 选项时出错: {str(e)}")
+
+
+def _apply_addon_families(plan, plan_code, server_info, options, text, log, capture):
+    """从addonFamilies提取可选配置及默认的CPU/内存/存储/带宽"""
+    addon_families = plan.get("addonFamilies")
+    default_options = options["default"]
+
+    # 打印一个完整的addonFamilies示例用于调试
+    if len(addon_families) > 0:
+        try:
+            log("INFO", f"addonFamilies示例: {json.dumps(addon_families[0], indent=2)}")
+        except Exception as e:
+            log("WARNING", f"无法序列化addonFamilies示例: {str(e)}")
+
+    # 尝试保存所有带宽相关的选项用于调试
+    if capture is not None and capture.should_capture(plan_code):
+        try:
+            bandwidth_options = []
+            for family in addon_families:
+                family_name = family.get("name", "").lower()
+                if _contains_any(family_name, FAMILY_BANDWIDTH_TERMS):
+                    bandwidth_options.append({
+                        "family": family.get("name"),
+                        "default": family.get("default"),
+                        "addons": family.get("addons")
+                    })
+            if bandwidth_options:
+                capture.capture(plan_code, "bandwidth_options", bandwidth_options)
+        except Exception as e:
+            log("WARNING", f"保存带宽选项时出错: {str(e)}")
+
+    temp_available_options = []
+
+    for family in addon_families:
+        if not isinstance(family, dict):
+            log("WARNING", f"addonFamily不是字典类型: {family}")
+            continue
+
+        family_name = text.lower(family.get("name", ""))  # 注意: 在API响应中是'name'而不是'family'
+        default_addon = family.get("default")
+        addons = family.get("addons")
+        has_addons = bool(addons) and isinstance(addons, list)
+
+        # 提取可选配置
+        if has_addons:
+            for addon_code in addons:
+                # 在API响应中，addons是字符串数组而不是对象数组
+                if not isinstance(addon_code, str):
+                    continue
+
+                is_default = (addon_code == default_addon)
+                addon_lower = text.lower(addon_code)
+
+                # 过滤掉许可证、操作系统和控制面板相关选项
+                if _contains_any(addon_lower, LICENSE_ADDON_TERMS) or addon_lower.startswith("os-"):
+                    continue
+
+                if addon_code:
+                    temp_available_options.append({
+                        "label": addon_code,
+                        "value": addon_code,
+                        "family": family_name,
+                        "isDefault": is_default
+                    })
+                    if is_default:
+                        default_options.append({"label": addon_code, "value": addon_code})
+
+        # 根据family名称设置对应的硬件信息
+        if not (family_name and has_addons):
+            continue
+        default_value = default_addon
+
+        if _contains_any(family_name, FAMILY_CPU_TERMS) and server_info["cpu"] == "N/A":
+            if default_value:
+                server_info["cpu"] = default_value
+                log("INFO", f"从addonFamilies默认选项提取CPU: {default_value} 给 {plan_code}")
+                try:
+                    cpu_options = [cpu_addon for cpu_addon in addons if isinstance(cpu_addon, str)]
+                    if cpu_options:
+                        log("INFO", f"服务器 {plan_code} 的CPU选项: {', '.join(cpu_options)}")
+                        if capture is not None:
+                            capture.capture(plan_code, "cpu_options", {"options": cpu_options, "default": default_value})
+                except Exception as e:
+                    log("WARNING", f"解析CPU选项时出错: {str(e)}")
+
+        elif _contains_any(family_name, FAMILY_MEMORY_TERMS) and server_info["memory"] == "N/A":
+            if default_value:
+                ram_match = RE_RAM_ADDON.search(default_value)
+                if ram_match:
+                    server_info["memory"] = f"{ram_match.group(1)} GB"
+                    log("INFO", f"从addonFamilies默认选项提取内存: {server_info['memory']} 给 {plan_code}")
+                else:
+                    server_info["memory"] = default_value
+                    log("INFO", f"从addonFamilies默认选项提取内存(原始值): {default_value} 给 {plan_code}")
+
+        elif _contains_any(family_name, FAMILY_STORAGE_TERMS) and server_info["storage"] == "N/A":
+            if default_value:
+                hybrid_match = RE_HYBRID_STORAGE.search(default_value)
+                if hybrid_match:
+                    count1, size1, type1, count2, size2, type2 = hybrid_match.groups()
+                    server_info["storage"] = f"混合RAID {count1}x {size1}GB {type1.upper()} + {count2}x {size2}GB {type2.upper()}"
+                    log("INFO", f"从addonFamilies默认选项提取混合存储: {server_info['storage']} 给 {plan_code}")
+                else:
+                    storage_match = RE_RAID_STORAGE.search(default_value)
+                    if storage_match:
+                        raid_type, count, size, type_str = storage_match.groups()
+                        server_info["storage"] = f"{raid_type.upper()} {count}x {size}GB {type_str.upper()}"
+                        log("INFO", f"从addonFamilies默认选项提取存储: {server_info['storage']} 给 {plan_code}")
+                    else:
+                        server_info["storage"] = default_value
+                        log("INFO", f"从addonFamilies默认选项提取存储(原始值): {default_value} 给 {plan_code}")
+
+        elif _contains_any(family_name, FAMILY_BANDWIDTH_TERMS) and server_info["bandwidth"] == "N/A":
+            if default_value:
+                _apply_bandwidth_addon(plan_code, default_value, server_info, text, log)
+
+    # 将处理好的可选配置添加到服务器信息中
+    if temp_available_options:
+        options["available"] = temp_available_options
+
+
+def _apply_bandwidth_addon(plan_code, default_value, server_info, text, log):
+    """解析带宽/流量 addon 代码"""
+    log("DEBUG", f"处理带宽选项: {default_value}")
+    value_lower = text.lower(default_value)
+
+    # 格式1: traffic-5tb-100-24sk-apac (带宽限制和流量限制)
+    traffic_bw_match = RE_TRAFFIC_BANDWIDTH.search(default_value)
+    if traffic_bw_match:
+        size, unit, bw_value = traffic_bw_match.groups()
+        server_info["bandwidth"] = f"{bw_value} Mbps / {size} {unit.upper()}流量"
+        log("INFO", f"从addonFamilies默认选项提取带宽和流量: {server_info['bandwidth']} 给 {plan_code}")
+        return
+
+    # 格式2: traffic-5tb (仅流量限制)
+    if RE_TRAFFIC_ONLY.search(default_value):
+        size, unit = RE_TRAFFIC.search(default_value).groups()
+        server_info["bandwidth"] = f"{size} {unit.upper()}流量"
+        log("INFO", f"从addonFamilies默认选项提取流量: {server_info['bandwidth']} 给 {plan_code}")
+        return
+
+    # 格式3: bandwidth-100 (仅带宽限制)
+    bandwidth_match = RE_BANDWIDTH.search(default_value)
+    if bandwidth_match:
+        server_info["bandwidth"] = _format_speed(int(bandwidth_match.group(1)))
+        log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
+        return
+
+    # 格式4: traffic-unlimited (无限流量)
+    if "unlimited" in value_lower:
+        bw_match = RE_NUMBER.search(default_value)
+        if bw_match:
+            server_info["bandwidth"] = f"{int(bw_match.group(1))} Mbps / 无限流量"
+        else:
+            server_info["bandwidth"] = "无限流量"
+        log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
+        return
+
+    # 格式5: bandwidth-guarantee (保证带宽)
+    if "guarantee" in value_lower:
+        bw_match = RE_NUMBER.search(default_value)
+        if bw_match:
+            server_info["bandwidth"] = f"{int(bw_match.group(1))} Mbps (保证带宽)"
+            log("INFO", f"从addonFamilies默认选项提取保证带宽: {server_info['bandwidth']} 给 {plan_code}")
+        else:
+            server_info["bandwidth"] = "保证带宽"
+            log("INFO", f"从addonFamilies默认选项提取保证带宽(无具体值) 给 {plan_code}")
+        return
+
+    # 格式6: vrack-bandwidth (内部网络带宽)
+    if "vrack" in value_lower:
+        vrack_bw_match = RE_VRACK_BANDWIDTH.search(default_value)
+        if vrack_bw_match:
+            server_info["vrackBandwidth"] = _format_speed(int(vrack_bw_match.group(1)))
+            log("INFO", f"从addonFamilies默认选项提取内部网络带宽: {server_info['vrackBandwidth']} 给 {plan_code}")
+        return
+
+    # 无法识别的格式，使用原始值
+    server_info["bandwidth"] = default_value
+    log("INFO", f"从addonFamilies默认选项提取带宽(原始值): {default_value} 给 {plan_code}")
+
+
+def _apply_properties(plan, plan_code, server_info, log):
+    """解析方法 1: 从details.properties中提取硬件详情"""
+    try:
+        if plan.get("details") and plan.get("details").get("properties"):
+            for prop in plan.get("details").get("properties"):
+                if not isinstance(prop, dict):
+                    log("WARNING", f"属性项不是字典类型: {prop}")
+                    continue
+
+                prop_name = prop.get("name", "").lower()
+                value = prop.get("value", "N/A")
+                if not value or value == "N/A":
+                    continue
+
+                if _contains_any(prop_name, CPU_TERMS):
+                    server_info["cpu"] = value
+                    log("INFO", f"从properties提取CPU: {value} 给 {plan_code}")
+                elif _contains_any(prop_name, MEMORY_TERMS):
+                    server_info["memory"] = value
+                    log("INFO", f"从properties提取内存: {value} 给 {plan_code}")
+                elif _contains_any(prop_name, STORAGE_TERMS):
+                    server_info["storage"] = value
+                    log("INFO", f"从properties提取存储: {value} 给 {plan_code}")
+                elif "bandwidth" in prop_name:
+                    if _contains_any(prop_name, PRIVATE_BANDWIDTH_TERMS):
+                        server_info["vrackBandwidth"] = value
+                        log("INFO", f"从properties提取vRack带宽: {value} 给 {plan_code}")
+                    else:
+                        server_info["bandwidth"] = value
+                        log("INFO", f"从properties提取带宽: {value} 给 {plan_code}")
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} 属性时出错: {str(e)}")
+
+
+def _apply_name_text(plan_code, server_info, text, log, capture):
+    """解析方法 2: 从名称和描述文本中提取CPU、内存、存储"""
+    try:
+        server_name = server_info["name"]
+        server_desc = server_info["description"] if server_info["description"] else ""
+
+        if capture is not None:
+            capture.capture(plan_code, "server_details", {
+                "name": server_name,
+                "description": server_desc,
+                "planCode": plan_code
+            })
+
+        # KS/RISE系列服务器通常使用 "KS-XX | CPU信息" 格式
+        if "|" in server_name:
+            parts = server_name.split("|")
+            if len(parts) > 1 and server_info["cpu"] == "N/A":
+                cpu_part = parts[1].strip()
+                server_info["cpu"] = cpu_part
+                log("INFO", f"从服务器名称提取CPU: {cpu_part} 给 {plan_code}")
+
+                # 例如: "4 Core, 8 Thread, xxxx"
+                if "core" in text.lower(cpu_part):
+                    core_parts = cpu_part.split(",")
+                    if len(core_parts) > 1:
+                        server_info["cpu"] = core_parts[0].strip()
+
+        full_text = f"{server_name} {server_desc}"
+
+        # 提取CPU型号信息
+        if server_info["cpu"] == "N/A":
+            full_text_lower = text.lower(full_text)
+            keyword, pos = text.find_keyword(full_text, CPU_TEXT_KEYWORDS)
+            if keyword is not None:
+                cpu_text = full_text_lower[max(0, pos - 5):min(len(full_text_lower), pos + 25)]
+                cpu_text = ' '.join(RE_CPU_TEXT_CLEAN.sub(' ', cpu_text).split())
+                if cpu_text:
+                    server_info["cpu"] = cpu_text
+                    log("INFO", f"从文本中提取CPU关键字: {cpu_text} 给 {plan_code}")
+
+        # 提取内存信息
+        if server_info["memory"] == "N/A":
+            for pattern in MEMORY_TEXT_PATTERNS:
+                match = pattern.search(full_text)
+                if match:
+                    server_info["memory"] = f"{match.group(1)} GB"
+                    log("INFO", f"从文本中提取内存: {server_info['memory']} 给 {plan_code}")
+                    break
+
+        # 提取存储信息
+        if server_info["storage"] == "N/A":
+            for pattern in STORAGE_TEXT_PATTERNS:
+                match = pattern.search(full_text)
+                if match:
+                    if match.lastindex == 3:
+                        count, size, disk_type = match.group(1), match.group(2), match.group(3).upper()
+                        server_info["storage"] = f"{count}x {size}GB {disk_type}"
+                    elif match.lastindex == 2:
+                        size, disk_type = match.group(1), match.group(2).upper()
+                        server_info["storage"] = f"{size} {disk_type}"
+                    log("INFO", f"从文本中提取存储: {server_info['storage']} 给 {plan_code}")
+                    break
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} 服务器名称时出错: {str(e)}")
+        log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+
+def _apply_product_configurations(plan, plan_code, server_info, log):
+    """解析方法 3: 从product.configurations中提取信息"""
+    try:
+        if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("configurations"):
+            configs = plan.get("product").get("configurations")
+            if not isinstance(configs, list):
+                log("WARNING", f"产品配置不是列表类型: {configs}")
+                configs = []
+
+            for product_config in configs:
+                if not isinstance(product_config, dict):
+                    log("WARNING", f"产品配置项不是字典类型: {product_config}")
+                    continue
+
+                config_name = product_config.get("name", "").lower()
+                value = product_config.get("value")
+                if not value:
+                    continue
+
+                if _contains_any(config_name, CPU_TERMS):
+                    server_info["cpu"] = value
+                    log("INFO", f"从产品配置提取CPU: {value} 给 {plan_code}")
+                elif _contains_any(config_name, MEMORY_TERMS):
+                    server_info["memory"] = value
+                    log("INFO", f"从产品配置提取内存: {value} 给 {plan_code}")
+                elif _contains_any(config_name, STORAGE_TERMS):
+                    server_info["storage"] = value
+                    log("INFO", f"从产品配置提取存储: {value} 给 {plan_code}")
+                elif "bandwidth" in config_name:
+                    server_info["bandwidth"] = value
+                    log("INFO", f"从产品配置提取带宽: {value} 给 {plan_code}")
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} 产品配置时出错: {str(e)}")
+        log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+
+def _apply_description(plan, plan_code, server_info, log):
+    """解析方法 4: 按逗号拆分description提取信息"""
+    try:
+        description = plan.get("description", "")
+        if description:
+            for part in description.split(","):
+                part = part.strip().lower()
+
+                if server_info["cpu"] == "N/A" and _contains_any(part, DESC_CPU_TERMS):
+                    server_info["cpu"] = part
+                    log("INFO", f"从描述提取CPU: {part} 给 {plan_code}")
+
+                if server_info["memory"] == "N/A" and _contains_any(part, DESC_MEMORY_TERMS):
+                    server_info["memory"] = part
+                    log("INFO", f"从描述提取内存: {part} 给 {plan_code}")
+
+                if server_info["storage"] == "N/A" and _contains_any(part, DESC_STORAGE_TERMS):
+                    server_info["storage"] = part
+                    log("INFO", f"从描述提取存储: {part} 给 {plan_code}")
+
+                if server_info["bandwidth"] == "N/A" and "bandwidth" in part:
+                    server_info["bandwidth"] = part
+                    log("INFO", f"从描述提取带宽: {part} 给 {plan_code}")
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} 描述时出错: {str(e)}")
+
+
+def _apply_pricing_configurations(plan, plan_code, server_info, log):
+    """解析方法 5: 从pricing.configurations获取信息"""
+    try:
+        if plan.get("pricing") and isinstance(plan.get("pricing"), dict) and plan.get("pricing").get("configurations"):
+            pricing_configs = plan.get("pricing").get("configurations")
+            if not isinstance(pricing_configs, list):
+                log("WARNING", f"价格配置不是列表类型: {pricing_configs}")
+                pricing_configs = []
+
+            for price_config in pricing_configs:
+                if not isinstance(price_config, dict):
+                    log("WARNING", f"价格配置项不是字典类型: {price_config}")
+                    continue
+
+                config_name = price_config.get("name", "").lower()
+                value = price_config.get("value")
+                if not value:
+                    continue
+
+                if "processor" in config_name and server_info["cpu"] == "N/A":
+                    server_info["cpu"] = value
+                    log("INFO", f"从pricing配置提取CPU: {value} 给 {plan_code}")
+                elif "memory" in config_name and server_info["memory"] == "N/A":
+                    server_info["memory"] = value
+                    log("INFO", f"从pricing配置提取内存: {value} 给 {plan_code}")
+                elif "storage" in config_name and server_info["storage"] == "N/A":
+                    server_info["storage"] = value
+                    log("INFO", f"从pricing配置提取存储: {value} 给 {plan_code}")
+    except Exception as e:
+        log("WARNING", f"解析 {plan_code} pricing配置时出错: {str(e)}")
+        log("WARNING", f"错误详情: {traceback.format_exc()}")
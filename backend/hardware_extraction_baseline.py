@@ -0,0 +1,806 @@
+"""
+硬件信息提取原实现（仅供基准测试对比）
+拆分为 hardware_extraction 规则表之前 load_server_list 中逐个型号的内联解析代码，
+benchmark_hardware_extraction.py 对同一份目录原始响应分别运行两种实现并对比结果，
+确认新实现与原实现的解析结果一致；应用本身不使用本模块
+"""
+
+import json
+import re
+import traceback
+
+
+def _noop_log(level, message, source="system"):
+    pass
+
+
+class _NoCapture:
+    """不采集调试数据"""
+
+    def capture(self, plan_code, name, payload):
+        pass
+
+    def should_capture(self, plan_code):
+        return False
+
+
+def parse_plan_baseline(plan, datacenters, log=None, capture=None):
+    """
+    原实现：解析单个目录型号的硬件信息和可选配置（参数和返回值同 hardware_extraction.parse_plan）
+
+    Args:
+        plan: 目录中的原始型号数据
+        datacenters: 已补全名称和区域的数据中心列表
+        log: 日志函数（签名同 add_log），None表示不记录
+        capture: 调试数据采集（DebugCaptureSink），None表示不采集
+
+    Returns:
+        dict: 服务器信息
+    """
+    add_log = log or _noop_log
+    capture = capture or _NoCapture()
+    plan_code = plan.get("planCode")
+
+    # Extract server details
+    default_options = []
+    available_options = []
+
+    # 创建初始服务器信息对象 - 确保在解析特定字段前就已创建
+    server_info = {
+        "planCode": plan_code,
+        "name": plan.get("invoiceName", ""),
+        "description": plan.get("description", ""),
+        "cpu": "N/A",
+        "memory": "N/A",
+        "storage": "N/A",
+        "bandwidth": "N/A",
+        "vrackBandwidth": "N/A",
+        "datacenters": datacenters,
+        "defaultOptions": default_options,
+        "availableOptions": available_options
+    }
+
+    # 保存服务器详细数据，以便于调试（异步采集，相同内容只保存一份）
+    capture.capture(plan_code, "plan_data", plan)
+    if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
+        capture.capture(plan_code, "addonFamilies", plan.get("addonFamilies"))
+
+    # 处理特殊系列处理逻辑
+    special_server_processed = False
+    try:
+        # 检查是否为SYSLE系列服务器
+        if "sysle" in plan_code.lower():
+            add_log("INFO", f"检测到SYSLE系列服务器: {plan_code}")
+
+            # 尝试从plan_code提取信息
+            # 通常SYSLE的格式为"25sysle021"，可能包含CPU型号或配置信息
+            # 根据不同型号添加更具体的CPU信息
+            if "011" in plan_code:
+                server_info["cpu"] = "SYSLE 011系列 (入门级服务器CPU)"
+            elif "021" in plan_code:
+                server_info["cpu"] = "SYSLE 021系列 (中端服务器CPU)"
+            elif "031" in plan_code:
+                server_info["cpu"] = "SYSLE 031系列 (高端服务器CPU)"
+            else:
+                server_info["cpu"] = "SYSLE系列CPU"
+
+            # 获取服务器显示名称和描述，可能包含CPU信息
+            display_name = plan.get("displayName", "")
+            invoice_name = plan.get("invoiceName", "")
+            description = plan.get("description", "")
+
+            # 检查名称中是否包含具体CPU型号信息
+            found_cpu = False
+            for name in [display_name, invoice_name, description]:
+                if not name:
+                    continue
+
+                # 查找CPU型号关键词
+                cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"]
+                for keyword in cpu_keywords:
+                    if keyword.lower() in name.lower():
+                        # 提取包含CPU型号的部分
+                        start_pos = name.lower().find(keyword.lower())
+                        end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
+                        cpu_info = name[start_pos:end_pos].split(",")[0].strip()
+                        server_info["cpu"] = cpu_info
+                        add_log("INFO", f"从关键词中提取SYSLE CPU型号: {cpu_info} 给 {plan_code}")
+                        found_cpu = True
+                        break
+
+                if found_cpu:
+                    break
+
+            # 尝试寻找更具体的信息
+            # 原始数据已通过调试采集保存（plan_data）
+
+            special_server_processed = True
+
+        # 检查是否为SK系列服务器
+        elif "sk" in plan_code.lower():
+            add_log("INFO", f"检测到SK系列服务器: {plan_code}")
+
+            # 获取服务器显示名称和描述，可能包含CPU信息
+            display_name = plan.get("displayName", "")
+            invoice_name = plan.get("invoiceName", "")
+            description = plan.get("description", "")
+
+            # 检查名称中是否包含具体CPU型号信息
+            found_cpu = False
+            for name in [display_name, invoice_name, description]:
+                if not name:
+                    continue
+
+                # 查找典型的CPU信息格式，例如"KS-A | Intel i7-6700k"
+                if "|" in name:
+                    parts = name.split("|")
+                    if len(parts) > 1:
+                        cpu_part = parts[1].strip()
+                        if "intel" in cpu_part.lower() or "amd" in cpu_part.lower() or "xeon" in cpu_part.lower() or "i7" in cpu_part.lower():
+                            server_info["cpu"] = cpu_part
+                            add_log("INFO", f"从名称中提取CPU型号: {cpu_part} 给 {plan_code}")
+                            found_cpu = True
+
+                # 直接查找CPU型号关键词
+                cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"]
+                for keyword in cpu_keywords:
+                    if keyword.lower() in name.lower():
+                        # 提取包含CPU型号的部分
+                        start_pos = name.lower().find(keyword.lower())
+                        end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
+                        cpu_info = name[start_pos:end_pos].split(",")[0].strip()
+                        server_info["cpu"] = cpu_info
+                        add_log("INFO", f"从关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
+                        found_cpu = True
+                        break
+
+                if found_cpu:
+                    break
+
+            # 如果没有找到详细的CPU型号，使用默认值
+            if not found_cpu:
+                server_info["cpu"] = "SK系列专用CPU"
+
+            # 尝试寻找更具体的信息
+            # 原始数据已通过调试采集保存（plan_data）
+
+            special_server_processed = True
+
+        # 添加更多特殊系列处理...
+
+        # 确保所有服务器都有CPU信息
+        if server_info["cpu"] == "N/A":
+            add_log("INFO", f"服务器 {plan_code} 无法从API提取CPU信息，尝试从名称提取")
+
+            # 尝试从名称中提取CPU信息
+            display_name = plan.get("displayName", "")
+            invoice_name = plan.get("invoiceName", "")
+            description = plan.get("description", "")
+
+            found_cpu = False
+            for name in [display_name, invoice_name, description]:
+                if not name:
+                    continue
+
+                # 检查是否有CPU型号信息
+                cpu_keywords = ["i7-", "i9-", "i5-", "xeon", "epyc", "ryzen", "processor", "cpu"]
+                for keyword in cpu_keywords:
+                    if keyword.lower() in name.lower():
+                        # 提取包含CPU型号的部分
+                        start_pos = name.lower().find(keyword.lower())
+                        end_pos = min(start_pos + 30, len(name))  # 提取最多30个字符
+                        cpu_info = name[start_pos:end_pos].split(",")[0].strip()
+                        server_info["cpu"] = cpu_info
+                        add_log("INFO", f"从名称关键词中提取CPU型号: {cpu_info} 给 {plan_code}")
+                        found_cpu = True
+                        break
+
+                if found_cpu:
+                    break
+
+            # 如果仍然没有找到CPU信息，使用默认值
+            if not found_cpu:
+                if "sysle" in plan_code.lower():
+                    server_info["cpu"] = "SYSLE系列专用CPU"
+                elif "rise" in plan_code.lower():
+                    server_info["cpu"] = "RISE系列专用CPU"
+                elif "game" in plan_code.lower():
+                    server_info["cpu"] = "GAME系列专用CPU"
+                else:
+                    server_info["cpu"] = "专用服务器CPU"
+    except Exception as e:
+        add_log("WARNING", f"处理特殊系列服务器时出错: {str(e)}")
+        add_log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+        # 出错时也确保有默认CPU信息
+        if server_info["cpu"] == "N/A":
+            server_info["cpu"] = "专用服务器CPU"
+
+    # 如果是特殊处理的服务器，记录日志
+    if special_server_processed:
+        add_log("INFO", f"已对服务器 {plan_code} 应用特殊处理逻辑")
+
+    # 获取服务器名称和描述，确保它们不为空
+    if not server_info["name"] and plan.get("displayName"):
+        server_info["name"] = plan.get("displayName")
+
+    if not server_info["description"] and plan.get("displayName"):
+        server_info["description"] = plan.get("displayName")
+
+    # 尝试从服务器名称标签中提取CPU信息
+    # 例如"KS-A | Intel i7-6700k"格式
+    if server_info["cpu"] == "N/A" or "系列" in server_info["cpu"]:
+        try:
+            display_name = plan.get("displayName", "")
+            invoice_name = plan.get("invoiceName", "")
+
+            for name in [display_name, invoice_name]:
+                if not name or "|" not in name:
+                    continue
+
+                parts = name.split("|")
+                if len(parts) > 1:
+                    cpu_part = parts[1].strip()
+                    if "intel" in cpu_part.lower() or "amd" in cpu_part.lower() or "xeon" in cpu_part.lower() or "i7" in cpu_part.lower():
+                        server_info["cpu"] = cpu_part
+                        add_log("INFO", f"从服务器名称标签中提取CPU: {cpu_part} 给 {plan_code}")
+                        break
+        except Exception as e:
+            add_log("WARNING", f"从名称提取CPU时出错: {str(e)}")
+
+    # 获取推荐配置和可选配置 - 使用多种方法处理不同格式
+    try:
+        # 方法 1: 检查plan.default.options
+        if plan.get("default") and isinstance(plan.get("default"), dict) and plan.get("default").get("options"):
+            for default_opt in plan.get("default").get("options"):
+                if isinstance(default_opt, dict):
+                    option_code = default_opt.get("planCode")
+                    option_name = default_opt.get("description", option_code)
+
+                    if option_code:
+                        default_options.append({
+                            "label": option_name,
+                            "value": option_code
+                        })
+
+        # 方法 2: 检查plan.addons
+        if plan.get("addons") and isinstance(plan.get("addons"), list):
+            for addon in plan.get("addons"):
+                if not isinstance(addon, dict):
+                    continue
+
+                addon_plan_code = addon.get("planCode")
+                if not addon_plan_code:
+                    continue
+
+                # 跳过已经在默认选项中的配置
+                if any(opt["value"] == addon_plan_code for opt in default_options):
+                    continue
+
+                # 添加到可选配置列表
+                available_options.append({
+                    "label": addon.get("description", addon_plan_code),
+                    "value": addon_plan_code
+                })
+
+        # 方法 3: 检查plan.product.options
+        if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("options"):
+            product_options = plan.get("product").get("options")
+            if isinstance(product_options, list):
+                for product_opt in product_options:
+                    if not isinstance(product_opt, dict):
+                        continue
+
+                    option_code = product_opt.get("planCode")
+                    option_name = product_opt.get("description", option_code)
+
+                    if option_code and not any(opt["value"] == option_code for opt in available_options) and not any(opt["value"] == option_code for opt in default_options):
+                        available_options.append({
+                            "label": option_name,
+                            "value": option_code
+                        })
+
+        # 方法 4: 尝试从plan.addonFamilies中提取硬件信息
+        printed_example = False
+        try:
+            if plan.get("addonFamilies") and isinstance(plan.get("addonFamilies"), list):
+                # 完整的addonFamilies数据已通过调试采集保存
+
+                # 打印一个完整的addonFamilies示例用于调试
+                if len(plan.get("addonFamilies")) > 0 and not printed_example:
+                    try:
+                        add_log("INFO", f"addonFamilies示例: {json.dumps(plan.get('addonFamilies')[0], indent=2)}")
+                        printed_example = True
+                    except Exception as e:
+                        add_log("WARNING", f"无法序列化addonFamilies示例: {str(e)}")
+
+                # 尝试保存所有带宽相关的选项用于调试
+                if capture.should_capture(plan_code):
+                    try:
+                        bandwidth_options = []
+                        for family in plan.get("addonFamilies"):
+                            family_name = family.get("name", "").lower()
+                            if ("bandwidth" in family_name or "traffic" in family_name or "network" in family_name):
+                                bandwidth_options.append({
+                                    "family": family.get("name"),
+                                    "default": family.get("default"),
+                                    "addons": family.get("addons")
+                                })
+
+                        if bandwidth_options:
+                            capture.capture(plan_code, "bandwidth_options", bandwidth_options)
+                    except Exception as e:
+                        add_log("WARNING", f"保存带宽选项时出错: {str(e)}")
+
+                # 重置可选配置列表
+                temp_available_options = []
+
+                # 提取addonFamilies信息
+                for family in plan.get("addonFamilies"):
+                    if not isinstance(family, dict):
+                        add_log("WARNING", f"addonFamily不是字典类型: {family}")
+                        continue
+
+                    family_name = family.get("name", "").lower()  # 注意: 在API响应中是'name'而不是'family'
+                    default_addon = family.get("default")  # 获取默认选项
+
+                    # 提取可选配置
+                    if family.get("addons") and isinstance(family.get("addons"), list):
+                        for addon_code in family.get("addons"):
+                            # 在API响应中，addons是字符串数组而不是对象数组
+                            if not isinstance(addon_code, str):
+                                continue
+
+                            # 标记是否为默认选项
+                            is_default = (addon_code == default_addon)
+
+                            # 从addon_code解析描述信息
+                            addon_desc = addon_code
+
+                            # 过滤掉许可证相关选项
+                            if (
+                                # Windows许可证
+                                "windows-server" in addon_code.lower() or
+                                # SQL Server许可证
+                                "sql-server" in addon_code.lower() or
+                                # cPanel许可证
+                                "cpanel-license" in addon_code.lower() or
+                                # Plesk许可证
+                                "plesk-" in addon_code.lower() or
+                                # 其他常见许可证
+                                "-license-" in addon_code.lower() or
+                                # 操作系统选项
+                                addon_code.lower().startswith("os-") or
+                                # 控制面板
+                                "control-panel" in addon_code.lower() or
+                                "panel" in addon_code.lower()
+                            ):
+                                # 跳过许可证类选项
+                                continue
+
+                            if addon_code:
+                                temp_available_options.append({
+                                    "label": addon_desc,
+                                    "value": addon_code,
+                                    "family": family_name,
+                                    "isDefault": is_default
+                                })
+
+                                # 如果是默认选项，添加到默认选项列表
+                                if is_default:
+                                    default_options.append({
+                                        "label": addon_desc,
+                                        "value": addon_code
+                                    })
+
+                    # 根据family名称设置对应的硬件信息
+                    if family_name and family.get("addons") and isinstance(family.get("addons"), list):
+                        # 获取默认选项的值
+                        default_value = family.get("default")
+
+                        # CPU信息
+                        if ("cpu" in family_name or "processor" in family_name) and server_info["cpu"] == "N/A":
+                            if default_value:
+                                server_info["cpu"] = default_value
+                                add_log("INFO", f"从addonFamilies默认选项提取CPU: {default_value} 给 {plan_code}")
+
+                                # 尝试从CPU选项中提取更详细信息
+                                try:
+                                    # 记录CPU选项的完整列表，方便调试
+                                    if family.get("addons") and isinstance(family.get("addons"), list):
+                                        cpu_options = []
+                                        for cpu_addon in family.get("addons"):
+                                            if isinstance(cpu_addon, str):
+                                                cpu_options.append(cpu_addon)
+
+                                        if cpu_options:
+                                            add_log("INFO", f"服务器 {plan_code} 的CPU选项: {', '.join(cpu_options)}")
+
+                                            # 保存以便更详细分析
+                                            capture.capture(plan_code, "cpu_options", {"options": cpu_options, "default": default_value})
+                                except Exception as e:
+                                    add_log("WARNING", f"解析CPU选项时出错: {str(e)}")
+
+                        # 内存信息
+                        elif ("memory" in family_name or "ram" in family_name) and server_info["memory"] == "N/A":
+                            if default_value:
+                                # 尝试提取内存大小
+                                ram_size = ""
+                                ram_match = re.search(r'ram-(\d+)g', default_value, re.IGNORECASE)
+                                if ram_match:
+                                    ram_size = f"{ram_match.group(1)} GB"
+                                    server_info["memory"] = ram_size
+                                    add_log("INFO", f"从addonFamilies默认选项提取内存: {ram_size} 给 {plan_code}")
+                                else:
+                                    server_info["memory"] = default_value
+                                    add_log("INFO", f"从addonFamilies默认选项提取内存(原始值): {default_value} 给 {plan_code}")
+
+                        # 存储信息
+                        elif ("storage" in family_name or "disk" in family_name or "drive" in family_name or "ssd" in family_name or "hdd" in family_name) and server_info["storage"] == "N/A":
+                            if default_value:
+                                # 尝试匹配混合RAID格式
+                                hybrid_storage_match = re.search(r'hybridsoftraid-(\d+)x(\d+)(sa|ssd|hdd)-(\d+)x(\d+)(nvme|ssd|hdd)', default_value, re.IGNORECASE)
+                                if hybrid_storage_match:
+                                    count1 = hybrid_storage_match.group(1)
+                                    size1 = hybrid_storage_match.group(2)
+                                    type1 = hybrid_storage_match.group(3).upper()
+                                    count2 = hybrid_storage_match.group(4)
+                                    size2 = hybrid_storage_match.group(5)
+                                    type2 = hybrid_storage_match.group(6).upper()
+                                    server_info["storage"] = f"混合RAID {count1}x {size1}GB {type1} + {count2}x {size2}GB {type2}"
+                                    add_log("INFO", f"从addonFamilies默认选项提取混合存储: {server_info['storage']} 给 {plan_code}")
+                                else:
+                                    # 尝试从存储代码中提取信息
+                                    storage_match = re.search(r'(raid|softraid)-(\d+)x(\d+)(ssd|hdd|nvme|sa)', default_value, re.IGNORECASE)
+                                    if storage_match:
+                                        raid_type = storage_match.group(1).upper()
+                                        count = storage_match.group(2)
+                                        size = storage_match.group(3)
+                                        type_str = storage_match.group(4).upper()
+                                        server_info["storage"] = f"{raid_type} {count}x {size}GB {type_str}"
+                                        add_log("INFO", f"从addonFamilies默认选项提取存储: {server_info['storage']} 给 {plan_code}")
+                                    else:
+                                        server_info["storage"] = default_value
+                                        add_log("INFO", f"从addonFamilies默认选项提取存储(原始值): {default_value} 给 {plan_code}")
+
+                        # 带宽信息
+                        elif ("bandwidth" in family_name or "traffic" in family_name or "network" in family_name) and server_info["bandwidth"] == "N/A":
+                            if default_value:
+                                add_log("DEBUG", f"处理带宽选项: {default_value}")
+
+                                # 格式1: traffic-5tb-100-24sk-apac (带宽限制和流量限制)
+                                traffic_bw_match = re.search(r'traffic-(\d+)(tb|gb|mb)-(\d+)', default_value, re.IGNORECASE)
+                                if traffic_bw_match:
+                                    size = traffic_bw_match.group(1)
+                                    unit = traffic_bw_match.group(2).upper()
+                                    bw_value = traffic_bw_match.group(3)
+                                    server_info["bandwidth"] = f"{bw_value} Mbps / {size} {unit}流量"
+                                    add_log("INFO", f"从addonFamilies默认选项提取带宽和流量: {server_info['bandwidth']} 给 {plan_code}")
+
+                                # 格式2: traffic-5tb (仅流量限制)
+                                elif re.search(r'traffic-(\d+)(tb|gb|mb)$', default_value, re.IGNORECASE):
+                                    simple_traffic_match = re.search(r'traffic-(\d+)(tb|gb|mb)', default_value, re.IGNORECASE)
+                                    size = simple_traffic_match.group(1)
+                                    unit = simple_traffic_match.group(2).upper()
+                                    server_info["bandwidth"] = f"{size} {unit}流量"
+                                    add_log("INFO", f"从addonFamilies默认选项提取流量: {server_info['bandwidth']} 给 {plan_code}")
+
+                                # 格式3: bandwidth-100 (仅带宽限制)
+                                elif re.search(r'bandwidth-(\d+)', default_value, re.IGNORECASE):
+                                    bandwidth_match = re.search(r'bandwidth-(\d+)', default_value, re.IGNORECASE)
+                                    bw_value = int(bandwidth_match.group(1))
+                                    if bw_value >= 1000:
+                                        server_info["bandwidth"] = f"{bw_value/1000:.1f} Gbps".replace(".0 ", " ")
+                                    else:
+                                        server_info["bandwidth"] = f"{bw_value} Mbps"
+                                    add_log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
+
+                                # 格式4: traffic-unlimited (无限流量)
+                                elif "traffic-unlimited" in default_value.lower() or "unlimited" in default_value.lower():
+                                    # 检查是否有带宽限制
+                                    bw_match = re.search(r'(\d+)', default_value)
+                                    if bw_match:
+                                        bw_value = int(bw_match.group(1))
+                                        server_info["bandwidth"] = f"{bw_value} Mbps / 无限流量"
+                                    else:
+                                        server_info["bandwidth"] = "无限流量"
+                                    add_log("INFO", f"从addonFamilies默认选项提取带宽: {server_info['bandwidth']} 给 {plan_code}")
+
+                                # 格式5: bandwidth-guarantee (保证带宽)
+                                elif "guarantee" in default_value.lower() or "guaranteed" in default_value.lower():
+                                    bw_guarantee_match = re.search(r'(\d+)', default_value)
+                                    if bw_guarantee_match:
+                                        bw_value = int(bw_guarantee_match.group(1))
+                                        server_info["bandwidth"] = f"{bw_value} Mbps (保证带宽)"
+                                        add_log("INFO", f"从addonFamilies默认选项提取保证带宽: {server_info['bandwidth']} 给 {plan_code}")
+                                    else:
+                                        server_info["bandwidth"] = "保证带宽"
+                                        add_log("INFO", f"从addonFamilies默认选项提取保证带宽(无具体值) 给 {plan_code}")
+
+                                # 格式6: vrack-bandwidth (内部网络带宽)
+                                elif "vrack" in default_value.lower():
+                                    vrack_bw_match = re.search(r'vrack-bandwidth-(\d+)', default_value, re.IGNORECASE)
+                                    if vrack_bw_match:
+                                        bw_value = int(vrack_bw_match.group(1))
+                                        if bw_value >= 1000:
+                                            server_info["vrackBandwidth"] = f"{bw_value/1000:.1f} Gbps".replace(".0 ", " ")
+                                        else:
+                                            server_info["vrackBandwidth"] = f"{bw_value} Mbps"
+                                        add_log("INFO", f"从addonFamilies默认选项提取内部网络带宽: {server_info['vrackBandwidth']} 给 {plan_code}")
+
+                                # 无法识别的格式，使用原始值
+                                else:
+                                    server_info["bandwidth"] = default_value
+                                    add_log("INFO", f"从addonFamilies默认选项提取带宽(原始值): {default_value} 给 {plan_code}")
+
+                # 将处理好的可选配置添加到服务器信息中
+                if temp_available_options:
+                    available_options = temp_available_options
+
+        except Exception as e:
+            add_log("ERROR", f"解析addonFamilies时出错: {str(e)}")
+            add_log("ERROR", f"错误详情: {traceback.format_exc()}")
+
+        # 方法 5: 检查plan.pricings中的配置项
+        if plan.get("pricings") and isinstance(plan.get("pricings"), dict):
+            for pricing_key, pricing_value in plan.get("pricings").items():
+                if isinstance(pricing_value, dict) and pricing_value.get("options"):
+                    for option_code, option_details in pricing_value.get("options").items():
+                        # 跳过已经在其他列表中的项目
+                        if any(opt["value"] == option_code for opt in default_options) or any(opt["value"] == option_code for opt in available_options):
+                            continue
+
+                        option_label = option_code
+                        if isinstance(option_details, dict) and option_details.get("description"):
+                            option_label = option_details.get("description")
+
+                        available_options.append({
+                            "label": option_label,
+                            "value": option_code
+                        })
+
+        # 记录找到的选项数量
+        add_log("INFO", f"找到 {len(default_options)} 个默认选项和 {len(available_options)} 个可选配置用于 {plan_code}")
+
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} 选项时出错: {str(e)}")
+
+    # 解析方法 1: 尝试从properties中提取硬件详情
+    try:
+        if plan.get("details") and plan.get("details").get("properties"):
+            for prop in plan.get("details").get("properties"):
+                # 添加类型检查，确保prop是字典类型
+                if not isinstance(prop, dict):
+                    add_log("WARNING", f"属性项不是字典类型: {prop}")
+                    continue
+
+                prop_name = prop.get("name", "").lower()
+                value = prop.get("value", "N/A")
+
+                if value and value != "N/A":
+                    if any(cpu_term in prop_name for cpu_term in ["cpu", "processor"]):
+                        server_info["cpu"] = value
+                        add_log("INFO", f"从properties提取CPU: {value} 给 {plan_code}")
+                    elif any(mem_term in prop_name for mem_term in ["memory", "ram"]):
+                        server_info["memory"] = value
+                        add_log("INFO", f"从properties提取内存: {value} 给 {plan_code}")
+                    elif any(storage_term in prop_name for storage_term in ["storage", "disk", "hdd", "ssd"]):
+                        server_info["storage"] = value
+                        add_log("INFO", f"从properties提取存储: {value} 给 {plan_code}")
+                    elif "bandwidth" in prop_name:
+                        if any(private_term in prop_name for private_term in ["vrack", "private", "internal"]):
+                            server_info["vrackBandwidth"] = value
+                            add_log("INFO", f"从properties提取vRack带宽: {value} 给 {plan_code}")
+                        else:
+                            server_info["bandwidth"] = value
+                            add_log("INFO", f"从properties提取带宽: {value} 给 {plan_code}")
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} 属性时出错: {str(e)}")
+
+    # 解析方法 2: 尝试从名称中提取信息
+    try:
+        server_name = server_info["name"]
+        server_desc = server_info["description"] if server_info["description"] else ""
+
+        # 保存原始数据用于调试
+        capture.capture(plan_code, "server_details", {
+            "name": server_name,
+            "description": server_desc,
+            "planCode": plan_code
+        })
+
+        # 检查是否为KS/RISE系列服务器，它们通常使用 "KS-XX | CPU信息" 格式
+        if "|" in server_name:
+            parts = server_name.split("|")
+            if len(parts) > 1 and server_info["cpu"] == "N/A":
+                cpu_part = parts[1].strip()
+                server_info["cpu"] = cpu_part
+                add_log("INFO", f"从服务器名称提取CPU: {cpu_part} 给 {plan_code}")
+
+                # 尝试从CPU部分提取更多信息
+                if "core" in cpu_part.lower():
+                    # 例如: "4 Core, 8 Thread, xxxx"
+                    core_parts = cpu_part.split(",")
+                    if len(core_parts) > 1:
+                        server_info["cpu"] = core_parts[0].strip()
+
+        # 提取CPU型号信息
+        if server_info["cpu"] == "N/A":
+            # 尝试匹配常见的CPU关键词
+            cpu_keywords = ["i7-", "i9-", "ryzen", "xeon", "epyc", "cpu", "intel", "amd", "processor"]
+            full_text = f"{server_name} {server_desc}".lower()
+
+            for keyword in cpu_keywords:
+                if keyword in full_text.lower():
+                    # 找到关键词的位置
+                    pos = full_text.lower().find(keyword)
+                    if pos >= 0:
+                        # 提取关键词周围的文本
+                        start = max(0, pos - 5)
+                        end = min(len(full_text), pos + 25)
+                        cpu_text = full_text[start:end]
+
+                        # 尝试清理提取的文本
+                        cpu_text = re.sub(r'[^\w\s\-,.]', ' ', cpu_text)
+                        cpu_text = ' '.join(cpu_text.split())
+
+                        if cpu_text:
+                            server_info["cpu"] = cpu_text
+                            add_log("INFO", f"从文本中提取CPU关键字: {cpu_text} 给 {plan_code}")
+                            break
+
+        # 从服务器名称中提取内存信息
+        if server_info["memory"] == "N/A":
+            # 寻找内存关键词
+            mem_match = None
+            mem_patterns = [
+                r'(\d+)\s*GB\s*RAM', 
+                r'RAM\s*(\d+)\s*GB',
+                r'(\d+)\s*G\s*RAM',
+                r'RAM\s*(\d+)\s*G',
+                r'(\d+)\s*GB'
+            ]
+
+            full_text = f"{server_name} {server_desc}"
+            for pattern in mem_patterns:
+                match = re.search(pattern, full_text, re.IGNORECASE)
+                if match:
+                    mem_match = match
+                    break
+
+            if mem_match:
+                memory_size = mem_match.group(1)
+                server_info["memory"] = f"{memory_size} GB"
+                add_log("INFO", f"从文本中提取内存: {server_info['memory']} 给 {plan_code}")
+
+        # 从服务器名称中提取存储信息
+        if server_info["storage"] == "N/A":
+            # 寻找存储关键词
+            storage_patterns = [
+                r'(\d+)\s*[xX]\s*(\d+)\s*GB\s*(SSD|HDD|NVMe)',
+                r'(\d+)\s*(SSD|HDD|NVMe)\s*(\d+)\s*GB',
+                r'(\d+)\s*TB\s*(SSD|HDD|NVMe)',
+                r'(\d+)\s*(SSD|HDD|NVMe)'
+            ]
+
+            full_text = f"{server_name} {server_desc}"
+            for pattern in storage_patterns:
+                match = re.search(pattern, full_text, re.IGNORECASE)
+                if match:
+                    if match.lastindex == 3:  # 匹配了第一种模式
+                        count = match.group(1)
+                        size = match.group(2)
+                        disk_type = match.group(3).upper()
+                        server_info["storage"] = f"{count}x {size}GB {disk_type}"
+                    elif match.lastindex == 2:  # 匹配了最后一种模式
+                        size = match.group(1)
+                        disk_type = match.group(2).upper()
+                        server_info["storage"] = f"{size} {disk_type}"
+
+                    add_log("INFO", f"从文本中提取存储: {server_info['storage']} 给 {plan_code}")
+                    break
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} 服务器名称时出错: {str(e)}")
+        add_log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+    # 解析方法 3: 尝试从产品配置中提取信息
+    try:
+        if plan.get("product") and isinstance(plan.get("product"), dict) and plan.get("product").get("configurations"):
+            configs = plan.get("product").get("configurations")
+            if not isinstance(configs, list):
+                add_log("WARNING", f"产品配置不是列表类型: {configs}")
+                configs = []
+
+            for config in configs:
+                # 添加类型检查，确保config是字典类型
+                if not isinstance(config, dict):
+                    add_log("WARNING", f"产品配置项不是字典类型: {config}")
+                    continue
+
+                config_name = config.get("name", "").lower()
+                value = config.get("value")
+
+                if value:
+                    if any(cpu_term in config_name for cpu_term in ["cpu", "processor"]):
+                        server_info["cpu"] = value
+                        add_log("INFO", f"从产品配置提取CPU: {value} 给 {plan_code}")
+                    elif any(mem_term in config_name for mem_term in ["memory", "ram"]):
+                        server_info["memory"] = value
+                        add_log("INFO", f"从产品配置提取内存: {value} 给 {plan_code}")
+                    elif any(storage_term in config_name for storage_term in ["storage", "disk", "hdd", "ssd"]):
+                        server_info["storage"] = value
+                        add_log("INFO", f"从产品配置提取存储: {value} 给 {plan_code}")
+                    elif "bandwidth" in config_name:
+                        server_info["bandwidth"] = value
+                        add_log("INFO", f"从产品配置提取带宽: {value} 给 {plan_code}")
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} 产品配置时出错: {str(e)}")
+        add_log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+    # 解析方法 4: 尝试从description解析信息
+    try:
+        description = plan.get("description", "")
+        if description:
+            parts = description.split(",")
+            for part in parts:
+                part = part.strip().lower()
+
+                # 检查每个部分是否包含硬件信息
+                if server_info["cpu"] == "N/A" and any(cpu_term in part for cpu_term in ["cpu", "core", "i7", "i9", "xeon", "epyc", "ryzen"]):
+                    server_info["cpu"] = part
+                    add_log("INFO", f"从描述提取CPU: {part} 给 {plan_code}")
+
+                if server_info["memory"] == "N/A" and any(mem_term in part for mem_term in ["ram", "gb", "memory"]):
+                    server_info["memory"] = part
+                    add_log("INFO", f"从描述提取内存: {part} 给 {plan_code}")
+
+                if server_info["storage"] == "N/A" and any(storage_term in part for storage_term in ["hdd", "ssd", "nvme", "storage", "disk"]):
+                    server_info["storage"] = part
+                    add_log("INFO", f"从描述提取存储: {part} 给 {plan_code}")
+
+                if server_info["bandwidth"] == "N/A" and "bandwidth" in part:
+                    server_info["bandwidth"] = part
+                    add_log("INFO", f"从描述提取带宽: {part} 给 {plan_code}")
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} 描述时出错: {str(e)}")
+
+    # 解析方法 5: 从pricing获取信息
+    try:
+        if plan.get("pricing") and isinstance(plan.get("pricing"), dict) and plan.get("pricing").get("configurations"):
+            pricing_configs = plan.get("pricing").get("configurations")
+            if not isinstance(pricing_configs, list):
+                add_log("WARNING", f"价格配置不是列表类型: {pricing_configs}")
+                pricing_configs = []
+
+            for price_config in pricing_configs:
+                # 添加类型检查，确保price_config是字典类型
+                if not isinstance(price_config, dict):
+                    add_log("WARNING", f"价格配置项不是字典类型: {price_config}")
+                    continue
+
+                config_name = price_config.get("name", "").lower()
+                value = price_config.get("value")
+
+                if value:
+                    if "processor" in config_name and server_info["cpu"] == "N/A":
+                        server_info["cpu"] = value
+                        add_log("INFO", f"从pricing配置提取CPU: {value} 给 {plan_code}")
+                    elif "memory" in config_name and server_info["memory"] == "N/A":
+                        server_info["memory"] = value
+                        add_log("INFO", f"从pricing配置提取内存: {value} 给 {plan_code}")
+                    elif "storage" in config_name and server_info["storage"] == "N/A":
+                        server_info["storage"] = value
+                        add_log("INFO", f"从pricing配置提取存储: {value} 给 {plan_code}")
+    except Exception as e:
+        add_log("WARNING", f"解析 {plan_code} pricing配置时出错: {str(e)}")
+        add_log("WARNING", f"错误详情: {traceback.format_exc()}")
+
+    # 清理提取的数据以确保格式一致
+    # 对于CPU，添加一些基本信息如果只有核心数
+    if server_info["cpu"] != "N/A" and server_info["cpu"].isdigit():
+        server_info["cpu"] = f"{server_info['cpu']} 核心"
+
+    # 更新服务器信息中的配置选项
+    server_info["defaultOptions"] = default_options
+    server_info["availableOptions"] = available_options
+    return server_info
@@ -0,0 +1,193 @@
+"""
+监控订阅自适应调度模块
+每个订阅按各自的间隔检查：间隔根据近期历史记录中的状态变化频率（波动度）和用户设置的优先级分配，
+所有订阅的检查总量受每分钟请求预算限制，剩余预算按权重分给最活跃的型号
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+# 优先级权重
+PRIORITY_WEIGHTS = {"high": 4.0, "normal": 1.0, "low": 0.25}
+DEFAULT_PRIORITY = "normal"
+
+# 波动度统计窗口（秒）和半衰期（秒）
+VOLATILITY_WINDOW = 7 * 24 * 3600
+VOLATILITY_HALF_LIFE = 24 * 3600
+
+# 相对于基准检查间隔的上下限倍数：最活跃的型号最快为基准的1/4，最冷门的最慢为基准的10倍
+MIN_INTERVAL_RATIO = 0.25
+MAX_INTERVAL_RATIO = 10
+MIN_INTERVAL_FLOOR = 10
+
+
+def volatility_score(history, now=None):
+    """
+    根据历史记录计算波动度（近7天的状态变化次数，按1天半衰期衰减）
+
+    Args:
+        history: 订阅的历史记录列表（含 ISO 格式的 timestamp）
+        now: 当前时间戳
+
+    Returns:
+        float: 波动度
+    """
+    now = time.time() if now is None else now
+    score = 0.0
+    for entry in history or []:
+        try:
+            age = now - datetime.fromisoformat(entry["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= age <= VOLATILITY_WINDOW:
+            score += 0.5 ** (age / VOLATILITY_HALF_LIFE)
+    return score
+
+
+def allocate_intervals(weights, checks_per_minute, min_interval, max_interval):
+    """
+    在每分钟检查次数预算内按权重分配各订阅的检查间隔
+
+    每个订阅先分到最低检查频率（max_interval），剩余预算按权重分配，
+    达到最高频率（min_interval）的订阅多出的预算再按权重分给其它订阅
+
+    Args:
+        weights: {key: 权重}
+        checks_per_minute: 每分钟允许的检查次数
+        min_interval: 最短间隔（秒）
+        max_interval: 最长间隔（秒）
+
+    Returns:
+        dict: {key: 间隔（秒）}
+    """
+    if not weights:
+        return {}
+    min_rate = 60.0 / max_interval
+    max_rate = 60.0 / min_interval
+
+    # 预算连最低频率都不够时，所有订阅平均分配
+    if checks_per_minute <= min_rate * len(weights):
+        interval = 60.0 * len(weights) / max(checks_per_minute, 1e-6)
+        return {key: interval for key in weights}
+
+    rates = {key: min_rate for key in weights}
+    remaining = checks_per_minute - min_rate * len(weights)
+    active = {key for key, weight in weights.items() if weight > 0}
+    while remaining > 1e-9 and active:
+        total_weight = sum(weights[key] for key in active)
+        capped = set()
+        spent = 0.0
+        for key in active:
+            share = remaining * weights[key] / total_weight
+            room = max_rate - rates[key]
+            if share >= room:
+                rates[key] = max_rate
+                spent += room
+                capped.add(key)
+            else:
+                rates[key] += share
+                spent += share
+        remaining -= spent
+        if not capped:
+            break
+        active -= capped
+    return {key: 60.0 / rate for key, rate in rates.items()}
+
+
+class AdaptiveScheduler:
+    """订阅检查调度（每个订阅各自的下次检查时间）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.plans = {}  # planCode -> {"interval", "weight", "volatility", "priority", "nextDue", "lastChecked", "lastActualInterval"}
+        self.budget_per_minute = None
+
+    def update(self, subscriptions, base_interval, checks_per_minute, now=None, boosts=None):
+        """
+        重新计算各订阅的检查间隔（保留已有的下次检查时间）
+
+        Args:
+            subscriptions: 订阅列表
+            base_interval: 基准检查间隔（秒）
+            checks_per_minute: 每分钟允许的检查次数
+            now: 当前时间（time.monotonic()）
+            boosts: {planCode: 补货时段加速倍数}，权重按倍数提高（总检查次数仍受预算限制）
+        """
+        now = time.monotonic() if now is None else now
+        wall_now = time.time()
+        min_interval = max(MIN_INTERVAL_FLOOR, base_interval * MIN_INTERVAL_RATIO)
+        max_interval = max(min_interval, base_interval * MAX_INTERVAL_RATIO)
+
+        info = {}
+        for subscription in subscriptions:
+            priority = subscription.get("priority") or DEFAULT_PRIORITY
+            volatility = volatility_score(subscription.get("history"), wall_now)
+            boost = (boosts or {}).get(subscription["planCode"], 1.0)
+            info[subscription["planCode"]] = {
+                "priority": priority,
+                "volatility": round(volatility, 3),
+                "windowBoost": boost,
+                "weight": PRIORITY_WEIGHTS.get(priority, 1.0) * (1.0 + volatility) * boost
+            }
+        intervals = allocate_intervals({key: value["weight"] for key, value in info.items()},
+                                       checks_per_minute, min_interval, max_interval)
+
+        with self._lock:
+            plans = {}
+            for plan_code, value in info.items():
+                previous = self.plans.get(plan_code, {})
+                interval = intervals[plan_code]
+                plan = dict(previous)
+                plan.update(value)
+                plan["interval"] = round(interval, 1)
+                if "nextDue" not in previous:
+                    # 新订阅立即检查
+                    plan["nextDue"] = now
+                elif previous.get("lastChecked") is not None:
+                    # 间隔变化时按新间隔重新计算下次检查时间
+                    plan["nextDue"] = previous["lastChecked"] + interval
+                plans[plan_code] = plan
+            self.plans = plans
+            self.budget_per_minute = checks_per_minute
+
+    def due(self, now=None):
+        """到期的订阅（按逾期时间从长到短）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = [(plan["nextDue"], plan_code) for plan_code, plan in self.plans.items() if plan["nextDue"] <= now]
+        return [plan_code for _, plan_code in sorted(due)]
+
+    def mark_started(self, plan_code, now=None):
+        """
+        记录开始检查，返回相对计划时间的延迟（秒）
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            plan = self.plans.get(plan_code)
+            if plan is None:
+                return 0.0
+            lag = max(0.0, now - plan["nextDue"])
+            if plan.get("lastChecked") is not None:
+                plan["lastActualInterval"] = round(now - plan["lastChecked"], 1)
+            plan["lastChecked"] = now
+            plan["nextDue"] = now + plan["interval"]
+            return lag
+
+    def get_status(self, now=None):
+        """各订阅的实际检查间隔和下次检查时间"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return {
+                plan_code: {
+                    "priority": plan["priority"],
+                    "volatility": plan["volatility"],
+                    "windowBoost": plan.get("windowBoost", 1.0),
+                    "weight": round(plan["weight"], 3),
+                    "effectiveInterval": plan["interval"],
+                    "lastActualInterval": plan.get("lastActualInterval"),
+                    "nextCheckIn": round(max(0.0, plan["nextDue"] - now), 1)
+                }
+                for plan_code, plan in self.plans.items()
+            }
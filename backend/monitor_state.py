@@ -0,0 +1,233 @@
+"""
+监控订阅状态表模块
+订阅的 lastStatus 不再每次检查都重建 "dc|配置" 字符串为键的字典：
+数据中心、配置和状态字符串全局驻留为小整数，每个订阅用定长数组保存各 (数据中心, 配置) 的状态编码，
+检查时原地对比并更新，保存时使用紧凑格式
+"""
+
+import sys
+import threading
+from array import array
+
+
+# 状态编码 0 表示没有记录（对应旧版 lastStatus 中不存在的键）
+STATUS_MISSING = 0
+
+# 配置编号 0 表示只有数据中心、没有配置（旧版简单格式）
+NO_CONFIG = 0
+
+
+class InternTable:
+    """字符串驻留表（字符串 <-> 小整数）"""
+
+    def __init__(self, reserved=None):
+        self._lock = threading.Lock()
+        self._values = [reserved]
+        self._ids = {}
+
+    def intern(self, value):
+        value_id = self._ids.get(value)
+        if value_id is not None:
+            return value_id
+        with self._lock:
+            value_id = self._ids.get(value)
+            if value_id is None:
+                value_id = len(self._values)
+                self._values.append(sys.intern(value) if isinstance(value, str) else value)
+                self._ids[value] = value_id
+            return value_id
+
+    def lookup(self, value):
+        """查找已驻留的编号（不新增），不存在返回None"""
+        return self._ids.get(value)
+
+    def value(self, value_id):
+        return self._values[value_id]
+
+    def __len__(self):
+        return len(self._values) - 1
+
+
+# 所有订阅共享的驻留表
+DATACENTERS = InternTable()
+CONFIGS = InternTable(reserved="")
+STATUSES = InternTable()
+
+
+# 状态表每行的初始列数（数据中心编号超出时按倍数扩展）
+INITIAL_STRIDE = 32
+
+
+class StatusState:
+    """
+    单个订阅的状态表：每个配置一行，每个数据中心一列，保存状态编码
+    检查时只返回状态编码发生变化的 (数据中心, 状态, 旧状态)，未变化的不会产生任何对象
+    """
+
+    __slots__ = ("rows", "row_configs", "stride", "codes", "seen", "generation", "filled", "observed")
+
+    def __init__(self):
+        self.rows = {}  # 配置编号 -> 行号
+        self.row_configs = []  # 行号 -> 配置编号
+        self.stride = INITIAL_STRIDE
+        self.codes = array("H")  # 行号 * stride + 数据中心编号 -> 状态编码
+        self.seen = array("B")  # 同上 -> 最后一次出现的检查轮次（取低8位）
+        self.generation = 0
+        self.filled = 0  # 有状态的槽位数
+        self.observed = 0  # 本次检查出现的槽位数
+
+    def begin(self):
+        """开始一次检查"""
+        self.generation = (self.generation + 1) & 0xFF
+        self.observed = 0
+
+    def _row(self, config_key):
+        config_id = CONFIGS.intern(config_key) if config_key else NO_CONFIG
+        row = self.rows.get(config_id)
+        if row is None:
+            row = len(self.row_configs)
+            self.rows[config_id] = row
+            self.row_configs.append(config_id)
+            self.codes.extend([STATUS_MISSING] * self.stride)
+            self.seen.extend([0] * self.stride)
+        return row
+
+    def _grow(self, dc_id):
+        """数据中心编号超出列数时扩展每行的列数"""
+        stride = self.stride
+        while stride <= dc_id:
+            stride *= 2
+        codes, seen = array("H"), array("B")
+        padding = stride - self.stride
+        for row in range(len(self.row_configs)):
+            start = row * self.stride
+            codes.extend(self.codes[start:start + self.stride])
+            codes.extend([STATUS_MISSING] * padding)
+            seen.extend(self.seen[start:start + self.stride])
+            seen.extend([0] * padding)
+        self.codes, self.seen, self.stride = codes, seen, stride
+
+    def observe_config(self, config_key, datacenter_statuses):
+        """
+        原地更新一个配置在各数据中心的状态
+
+        Args:
+            config_key: 配置标识（None表示旧版简单格式，只有数据中心）
+            datacenter_statuses: {数据中心: 状态}
+
+        Returns:
+            list: 状态变化的 [(数据中心, 当前状态, 上次状态或None)]
+        """
+        base = self._row(config_key) * self.stride
+        dc_ids, status_ids = DATACENTERS._ids, STATUSES._ids
+        generation = self.generation
+        changes = []
+        for dc, status in datacenter_statuses.items():
+            dc_id = dc_ids.get(dc) or DATACENTERS.intern(dc)
+            if dc_id >= self.stride:
+                self._grow(dc_id)
+                base = self.rows[CONFIGS.intern(config_key) if config_key else NO_CONFIG] * self.stride
+            code = status_ids.get(status) or STATUSES.intern(status)
+            slot = base + dc_id
+            self.seen[slot] = generation
+            self.observed += 1
+            old_code = self.codes[slot]
+            if old_code != code:
+                self.codes[slot] = code
+                if old_code == STATUS_MISSING:
+                    self.filled += 1
+                changes.append((dc, status, STATUSES.value(old_code) if old_code != STATUS_MISSING else None))
+        return changes
+
+    def end(self):
+        """结束检查：本次没有出现的 (数据中心, 配置) 清除状态"""
+        if self.observed >= self.filled:
+            return
+        generation = self.generation
+        codes, seen = self.codes, self.seen
+        for slot in range(len(codes)):
+            if codes[slot] != STATUS_MISSING and seen[slot] != generation:
+                codes[slot] = STATUS_MISSING
+                self.filled -= 1
+
+    def get(self, datacenter, config_key=None):
+        dc_id = DATACENTERS.lookup(datacenter)
+        config_id = CONFIGS.lookup(config_key) if config_key else NO_CONFIG
+        row = self.rows.get(config_id) if config_id is not None else None
+        if dc_id is None or row is None or dc_id >= self.stride:
+            return None
+        code = self.codes[row * self.stride + dc_id]
+        return STATUSES.value(code) if code != STATUS_MISSING else None
+
+    def __len__(self):
+        return self.filled
+
+    def _entries(self):
+        """遍历有状态的槽位：(配置编号, 数据中心编号, 状态编码)"""
+        stride = self.stride
+        for row, config_id in enumerate(self.row_configs):
+            base = row * stride
+            for dc_id in range(1, stride):
+                code = self.codes[base + dc_id]
+                if code != STATUS_MISSING:
+                    yield config_id, dc_id, code
+
+    # ---------- 转换 ----------
+
+    def to_dict(self):
+        """转换为旧版 lastStatus 字典格式（{"dc|配置": 状态} 或 {"dc": 状态}），供API展示"""
+        result = {}
+        for config_id, dc_id, code in self._entries():
+            dc = DATACENTERS.value(dc_id)
+            key = f"{dc}|{CONFIGS.value(config_id)}" if config_id != NO_CONFIG else dc
+            result[key] = STATUSES.value(code)
+        return result
+
+    def to_compact(self):
+        """
+        紧凑的保存格式：数据中心、配置、状态各保存一次，
+        每个配置一行字符串，每个字符对应一个数据中心（"." 表示没有记录，其余为状态下标）
+        """
+        entries = list(self._entries())
+        dc_ids = sorted({dc_id for _, dc_id, _ in entries})
+        columns = {dc_id: index for index, dc_id in enumerate(dc_ids)}
+        statuses = {}
+        rows = {}
+        for config_id, dc_id, code in entries:
+            row = rows.setdefault(config_id, ["."] * len(dc_ids))
+            row[columns[dc_id]] = chr(ord("0") + statuses.setdefault(code, len(statuses)))
+        return {
+            "format": "compact",
+            "datacenters": [DATACENTERS.value(dc_id) for dc_id in dc_ids],
+            "statuses": [STATUSES.value(code) for code in statuses],
+            "rows": {CONFIGS.value(config_id): "".join(row) for config_id, row in rows.items()}
+        }
+
+    @classmethod
+    def load(cls, data):
+        """从紧凑格式或旧版字典格式恢复"""
+        state = cls()
+        if not isinstance(data, dict) or not data:
+            return state
+        state.begin()
+        if data.get("format") == "compact":
+            datacenters, statuses = data.get("datacenters", []), data.get("statuses", [])
+            for config_key, row in (data.get("rows") or {}).items():
+                state.observe_config(config_key or None, {
+                    datacenters[index]: statuses[ord(char) - ord("0")]
+                    for index, char in enumerate(row) if char != "."
+                })
+        else:
+            grouped = {}
+            for key, status in data.items():
+                dc, _, config_key = key.partition("|")
+                grouped.setdefault(config_key or None, {})[dc] = status
+            for config_key, datacenter_statuses in grouped.items():
+                state.observe_config(config_key, datacenter_statuses)
+        return state
+
+    def memory_bytes(self):
+        """状态表占用的大致内存（字节）"""
+        return (sys.getsizeof(self.rows) + sys.getsizeof(self.row_configs)
+                + self.codes.buffer_info()[1] * self.codes.itemsize
+                + self.seen.buffer_info()[1] * self.seen.itemsize)
@@ -0,0 +1,558 @@
+"""
+多进程监控模块
+开启后订阅按型号分片到 N 个监控工作进程：每个进程只检查自己负责的型号（按存活的工作进程做一致性哈希分配，
+进程启动或退出时自动重新分配），在进程内对比状态，把状态变化和各型号的状态表写入共享的 SQLite 数据库，
+并定期写入心跳；Web 进程只读取状态变化并发送通知、记录历史和补货统计，
+JSON 解析和状态对比不再与 Flask 请求处理争用同一个解释器的 GIL；
+工作进程接管型号时递增该型号的归属版本，不再负责该型号的进程写入的检查结果被拒绝（重新分配时不会重复产生状态变化），
+所有工作进程的OVH请求合计受共享存储中的令牌桶限制（Web 进程的请求预算相应减少）
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+
+from monitor_scheduler import AdaptiveScheduler
+from monitor_state import StatusState
+
+
+# 心跳间隔和超时（秒）：超过超时没有心跳的工作进程视为已退出，其负责的型号重新分配
+HEARTBEAT_SECONDS = 5
+WORKER_TIMEOUT = 20
+
+# 工作进程的调度间隔（秒）
+WORKER_TICK = 1
+
+# 已处理的状态变化保留时间（秒）
+TRANSITION_RETENTION = 3600
+
+# 最多的工作进程数
+MAX_WORKERS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    pid INTEGER,
+    started_at REAL,
+    heartbeat REAL,
+    stats TEXT
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    plan_code TEXT PRIMARY KEY,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS states (
+    plan_code TEXT PRIMARY KEY,
+    state TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL,
+    worker_id TEXT,
+    plan_code TEXT,
+    datacenter TEXT,
+    config_key TEXT,
+    memory TEXT,
+    storage TEXT,
+    old_status TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS owners (
+    plan_code TEXT PRIMARY KEY,
+    worker_id TEXT,
+    epoch INTEGER
+);
+CREATE TABLE IF NOT EXISTS budget (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens REAL,
+    updated_at REAL
+);
+"""
+
+
+def parse_config_availability(availabilities):
+    """
+    OVH /dedicated/server/datacenter/availabilities 返回值 -> 配置级别的可用性
+
+    Returns:
+        dict: {fqn: {"memory", "storage", "datacenters": {dc: 状态}, "fqn"}}
+    """
+    result = {}
+    for item in availabilities or []:
+        fqn = item.get("fqn", "")
+        datacenters = {}
+        for dc in item.get("datacenters", []):
+            dc_name = dc.get("datacenter")
+            if dc_name:
+                datacenters[dc_name] = dc.get("availability", "unknown")
+        result[fqn] = {
+            "memory": item.get("memory", "N/A"),
+            "storage": item.get("storage", "N/A"),
+            "datacenters": datacenters,
+            "fqn": fqn
+        }
+    return result
+
+
+def owner_of(plan_code, worker_ids):
+    """一致性哈希（最高随机权重）：工作进程增减时只有少量型号改变归属"""
+    best, best_weight = None, -1
+    for worker_id in worker_ids:
+        weight = int(hashlib.md5(f"{worker_id}|{plan_code}".encode("utf-8")).hexdigest()[:16], 16)
+        if weight > best_weight:
+            best, best_weight = worker_id, weight
+    return best
+
+
+class MonitorStore:
+    """工作进程和 Web 进程共享的 SQLite 存储（每个线程一个连接）"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- 工作进程 ----------
+
+    def heartbeat(self, worker_id, pid, started_at, stats):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, pid, started_at, heartbeat, stats) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET pid=excluded.pid, heartbeat=excluded.heartbeat, stats=excluded.stats",
+                (worker_id, pid, started_at, time.time(), json.dumps(stats))
+            )
+
+    def remove_worker(self, worker_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def workers(self):
+        rows = self._connect().execute("SELECT worker_id, pid, started_at, heartbeat, stats FROM workers ORDER BY worker_id").fetchall()
+        return [
+            {"workerId": row[0], "pid": row[1], "startedAt": row[2], "heartbeat": row[3], "stats": json.loads(row[4] or "{}")}
+            for row in rows
+        ]
+
+    def live_worker_ids(self, timeout=WORKER_TIMEOUT):
+        cutoff = time.time() - timeout
+        rows = self._connect().execute("SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id", (cutoff,)).fetchall()
+        return [row[0] for row in rows]
+
+    # ---------- 订阅和设置 ----------
+
+    def get_meta(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def sync_subscriptions(self, subscriptions):
+        """
+        替换订阅列表（内容没有变化时不写入）
+
+        Returns:
+            bool: 是否有变化
+        """
+        payload = {s["planCode"]: json.dumps(s, sort_keys=True, ensure_ascii=False) for s in subscriptions}
+        digest = hashlib.sha1("\n".join(f"{k}\t{v}" for k, v in sorted(payload.items())).encode("utf-8")).hexdigest()
+        if self.get_meta("subscriptionsDigest") == digest:
+            return False
+        with self._connect() as conn:
+            conn.execute("DELETE FROM subscriptions")
+            conn.executemany("INSERT INTO subscriptions (plan_code, data) VALUES (?, ?)", payload.items())
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", ("subscriptionsDigest", json.dumps(digest)))
+        return True
+
+    def load_subscriptions(self):
+        """
+        Returns:
+            tuple: (版本摘要, {planCode: 订阅})
+        """
+        digest = self.get_meta("subscriptionsDigest")
+        rows = self._connect().execute("SELECT plan_code, data FROM subscriptions").fetchall()
+        return digest, {row[0]: json.loads(row[1]) for row in rows}
+
+    # ---------- 状态 ----------
+
+    def seed_states(self, states):
+        """
+        写入 Web 进程已有的状态表
+
+        共享存储中可能留有之前多进程模式会话的旧状态，只在 Web 进程的状态更新时覆盖
+        （否则工作进程会再次产生单进程模式已经处理过的状态变化）
+
+        Args:
+            states: {planCode: (紧凑格式, 最后更新的时间戳)}，时间戳未知时为 0（不覆盖已有的状态）
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO states (plan_code, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(plan_code) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at "
+                "WHERE excluded.updated_at > states.updated_at",
+                [(plan_code, json.dumps(state), updated_at) for plan_code, (state, updated_at) in states.items()]
+            )
+
+    def load_state(self, plan_code):
+        row = self._connect().execute("SELECT state FROM states WHERE plan_code = ?", (plan_code,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim_plan(self, worker_id, plan_code):
+        """
+        接管型号：递增归属版本，并在同一事务中读取最新的状态表
+
+        Returns:
+            tuple: (归属版本, 状态表紧凑格式或None)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO owners (plan_code, worker_id, epoch) VALUES (?, ?, 1) "
+                "ON CONFLICT(plan_code) DO UPDATE SET worker_id = excluded.worker_id, epoch = owners.epoch + 1",
+                (plan_code, worker_id)
+            )
+            epoch = conn.execute("SELECT epoch FROM owners WHERE plan_code = ?", (plan_code,)).fetchone()[0]
+            row = conn.execute("SELECT state FROM states WHERE plan_code = ?", (plan_code,)).fetchone()
+        return epoch, json.loads(row[0]) if row else None
+
+    def save_check(self, worker_id, plan_code, epoch, state, transitions):
+        """
+        在一个事务中保存检查后的状态表和状态变化
+
+        Returns:
+            bool: 是否已保存（型号已被其它工作进程接管时不保存）
+        """
+        now = time.time()
+        with self._connect() as conn:
+            saved = conn.execute(
+                "INSERT OR REPLACE INTO states (plan_code, state, updated_at) SELECT ?, ?, ? "
+                "WHERE EXISTS (SELECT 1 FROM owners WHERE plan_code = ? AND worker_id = ? AND epoch = ?)",
+                (plan_code, json.dumps(state), now, plan_code, worker_id, epoch)
+            ).rowcount
+            if saved and transitions:
+                conn.executemany(
+                    "INSERT INTO transitions (ts, worker_id, plan_code, datacenter, config_key, memory, storage, old_status, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(now, worker_id, plan_code) + tuple(t) for t in transitions]
+                )
+        return bool(saved)
+
+    # ---------- 请求预算 ----------
+
+    def try_acquire_request(self, requests_per_minute, cost=1):
+        """
+        从所有工作进程共享的令牌桶扣除请求（不阻塞），桶容量与 RateBudget 相同
+
+        Args:
+            requests_per_minute: 所有工作进程合计的每分钟请求数，None表示不限制
+            cost: 需要的请求数
+
+        Returns:
+            bool: 是否成功获得预算
+        """
+        if requests_per_minute is None:
+            return True
+        rate = max(1, requests_per_minute) / 60.0
+        burst = max(10, int(requests_per_minute) // 12)
+        now = time.time()
+        refilled = "MIN(?, tokens + MAX(0, ? - updated_at) * ?)"
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO budget (id, tokens, updated_at) VALUES (1, ?, ?)", (burst, now))
+            return conn.execute(
+                f"UPDATE budget SET tokens = {refilled} - ?, updated_at = ? WHERE id = 1 AND {refilled} >= ?",
+                (burst, now, rate, cost, now, burst, now, rate, cost)
+            ).rowcount == 1
+
+    # ---------- 状态变化 ----------
+
+    def transitions_after(self, last_id, limit=1000):
+        rows = self._connect().execute(
+            "SELECT id, ts, worker_id, plan_code, datacenter, config_key, memory, storage, old_status, status "
+            "FROM transitions WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)).fetchall()
+        keys = ("id", "ts", "workerId", "planCode", "datacenter", "configKey", "memory", "storage", "oldStatus", "status")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def last_transition_id(self):
+        row = self._connect().execute("SELECT MAX(id) FROM transitions").fetchone()
+        return row[0] or 0
+
+    def prune_transitions(self, upto_id, retention=TRANSITION_RETENTION):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM transitions WHERE id <= ? AND ts < ?", (upto_id, time.time() - retention))
+
+
+# ---------- 工作进程 ----------
+
+class ShardWorker:
+    """单个工作进程：检查自己负责的型号并写入状态变化"""
+
+    def __init__(self, worker_id, store, api_config):
+        self.worker_id = worker_id
+        self.store = store
+        self.api_config = api_config
+        self.client = None
+        self.started_at = time.time()
+        self.scheduler = AdaptiveScheduler()
+        self.states = {}  # planCode -> StatusState
+        self.epochs = {}  # planCode -> 接管时的归属版本
+        self.owned = set()
+        self.request_budget = None  # 所有工作进程合计的每分钟OVH请求数，None表示不限制
+        self.membership = None  # (订阅版本, 存活的工作进程)
+        self.stats = {"checks": 0, "errors": 0, "transitions": 0, "owned": 0, "rebalances": 0, "rejected": 0,
+                      "throttled": 0, "lastError": None}
+
+    def _get_client(self):
+        if self.client is None:
+            import ovh
+            self.client = ovh.Client(**self.api_config)
+        return self.client
+
+    def run(self, stop_event):
+        last_sync = None
+        try:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                if last_sync is None or now - last_sync >= HEARTBEAT_SECONDS:
+                    self.sync(now)
+                    last_sync = now
+                for plan_code in self.scheduler.due(now):
+                    if stop_event.is_set():
+                        break
+                    if plan_code not in self.owned:
+                        continue
+                    # 共享预算不足时等下一轮（不标记开始，型号保持到期）
+                    if not self.store.try_acquire_request(self.request_budget):
+                        self.stats["throttled"] += 1
+                        break
+                    self.scheduler.mark_started(plan_code, now)
+                    self.check(plan_code)
+                stop_event.wait(WORKER_TICK)
+        finally:
+            # 退出时立即删除心跳，其它工作进程下次同步时接管
+            self.store.remove_worker(self.worker_id)
+
+    def sync(self, now):
+        """写入心跳，按存活的工作进程重新计算负责的型号"""
+        self.store.heartbeat(self.worker_id, os.getpid(), self.started_at, self.stats)
+        worker_ids = self.store.live_worker_ids()
+        if self.worker_id not in worker_ids:
+            worker_ids = sorted(worker_ids + [self.worker_id])
+        digest, subscriptions = self.store.load_subscriptions()
+        settings = self.store.get_meta("settings", {})
+        membership = (digest, tuple(worker_ids), json.dumps(settings, sort_keys=True))
+        if membership == self.membership:
+            return
+        self.membership = membership
+
+        owned = {plan_code for plan_code in subscriptions if owner_of(plan_code, worker_ids) == self.worker_id}
+        if owned != self.owned:
+            self.stats["rebalances"] += 1
+        for plan_code in owned - self.owned:
+            self.epochs[plan_code], state = self.store.claim_plan(self.worker_id, plan_code)
+            self.states[plan_code] = StatusState.load(state)
+        for plan_code in self.owned - owned:
+            self.states.pop(plan_code, None)
+            self.epochs.pop(plan_code, None)
+        self.owned = owned
+        self.request_budget = settings.get("requestBudget")
+        self.stats["owned"] = len(owned)
+        self.store.heartbeat(self.worker_id, os.getpid(), self.started_at, self.stats)
+
+        # 每分钟检查次数预算按存活的工作进程平均分配
+        checks_per_minute = settings.get("requestsPerMinute", 60) / max(1, len(worker_ids))
+        owned_subscriptions = [subscriptions[plan_code] for plan_code in sorted(owned)]
+        self.scheduler.update(owned_subscriptions, settings.get("checkInterval", 60), checks_per_minute, now,
+                              boosts={s["planCode"]: s.get("windowBoost", 1.0) for s in owned_subscriptions})
+
+    def check(self, plan_code):
+        try:
+            availabilities = self._get_client().get('/dedicated/server/datacenter/availabilities', planCode=plan_code)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["lastError"] = f"{plan_code}: {str(e)}"
+            return
+        current = parse_config_availability(availabilities)
+        if not current:
+            return
+
+        state = self.states.get(plan_code)
+        if state is None:
+            state = self.states[plan_code] = StatusState()
+        state.begin()
+        transitions = []
+        for config_key, config_data in current.items():
+            memory, storage = config_data["memory"], config_data["storage"]
+            for dc, status, old_status in state.observe_config(config_key, config_data["datacenters"]):
+                transitions.append((dc, config_key, memory, storage, old_status, status))
+        state.end()
+
+        if not self.store.save_check(self.worker_id, plan_code, self.epochs.get(plan_code), state.to_compact(), transitions):
+            # 已被其它工作进程接管：丢弃本次结果，下次同步时重新计算负责的型号
+            self.stats["rejected"] += 1
+            self.owned.discard(plan_code)
+            self.states.pop(plan_code, None)
+            self.epochs.pop(plan_code, None)
+            self.membership = None
+            return
+        self.stats["checks"] += 1
+        self.stats["transitions"] += len(transitions)
+
+
+def worker_main(worker_id, store_path, api_config, stop_event):
+    """工作进程入口"""
+    store = MonitorStore(store_path)
+    try:
+        ShardWorker(worker_id, store, api_config).run(stop_event)
+    except Exception:
+        traceback.print_exc()
+
+
+# ---------- Web 进程 ----------
+
+class MonitorWorkerPool:
+    """管理监控工作进程，读取它们写入的状态变化"""
+
+    def __init__(self, store_path, api_config, add_log_func, num_workers=2):
+        """
+        初始化工作进程池
+
+        Args:
+            store_path: SQLite 数据库路径
+            api_config: ovh.Client 的参数（endpoint、application_key 等）
+            add_log_func: 添加日志的函数
+            num_workers: 工作进程数
+        """
+        self.store = MonitorStore(store_path)
+        self.store_path = store_path
+        self.api_config = dict(api_config)
+        self.add_log = add_log_func
+        self.num_workers = max(1, min(MAX_WORKERS, int(num_workers)))
+        # spawn：工作进程不继承 Web 进程的线程和锁
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = {}  # worker_id -> (Process, stop_event)
+        self._lock = threading.Lock()
+        self._last_id = self.store.last_transition_id()
+        self._live = None
+        self.request_budget = None  # 工作进程合计的每分钟OVH请求上限，None表示不限制
+        self.restarts = 0
+
+    def start(self):
+        with self._lock:
+            for index in range(self.num_workers):
+                self._start_worker(f"worker-{index}")
+        self.add_log("INFO", f"已启动 {self.num_workers} 个监控工作进程", "monitor")
+
+    def _start_worker(self, worker_id):
+        stop_event = self._context.Event()
+        process = self._context.Process(target=worker_main, name=f"monitor-{worker_id}",
+                                        args=(worker_id, self.store_path, self.api_config, stop_event), daemon=True)
+        process.start()
+        self._processes[worker_id] = (process, stop_event)
+
+    def _stop_worker(self, worker_id, timeout=5):
+        process, stop_event = self._processes.pop(worker_id)
+        stop_event.set()
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            self.store.remove_worker(worker_id)
+
+    def stop(self):
+        with self._lock:
+            for worker_id in list(self._processes):
+                self._stop_worker(worker_id)
+        self.add_log("INFO", "监控工作进程已停止", "monitor")
+
+    def set_workers(self, num_workers):
+        """调整工作进程数（其它进程在下次心跳时接管或让出型号）"""
+        num_workers = max(1, min(MAX_WORKERS, int(num_workers)))
+        with self._lock:
+            self.num_workers = num_workers
+            wanted = {f"worker-{index}" for index in range(num_workers)}
+            for worker_id in list(self._processes):
+                if worker_id not in wanted:
+                    self._stop_worker(worker_id)
+            for worker_id in sorted(wanted - set(self._processes)):
+                self._start_worker(worker_id)
+
+    def update_api_config(self, api_config):
+        """API 凭据变化时重启工作进程"""
+        if dict(api_config) == self.api_config:
+            return
+        self.api_config = dict(api_config)
+        with self._lock:
+            for worker_id in list(self._processes):
+                self._stop_worker(worker_id)
+                self._start_worker(worker_id)
+
+    def supervise(self):
+        """重启意外退出的工作进程，记录存活工作进程的变化"""
+        with self._lock:
+            for worker_id, (process, _) in list(self._processes.items()):
+                if not process.is_alive():
+                    self.add_log("WARNING", f"监控工作进程 {worker_id} 已退出（退出码 {process.exitcode}），正在重启", "monitor")
+                    self.store.remove_worker(worker_id)
+                    self._start_worker(worker_id)
+                    self.restarts += 1
+        live = self.store.live_worker_ids()
+        if live != self._live:
+            if self._live is not None:
+                self.add_log("INFO", f"监控工作进程变化，重新分配订阅: {', '.join(live) or '无'}", "monitor")
+            self._live = live
+
+    def sync(self, subscriptions, check_interval, requests_per_minute, states=None):
+        """
+        同步订阅列表和设置到共享存储
+
+        Args:
+            subscriptions: [{"planCode", "priority", "history", "windowBoost"}]
+            check_interval: 基准检查间隔（秒）
+            requests_per_minute: 所有工作进程合计的每分钟检查次数
+            states: Web 进程已有的状态表 {planCode: (紧凑格式, 最后更新的时间戳)}
+        """
+        if states:
+            self.store.seed_states(states)
+        self.store.set_meta("settings", {"checkInterval": check_interval, "requestsPerMinute": requests_per_minute,
+                                         "requestBudget": self.request_budget})
+        self.store.sync_subscriptions(subscriptions)
+
+    def set_request_budget(self, requests_per_minute):
+        """设置工作进程合计的每分钟OVH请求上限（下次同步设置时生效）"""
+        self.request_budget = None if requests_per_minute is None else max(1, int(requests_per_minute))
+
+    def poll_transitions(self, limit=1000):
+        """读取新的状态变化"""
+        rows = self.store.transitions_after(self._last_id, limit)
+        if rows:
+            self._last_id = rows[-1]["id"]
+            self.store.prune_transitions(self._last_id)
+        return rows
+
+    def get_status(self):
+        now = time.time()
+        workers = self.store.workers()
+        for worker in workers:
+            worker["heartbeatAge"] = round(now - worker["heartbeat"], 1) if worker["heartbeat"] else None
+            worker["alive"] = worker["heartbeatAge"] is not None and worker["heartbeatAge"] <= WORKER_TIMEOUT
+        return {"numWorkers": self.num_workers, "restarts": self.restarts, "requestBudget": self.request_budget,
+                "lastTransitionId": self._last_id, "workers": workers}
@@ -0,0 +1,298 @@
+"""
+Telegram 通知异步发送模块
+发送通知不再在监控、抢购和配置狙击的线程中同步调用 Telegram API：
+消息放入有容量限制的队列后立即返回，由后台线程按聊天合并短时间内的多条消息为一条汇总发送，
+使用连接池复用的 HTTP 会话，遵守 Telegram 的频率限制（单个聊天约每秒1条、群组每分钟20条、全局每秒30条），
+失败时按指数退避重试，收到 429 时按 retry_after 等待
+"""
+
+import queue
+import threading
+import time
+
+import requests
+
+
+# 待发送队列的容量，超出时丢弃（不阻塞调用方）
+MAX_PENDING = 500
+
+# 合并窗口（秒）：同一聊天在窗口内的消息合并为一条汇总
+BATCH_WINDOW = 2.0
+
+# Telegram 单条消息的最大长度
+MAX_MESSAGE_LENGTH = 4096
+
+# 频率限制：全局发送间隔、私聊和群组（chat_id 为负数）的发送间隔（秒）
+GLOBAL_INTERVAL = 1.0 / 30
+PRIVATE_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+
+# 重试次数和退避基数（秒）
+MAX_ATTEMPTS = 4
+RETRY_BACKOFF = 2.0
+
+# 单次请求超时（秒）
+REQUEST_TIMEOUT = 10
+
+# 汇总消息中各条消息之间的分隔线
+DIGEST_SEPARATOR = "\n\n━━━━━━━━━━\n\n"
+
+
+def build_digest(messages, max_length=MAX_MESSAGE_LENGTH):
+    """
+    把多条消息合并为不超过长度限制的汇总消息
+
+    Args:
+        messages: 消息列表
+        max_length: 单条消息的最大长度
+
+    Returns:
+        list: 要发送的消息文本列表
+    """
+    if len(messages) == 1:
+        parts = [messages[0]]
+    else:
+        header = f"📬 {len(messages)} 条通知汇总\n\n"
+        parts = [header + messages[0]] + messages[1:]
+
+    chunks = []
+    current = ""
+    for part in parts:
+        # 单条超长的消息按长度切分
+        while len(part) > max_length:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(part[:max_length])
+            part = part[max_length:]
+        if not current:
+            current = part
+        elif len(current) + len(DIGEST_SEPARATOR) + len(part) <= max_length:
+            current += DIGEST_SEPARATOR + part
+        else:
+            chunks.append(current)
+            current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class NotificationDispatcher:
+    """异步、合并、限速、重试的 Telegram 通知发送"""
+
+    def __init__(self, add_log_func, batch_window=BATCH_WINDOW, max_pending=MAX_PENDING):
+        """
+        初始化通知发送
+
+        Args:
+            add_log_func: 添加日志的函数
+            batch_window: 合并窗口（秒）
+            max_pending: 待发送队列的容量
+        """
+        self.add_log = add_log_func
+        self.batch_window = batch_window
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self._session.mount("https://", adapter)
+
+        # 后台线程内部状态
+        self._batches = {}  # (token, chat_id) -> {"messages", "deadline"}
+        self._outbox = []  # [{"token", "chat_id", "text", "attempts", "notBefore"}]
+        self._chat_ready = {}  # chat_id -> 下次允许发送的时间
+        self._global_ready = 0.0
+
+        # 统计
+        self.enqueued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def enqueue(self, token, chat_id, message, urgent=False):
+        """
+        提交通知（立即返回，由后台线程发送）
+
+        Args:
+            token: Bot Token
+            chat_id: Chat ID
+            message: 消息内容
+            urgent: 是否立即发送（不等待合并窗口，如抢购成功）
+
+        Returns:
+            bool: 是否已加入发送队列（队列已满时丢弃并返回False）
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((token, str(chat_id), message, urgent))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def send_now(self, token, chat_id, message):
+        """
+        同步发送一条消息并返回结果（只用于测试通知等需要立即知道结果的场景）
+
+        Returns:
+            bool: 是否发送成功
+        """
+        status, _ = self._post(token, str(chat_id), message)
+        return status == "ok"
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._dispatch_loop, name="telegram-dispatcher", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout=10):
+        """等待队列中的消息发送完成"""
+        deadline = time.time() + timeout
+        while (self._queue.unfinished_tasks or self._batches or self._outbox) and time.time() < deadline:
+            time.sleep(0.05)
+
+    # ---------- 后台发送 ----------
+
+    def _dispatch_loop(self):
+        while True:
+            try:
+                self._collect(self._next_wakeup())
+                now = time.monotonic()
+                self._close_batches(now)
+                self._send_ready(now)
+            except Exception as e:
+                self.add_log("ERROR", f"通知发送线程出错: {str(e)}")
+                time.sleep(1)
+
+    def _next_wakeup(self):
+        """距离下一次需要处理（合并窗口结束或可以重发）的时间"""
+        if not self._batches and not self._outbox:
+            return None
+        now = time.monotonic()
+        times = [batch["deadline"] for batch in self._batches.values()]
+        times.extend(self._ready_at(item) for item in self._outbox)
+        return max(0.0, min(times) - now)
+
+    def _collect(self, timeout):
+        """等待新消息，并取出队列中已有的所有消息"""
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        self._add_to_batch(*item)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._add_to_batch(*item)
+
+    def _add_to_batch(self, token, chat_id, message, urgent):
+        now = time.monotonic()
+        batch = self._batches.get((token, chat_id))
+        if batch is None:
+            batch = self._batches[(token, chat_id)] = {"messages": [], "deadline": now + self.batch_window}
+        else:
+            self.coalesced += 1
+        batch["messages"].append(message)
+        if urgent:
+            batch["deadline"] = now
+        self._queue.task_done()
+
+    def _close_batches(self, now):
+        """合并窗口结束的消息生成汇总，放入发送队列"""
+        for key in [key for key, batch in self._batches.items() if batch["deadline"] <= now]:
+            token, chat_id = key
+            batch = self._batches.pop(key)
+            for text in build_digest(batch["messages"]):
+                self._outbox.append({"token": token, "chat_id": chat_id, "text": text, "attempts": 0, "notBefore": now})
+
+    def _ready_at(self, item):
+        return max(item["notBefore"], self._chat_ready.get(item["chat_id"], 0.0), self._global_ready)
+
+    def _send_ready(self, now):
+        """按顺序发送已到时间、且满足频率限制的消息"""
+        for item in list(self._outbox):
+            if self._ready_at(item) > now:
+                continue
+            chat_id = item["chat_id"]
+            status, retry_after = self._post(item["token"], chat_id, item["text"])
+            now = time.monotonic()
+            interval = GROUP_CHAT_INTERVAL if chat_id.startswith("-") else PRIVATE_CHAT_INTERVAL
+            self._chat_ready[chat_id] = now + interval
+            self._global_ready = now + GLOBAL_INTERVAL
+
+            if status == "ok":
+                self._outbox.remove(item)
+                self.sent += 1
+                continue
+
+            if status == "rate_limited":
+                # 被限速不计入重试次数，该聊天的所有消息都等待 retry_after
+                self.rate_limited += 1
+                self._chat_ready[chat_id] = now + retry_after
+                self.add_log("WARNING", f"Telegram 限速，{retry_after} 秒后重试")
+                continue
+
+            item["attempts"] += 1
+            if status == "fatal" or item["attempts"] >= MAX_ATTEMPTS:
+                self._outbox.remove(item)
+                self.failed += 1
+                self.add_log("ERROR", f"Telegram 消息发送失败，已放弃（尝试 {item['attempts']} 次）")
+                continue
+
+            self.retried += 1
+            item["notBefore"] = now + RETRY_BACKOFF ** item["attempts"]
+
+    def _post(self, token, chat_id, text):
+        """
+        调用 Telegram API 发送一条消息
+
+        Returns:
+            tuple: (状态 ok/rate_limited/retry/fatal, 限速等待秒数)
+        """
+        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        try:
+            response = self._session.post(url, json={"chat_id": chat_id, "text": text}, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.Timeout:
+            self.add_log("WARNING", "发送Telegram消息超时")
+            return "retry", 0
+        except requests.exceptions.RequestException as e:
+            self.add_log("WARNING", f"发送Telegram消息时发生网络错误: {str(e)}")
+            return "retry", 0
+
+        if response.status_code == 200:
+            return "ok", 0
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after", 5))
+            except (ValueError, AttributeError):
+                retry_after = 5.0
+            return "rate_limited", retry_after
+
+        self.add_log("ERROR", f"发送消息到Telegram失败: 状态码={response.status_code}, 响应={response.text[:200]}")
+        # 5xx 为服务端临时错误可重试，其它 4xx（Token/Chat ID 错误等）重试也不会成功
+        return ("retry" if response.status_code >= 500 else "fatal"), 0
+
+    def get_status(self):
+        return {
+            "pending": self._queue.qsize() + sum(len(batch["messages"]) for batch in list(self._batches.values())),
+            "outbox": len(self._outbox),
+            "batchWindow": self.batch_window,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "retried": self.retried,
+            "rateLimited": self.rate_limited,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
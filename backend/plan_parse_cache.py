@@ -0,0 +1,116 @@
+"""
+服务器型号解析缓存模块
+按型号保存原始目录数据（含 addonFamilies 和 pricings）的哈希及解析结果，
+刷新服务器列表时哈希未变化的型号直接复用上次的解析结果，只完整解析新增或变化的型号
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+
+
+# 解析逻辑变化时递增，使旧的磁盘缓存全部失效
+PARSER_VERSION = 2
+
+# 不写入缓存的字段（每次刷新都会重新获取）
+VOLATILE_FIELDS = ("datacenters", "price")
+
+
+class PlanParseCache:
+    """按型号哈希缓存解析结果（持久化到磁盘）"""
+
+    def __init__(self, cache_file, add_log_func=None):
+        """
+        初始化解析缓存
+
+        Args:
+            cache_file: 缓存文件路径
+            add_log_func: 添加日志的函数
+        """
+        self.cache_file = cache_file
+        self.add_log = add_log_func
+        self._lock = threading.Lock()
+        self._entries = {}  # planCode -> {"hash": ..., "record": ...}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def digest(plan):
+        """计算原始型号数据的哈希（键排序，保证相同内容得到相同结果）"""
+        raw = json.dumps(plan, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def load(self):
+        """从磁盘加载缓存，版本不一致或文件损坏时忽略"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != PARSER_VERSION:
+                if self.add_log:
+                    self.add_log("INFO", "型号解析缓存版本已变化，将重新解析所有型号")
+                return
+            with self._lock:
+                self._entries = data.get("plans", {})
+        except Exception as e:
+            if self.add_log:
+                self.add_log("WARNING", f"加载型号解析缓存失败: {str(e)}")
+
+    def get(self, plan_code, plan_hash):
+        """
+        获取缓存的解析结果
+
+        Returns:
+            dict: 解析结果的副本，哈希不匹配或不存在时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(plan_code)
+            if not entry or entry.get("hash") != plan_hash:
+                return None
+            return copy.deepcopy(entry["record"])
+
+    def put(self, plan_code, plan_hash, record):
+        """保存解析结果（不包含每次刷新都会变化的字段）"""
+        stored = {k: copy.deepcopy(v) for k, v in record.items() if k not in VOLATILE_FIELDS}
+        with self._lock:
+            self._entries[plan_code] = {"hash": plan_hash, "record": stored}
+            self._dirty = True
+
+    def prune(self, plan_codes, prefix=""):
+        """删除目录中已不存在的型号（prefix 不为空时只检查以其开头的条目）"""
+        keep = set(plan_codes)
+        with self._lock:
+            removed = [code for code in self._entries if code.startswith(prefix) and code not in keep]
+            for code in removed:
+                del self._entries[code]
+            if removed:
+                self._dirty = True
+        return len(removed)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+    def save(self):
+        """写入磁盘（先写临时文件再替换，避免写入中断导致缓存损坏）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": PARSER_VERSION, "plans": self._entries}
+            tmp_file = self.cache_file + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+            except Exception as e:
+                if self.add_log:
+                    self.add_log("WARNING", f"保存型号解析缓存失败: {str(e)}")
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,169 @@
+"""
+抢购流程耗时追踪模块
+使用单调时钟记录购买流程每个步骤（可用性检查、创建购物车、添加商品、配置、选项、绑定、结账）的耗时，
+结果随抢购历史保存，并按步骤和数据中心汇总 p50/p95
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# 每个 (数据中心, 步骤) 保留的最近样本数
+MAX_SAMPLES = 500
+
+# 只计数、不计入耗时样本的结果（队列重试时的无货检查，不是真正的购买）
+COUNT_ONLY_OUTCOMES = ("unavailable",)
+
+# 购买流程的步骤顺序（用于汇总结果排序）
+PURCHASE_STEPS = [
+    "availability",
+    "cart_create",
+    "item_add",
+    "configure",
+    "option_lookup",
+    "option_add",
+    "assign",
+    "checkout",
+]
+
+
+class PurchaseTrace:
+    """单次购买流程的步骤计时器（开始新步骤时自动结束上一个步骤）"""
+
+    def __init__(self, plan_code, datacenter):
+        self.plan_code = plan_code
+        self.datacenter = datacenter
+        self.steps = []
+        self.outcome = None
+        self._start = time.perf_counter()
+        self._current = None  # (步骤名, 开始时间)
+        self._end = None
+
+    def begin(self, step):
+        """开始一个新步骤"""
+        now = time.perf_counter()
+        self._close(now, ok=True)
+        self._current = (step, now)
+
+    def _close(self, now, ok):
+        if self._current is not None:
+            name, started = self._current
+            self.steps.append({"step": name, "ms": round((now - started) * 1000, 1), "ok": ok})
+            self._current = None
+
+    def finish(self, outcome):
+        """
+        结束追踪
+
+        Args:
+            outcome: 结果 (success / failed / unavailable)
+        """
+        if self._end is not None:
+            return
+        now = time.perf_counter()
+        # 失败时当前步骤即为出错的步骤
+        self._close(now, ok=(outcome != "failed"))
+        self._end = now
+        self.outcome = outcome
+
+    @property
+    def total_ms(self):
+        end = self._end if self._end is not None else time.perf_counter()
+        return round((end - self._start) * 1000, 1)
+
+    def to_dict(self):
+        return {
+            "outcome": self.outcome,
+            "totalMs": self.total_ms,
+            "steps": list(self.steps)
+        }
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class TraceAggregator:
+    """按步骤和数据中心汇总购买耗时"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}  # (datacenter, step) -> deque[ms]
+        self._outcomes = {}  # outcome -> count
+
+    def record(self, trace):
+        """记录一次追踪结果（PurchaseTrace 或其 to_dict() 结果）"""
+        data = trace.to_dict() if isinstance(trace, PurchaseTrace) else trace
+        datacenter = trace.datacenter if isinstance(trace, PurchaseTrace) else data.get("datacenter")
+        if not data or not data.get("steps"):
+            return
+
+        with self._lock:
+            outcome = data.get("outcome") or "unknown"
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            if outcome in COUNT_ONLY_OUTCOMES:
+                return
+            # 同一步骤可能出现多次（如多个配置项），按步骤合计
+            per_step = {}
+            for entry in data["steps"]:
+                per_step[entry["step"]] = per_step.get(entry["step"], 0) + entry["ms"]
+            per_step["total"] = data.get("totalMs", sum(per_step.values()))
+            for step, ms in per_step.items():
+                key = (datacenter or "unknown", step)
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.max_samples)
+                samples.append(ms)
+
+    def load_history(self, history):
+        """从抢购历史中恢复样本"""
+        for entry in history:
+            trace = entry.get("trace")
+            if isinstance(trace, dict):
+                self.record(dict(trace, datacenter=entry.get("datacenter")))
+
+    def stats(self, datacenter=None):
+        """
+        获取汇总结果
+
+        Args:
+            datacenter: 只返回指定数据中心，None表示全部
+
+        Returns:
+            dict: {"overall": {step: {...}}, "byDatacenter": {dc: {step: {...}}}, "outcomes": {...}}
+        """
+        with self._lock:
+            items = [(key, list(values)) for key, values in self._samples.items()]
+            outcomes = dict(self._outcomes)
+
+        order = {step: i for i, step in enumerate(PURCHASE_STEPS + ["total"])}
+        overall = {}
+        by_dc = {}
+        for (dc, step), values in items:
+            if datacenter and dc != datacenter:
+                continue
+            by_dc.setdefault(dc, {})[step] = values
+            overall.setdefault(step, []).extend(values)
+
+        def summarize(step_values):
+            result = {}
+            for step in sorted(step_values, key=lambda s: order.get(s, len(order))):
+                values = sorted(step_values[step])
+                result[step] = {
+                    "count": len(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "max": values[-1] if values else None
+                }
+            return result
+
+        return {
+            "overall": summarize(overall),
+            "byDatacenter": {dc: summarize(steps) for dc, steps in sorted(by_dc.items())},
+            "outcomes": outcomes
+        }
@@ -0,0 +1,162 @@
+"""
+抢购工作线程池模块
+将到期的队列项分派给有界的工作线程并发执行购买，
+单个慢速的购物车流程不会再拖慢其它队列项
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 线程池的硬上限，实际并发数由 max_workers 控制（可在运行时调整）
+MAX_POOL_SIZE = 16
+
+# 单次购买流程大约消耗的OVH API请求数（可用性检查 + 购物车 + 配置 + 结账）
+PURCHASE_REQUEST_COST = 8
+
+# 利用率统计窗口（秒）
+UTILIZATION_WINDOW = 300
+
+
+class PurchaseWorkerPool:
+    """有界抢购工作线程池"""
+
+    def __init__(self, run_item_func, add_log_func, max_workers=3, rate_budget=None):
+        """
+        初始化工作线程池
+
+        Args:
+            run_item_func: 执行单个队列项购买的函数，参数为队列项
+            add_log_func: 添加日志的函数
+            max_workers: 最大并发购买数
+            rate_budget: 共享的OVH请求预算（RateBudget），None表示不限制
+        """
+        self.run_item = run_item_func
+        self.add_log = add_log_func
+        self.rate_budget = rate_budget
+        self.max_workers = self._clamp(max_workers)
+
+        self._executor = ThreadPoolExecutor(max_workers=MAX_POOL_SIZE, thread_name_prefix="purchase")
+        self._lock = threading.Lock()
+        self._in_flight = {}  # item_id -> 正在执行的购买信息
+        self._busy_plans = set()  # 正在购买中的 planCode（同型号互斥，避免重复下单）
+
+        # 统计
+        self._started_at = time.monotonic()
+        self._busy_seconds = 0.0
+        self._recent = deque()  # (结束时间, 开始时间)，用于计算窗口内利用率
+        self.completed = 0
+        self.skipped_plan_busy = 0
+        self.skipped_pool_full = 0
+        self.skipped_budget = 0
+
+    @staticmethod
+    def _clamp(value):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = 3
+        return max(1, min(MAX_POOL_SIZE, value))
+
+    def set_max_workers(self, max_workers):
+        """调整最大并发购买数"""
+        with self._lock:
+            self.max_workers = self._clamp(max_workers)
+        self.add_log("INFO", f"抢购并发数已设置为 {self.max_workers}", "queue")
+
+    def is_in_flight(self, item_id):
+        with self._lock:
+            return item_id in self._in_flight
+
+    def has_capacity(self):
+        with self._lock:
+            return len(self._in_flight) < self.max_workers
+
+    def submit(self, item):
+        """
+        尝试将队列项分派给工作线程
+
+        Args:
+            item: 队列项
+
+        Returns:
+            bool: 是否已分派（同型号正在购买、线程池已满或预算不足时返回False）
+        """
+        with self._lock:
+            if item["id"] in self._in_flight:
+                return False
+            if item["planCode"] in self._busy_plans:
+                self.skipped_plan_busy += 1
+                return False
+            if len(self._in_flight) >= self.max_workers:
+                self.skipped_pool_full += 1
+                return False
+            if self.rate_budget is not None and not self.rate_budget.try_acquire(PURCHASE_REQUEST_COST):
+                self.skipped_budget += 1
+                return False
+
+            self._in_flight[item["id"]] = {
+                "id": item["id"],
+                "planCode": item["planCode"],
+                "datacenter": item["datacenter"],
+                "startedAt": time.time(),
+                "_start": time.monotonic()
+            }
+            self._busy_plans.add(item["planCode"])
+
+        self._executor.submit(self._run, item)
+        return True
+
+    def _run(self, item):
+        try:
+            self.run_item(item)
+        except Exception as e:
+            self.add_log("ERROR", f"抢购工作线程执行任务 {item['id']} 出错: {str(e)}", "queue")
+            self.add_log("ERROR", f"错误详情: {traceback.format_exc()}", "queue")
+        finally:
+            end = time.monotonic()
+            with self._lock:
+                info = self._in_flight.pop(item["id"], None)
+                self._busy_plans.discard(item["planCode"])
+                if info:
+                    self._busy_seconds += end - info["_start"]
+                    self._recent.append((end, info["_start"]))
+                self.completed += 1
+                self._trim_recent(end)
+
+    def _trim_recent(self, now):
+        cutoff = now - UTILIZATION_WINDOW
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    def get_status(self):
+        """获取线程池状态（用于仪表盘显示）"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim_recent(now)
+            window_start = max(self._started_at, now - UTILIZATION_WINDOW)
+            window = max(now - window_start, 1e-6)
+
+            # 窗口内已完成任务的忙碌时间 + 正在执行任务的忙碌时间
+            busy = sum(end - max(start, window_start) for end, start in self._recent)
+            busy += sum(now - max(info["_start"], window_start) for info in self._in_flight.values())
+
+            in_flight = [
+                {k: v for k, v in info.items() if not k.startswith("_")}
+                for info in self._in_flight.values()
+            ]
+
+            return {
+                "maxWorkers": self.max_workers,
+                "activeWorkers": len(in_flight),
+                "inFlight": in_flight,
+                "utilization": round(len(in_flight) / self.max_workers, 3),
+                "avgUtilization": round(min(1.0, busy / (window * self.max_workers)), 3),
+                "completed": self.completed,
+                "skippedPlanBusy": self.skipped_plan_busy,
+                "skippedPoolFull": self.skipped_pool_full,
+                "skippedBudget": self.skipped_budget
+            }
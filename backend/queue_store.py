@@ -0,0 +1,305 @@
+"""
+抢购队列存储模块
+提供按ID索引、按状态分桶、按到期时间排序、带墓碑(已删除记录)TTL清理的线程安全队列，
+队列处理线程每秒的调度只需取出已到期的任务，不再线性扫描整个队列
+"""
+
+import heapq
+import threading
+import time
+
+
+# 已删除任务ID的保留时间（秒），超时后自动清理，避免集合无限增长
+TOMBSTONE_TTL = 60 * 60
+
+
+class QueueRepository:
+    """线程安全的抢购队列存储"""
+
+    def __init__(self, tombstone_ttl=TOMBSTONE_TTL):
+        """
+        初始化队列存储
+
+        Args:
+            tombstone_ttl: 已删除任务ID的保留时间（秒）
+        """
+        self._lock = threading.RLock()
+        self._items = {}  # id -> 队列项（保持插入顺序）
+        self._by_status = {}  # status -> {id: None}（保持插入顺序）
+        self._by_plan = {}  # planCode -> {id: None}
+        self._tombstones = {}  # id -> 删除时间（monotonic）
+        self._due_heap = []  # (到期时间, 序号, id)，只包含运行中且未在执行的任务
+        self._due_at = {}  # id -> 当前有效的到期时间（堆中其它记录视为过期）
+        self._seq = 0
+        self.tombstone_ttl = tombstone_ttl
+        self._last_cleanup = time.monotonic()
+        self.interval_func = None  # 计算任务实际重试间隔的函数 interval_func(item)，None表示使用 retryInterval
+
+        self.version = 0
+        self._snapshot = ()
+        self._snapshot_version = 0
+
+    # ---------- 内部索引维护 ----------
+
+    def _index(self, item):
+        self._by_status.setdefault(item.get("status"), {})[item["id"]] = None
+        self._by_plan.setdefault(item.get("planCode"), {})[item["id"]] = None
+
+    def _unindex(self, item):
+        bucket = self._by_status.get(item.get("status"))
+        if bucket is not None:
+            bucket.pop(item["id"], None)
+        plan_bucket = self._by_plan.get(item.get("planCode"))
+        if plan_bucket is not None:
+            plan_bucket.pop(item["id"], None)
+            if not plan_bucket:
+                del self._by_plan[item.get("planCode")]
+
+    def _bump(self):
+        self.version += 1
+
+    def _schedule_locked(self, item_id, due_at):
+        self._seq += 1
+        self._due_at[item_id] = due_at
+        heapq.heappush(self._due_heap, (due_at, self._seq, item_id))
+
+    def _schedule_item_locked(self, item):
+        """运行中的任务按上次检查时间 + 重试间隔计算到期时间"""
+        if item.get("status") != "running":
+            self._due_at.pop(item["id"], None)
+            return
+        last_check_time = item.get("lastCheckTime", 0) or 0
+        due_at = last_check_time + self._retry_interval(item) if last_check_time else 0
+        self._schedule_locked(item["id"], due_at)
+
+    def _retry_interval(self, item):
+        interval = item.get("retryInterval", 30)
+        if self.interval_func is not None:
+            try:
+                return self.interval_func(item)
+            except Exception:
+                return interval
+        return interval
+
+    # ---------- 写操作 ----------
+
+    def load(self, items):
+        """从持久化数据加载队列（替换当前内容）"""
+        with self._lock:
+            self._items = {}
+            self._by_status = {}
+            self._by_plan = {}
+            self._due_heap = []
+            self._due_at = {}
+            for item in items or []:
+                if not isinstance(item, dict) or "id" not in item:
+                    continue
+                self._items[item["id"]] = item
+                self._index(item)
+                self._schedule_item_locked(item)
+            self._bump()
+
+    def add(self, item):
+        """添加队列项"""
+        with self._lock:
+            self._items[item["id"]] = item
+            self._index(item)
+            self._tombstones.pop(item["id"], None)
+            self._schedule_item_locked(item)
+            self._bump()
+        return item
+
+    append = add
+
+    def remove(self, item_id):
+        """
+        删除队列项并记录墓碑（后台线程据此立即停止处理）
+
+        Returns:
+            被删除的队列项，不存在时返回None
+        """
+        with self._lock:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                self._unindex(item)
+                self._due_at.pop(item_id, None)
+                self._tombstones[item_id] = time.monotonic()
+                self._bump()
+            self._cleanup_locked()
+            return item
+
+    def clear(self):
+        """清空队列，所有任务记录墓碑，返回删除数量"""
+        with self._lock:
+            now = time.monotonic()
+            count = len(self._items)
+            for item_id in self._items:
+                self._tombstones[item_id] = now
+            self._items = {}
+            self._by_status = {}
+            self._by_plan = {}
+            self._due_heap = []
+            self._due_at = {}
+            self._bump()
+            self._cleanup_locked()
+            return count
+
+    def set_status(self, item_id, status):
+        """更新队列项状态（同时维护状态分桶）"""
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None:
+                return None
+            if item.get("status") != status:
+                self._unindex(item)
+                item["status"] = status
+                self._index(item)
+                self._schedule_item_locked(item)
+                self._bump()
+            return item
+
+    def pop_due(self, now=None):
+        """
+        取出所有已到期的运行中任务（按到期时间先后排序，等待最久的在前）
+        取出的任务不会再次返回，直到调用 reschedule 重新排期
+
+        Args:
+            now: 当前时间戳，默认 time.time()
+
+        Returns:
+            list: 到期的队列项
+        """
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._due_heap and self._due_heap[0][0] <= now:
+                due_at, _, item_id = heapq.heappop(self._due_heap)
+                # 跳过过期的堆记录（任务已删除、状态已变化或已重新排期）
+                if self._due_at.get(item_id) != due_at:
+                    continue
+                del self._due_at[item_id]
+                item = self._items.get(item_id)
+                if item is not None and item.get("status") == "running":
+                    due.append(item)
+            # 堆过大（大量过期记录）时重建
+            if len(self._due_heap) > 2 * len(self._due_at) + 64:
+                self._due_heap = [(due_at, seq, item_id) for due_at, seq, item_id in self._due_heap
+                                  if self._due_at.get(item_id) == due_at]
+                heapq.heapify(self._due_heap)
+        return due
+
+    def take(self, item_id):
+        """
+        直接取出一个运行中的任务（不等待到期，如快速通道立即分派）
+        取出的任务与 pop_due 返回的任务相同，直到调用 reschedule 才会再次被调度
+
+        Returns:
+            dict: 队列项，任务不存在、不在运行中或已被取出时返回None
+        """
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None or item.get("status") != "running" or item_id not in self._due_at:
+                return None
+            del self._due_at[item_id]
+            return item
+
+    def reschedule(self, item_id, due_at=None):
+        """
+        重新排期任务
+
+        Args:
+            item_id: 任务ID
+            due_at: 到期时间戳，None表示按上次检查时间 + 重试间隔计算
+        """
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None or item.get("status") != "running":
+                return
+            if due_at is None:
+                self._schedule_item_locked(item)
+            else:
+                self._schedule_locked(item_id, due_at)
+
+    # ---------- 读操作 ----------
+
+    def get(self, item_id):
+        with self._lock:
+            return self._items.get(item_id)
+
+    def contains(self, item_id):
+        with self._lock:
+            return item_id in self._items
+
+    def is_deleted(self, item_id):
+        """任务是否已被删除（墓碑未过期）"""
+        with self._lock:
+            return item_id in self._tombstones
+
+    def by_status(self, *statuses):
+        """按状态获取队列项列表"""
+        with self._lock:
+            result = []
+            for status in statuses:
+                bucket = self._by_status.get(status)
+                if bucket:
+                    result.extend(self._items[item_id] for item_id in bucket)
+            return result
+
+    def count_by_status(self, *statuses):
+        with self._lock:
+            return sum(len(self._by_status.get(status, ())) for status in statuses)
+
+    def find_by_plan(self, plan_code):
+        """按 planCode 获取队列项列表"""
+        with self._lock:
+            return [self._items[item_id] for item_id in self._by_plan.get(plan_code, ())]
+
+    def snapshot(self):
+        """
+        获取队列的只读快照（按版本缓存，版本未变化时不会重新复制）
+
+        Returns:
+            tuple: 队列项元组
+        """
+        with self._lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = tuple(self._items.values())
+                self._snapshot_version = self.version
+            return self._snapshot
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    # ---------- 墓碑清理 ----------
+
+    def cleanup_tombstones(self):
+        """清理过期的墓碑记录（最多每分钟执行一次）"""
+        with self._lock:
+            self._cleanup_locked()
+
+    def _cleanup_locked(self, force=False):
+        now = time.monotonic()
+        # 最多每分钟清理一次，避免频繁删除时重复扫描
+        if not force and now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        cutoff = now - self.tombstone_ttl
+        expired = [item_id for item_id, deleted_at in self._tombstones.items() if deleted_at < cutoff]
+        for item_id in expired:
+            del self._tombstones[item_id]
+
+    def get_status(self):
+        with self._lock:
+            return {
+                "total": len(self._items),
+                "version": self.version,
+                "byStatus": {status: len(ids) for status, ids in self._by_status.items() if ids},
+                "scheduled": len(self._due_at),
+                "tombstones": len(self._tombstones)
+            }
@@ -0,0 +1,113 @@
+"""
+OVH API 请求预算模块
+所有后台组件（抢购、监控、狙击）共享同一个令牌桶，避免并发后超出OVH的速率限制
+"""
+
+import threading
+import time
+
+
+class RateBudget:
+    """共享的令牌桶请求预算（按每分钟请求数计）"""
+
+    def __init__(self, requests_per_minute=600, burst=None):
+        """
+        初始化请求预算
+
+        Args:
+            requests_per_minute: 每分钟允许的请求数
+            burst: 令牌桶容量，默认等于每秒请求数的5倍（至少10）
+        """
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.burst = burst or max(10, self.requests_per_minute // 12)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+
+        # 统计
+        self.granted = 0
+        self.rejected = 0
+        self.waited_seconds = 0.0
+
+    @property
+    def rate_per_second(self):
+        return self.requests_per_minute / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+            self._last_refill = now
+
+    def try_acquire(self, cost=1):
+        """立即尝试扣除预算，不足时返回False（不阻塞）"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= cost:
+                self._tokens -= cost
+                self.granted += cost
+                return True
+            self.rejected += cost
+            return False
+
+    def acquire(self, cost=1, timeout=None):
+        """
+        阻塞等待直到预算足够
+
+        Args:
+            cost: 需要的请求数
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            bool: 是否成功获得预算
+        """
+        # 单次请求超过桶容量时按桶容量计算，避免永远无法满足
+        cost = min(cost, self.burst)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start = time.monotonic()
+
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    self.granted += cost
+                    self.waited_seconds += time.monotonic() - start
+                    return True
+
+                wait_time = (cost - self._tokens) / self.rate_per_second
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += cost
+                        return False
+                    wait_time = min(wait_time, remaining)
+                self._cond.wait(wait_time)
+
+    def available(self):
+        """当前可用的请求数"""
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+    def set_rate(self, requests_per_minute):
+        """调整每分钟请求数"""
+        with self._cond:
+            self._refill()
+            self.requests_per_minute = max(1, int(requests_per_minute))
+            self.burst = max(10, self.requests_per_minute // 12)
+            self._tokens = min(self._tokens, self.burst)
+            self._cond.notify_all()
+
+    def get_status(self):
+        """获取预算状态"""
+        return {
+            "requestsPerMinute": self.requests_per_minute,
+            "burst": self.burst,
+            "available": self.available(),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "waitedSeconds": round(self.waited_seconds, 2)
+        }
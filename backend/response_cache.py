@@ -0,0 +1,168 @@
+"""
+预序列化响应缓存模块
+服务器列表只在刷新时变化，因此每个目录版本只序列化一次 JSON，
+同时预先生成 gzip/brotli 压缩版本并计算强 ETag（每种编码使用不同的 ETag，如 "<sha1>-gzip"）；
+请求时 ETag 匹配直接返回 304，否则按 Accept-Encoding 直接返回缓存的字节
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    # brotli 为可选依赖，未安装时只提供 gzip
+    brotli = None
+
+
+# 最多缓存的响应数量（按子公司/版本）
+MAX_ENTRIES = 8
+
+# 小于该大小的响应不压缩
+MIN_COMPRESS_BYTES = 1024
+
+
+class SerializedResponse:
+    """一份预序列化的响应（原始字节、压缩版本、ETag）"""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.digest = hashlib.sha1(self.body).hexdigest()
+        self.etag = '"' + self.digest + '"'
+        self.encodings = {}
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            self.encodings["gzip"] = gzip.compress(self.body, compresslevel=6)
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(self.body, quality=5)
+
+    def etag_for(self, encoding):
+        """各编码的强 ETag（同一内容的不同编码是不同的表示，不能共用强 ETag）"""
+        return self.etag if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def sizes(self):
+        sizes = {"identity": len(self.body)}
+        sizes.update({name: len(data) for name, data in self.encodings.items()})
+        return sizes
+
+
+def _accepted_encodings(header):
+    """解析 Accept-Encoding（忽略 q=0 的编码）"""
+    accepted = set()
+    for part in (header or "").split(","):
+        fields = part.strip().split(";")
+        name = fields[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+def _etag_matches(header, digest):
+    """If-None-Match 中是否有同一内容（任一编码）的 ETag"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        # 反向代理可能把强 ETag 改为弱 ETag，比较时忽略 W/ 前缀；304 只需确认内容未变化，忽略编码后缀
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').partition("-")[0] == digest:
+            return True
+    return False
+
+
+class ResponseCache:
+    """按键缓存预序列化的 JSON 响应"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.builds = 0
+        self.not_modified = 0
+
+    def get(self, key, build_payload):
+        """
+        获取缓存的响应，不存在时调用 build_payload() 生成并序列化
+
+        Args:
+            key: 缓存键（应包含数据版本）
+            build_payload: 生成响应数据的函数
+
+        Returns:
+            SerializedResponse
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = SerializedResponse(build_payload())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.builds += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def respond(self, entry, req, headers=None):
+        """
+        根据请求返回 304 或缓存的字节
+
+        Args:
+            entry: SerializedResponse
+            req: Flask request
+            headers: 额外的响应头
+
+        Returns:
+            Flask Response
+        """
+        accepted = _accepted_encodings(req.headers.get("Accept-Encoding"))
+        encoding = next((name for name in ("br", "gzip") if name in accepted and name in entry.encodings), "identity")
+
+        base_headers = {"ETag": entry.etag_for(encoding), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        base_headers.update(headers or {})
+
+        if _etag_matches(req.headers.get("If-None-Match"), entry.digest):
+            self.not_modified += 1
+            return Response(status=304, headers=base_headers)
+
+        if encoding != "identity":
+            base_headers["Content-Encoding"] = encoding
+            return Response(entry.encodings[encoding], status=200, mimetype="application/json", headers=base_headers)
+        return Response(entry.body, status=200, mimetype="application/json", headers=base_headers)
+
+    def get_status(self):
+        with self._lock:
+            entries = list(self._entries.items())
+        return {
+            "entries": len(entries),
+            "brotli": brotli is not None,
+            "hits": self.hits,
+            "builds": self.builds,
+            "notModified": self.not_modified,
+            "sizes": {str(key): entry.sizes() for key, entry in entries}
+        }
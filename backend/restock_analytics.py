@@ -0,0 +1,388 @@
+"""
+补货统计模块
+服务器监控和VPS监控观察到的每次有货/无货变化都记录为事件，
+按 (型号, 数据中心, 配置) 增量更新统计：补货次数和频率、每次有货持续时间的分布、
+常见的补货时段（一周中的星期和小时）、距上次补货的时间，
+/api/monitor/analytics 直接返回已计算好的结果
+启动时从保存的事件重建统计，安装了 NumPy 时使用向量化聚合，否则逐条重放（结果相同）
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy 为可选依赖
+    np = None
+
+
+# 保留的事件数量
+MAX_EVENTS = 50000
+
+# 每个型号保留的最近补货时间数量（用于核对补货时段预测）
+MAX_PLAN_RESTOCKS = 100
+
+# 型号级补货的去重时段（秒）：同一次补货通常在多个数据中心/配置同时出现，每个时段只计一次
+PLAN_RESTOCK_BUCKET = 3600
+
+# 事件类型
+EVENT_RESTOCK = 1  # 从无货变有货
+EVENT_SOLD_OUT = 2  # 从有货变无货
+EVENT_FIRST_IN = 3  # 首次观察到有货（不计为补货）
+EVENT_FIRST_OUT = 4  # 首次观察到无货
+
+# 有货持续时间的分布区间（秒）
+DURATION_BUCKETS = (
+    ("<5m", 300),
+    ("5-15m", 900),
+    ("15m-1h", 3600),
+    ("1-6h", 6 * 3600),
+    ("6-24h", 24 * 3600),
+    (">24h", float("inf"))
+)
+
+HOURS_PER_WEEK = 168
+WEEKDAYS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+
+def hour_of_week(timestamp):
+    """时间戳 -> 一周中的小时（周一0点为0，本地时间）"""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+def duration_bucket(seconds):
+    for index, (_, limit) in enumerate(DURATION_BUCKETS):
+        if seconds < limit:
+            return index
+    return len(DURATION_BUCKETS) - 1
+
+
+def _new_stats():
+    return {
+        "restocks": 0,
+        "soldOuts": 0,
+        "firstSeen": None,
+        "lastRestock": None,
+        "lastSoldOut": None,
+        "inStockSince": None,
+        "inStock": False,
+        "hourOfWeek": [0] * HOURS_PER_WEEK,
+        "durationCount": 0,
+        "durationSum": 0.0,
+        "durationMin": None,
+        "durationMax": None,
+        "durationBuckets": [0] * len(DURATION_BUCKETS),
+        "intervalSum": 0.0,
+        "intervalCount": 0
+    }
+
+
+def _summarize(key, stats):
+    """生成对外的统计结果（不含与当前时间相关的字段）"""
+    plan_code, datacenter, config = key
+    span = (stats["lastSoldOut"] or stats["lastRestock"] or stats["firstSeen"] or 0) - (stats["firstSeen"] or 0)
+    hours = stats["hourOfWeek"]
+    peak_hours = sorted((h for h in range(HOURS_PER_WEEK) if hours[h]), key=lambda h: (-hours[h], h))[:3]
+    count = stats["durationCount"]
+    return {
+        "planCode": plan_code,
+        "datacenter": datacenter,
+        "config": config or None,
+        "restocks": stats["restocks"],
+        "soldOuts": stats["soldOuts"],
+        "inStock": stats["inStock"],
+        "firstSeen": stats["firstSeen"],
+        "lastRestock": stats["lastRestock"],
+        "restocksPerDay": round(stats["restocks"] / (span / 86400), 3) if span >= 3600 else None,
+        "avgRestockInterval": round(stats["intervalSum"] / stats["intervalCount"]) if stats["intervalCount"] else None,
+        "timeInStock": {
+            "count": count,
+            "avg": round(stats["durationSum"] / count) if count else None,
+            "min": round(stats["durationMin"]) if stats["durationMin"] is not None else None,
+            "max": round(stats["durationMax"]) if stats["durationMax"] is not None else None,
+            "distribution": {label: stats["durationBuckets"][i] for i, (label, _) in enumerate(DURATION_BUCKETS)}
+        },
+        "typicalRestockTimes": [
+            {"weekday": WEEKDAYS[h // 24], "hour": h % 24, "count": hours[h]} for h in peak_hours
+        ]
+    }
+
+
+class RestockAnalytics:
+    """补货统计（按事件增量更新）"""
+
+    def __init__(self, add_log_func, max_events=MAX_EVENTS):
+        """
+        初始化补货统计
+
+        Args:
+            add_log_func: 添加日志的函数
+            max_events: 保留的事件数量
+        """
+        self.add_log = add_log_func
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max_events)  # [时间戳, 型号, 数据中心, 配置, 事件类型]
+        self._stats = {}  # (型号, 数据中心, 配置) -> 统计
+        self._summaries = {}  # (型号, 数据中心, 配置) -> _summarize 的结果
+        self._plan_hours = {}  # 型号 -> 每周各小时的补货次数（每个去重时段只计一次）
+        self._plan_restocks = {}  # 型号 -> 最近的补货时间（每个去重时段第一次补货的时间）
+        self._plan_days = {}  # 型号 -> 有补货的日期（时间戳 // 86400）
+        self.vectorized_rebuild = False
+
+    def record(self, plan_code, datacenter, config, was_available, is_available, timestamp=None):
+        """
+        记录一次状态观察（只有首次观察和有货/无货发生变化时才产生事件）
+
+        Args:
+            plan_code: 型号
+            datacenter: 数据中心
+            config: 配置描述（没有配置时为None）
+            was_available: 上次是否有货，首次观察为None
+            is_available: 当前是否有货
+            timestamp: 时间戳，默认为当前时间
+
+        Returns:
+            int: 事件类型，没有产生事件时返回None
+        """
+        if was_available is None:
+            event_type = EVENT_FIRST_IN if is_available else EVENT_FIRST_OUT
+        elif was_available == is_available:
+            return None
+        else:
+            event_type = EVENT_RESTOCK if is_available else EVENT_SOLD_OUT
+
+        event = [time.time() if timestamp is None else timestamp, plan_code, datacenter, config or "", event_type]
+        with self._lock:
+            self._events.append(event)
+            key = (event[1], event[2], event[3])
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _new_stats()
+            self._apply(stats, event[0], event_type)
+            self._summaries[key] = _summarize(key, stats)
+            if event_type == EVENT_RESTOCK:
+                self._add_plan_restock(plan_code, event[0])
+        return event_type
+
+    def _add_plan_restock(self, plan_code, ts):
+        """累加型号级补货（同一去重时段内多个数据中心/配置的补货只计一次）"""
+        hours = self._plan_hours.get(plan_code)
+        if hours is None:
+            hours = self._plan_hours[plan_code] = [0] * HOURS_PER_WEEK
+            self._plan_restocks[plan_code] = deque(maxlen=MAX_PLAN_RESTOCKS)
+            self._plan_days[plan_code] = set()
+        bucket = int(ts // PLAN_RESTOCK_BUCKET)
+        if any(int(previous // PLAN_RESTOCK_BUCKET) == bucket for previous in self._plan_restocks[plan_code]):
+            return
+        hours[hour_of_week(ts)] += 1
+        self._plan_restocks[plan_code].append(ts)
+        self._plan_days[plan_code].add(int(ts // 86400))
+
+    @staticmethod
+    def _apply(stats, ts, event_type):
+        """把一个事件累加到统计中"""
+        if stats["firstSeen"] is None:
+            stats["firstSeen"] = ts
+
+        if event_type in (EVENT_RESTOCK, EVENT_FIRST_IN):
+            if event_type == EVENT_RESTOCK:
+                stats["restocks"] += 1
+                stats["hourOfWeek"][hour_of_week(ts)] += 1
+                if stats["lastRestock"] is not None:
+                    stats["intervalSum"] += ts - stats["lastRestock"]
+                    stats["intervalCount"] += 1
+                stats["lastRestock"] = ts
+            stats["inStock"] = True
+            stats["inStockSince"] = ts
+            return
+
+        if event_type == EVENT_SOLD_OUT:
+            stats["soldOuts"] += 1
+            stats["lastSoldOut"] = ts
+            if stats["inStockSince"] is not None:
+                duration = ts - stats["inStockSince"]
+                stats["durationCount"] += 1
+                stats["durationSum"] += duration
+                stats["durationMin"] = duration if stats["durationMin"] is None else min(stats["durationMin"], duration)
+                stats["durationMax"] = duration if stats["durationMax"] is None else max(stats["durationMax"], duration)
+                stats["durationBuckets"][duration_bucket(duration)] += 1
+        stats["inStock"] = False
+        stats["inStockSince"] = None
+
+    # ---------- 重建 ----------
+
+    def load_list(self, events):
+        """从保存的事件重建统计"""
+        valid = [
+            [float(e[0]), e[1], e[2], e[3] or "", int(e[4])] for e in events or []
+            if isinstance(e, list) and len(e) == 5 and e[4] in (EVENT_RESTOCK, EVENT_SOLD_OUT, EVENT_FIRST_IN, EVENT_FIRST_OUT)
+        ]
+        valid.sort(key=lambda e: e[0])
+        with self._lock:
+            self._events.clear()
+            self._events.extend(valid)
+            events = list(self._events)
+            if np is not None and events:
+                self._stats = self._rebuild_numpy(events)
+                self.vectorized_rebuild = True
+            else:
+                self._stats = self._rebuild_python(events)
+                self.vectorized_rebuild = False
+            self._summaries = {key: _summarize(key, stats) for key, stats in self._stats.items()}
+            self._plan_hours = {}
+            self._plan_restocks = {}
+            self._plan_days = {}
+            for ts, plan_code, _, _, event_type in events:
+                if event_type == EVENT_RESTOCK:
+                    self._add_plan_restock(plan_code, ts)
+
+    def _rebuild_python(self, events):
+        stats_by_key = {}
+        for ts, plan_code, datacenter, config, event_type in events:
+            stats = stats_by_key.setdefault((plan_code, datacenter, config), _new_stats())
+            self._apply(stats, ts, event_type)
+        return stats_by_key
+
+    @staticmethod
+    def _rebuild_numpy(events):
+        """向量化聚合：按 (键, 时间) 排序后用相邻事件计算有货持续时间和补货间隔"""
+        keys = {}
+        key_index = np.array([keys.setdefault((e[1], e[2], e[3]), len(keys)) for e in events], dtype=np.int64)
+        ts = np.array([e[0] for e in events], dtype=np.float64)
+        kinds = np.array([e[4] for e in events], dtype=np.int64)
+        how = np.array([hour_of_week(t) for t in ts.tolist()], dtype=np.int64)
+        n_keys = len(keys)
+
+        order = np.lexsort((ts, key_index))
+        key_index, ts, kinds, how = key_index[order], ts[order], kinds[order], how[order]
+
+        restock = kinds == EVENT_RESTOCK
+        sold_out = kinds == EVENT_SOLD_OUT
+        comes_in = restock | (kinds == EVENT_FIRST_IN)
+
+        restocks = np.bincount(key_index[restock], minlength=n_keys)
+        sold_outs = np.bincount(key_index[sold_out], minlength=n_keys)
+        hour_counts = np.bincount(key_index[restock] * HOURS_PER_WEEK + how[restock],
+                                  minlength=n_keys * HOURS_PER_WEEK).reshape(n_keys, HOURS_PER_WEEK)
+
+        # 每个键的第一个和最后一个事件
+        first = np.ones(len(ts), dtype=bool)
+        first[1:] = key_index[1:] != key_index[:-1]
+        last = np.ones(len(ts), dtype=bool)
+        last[:-1] = key_index[:-1] != key_index[1:]
+
+        # 有货持续时间：无货事件与同一键的前一个事件（补货或首次有货）之差
+        paired = np.zeros(len(ts), dtype=bool)
+        paired[1:] = sold_out[1:] & ~first[1:] & comes_in[:-1]
+        durations = np.zeros(len(ts), dtype=np.float64)
+        durations[1:] = ts[1:] - ts[:-1]
+        duration_keys, duration_values = key_index[paired], durations[paired]
+        limits = np.array([limit for _, limit in DURATION_BUCKETS[:-1]], dtype=np.float64)
+        buckets = np.searchsorted(limits, duration_values, side="right")
+        bucket_counts = np.bincount(duration_keys * len(DURATION_BUCKETS) + buckets,
+                                    minlength=n_keys * len(DURATION_BUCKETS)).reshape(n_keys, len(DURATION_BUCKETS))
+
+        # 补货间隔：同一键相邻两次补货之差
+        restock_keys, restock_ts = key_index[restock], ts[restock]
+        same_key = restock_keys[1:] == restock_keys[:-1]
+        interval_keys = restock_keys[1:][same_key]
+        interval_values = (restock_ts[1:] - restock_ts[:-1])[same_key]
+
+        duration_count = np.bincount(duration_keys, minlength=n_keys)
+        duration_sum = np.bincount(duration_keys, weights=duration_values, minlength=n_keys)
+        duration_min = np.full(n_keys, np.inf)
+        np.minimum.at(duration_min, duration_keys, duration_values)
+        duration_max = np.full(n_keys, -np.inf)
+        np.maximum.at(duration_max, duration_keys, duration_values)
+        interval_count = np.bincount(interval_keys, minlength=n_keys)
+        interval_sum = np.bincount(interval_keys, weights=interval_values, minlength=n_keys)
+
+        def last_time(mask):
+            values = np.full(n_keys, np.nan)
+            # 已按时间排序，后面的赋值覆盖前面的
+            values[key_index[mask]] = ts[mask]
+            return values
+
+        last_restock = last_time(restock)
+        last_sold_out = last_time(sold_out)
+
+        stats_by_key = {}
+        first_ts = dict(zip(key_index[first].tolist(), ts[first].tolist()))
+        last_kind = dict(zip(key_index[last].tolist(), kinds[last].tolist()))
+        last_ts = dict(zip(key_index[last].tolist(), ts[last].tolist()))
+        for key, index in keys.items():
+            stats = _new_stats()
+            stats["restocks"] = int(restocks[index])
+            stats["soldOuts"] = int(sold_outs[index])
+            stats["firstSeen"] = first_ts[index]
+            stats["lastRestock"] = None if np.isnan(last_restock[index]) else float(last_restock[index])
+            stats["lastSoldOut"] = None if np.isnan(last_sold_out[index]) else float(last_sold_out[index])
+            stats["inStock"] = last_kind[index] in (EVENT_RESTOCK, EVENT_FIRST_IN)
+            stats["inStockSince"] = last_ts[index] if stats["inStock"] else None
+            stats["hourOfWeek"] = hour_counts[index].tolist()
+            if duration_count[index]:
+                stats["durationCount"] = int(duration_count[index])
+                stats["durationSum"] = float(duration_sum[index])
+                stats["durationMin"] = float(duration_min[index])
+                stats["durationMax"] = float(duration_max[index])
+            stats["durationBuckets"] = bucket_counts[index].tolist()
+            stats["intervalSum"] = float(interval_sum[index])
+            stats["intervalCount"] = int(interval_count[index])
+            stats_by_key[key] = stats
+        return stats_by_key
+
+    # ---------- 查询 ----------
+
+    def to_list(self):
+        with self._lock:
+            return list(self._events)
+
+    def plan_hour_counts(self, plan_code):
+        """型号每周各小时的补货次数，同一去重时段内多个数据中心/配置的补货只计一次（没有记录时返回None）"""
+        with self._lock:
+            hours = self._plan_hours.get(plan_code)
+            return list(hours) if hours is not None else None
+
+    def plan_restocks_between(self, plan_code, start, end):
+        """型号在时间段内的补货次数（每个去重时段只计一次）"""
+        with self._lock:
+            return sum(1 for ts in self._plan_restocks.get(plan_code, ()) if start <= ts < end)
+
+    def plan_restock_days(self, plan_code):
+        """型号有补货的不同日期数"""
+        with self._lock:
+            return len(self._plan_days.get(plan_code, ()))
+
+    def query(self, plan_code=None, datacenter=None, now=None):
+        """
+        获取统计结果
+
+        Args:
+            plan_code: 只返回指定型号
+            datacenter: 只返回指定数据中心
+            now: 当前时间戳
+
+        Returns:
+            list: 统计结果（按补货次数从多到少）
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            items = [
+                summary for key, summary in self._summaries.items()
+                if (not plan_code or key[0] == plan_code) and (not datacenter or key[1] == datacenter)
+            ]
+        result = []
+        for summary in items:
+            item = dict(summary)
+            item["secondsSinceLastRestock"] = round(now - summary["lastRestock"]) if summary["lastRestock"] else None
+            result.append(item)
+        result.sort(key=lambda item: (-item["restocks"], item["planCode"], item["datacenter"], item["config"] or ""))
+        return result
+
+    def get_status(self):
+        with self._lock:
+            return {"events": len(self._events), "keys": len(self._stats), "vectorizedRebuild": self.vectorized_rebuild}
@@ -0,0 +1,173 @@
+"""
+补货时段预测模块
+根据补货统计中每个型号在一周各小时的补货次数，判断当前是否临近历史上补货集中的时段：
+临近时返回加速倍数，监控调度、抢购队列重试和配置狙击据此临时提高该型号的检查频率
+（监控按倍数提高权重后仍在每分钟请求预算内分配，抢购队列和配置狙击仍受共享的OVH请求预算限制），
+每个预测时段结束后与实际补货核对并记录命中情况
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from restock_analytics import HOURS_PER_WEEK, PLAN_RESTOCK_BUCKET, WEEKDAYS, hour_of_week
+
+
+# 预测窗口：当前小时起的小时数（提前进入加速）
+WINDOW_HOURS = 2
+
+# 至少有这么多次补货记录才预测（同一去重时段内多个数据中心/配置的补货只计一次）
+MIN_RESTOCKS = 5
+
+# 补货至少分布在这么多个不同日期才预测（避免一两次集中补货被当作规律）
+MIN_RESTOCK_DAYS = 3
+
+# 窗口内补货占比至少为均匀分布的倍数才视为补货集中时段
+MIN_LIFT = 2.0
+
+# 最大加速倍数
+MAX_BOOST = 4.0
+
+# 保留的预测记录数量
+MAX_PREDICTIONS = 200
+
+
+class RestockWindowPredictor:
+    """补货时段预测（按型号、按小时缓存）"""
+
+    def __init__(self, analytics, add_log_func, enabled=True):
+        """
+        初始化补货时段预测
+
+        Args:
+            analytics: RestockAnalytics
+            add_log_func: 添加日志的函数
+            enabled: 是否启用（关闭时加速倍数始终为1）
+        """
+        self.analytics = analytics
+        self.add_log = add_log_func
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._cache = {}  # 型号 -> (小时编号, 预测)
+        self._active = {}  # 型号 -> 进行中的预测
+        self._history = deque(maxlen=MAX_PREDICTIONS)
+        self._observed = {}  # 型号 -> 最近一次计入的补货去重时段
+        self.hits = 0
+        self.misses = 0
+        self.restocks_in_window = 0
+        self.restocks_outside_window = 0
+
+    def predict(self, plan_code, now=None):
+        """
+        预测型号当前是否临近补货集中时段
+
+        Returns:
+            dict: {"likelihood", "lift", "boost", "windowStart", "windowEnd"}，不在补货集中时段时返回None
+        """
+        hours = self.analytics.plan_hour_counts(plan_code)
+        total = sum(hours) if hours else 0
+        if total < MIN_RESTOCKS or self.analytics.plan_restock_days(plan_code) < MIN_RESTOCK_DAYS:
+            return None
+
+        now = time.time() if now is None else now
+        current = hour_of_week(now)
+        window_count = sum(hours[(current + offset) % HOURS_PER_WEEK] for offset in range(WINDOW_HOURS))
+        likelihood = window_count / total
+        lift = likelihood / (WINDOW_HOURS / HOURS_PER_WEEK)
+        if lift < MIN_LIFT:
+            return None
+
+        window_start = now - (now % 3600)
+        return {
+            "likelihood": round(likelihood, 3),
+            "lift": round(lift, 2),
+            "boost": round(min(MAX_BOOST, lift / MIN_LIFT + 1), 2),
+            "windowStart": window_start,
+            "windowEnd": window_start + WINDOW_HOURS * 3600
+        }
+
+    def boost(self, plan_code, now=None):
+        """
+        型号当前的检查加速倍数（不在补货集中时段时为1），每个型号每小时只计算一次
+
+        Args:
+            plan_code: 型号
+            now: 当前时间戳
+
+        Returns:
+            float: 加速倍数
+        """
+        if not self.enabled or not plan_code:
+            return 1.0
+        now = time.time() if now is None else now
+        hour_index = int(now // 3600)
+        with self._lock:
+            cached = self._cache.get(plan_code)
+        if cached is not None and cached[0] == hour_index:
+            prediction = cached[1]
+        else:
+            self._evaluate(now)
+            prediction = self.predict(plan_code, now)
+            with self._lock:
+                self._cache[plan_code] = (hour_index, prediction)
+                if prediction and plan_code not in self._active:
+                    self._active[plan_code] = dict(prediction, planCode=plan_code, restocks=0)
+                    self._log_prediction(plan_code, prediction)
+        return prediction["boost"] if prediction else 1.0
+
+    def _log_prediction(self, plan_code, prediction):
+        start = datetime.fromtimestamp(prediction["windowStart"])
+        self.add_log("INFO", f"预测 {plan_code} 即将进入补货集中时段（{WEEKDAYS[start.weekday()]} {start.hour}:00 起 {WINDOW_HOURS} 小时，"
+                             f"历史补货占比 {prediction['likelihood']:.0%}），检查频率提高到 {prediction['boost']} 倍", "monitor")
+
+    def observe_restock(self, plan_code, now=None):
+        """记录实际补货（用于统计预测覆盖了多少补货，同一去重时段内只计一次）"""
+        now = time.time() if now is None else now
+        bucket = int(now // PLAN_RESTOCK_BUCKET)
+        with self._lock:
+            if self._observed.get(plan_code) == bucket:
+                return
+            self._observed[plan_code] = bucket
+            active = self._active.get(plan_code)
+            if active and active["windowStart"] <= now < active["windowEnd"]:
+                active["restocks"] += 1
+                self.restocks_in_window += 1
+            else:
+                self.restocks_outside_window += 1
+
+    def _evaluate(self, now):
+        """核对已结束的预测时段"""
+        with self._lock:
+            finished = [plan_code for plan_code, active in self._active.items() if active["windowEnd"] <= now]
+            results = [self._active.pop(plan_code) for plan_code in finished]
+        for result in results:
+            restocks = self.analytics.plan_restocks_between(result["planCode"], result["windowStart"], result["windowEnd"])
+            result["restocks"] = restocks
+            result["hit"] = restocks > 0
+            with self._lock:
+                self._history.append(result)
+                if result["hit"]:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            self.add_log("INFO", f"补货时段预测{'命中' if result['hit'] else '未命中'}: {result['planCode']}"
+                                 f"（预测占比 {result['likelihood']:.0%}，实际补货 {restocks} 次）", "monitor")
+
+    def get_status(self, now=None):
+        now = time.time() if now is None else now
+        self._evaluate(now)
+        with self._lock:
+            evaluated = self.hits + self.misses
+            observed = self.restocks_in_window + self.restocks_outside_window
+            return {
+                "enabled": self.enabled,
+                "active": [dict(active) for active in self._active.values()],
+                "recent": list(self._history)[-20:],
+                "hits": self.hits,
+                "misses": self.misses,
+                "precision": round(self.hits / evaluated, 3) if evaluated else None,
+                "restocksInWindow": self.restocks_in_window,
+                "restocksOutsideWindow": self.restocks_outside_window,
+                "coverage": round(self.restocks_in_window / observed, 3) if observed else None
+            }
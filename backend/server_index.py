@@ -0,0 +1,255 @@
+"""
+服务器列表列式索引模块
+每次目录刷新后把服务器列表解析为按列存储的数值数组（内存GB、存储TB、硬盘类型、带宽、价格、
+各数据中心的可用性位掩码），/api/servers 的范围过滤、排序、搜索和分页在这些数组上用向量化掩码计算，
+不再让每个客户端下载整个目录后在浏览器中过滤
+安装了 NumPy 时使用 NumPy 数组，否则退回到纯 Python 列表实现（结果相同）
+"""
+
+import math
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy 为可选依赖
+    np = None
+
+
+# 硬盘类型位标志
+DISK_TYPES = {"nvme": 1, "ssd": 2, "hdd": 4}
+
+# 可排序的字段
+SORT_FIELDS = ("price", "memory", "storage", "bandwidth", "name", "planCode")
+
+# 视为无货的可用性状态
+UNAVAILABLE_STATES = ("unavailable", "unknown")
+
+RE_MEMORY = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB|T|G)\b', re.IGNORECASE)
+RE_STORAGE = re.compile(r'(?:(\d+)\s*[x×]\s*)?(\d+(?:\.\d+)?)\s*(TB|GB|T|G)\b', re.IGNORECASE)
+RE_BANDWIDTH = re.compile(r'(\d+(?:\.\d+)?)\s*(Gbps|Mbps)', re.IGNORECASE)
+RE_DISK_NVME = re.compile(r'nvme', re.IGNORECASE)
+RE_DISK_SSD = re.compile(r'ssd', re.IGNORECASE)
+RE_DISK_HDD = re.compile(r'hdd|sata|\bsa\b', re.IGNORECASE)
+
+NAN = float("nan")
+
+
+def parse_memory_gb(text):
+    """"64 GB" / "128GB DDR4" -> 64.0 / 128.0，无法解析返回NaN"""
+    match = RE_MEMORY.search(text or "")
+    if not match:
+        return NAN
+    value = float(match.group(1))
+    return value * 1024 if match.group(2).upper().startswith("T") else value
+
+
+def parse_storage(text):
+    """
+    解析存储描述
+
+    Returns:
+        tuple: (总容量TB，无法解析为NaN；硬盘类型位标志)
+    """
+    text = text or ""
+    total_gb = 0.0
+    for count, size, unit in RE_STORAGE.findall(text):
+        size_gb = float(size) * (1000 if unit.upper().startswith("T") else 1)
+        total_gb += size_gb * (int(count) if count else 1)
+    disk_flags = 0
+    if RE_DISK_NVME.search(text):
+        disk_flags |= DISK_TYPES["nvme"]
+    if RE_DISK_SSD.search(text):
+        disk_flags |= DISK_TYPES["ssd"]
+    if RE_DISK_HDD.search(text):
+        disk_flags |= DISK_TYPES["hdd"]
+    return (total_gb / 1000 if total_gb else NAN), disk_flags
+
+
+def parse_bandwidth_mbps(text):
+    """"1 Gbps" / "500 Mbps / 无限流量" -> 1000.0 / 500.0，无法解析返回NaN"""
+    match = RE_BANDWIDTH.search(text or "")
+    if not match:
+        return NAN
+    value = float(match.group(1))
+    return value * 1000 if match.group(2).lower() == "gbps" else value
+
+
+class ServerIndex:
+    """服务器列表的列式索引（行顺序与原服务器列表一致）"""
+
+    def __init__(self, servers):
+        """
+        从服务器列表建立索引
+
+        Args:
+            servers: 服务器列表（load_server_list 的结果）
+        """
+        self.size = len(servers)
+        self.datacenter_bits = {}  # 数据中心代码 -> 位序号
+
+        memory, storage, disks, bandwidth, price, available, names, plan_codes, text = ([] for _ in range(9))
+        for server in servers:
+            memory.append(parse_memory_gb(server.get("memory")))
+            storage_tb, disk_flags = parse_storage(server.get("storage"))
+            storage.append(storage_tb)
+            disks.append(disk_flags)
+            bandwidth.append(parse_bandwidth_mbps(server.get("bandwidth")))
+            price_info = server.get("price")
+            price.append(float(price_info["value"]) if isinstance(price_info, dict) and price_info.get("value") is not None else NAN)
+
+            mask = 0
+            for dc in server.get("datacenters") or []:
+                code = (dc.get("datacenter") or "").lower()
+                if not code or dc.get("availability") in UNAVAILABLE_STATES:
+                    continue
+                if code not in self.datacenter_bits:
+                    self.datacenter_bits[code] = len(self.datacenter_bits)
+                mask |= 1 << self.datacenter_bits[code]
+            available.append(mask)
+
+            names.append((server.get("name") or "").lower())
+            plan_codes.append((server.get("planCode") or "").lower())
+            text.append(" ".join(str(server.get(field) or "") for field in
+                                 ("planCode", "name", "description", "cpu", "memory", "storage", "bandwidth")).lower())
+
+        self.vectorized = np is not None and len(self.datacenter_bits) <= 63
+        if self.vectorized:
+            self.columns = {
+                "memory": np.array(memory, dtype=np.float64),
+                "storage": np.array(storage, dtype=np.float64),
+                "disk": np.array(disks, dtype=np.int64),
+                "bandwidth": np.array(bandwidth, dtype=np.float64),
+                "price": np.array(price, dtype=np.float64),
+                "available": np.array(available, dtype=np.int64),
+                "name": np.array(names, dtype=object),
+                "planCode": np.array(plan_codes, dtype=object)
+            }
+        else:
+            self.columns = {
+                "memory": memory, "storage": storage, "disk": disks, "bandwidth": bandwidth,
+                "price": price, "available": available, "name": names, "planCode": plan_codes
+            }
+        self.text = text
+
+    def datacenter_mask(self, datacenters):
+        """数据中心列表 -> 位掩码（未出现过的数据中心忽略）"""
+        mask = 0
+        for code in datacenters:
+            bit = self.datacenter_bits.get(code.lower())
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def query(self, ranges=None, disks=None, datacenters=None, search=None, sort=None, offset=0, limit=None):
+        """
+        过滤、排序和分页
+
+        Args:
+            ranges: {字段: (最小值或None, 最大值或None)}，字段为 memory/storage/bandwidth/price
+            disks: 硬盘类型列表（nvme/ssd/hdd，满足任意一种）
+            datacenters: 数据中心列表（在任意一个有货）
+            search: 搜索文本（空格分隔的词都需匹配型号、名称、描述或配置）
+            sort: 排序字段，前缀 "-" 表示降序，无法解析的值排在最后
+            offset: 分页起始位置
+            limit: 每页数量，None表示不限制
+
+        Returns:
+            tuple: (当前页的行号列表, 匹配的总数)
+        """
+        ranges = ranges or {}
+        disk_mask = 0
+        for disk in disks or []:
+            disk_mask |= DISK_TYPES.get(disk.lower(), 0)
+        dc_mask = self.datacenter_mask(datacenters) if datacenters else None
+        terms = [term for term in (search or "").lower().split() if term]
+
+        if self.vectorized:
+            rows = self._filter_numpy(ranges, disks, disk_mask, dc_mask, terms)
+            rows = self._sort_numpy(rows, sort)
+            total = len(rows)
+            end = None if limit is None else offset + limit
+            return rows[offset:end].tolist(), total
+
+        rows = self._filter_python(ranges, disks, disk_mask, dc_mask, terms)
+        rows = self._sort_python(rows, sort)
+        total = len(rows)
+        end = None if limit is None else offset + limit
+        return rows[offset:end], total
+
+    # ---------- NumPy 实现 ----------
+
+    def _filter_numpy(self, ranges, disks, disk_mask, dc_mask, terms):
+        mask = np.ones(self.size, dtype=bool)
+        for field, (low, high) in ranges.items():
+            column = self.columns[field]
+            # NaN 与任何数比较都为 False，设置了范围时无法解析的行会被排除
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+        if disks:
+            mask &= (self.columns["disk"] & disk_mask) != 0
+        if dc_mask is not None:
+            mask &= (self.columns["available"] & dc_mask) != 0
+        rows = np.flatnonzero(mask)
+        if terms:
+            rows = np.array([row for row in rows if all(term in self.text[row] for term in terms)], dtype=np.int64)
+        return rows
+
+    def _sort_numpy(self, rows, sort):
+        field, descending = _parse_sort(sort)
+        if field is None or len(rows) == 0:
+            return rows
+        values = self.columns[field][rows]
+        if values.dtype == object:
+            order = np.array(sorted(range(len(rows)), key=values.__getitem__, reverse=descending), dtype=np.int64)
+        else:
+            # NaN 始终排在最后
+            keys = -values if descending else values
+            order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")
+        return rows[order]
+
+    # ---------- 纯 Python 实现 ----------
+
+    def _filter_python(self, ranges, disks, disk_mask, dc_mask, terms):
+        rows = []
+        columns = self.columns
+        for row in range(self.size):
+            matched = True
+            for field, (low, high) in ranges.items():
+                value = columns[field][row]
+                if (low is not None and not value >= low) or (high is not None and not value <= high):
+                    matched = False
+                    break
+            if not matched:
+                continue
+            if disks and not columns["disk"][row] & disk_mask:
+                continue
+            if dc_mask is not None and not columns["available"][row] & dc_mask:
+                continue
+            if terms and not all(term in self.text[row] for term in terms):
+                continue
+            rows.append(row)
+        return rows
+
+    def _sort_python(self, rows, sort):
+        field, descending = _parse_sort(sort)
+        if field is None:
+            return rows
+        column = self.columns[field]
+        if field in ("name", "planCode"):
+            return sorted(rows, key=lambda row: column[row], reverse=descending)
+        valid = [row for row in rows if not math.isnan(column[row])]
+        invalid = [row for row in rows if math.isnan(column[row])]
+        return sorted(valid, key=lambda row: column[row], reverse=descending) + invalid
+
+
+def _parse_sort(sort):
+    if not sort:
+        return None, False
+    descending = sort.startswith("-")
+    field = sort.lstrip("-+")
+    if field not in SORT_FIELDS:
+        raise ValueError(f"不支持的排序字段: {field}")
+    return field, descending
@@ -5,14 +5,39 @@
 
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import traceback
 
+from monitor_scheduler import AdaptiveScheduler, PRIORITY_WEIGHTS, DEFAULT_PRIORITY
+from monitor_state import StatusState
+
+
+# 同时检查的订阅数上限
+DEFAULT_MAX_WORKERS = 4
+MAX_POOL_SIZE = 16
+
+# 监控每分钟最多发起的检查次数（所有订阅共享）
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+# 调度循环的检查周期（秒），以及重新分配各订阅间隔的周期（秒）
+SCHEDULER_TICK = 1
+RESCHEDULE_SECONDS = 30
+
+# 单个订阅检查消耗的OVH API请求数（一次可用性查询）
+CHECK_REQUEST_COST = 1
+
+# 保留的调度延迟样本数量
+LAG_HISTORY = 200
+
 
 class ServerMonitor:
     """服务器监控类"""
     
-    def __init__(self, check_availability_func, send_notification_func, add_log_func):
+    def __init__(self, check_availability_func, send_notification_func, add_log_func,
+                 rate_budget=None, max_workers=DEFAULT_MAX_WORKERS, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 transition_func=None, boost_func=None):
         """
         初始化监控器
         
@@ -20,20 +45,45 @@ class ServerMonitor:
             check_availability_func: 检查服务器可用性的函数
             send_notification_func: 发送通知的函数
             add_log_func: 添加日志的函数
+            rate_budget: 共享的OVH请求预算（RateBudget），None表示不限制
+            max_workers: 同时检查的订阅数
+            requests_per_minute: 监控每分钟最多发起的检查次数
+            transition_func: 状态变化回调 transition_func(planCode, 数据中心, 配置描述, 旧状态, 新状态)，用于补货统计
+            boost_func: 补货时段加速倍数 boost_func(planCode)，临近补货集中时段的订阅分到更多检查次数
         """
         self.check_availability = check_availability_func
         self.send_notification = send_notification_func
         self.add_log = add_log_func
+        self.rate_budget = rate_budget
+        self.transition_func = transition_func
+        self.boost_func = boost_func
+        self.worker_pool = None  # 多进程模式的工作进程池（MonitorWorkerPool），None表示在本进程内检查
+        self.max_workers = max(1, min(MAX_POOL_SIZE, int(max_workers)))
+        self.requests_per_minute = max(1, int(requests_per_minute))
         
         self.subscriptions = []  # 订阅列表
+        self.status_states = {}  # planCode -> StatusState（各订阅上次检查的状态）
+        self.state_updated_at = {}  # planCode -> 状态表最后更新的时间戳（切换到多进程模式时与共享存储比较新旧）
         self.known_servers = set()  # 已知服务器集合
         self.running = False  # 运行状态
-        self.check_interval = 60  # 检查间隔（秒），默认60秒
+        self.check_interval = 60  # 基准检查间隔（秒），各订阅的实际间隔在此基础上自适应调整
         self.thread = None
+        self._stop_event = threading.Event()
+        
+        # 各订阅的自适应检查间隔
+        self.scheduler = AdaptiveScheduler()
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        
+        # 调度统计（相对计划时间的延迟）
+        self.lags = deque(maxlen=LAG_HISTORY)
+        self.check_count = 0
+        self.overrun_count = 0
+        self.budget_skipped = 0
         
         self.add_log("INFO", "服务器监控器初始化完成", "monitor")
     
-    def add_subscription(self, plan_code, datacenters=None, notify_available=True, notify_unavailable=False, server_name=None):
+    def add_subscription(self, plan_code, datacenters=None, notify_available=True, notify_unavailable=False, server_name=None, priority=None):
         """
         添加服务器订阅
         
@@ -43,7 +93,11 @@ class ServerMonitor:
             notify_available: 是否在有货时提醒
             notify_unavailable: 是否在无货时提醒
             server_name: 服务器友好名称（如"KS-2 | Intel Xeon-D 1540"）
+            priority: 检查优先级（high/normal/low），影响自适应检查间隔
         """
+        if priority not in PRIORITY_WEIGHTS:
+            priority = None
+        
         # 检查是否已存在
         existing = next((s for s in self.subscriptions if s["planCode"] == plan_code), None)
         if existing:
@@ -54,6 +108,8 @@ class ServerMonitor:
             # 更新服务器名称（如果提供）
             if server_name:
                 existing["serverName"] = server_name
+            if priority:
+                existing["priority"] = priority
             # 确保历史记录字段存在
             if "history" not in existing:
                 existing["history"] = []
@@ -64,7 +120,7 @@ class ServerMonitor:
             "datacenters": datacenters or [],
             "notifyAvailable": notify_available,
             "notifyUnavailable": notify_unavailable,
-            "lastStatus": {},  # 记录上次状态
+            "priority": priority or DEFAULT_PRIORITY,
             "createdAt": datetime.now().isoformat(),
             "history": []  # 历史记录
         }
@@ -84,6 +140,8 @@ class ServerMonitor:
         self.subscriptions = [s for s in self.subscriptions if s["planCode"] != plan_code]
         
         if len(self.subscriptions) < original_count:
+            self.status_states.pop(plan_code, None)
+            self.state_updated_at.pop(plan_code, None)
             self.add_log("INFO", f"删除订阅: {plan_code}", "monitor")
             return True
         return False
@@ -92,6 +150,8 @@ class ServerMonitor:
         """清空所有订阅"""
         count = len(self.subscriptions)
         self.subscriptions = []
+        self.status_states = {}
+        self.state_updated_at = {}
         self.add_log("INFO", f"清空所有订阅 ({count} 项)", "monitor")
         return count
     
@@ -111,7 +171,10 @@ class ServerMonitor:
                 self.add_log("WARNING", f"无法获取 {plan_code} 的可用性信息", "monitor")
                 return
             
-            last_status = subscription.get("lastStatus", {})
+            state = self.status_states.get(plan_code)
+            if state is None:
+                state = self.status_states[plan_code] = StatusState()
+            state.begin()
             monitored_dcs = subscription.get("datacenters", [])
             
             # 调试日志
@@ -125,15 +188,13 @@ class ServerMonitor:
                 
                 # 如果是简单的数据中心状态（旧版兼容）
                 if isinstance(config_data, str):
-                    dc = config_key
-                    status = config_data
-                    
-                    # 如果指定了数据中心列表，只监控列表中的
-                    if monitored_dcs and dc not in monitored_dcs:
-                        continue
-                    
-                    old_status = last_status.get(dc)
-                    self._check_and_notify_change(subscription, plan_code, dc, status, old_status, None, dc)
+                    # 原地更新状态表（未监控的数据中心也记录状态），只处理状态变化的数据中心
+                    for dc, status, old_status in state.observe_config(None, {config_key: config_data}):
+                        self._record_transition(plan_code, dc, None, old_status, status)
+                        # 如果指定了数据中心列表，只监控列表中的
+                        if monitored_dcs and dc not in monitored_dcs:
+                            continue
+                        self._check_and_notify_change(subscription, plan_code, dc, status, old_status, None, dc)
                 
                 # 如果是配置级别的数据（新版配置监控）
                 elif isinstance(config_data, dict) and "datacenters" in config_data:
@@ -143,43 +204,40 @@ class ServerMonitor:
                     
                     self.add_log("INFO", f"检查配置: {config_display}", "monitor")
                     
-                    # 检查该配置在各个数据中心的可用性
-                    for dc, status in config_data["datacenters"].items():
+                    # 准备配置信息用于通知（同一配置的各数据中心共用）
+                    config_info = {
+                        "memory": memory,
+                        "storage": storage,
+                        "display": config_display
+                    }
+                    
+                    # 使用 (数据中心, 配置) 追踪状态：原地更新状态表，只处理状态变化的数据中心
+                    # （状态未变化时 _check_and_notify_change 不会产生任何通知）
+                    for dc, status, old_status in state.observe_config(config_key, config_data["datacenters"]):
+                        self._record_transition(plan_code, dc, config_display, old_status, status)
                         # 如果指定了数据中心列表，只监控列表中的
                         if monitored_dcs and dc not in monitored_dcs:
                             continue
                         
-                        # 使用配置作为key来追踪状态
-                        status_key = f"{dc}|{config_key}"
-                        old_status = last_status.get(status_key)
-                        
-                        # 准备配置信息用于通知
-                        config_info = {
-                            "memory": memory,
-                            "storage": storage,
-                            "display": config_display
-                        }
-                        
-                        self._check_and_notify_change(subscription, plan_code, dc, status, old_status, config_info, status_key)
+                        self._check_and_notify_change(subscription, plan_code, dc, status, old_status, config_info)
             
-            # 更新状态（需要转换为状态字典）
-            new_last_status = {}
-            for config_key, config_data in current_availability.items():
-                if isinstance(config_data, str):
-                    # 简单的数据中心状态
-                    new_last_status[config_key] = config_data
-                elif isinstance(config_data, dict) and "datacenters" in config_data:
-                    # 配置级别的状态
-                    for dc, status in config_data["datacenters"].items():
-                        status_key = f"{dc}|{config_key}"
-                        new_last_status[status_key] = status
-            
-            subscription["lastStatus"] = new_last_status
+            # 本次没有出现的 (数据中心, 配置) 清除状态
+            state.end()
+            self.state_updated_at[plan_code] = time.time()
             
         except Exception as e:
             self.add_log("ERROR", f"检查 {plan_code} 可用性时出错: {str(e)}", "monitor")
             self.add_log("ERROR", f"错误详情: {traceback.format_exc()}", "monitor")
     
+    def _record_transition(self, plan_code, dc, config_display, old_status, status):
+        """把状态变化交给补货统计（所有数据中心都记录，不受通知设置影响）"""
+        if self.transition_func is None:
+            return
+        try:
+            self.transition_func(plan_code, dc, config_display, old_status, status)
+        except Exception as e:
+            self.add_log("WARNING", f"记录状态变化失败: {str(e)}", "monitor")
+    
     def _check_and_notify_change(self, subscription, plan_code, dc, status, old_status, config_info=None, status_key=None):
         """
         检查状态变化并发送通知
@@ -311,13 +369,13 @@ class ServerMonitor:
                 )
             
             config_desc = f" [{config_info['display']}]" if config_info else ""
-            self.add_log("INFO", f"正在发送Telegram通知: {plan_code}@{datacenter}{config_desc}", "monitor")
+            self.add_log("INFO", f"提交Telegram通知: {plan_code}@{datacenter}{config_desc}", "monitor")
             result = self.send_notification(message)
             
             if result:
-                self.add_log("INFO", f"✅ Telegram通知发送成功: {plan_code}@{datacenter}{config_desc} - {change_type}", "monitor")
+                self.add_log("INFO", f"✅ Telegram通知已加入发送队列: {plan_code}@{datacenter}{config_desc} - {change_type}", "monitor")
             else:
-                self.add_log("WARNING", f"⚠️ Telegram通知发送失败: {plan_code}@{datacenter}{config_desc}", "monitor")
+                self.add_log("WARNING", f"⚠️ Telegram通知未能加入发送队列: {plan_code}@{datacenter}{config_desc}", "monitor")
             
         except Exception as e:
             self.add_log("ERROR", f"发送提醒时发生异常: {str(e)}", "monitor")
@@ -343,10 +401,9 @@ class ServerMonitor:
             new_servers = current_codes - self.known_servers
             
             if new_servers:
+                servers_by_code = {s.get("planCode"): s for s in current_server_list if s.get("planCode")}
                 for server_code in new_servers:
-                    server = next((s for s in current_server_list if s.get("planCode") == server_code), None)
-                    if server:
-                        self.send_new_server_alert(server)
+                    self.send_new_server_alert(servers_by_code[server_code])
                 
                 # 更新已知服务器列表
                 self.known_servers = current_codes
@@ -355,6 +412,52 @@ class ServerMonitor:
         except Exception as e:
             self.add_log("ERROR", f"检查新服务器时出错: {str(e)}", "monitor")
     
+    def handle_catalog_changes(self, event):
+        """
+        处理目录变更（由目录刷新发布，只处理变化的型号）
+        
+        Args:
+            event: 目录变更记录（参见 catalog_changes.CatalogChangeFeed）
+        """
+        try:
+            for server in event.get("added", []):
+                if server.get("planCode") not in self.known_servers:
+                    self.send_new_server_alert(server)
+                    self.known_servers.add(server.get("planCode"))
+            for plan_code in event.get("removed", []):
+                self.known_servers.discard(plan_code)
+            
+            # 只提醒已订阅型号的价格变化
+            subscribed = {sub["planCode"]: sub for sub in self.subscriptions}
+            for change in event.get("priceChanged", []):
+                subscription = subscribed.get(change["planCode"])
+                if subscription:
+                    self.send_price_change_alert(change, subscription.get("serverName"), event.get("zone"))
+        
+        except Exception as e:
+            self.add_log("ERROR", f"处理目录变更时出错: {str(e)}", "monitor")
+    
+    def send_price_change_alert(self, change, server_name=None, zone=None):
+        """发送订阅型号的价格变化提醒"""
+        try:
+            old_price, new_price = change.get("old") or {}, change.get("new") or {}
+            currency = new_price.get("currency") or ""
+            trend = "📉 降价" if change.get("delta", 0) < 0 else "📈 涨价"
+            message = (
+                f"{trend}通知！\n\n"
+                f"型号: {change['planCode']}\n"
+                + (f"名称: {server_name}\n" if server_name else "")
+                + (f"区域: {zone}\n" if zone else "")
+                + f"价格: {old_price.get('value')} → {new_price.get('value')} {currency}/月\n"
+                f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+            
+            self.send_notification(message)
+            self.add_log("INFO", f"发送价格变化提醒: {change['planCode']} ({change.get('delta')})", "monitor")
+            
+        except Exception as e:
+            self.add_log("ERROR", f"发送价格变化提醒失败: {str(e)}", "monitor")
+    
     def send_new_server_alert(self, server):
         """发送新服务器上架提醒"""
         try:
@@ -377,40 +480,192 @@ class ServerMonitor:
             self.add_log("ERROR", f"发送新服务器提醒失败: {str(e)}", "monitor")
     
     def monitor_loop(self):
-        """监控主循环"""
-        self.add_log("INFO", "监控循环已启动", "monitor")
+        """监控主循环（每个订阅按各自的自适应间隔检查，到期的订阅并发检查）"""
+        if self.worker_pool is not None:
+            self._worker_pool_loop(self.worker_pool)
+            return
         
-        while self.running:
-            try:
-                # 检查订阅的服务器
-                if self.subscriptions:
-                    self.add_log("INFO", f"开始检查 {len(self.subscriptions)} 个订阅...", "monitor")
+        self.add_log("INFO", f"监控循环已启动（并发数: {self.max_workers}，每分钟最多 {self.requests_per_minute} 次检查）", "monitor")
+        
+        executor = ThreadPoolExecutor(max_workers=MAX_POOL_SIZE, thread_name_prefix="monitor")
+        last_reschedule = None
+        scheduled_keys = None
+        try:
+            while self.running:
+                try:
+                    now = time.monotonic()
+                    subscriptions = list(self.subscriptions)
+                    subscription_keys = [(s["planCode"], s.get("priority")) for s in subscriptions]
                     
-                    for subscription in self.subscriptions:
-                        if not self.running:  # 检查是否被停止
-                            break
-                        self.check_availability_change(subscription)
-                        time.sleep(1)  # 避免请求过快
-                else:
-                    self.add_log("INFO", "当前无订阅，跳过检查", "monitor")
+                    # 订阅变化或到了重新分配周期时，重新计算各订阅的检查间隔
+                    if subscription_keys != scheduled_keys or last_reschedule is None or now - last_reschedule >= RESCHEDULE_SECONDS:
+                        self.scheduler.update(subscriptions, self.check_interval, self.requests_per_minute / CHECK_REQUEST_COST, now,
+                                              boosts=self._window_boosts(subscriptions))
+                        scheduled_keys = subscription_keys
+                        last_reschedule = now
+                    
+                    by_code = {s["planCode"]: s for s in subscriptions}
+                    for plan_code in self.scheduler.due(now):
+                        with self._in_flight_lock:
+                            if len(self._in_flight) >= self.max_workers:
+                                break
+                            if plan_code in self._in_flight:
+                                continue
+                            self._in_flight.add(plan_code)
+                        self._record_lag(self.scheduler.mark_started(plan_code, now), plan_code)
+                        executor.submit(self._check_with_budget, by_code[plan_code])
                 
-                # 注意：新服务器检查需要在外部调用时传入服务器列表
+                except Exception as e:
+                    self.add_log("ERROR", f"监控循环出错: {str(e)}", "monitor")
+                    self.add_log("ERROR", f"错误详情: {traceback.format_exc()}", "monitor")
                 
-            except Exception as e:
-                self.add_log("ERROR", f"监控循环出错: {str(e)}", "monitor")
-                self.add_log("ERROR", f"错误详情: {traceback.format_exc()}", "monitor")
-            
-            # 等待下次检查（使用可中断的sleep）
-            if self.running:
-                self.add_log("INFO", f"等待 {self.check_interval} 秒后进行下次检查...", "monitor")
-                # 分段sleep，每秒检查一次running状态，实现快速停止
-                for _ in range(self.check_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # 等待下次调度（停止时立即唤醒）
+                self._stop_event.wait(SCHEDULER_TICK)
+        finally:
+            executor.shutdown(wait=False)
+        
+        self.add_log("INFO", "监控循环已停止", "monitor")
+    
+    def _worker_pool_loop(self, pool):
+        """多进程模式的主循环：同步订阅到工作进程，处理它们写入的状态变化"""
+        self.add_log("INFO", f"监控循环已启动（多进程模式，{pool.num_workers} 个工作进程）", "monitor")
+        pool.start()
+        last_sync = None
+        synced_keys = None
+        try:
+            while self.running:
+                try:
+                    now = time.monotonic()
+                    subscriptions = list(self.subscriptions)
+                    subscription_keys = [(s["planCode"], s.get("priority")) for s in subscriptions]
+                    
+                    if subscription_keys != synced_keys or last_sync is None or now - last_sync >= RESCHEDULE_SECONDS:
+                        boosts = self._window_boosts(subscriptions) or {}
+                        pool.sync(
+                            [{
+                                "planCode": s["planCode"],
+                                "priority": s.get("priority"),
+                                "history": s.get("history", []),
+                                "windowBoost": boosts.get(s["planCode"], 1.0)
+                            } for s in subscriptions],
+                            self.check_interval,
+                            self.requests_per_minute / CHECK_REQUEST_COST,
+                            # 首次同步时写入已有的状态表，工作进程接管后不会把已知状态当作首次检查
+                            states={
+                                plan_code: (state.to_compact(), self.state_updated_at.get(plan_code, 0))
+                                for plan_code, state in self.status_states.items()
+                            } if last_sync is None else None
+                        )
+                        synced_keys = subscription_keys
+                        last_sync = now
+                    
+                    pool.supervise()
+                    for transition in pool.poll_transitions():
+                        self.apply_transition(transition)
+                
+                except Exception as e:
+                    self.add_log("ERROR", f"监控循环出错: {str(e)}", "monitor")
+                    self.add_log("ERROR", f"错误详情: {traceback.format_exc()}", "monitor")
+                
+                self._stop_event.wait(SCHEDULER_TICK)
+        finally:
+            pool.stop()
         
         self.add_log("INFO", "监控循环已停止", "monitor")
     
+    def apply_transition(self, transition):
+        """
+        处理工作进程写入的一个状态变化（更新本进程的状态表、记录补货统计、发送通知和记录历史）
+        
+        Args:
+            transition: {"planCode", "datacenter", "configKey", "memory", "storage", "oldStatus", "status"}
+        """
+        plan_code = transition["planCode"]
+        subscription = next((s for s in self.subscriptions if s["planCode"] == plan_code), None)
+        if subscription is None:
+            return
+        
+        dc, status, old_status = transition["datacenter"], transition["status"], transition["oldStatus"]
+        config_key = transition.get("configKey") or None
+        config_info = None
+        if config_key:
+            config_info = {
+                "memory": transition.get("memory"),
+                "storage": transition.get("storage"),
+                "display": f"{transition.get('memory')} + {transition.get('storage')}"
+            }
+        
+        state = self.status_states.get(plan_code)
+        if state is None:
+            state = self.status_states[plan_code] = StatusState()
+        state.observe_config(config_key, {dc: status})
+        self.state_updated_at[plan_code] = max(self.state_updated_at.get(plan_code, 0), transition.get("ts") or 0)
+        
+        self._record_transition(plan_code, dc, config_info["display"] if config_info else None, old_status, status)
+        
+        monitored_dcs = subscription.get("datacenters", [])
+        if monitored_dcs and dc not in monitored_dcs:
+            return
+        self._check_and_notify_change(subscription, plan_code, dc, status, old_status, config_info)
+    
+    def set_worker_pool(self, pool):
+        """切换多进程模式（运行中时重启监控循环）"""
+        was_running = self.running
+        if was_running:
+            self.stop()
+        self.worker_pool = pool
+        if was_running:
+            self.start()
+    
+    def _window_boosts(self, subscriptions):
+        """各订阅的补货时段加速倍数"""
+        if self.boost_func is None:
+            return None
+        boosts = {}
+        for subscription in subscriptions:
+            try:
+                boosts[subscription["planCode"]] = self.boost_func(subscription["planCode"])
+            except Exception as e:
+                self.add_log("WARNING", f"计算补货时段加速倍数失败: {str(e)}", "monitor")
+        return boosts
+    
+    def _check_with_budget(self, subscription):
+        """在共享请求预算内检查单个订阅（等不到预算则推迟到下一个间隔）"""
+        plan_code = subscription["planCode"]
+        try:
+            if not self.running:
+                return
+            if self.rate_budget and not self.rate_budget.acquire(CHECK_REQUEST_COST, timeout=self.check_interval):
+                self.budget_skipped += 1
+                self.add_log("WARNING", f"请求预算不足，推迟检查 {plan_code}", "monitor")
+                return
+            self.check_availability_change(subscription)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(plan_code)
+    
+    def _record_lag(self, lag, plan_code):
+        self.check_count += 1
+        self.lags.append(lag)
+        interval = self.scheduler.plans.get(plan_code, {}).get("interval", self.check_interval)
+        # 晚于计划超过一个完整间隔视为超时
+        if lag > interval:
+            self.overrun_count += 1
+    
+    def get_scheduler_stats(self):
+        """调度统计：检查次数、相对计划的延迟、超时次数"""
+        lags = list(self.lags)
+        return {
+            "checks": self.check_count,
+            "overruns": self.overrun_count,
+            "budgetSkipped": self.budget_skipped,
+            "maxWorkers": self.max_workers,
+            "inFlight": len(self._in_flight),
+            "requestsPerMinute": self.requests_per_minute,
+            "avgLagSeconds": round(sum(lags) / len(lags), 2) if lags else None,
+            "maxLagSeconds": round(max(lags), 2) if lags else None
+        }
+    
     def start(self):
         """启动监控"""
         if self.running:
@@ -418,6 +673,7 @@ class ServerMonitor:
             return False
         
         self.running = True
+        self._stop_event.clear()
         self.thread = threading.Thread(target=self.monitor_loop, daemon=True)
         self.thread.start()
         
@@ -431,9 +687,10 @@ class ServerMonitor:
             return False
         
         self.running = False
+        self._stop_event.set()
         self.add_log("INFO", "正在停止服务器监控...", "monitor")
         
-        # 等待线程结束（最多等待3秒，因为已优化为1秒检查一次）
+        # 等待线程结束（最多等待3秒，正在进行的检查不会被中断）
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=3)
         
@@ -447,9 +704,70 @@ class ServerMonitor:
             "subscriptions_count": len(self.subscriptions),
             "known_servers_count": len(self.known_servers),
             "check_interval": self.check_interval,
-            "subscriptions": self.subscriptions
+            "scheduler": self.get_scheduler_stats(),
+            "workers": self.worker_pool.get_status() if self.worker_pool is not None else None,
+            "subscriptions": self._subscriptions_with_schedule()
         }
     
+    def _subscriptions_with_schedule(self):
+        """订阅列表（附带各订阅的实际检查间隔，不修改保存的订阅数据）"""
+        schedule = self.scheduler.get_status()
+        result = self.list_subscriptions()
+        for item in result:
+            item["schedule"] = schedule.get(item["planCode"])
+        return result
+    
+    def list_subscriptions(self):
+        """订阅列表（附带字典格式的 lastStatus，供API展示）"""
+        result = []
+        for subscription in self.subscriptions:
+            item = dict(subscription)
+            state = self.status_states.get(subscription["planCode"])
+            item["lastStatus"] = state.to_dict() if state else {}
+            result.append(item)
+        return result
+    
+    def export_subscriptions(self):
+        """订阅列表（附带紧凑格式的 lastStatus，用于保存）"""
+        result = []
+        for subscription in self.subscriptions:
+            item = dict(subscription)
+            state = self.status_states.get(subscription["planCode"])
+            if state:
+                item["lastStatus"] = state.to_compact()
+                item["lastStatusAt"] = self.state_updated_at.get(subscription["planCode"], 0)
+            result.append(item)
+        return result
+    
+    def restore_subscription_state(self, plan_code, last_status=None, history=None, last_status_at=None):
+        """
+        恢复保存的订阅状态和历史记录
+        
+        Args:
+            plan_code: 服务器型号
+            last_status: 保存的 lastStatus（紧凑格式或旧版字典格式）
+            history: 保存的历史记录
+            last_status_at: lastStatus 最后更新的时间戳（旧版保存的数据没有）
+        """
+        if last_status:
+            self.status_states[plan_code] = StatusState.load(last_status)
+            if last_status_at:
+                self.state_updated_at[plan_code] = last_status_at
+        if history:
+            subscription = next((s for s in self.subscriptions if s["planCode"] == plan_code), None)
+            if subscription is not None:
+                subscription["history"] = history[-100:]
+    
+    def set_requests_per_minute(self, requests_per_minute):
+        """设置监控每分钟最多发起的检查次数（下次重新分配间隔时生效）"""
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.add_log("INFO", f"监控请求预算已设置为每分钟 {self.requests_per_minute} 次", "monitor")
+    
+    def set_max_workers(self, max_workers):
+        """设置同时检查的订阅数"""
+        self.max_workers = max(1, min(MAX_POOL_SIZE, int(max_workers)))
+        self.add_log("INFO", f"监控并发数已设置为 {self.max_workers}", "monitor")
+    
     def set_check_interval(self, interval):
         """设置检查间隔（秒）"""
         if interval < 60:
@@ -5,12 +5,21 @@ import { Link } from "react-router-dom";
 import { useAPI } from "@/context/APIContext";
 import { api } from "@/utils/apiClient";
 
+interface PurchaseWorkersType {
+  maxWorkers: number;
+  activeWorkers: number;
+  inFlight: { id: string; planCode: string; datacenter: string; startedAt: number }[];
+  utilization: number;
+  avgUtilization: number;
+}
+
 interface StatsType {
   activeQueues: number;
   totalServers: number;
   availableServers: number;
   purchaseSuccess: number;
   purchaseFailed: number;
+  purchaseWorkers?: PurchaseWorkersType;
 }
 
 interface QueueItem {
@@ -327,6 +336,25 @@ const Dashboard = () => {
                 已启用
               </span>
             </div>
+            {stats.purchaseWorkers && (
+              <div className="p-2 border-b border-cyber-grid">
+                <div className="flex justify-between items-center">
+                  <span className="text-cyber-muted">抢购线程</span>
+                  <span className="text-cyber-text">
+                    {stats.purchaseWorkers.activeWorkers}/{stats.purchaseWorkers.maxWorkers}
+                    <span className="text-cyber-muted text-xs ml-2">
+                      利用率 {Math.round(stats.purchaseWorkers.avgUtilization * 100)}%
+                    </span>
+                  </span>
+                </div>
+                {stats.purchaseWorkers.inFlight.map((job) => (
+                  <div key={job.id} className="flex justify-between items-center text-xs text-cyber-muted mt-1">
+                    <span>{job.planCode}</span>
+                    <span>{job.datacenter.toUpperCase()} • {Math.max(0, Math.round(Date.now() / 1000 - job.startedAt))}s</span>
+                  </div>
+                ))}
+              </div>
+            )}
             <div className="flex justify-between items-center p-2">
               <span className="text-cyber-muted">版本</span>
               <span className="text-cyber-text">v1.0.0</span>
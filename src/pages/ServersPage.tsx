@@ -22,6 +22,7 @@ import { API_URL } from "@/config/constants";
 // 定义缓存相关的常量
 const CACHE_KEY = 'ovh-servers-cache';
 const CACHE_EXPIRY = 2 * 60 * 60 * 1000; // 缓存2小时过期（与后端保持一致）
+const REFRESH_POLL_INTERVAL = 3000; // 后端刷新服务器列表时，查询刷新任务进度的间隔（毫秒）
 
 // 全局CSS样式
 const globalStyles = `
@@ -122,6 +123,8 @@ const ServersPage = () => {
   const hasLoadedFromCache = useRef(false);
   // 新增：标记是否真正在从API获取数据，防止并发
   const [isActuallyFetching, setIsActuallyFetching] = useState(false);
+  // 正在轮询的后端刷新任务ID，防止重复轮询同一任务
+  const refreshJobRef = useRef<string | null>(null);
   
   // 视图模式：grid 或 list (移动端只支持grid)
   const [viewMode, setViewMode] = useState<'grid' | 'list'>(() => {
@@ -196,7 +199,8 @@ const ServersPage = () => {
       if (!cacheData) return false;
       
       const { data, timestamp } = JSON.parse(cacheData);
-      if (!data || !Array.isArray(data)) return false;
+      // 空列表不作为缓存使用（后端刷新完成前的空结果）
+      if (!data || !Array.isArray(data) || data.length === 0) return false;
       
       console.log(`💾 从缓存加载服务器数据... (${data.length} 台服务器)`);
       
@@ -244,10 +248,40 @@ const ServersPage = () => {
     }
   };
 
+  // 轮询后端的服务器列表刷新任务，完成后重新获取列表
+  const pollRefreshJob = async (jobId: string, authState: boolean) => {
+    if (refreshJobRef.current === jobId) return; // 已在轮询该任务
+    refreshJobRef.current = jobId;
+    try {
+      while (refreshJobRef.current === jobId) {
+        await new Promise(resolve => setTimeout(resolve, REFRESH_POLL_INTERVAL));
+        if (refreshJobRef.current !== jobId) return;
+        
+        const { data: job } = await api.get(`/servers/refresh/${jobId}`);
+        if (job.state === 'running' || job.state === 'queued') continue; // 排队的完整解析任务等当前刷新结束后开始
+        
+        refreshJobRef.current = null;
+        if (job.state === 'completed') {
+          console.log(`✅ 服务器列表刷新任务 ${jobId} 已完成，重新获取列表`);
+          await fetchServers(false, authState, true);
+        } else {
+          setIsLoading(false);
+          toast.error(`刷新服务器列表失败: ${job.error || '未知错误'}`);
+        }
+        return;
+      }
+    } catch (error: any) {
+      console.error("查询服务器列表刷新任务出错:", error);
+      if (refreshJobRef.current === jobId) refreshJobRef.current = null;
+      setIsLoading(false);
+    }
+  };
+
   // Fetch servers from the backend
-  const fetchServers = async (forceRefresh = false, overrideAuth?: boolean) => {
+  // refreshCompleted: 后端刷新任务刚完成，直接获取后端缓存（不再检查本地缓存，也不再触发刷新）
+  const fetchServers = async (forceRefresh = false, overrideAuth?: boolean, refreshCompleted = false) => {
     // 如果不是强制刷新，并且已从缓存加载过数据，并且缓存未过期，则跳过
-    if (!forceRefresh && hasLoadedFromCache.current && !isCacheExpired()) {
+    if (!forceRefresh && !refreshCompleted && hasLoadedFromCache.current && !isCacheExpired()) {
       console.log("使用现有数据，缓存未过期，跳过API请求");
       return;
     }
@@ -284,6 +318,10 @@ const ServersPage = () => {
       // 调试输出查看原始服务器数据
       console.log("原始服务器数据:", response.data);
       
+      // 后端仍在刷新时返回的是旧缓存（或冷启动时的空列表），刷新完成前不能当作最新数据
+      const cacheInfo = response.data?.cacheInfo;
+      const refreshJobId: string | undefined = cacheInfo?.refreshing ? cacheInfo.refreshJob?.id : undefined;
+      
       // 确保我们从正确的数据结构中获取服务器列表
       let serversList = [];
       
@@ -362,12 +400,24 @@ const ServersPage = () => {
       //   setFilteredServers(formattedServers);
       // }
       
-      setIsLoading(false); // isLoading 在这里可以先置为false，因为数据已获取并设置
-      // 更新最后刷新时间
-      setLastUpdated(new Date());
-      
-      // 保存到缓存
-      saveToCache(formattedServers);
+      if (refreshJobId) {
+        // 后端仍在刷新：先显示旧数据，不更新刷新时间也不保存到缓存，刷新完成后重新获取
+        setIsLoading(formattedServers.length === 0);
+        if (cacheInfo.timestamp) {
+          setLastUpdated(new Date(cacheInfo.timestamp * 1000));
+        }
+        if (forceRefresh && formattedServers.length > 0) {
+          toast.info('后台正在刷新服务器列表，完成后自动更新');
+        }
+        pollRefreshJob(refreshJobId, authState); // 后台轮询，不需要await
+      } else {
+        setIsLoading(false); // isLoading 在这里可以先置为false，因为数据已获取并设置
+        // 更新最后刷新时间
+        setLastUpdated(new Date());
+        
+        // 保存到缓存
+        saveToCache(formattedServers);
+      }
       
       console.log(`✅ 服务器数据已设置: ${formattedServers.length} 台服务器`);
       console.log(`🔍 setServers后，ref.size = ${subscribedServersRef.current.size}`);
@@ -1127,6 +1177,7 @@ const ServersPage = () => {
     
     return () => {
       unsubscribe();
+      refreshJobRef.current = null; // 停止轮询刷新任务
     };
   }, []);
 